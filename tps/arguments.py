@@ -3,6 +3,16 @@
 Functionality parses arguments and answers questions about defined arguments:
     -d/--distinct-rooms
     -g/--graph-dir
+    -w/--weighted-edges
+    render-all [-j/--jobs] [-t/--timeout] [-e/--engine] [-f/--format]
+    graph [render-all options] HOSPITAL [HOSPITAL ...]
+    illness-graph [render-all options] -H/--hospital HOSPITAL ILLNESS [ILLNESS ...]
+    room-graph [render-all options] -H/--hospital HOSPITAL ROOM [ROOM ...]
+    edges [-r/--by-room] [-a/--ascending] [-o/--output] [HOSPITAL ...]
+    danger [-s/--sort] [-S/--strategy] [-a/--ascending] [-o/--output] [HOSPITAL ...]
+    serve [-p/--port] [-t/--timeout]
+
+The subcommands run without menus, prompts, or screen clearing.
 
     Typical usage example:
 
@@ -23,6 +33,74 @@ import os
 # Local
 
 
+# MACROS
+# Default number of seconds a single render-all layout may run
+RENDER_TIMEOUT = 120.0
+# Default serve port
+SERVE_PORT = 8080
+# Subcommands that render the graphs of their targets
+GRAPH_COMMANDS = ('graph', 'illness-graph', 'room-graph')
+# Subcommands that print the tables of their targets
+TABLE_COMMANDS = ('edges', 'danger')
+
+
+def command_name(args: argparse.Namespace) -> str:
+    """Determine which subcommand, if any, was requested.
+
+    Returns the subcommand name (e.g., 'render-all'), an empty string otherwise.
+    """
+    # LOCAL VARIABLES
+    command = ''  # Subcommand name
+
+    # INPUT VALIDATION
+    if not isinstance(args, argparse.Namespace):
+        raise TypeError(f'The args parameter can not be of type {type(args)}')
+
+    # CHECK IT
+    try:
+        if args.command:
+            command = args.command
+    except AttributeError:
+        pass
+
+    # DONE
+    return command
+
+
+def command_targets(args: argparse.Namespace) -> dict:
+    """Determine the targets of a graph or table subcommand.
+
+    Returns a dictionary of hospital_names (list) and item_names (list of the illness or room
+    names).  Empty lists are used for any target not found in args.
+    """
+    # LOCAL VARIABLES
+    targets = {'hospital_names': [], 'item_names': []}  # Return value
+
+    # INPUT VALIDATION
+    if not isinstance(args, argparse.Namespace):
+        raise TypeError(f'The args parameter can not be of type {type(args)}')
+
+    # CHECK IT
+    try:
+        if args.hospital:
+            targets['hospital_names'] = [args.hospital]
+    except AttributeError:
+        pass
+    try:
+        if args.hospitals:
+            targets['hospital_names'] = list(args.hospitals)
+    except AttributeError:
+        pass
+    try:
+        if args.items:
+            targets['item_names'] = list(args.items)
+    except AttributeError:
+        pass
+
+    # DONE
+    return targets
+
+
 def graph_directory(args: argparse.Namespace) -> bool:
     """Determine what directory to store graph files in.
 
@@ -53,12 +131,161 @@ def parse_arguments() -> argparse.Namespace:
     parser.add_argument('-d', '--distinct-rooms', action='store_true', default=False,
                         help='Separate dual-purpose rooms on the directed graph')
     parser.add_argument('-g', '--graph-dir', help='Directed graph storage directory')
+    parser.add_argument('-w', '--weighted-edges', action='store_true', default=False,
+                        help='Collapse parallel edges into one edge labeled with its count')
+    subparsers = parser.add_subparsers(dest='command')
+    # Options shared by every subcommand that renders graphs
+    render_parent = argparse.ArgumentParser(add_help=False)
+    render_parent.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                               help='Number of graphs to render in parallel (default: CPU count)')
+    render_parent.add_argument('-t', '--timeout', type=float, default=RENDER_TIMEOUT,
+                               help=f'Seconds one graph may render before it fails '
+                                    f'(default: {RENDER_TIMEOUT})')
+    render_parent.add_argument('-e', '--engine', default='dot',
+                               help='Layout engine: [dot], neato, sfdp, fdp, tps (in-process, '
+                                    'needs --format svg)')
+    render_parent.add_argument('-f', '--format', default='png', dest='graph_format',
+                               help='Output format: [png], pdf, svg')
+    render_parent.add_argument('-n', '--no-cache', action='store_false', default=True,
+                               dest='cache',
+                               help='Pipe each graph straight to its file instead of through the '
+                                    'render cache')
+    # Options shared by every subcommand that prints tables
+    table_parent = argparse.ArgumentParser(add_help=False)
+    table_parent.add_argument('-a', '--ascending', action='store_true', default=False,
+                              help='Sort the table in ascending order')
+    table_parent.add_argument('-o', '--output', default='',
+                              help='Export the tables to this file instead of printing them: '
+                                   '.csv, .jsonl, .arrow, .parquet (pyarrow), or - for CSV on '
+                                   'stdout')
+    table_parent.add_argument('hospitals', nargs='*', metavar='HOSPITAL',
+                              help='Hospital name (e.g., Smogley) (default: every hospital)')
+    subparsers.add_parser('render-all', parents=[render_parent],
+                          help='Render every hospital, illness, and room graph without the menus')
+    subparsers.add_parser('graph', parents=[render_parent],
+                          help='Render the graph of each hospital').add_argument(
+                              'hospitals', nargs='+', metavar='HOSPITAL',
+                              help='Hospital name (e.g., Smogley)')
+    for command, item, items in (('illness-graph', 'ILLNESS', 'illnesses'),
+                                 ('room-graph', 'ROOM', 'rooms')):
+        item_parser = subparsers.add_parser(command, parents=[render_parent],
+                                            help=f'Render the graph of each of a hospital\'s '
+                                                 f'{items}')
+        item_parser.add_argument('-H', '--hospital', required=True,
+                                 help='Hospital name (e.g., Smogley)')
+        item_parser.add_argument('items', nargs='+', metavar=item,
+                                 help=f'{item.capitalize()} name')
+    subparsers.add_parser('edges', parents=[table_parent],
+                          help='Print the room connection table of each hospital').add_argument(
+                              '-r', '--by-room', action='store_true', default=False,
+                              help='Sort the table by room name instead of connection count')
+    danger_parser = subparsers.add_parser('danger', parents=[table_parent],
+                                          help='Print the illness danger table of each hospital')
+    danger_parser.add_argument('-s', '--sort', type=int, default=6, dest='sort_by_col',
+                               help='Column to sort by: 1 illness, 2 treatment, 3 difficulty, '
+                                    '4 death chance, 5 rate of decline, [6] aggregate')
+    danger_parser.add_argument('-S', '--strategy', type=int, default=2,
+                               help='Aggregate strategy (see: the danger menu) (default: 2)')
+    serve_parser = subparsers.add_parser(
+        'serve', help='Answer JSON, SVG, and PNG queries over HTTP on localhost until interrupted')
+    serve_parser.add_argument('-p', '--port', type=int, default=SERVE_PORT,
+                              help=f'Port to listen on (default: {SERVE_PORT})')
+    serve_parser.add_argument('-t', '--timeout', type=float, default=RENDER_TIMEOUT,
+                              help=f'Seconds one graph may render before its request fails '
+                                   f'(default: {RENDER_TIMEOUT})')
+    serve_parser.add_argument('-c', '--cache-renders', action='store_true', default=False,
+                              help='Also keep rendered graphs in the on-disk render cache')
     args = parser.parse_args()
 
     # DONE
     return args
 
 
+def render_options(args: argparse.Namespace) -> dict:
+    """Determine the render-all options.
+
+    Returns a dictionary of jobs, timeout, engine, graph_format, and cache.  Defaults are used for
+    any option not found in args.
+    """
+    # LOCAL VARIABLES
+    options = {'jobs': os.cpu_count() or 1, 'timeout': RENDER_TIMEOUT, 'engine': 'dot',
+               'graph_format': 'png', 'cache': True}  # Return value
+
+    # INPUT VALIDATION
+    if not isinstance(args, argparse.Namespace):
+        raise TypeError(f'The args parameter can not be of type {type(args)}')
+
+    # CHECK IT
+    for option in options:
+        try:
+            if getattr(args, option) or isinstance(getattr(args, option), bool):
+                options[option] = getattr(args, option)
+        except AttributeError:
+            pass
+
+    # DONE
+    return options
+
+
+def serve_options(args: argparse.Namespace) -> dict:
+    """Determine the serve options.
+
+    Returns a dictionary of port, timeout, and cache_renders.  Defaults are used for any option
+    not found in args.
+    """
+    # LOCAL VARIABLES
+    options = {'port': SERVE_PORT, 'timeout': RENDER_TIMEOUT,
+               'cache_renders': False}  # Return value
+
+    # INPUT VALIDATION
+    if not isinstance(args, argparse.Namespace):
+        raise TypeError(f'The args parameter can not be of type {type(args)}')
+
+    # CHECK IT
+    for option in options:
+        try:
+            if getattr(args, option) is not None:
+                options[option] = getattr(args, option)
+        except AttributeError:
+            pass
+
+    # DONE
+    return options
+
+
+def table_options(args: argparse.Namespace) -> dict:
+    """Determine the table subcommand options.
+
+    Returns a dictionary of sort_desc, sort_by_count, sort_by_col, strategy, and output (an
+    export path, empty to print).  Defaults are used for any option not found in args.
+    """
+    # LOCAL VARIABLES
+    options = {'sort_desc': True, 'sort_by_count': True, 'sort_by_col': 6,
+               'strategy': 2, 'output': ''}  # Return value
+
+    # INPUT VALIDATION
+    if not isinstance(args, argparse.Namespace):
+        raise TypeError(f'The args parameter can not be of type {type(args)}')
+
+    # CHECK IT
+    try:
+        options['sort_desc'] = not args.ascending
+    except AttributeError:
+        pass
+    try:
+        options['sort_by_count'] = not args.by_room
+    except AttributeError:
+        pass
+    for option in ('sort_by_col', 'strategy', 'output'):
+        try:
+            options[option] = getattr(args, option)
+        except AttributeError:
+            pass
+
+    # DONE
+    return options
+
+
 def separate_rooms(args: argparse.Namespace) -> bool:
     """Determine if rooms should be separated."""
     # LOCAL VARIABLES
@@ -77,3 +304,23 @@ def separate_rooms(args: argparse.Namespace) -> bool:
 
     # DONE
     return separate
+
+
+def weighted_edges(args: argparse.Namespace) -> bool:
+    """Determine if parallel edges should be collapsed into weighted edges."""
+    # LOCAL VARIABLES
+    weighted = False  # Argument is found and True
+
+    # INPUT VALIDATION
+    if not isinstance(args, argparse.Namespace):
+        raise TypeError(f'The args parameter can not be of type {type(args)}')
+
+    # CHECK IT
+    try:
+        if args.weighted_edges:
+            weighted = True
+    except AttributeError:
+        pass
+
+    # DONE
+    return weighted
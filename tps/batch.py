@@ -0,0 +1,251 @@
+"""Renders the full Two Point Science graph atlas.
+
+Enumerates every hospital, illness, and room graph and renders them through a bounded process
+pool.  Each layout runs under a timeout and failures are collected into a summary instead of
+stopping the batch.  Renders go through the RenderCache (see: render_cache module) so an
+unchanged graph is never laid out twice.  Without the cache, each graph is piped straight to its
+file in the graph directory; nothing else is written.
+
+    Typical usage example:
+
+    python3 -m tps -g graphs render-all --jobs 16 --timeout 60
+    python3 -m tps -g graphs illness-graph -H Smogley 'Jest Infection' 'Mock Star'
+
+    from tps.batch import print_render_summary, render_all
+    results = render_all('graphs', jobs=16)
+    print_render_summary(results)
+"""
+
+# Standard
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List
+import subprocess
+import time
+
+# Third Party
+
+# Local
+from tps.dgraph import (create_sep_room_dict, create_target_graph, GRAPH_HOSPITAL, GRAPH_ILLNESS,
+                        GRAPH_ROOM)
+from tps.misc import print_stats_table
+from tps.render_cache import export_render, pipe_graph, RenderCache, write_atomic
+from tps.tph_hospital import get_configured_hospitals, TPHHospital
+
+
+# MACROS
+# Render job kinds (see: dgraph module's GRAPH_* macros)
+JOB_HOSPITAL = GRAPH_HOSPITAL
+JOB_ILLNESS = GRAPH_ILLNESS
+JOB_ROOM = GRAPH_ROOM
+
+# One graph to render: the kind of graph, its hospital, and the illness or room name (if any)
+RenderJob = namedtuple('RenderJob', 'kind hospital_name item_name')
+# The outcome of one RenderJob: the exported file path on success, an error message on failure
+RenderResult = namedtuple('RenderResult', 'job path error seconds')
+
+
+def enumerate_jobs(hospital_list: List[str] = None, sep_rooms: bool = False) -> List[RenderJob]:
+    """List every graph that can be rendered for the hospitals in hospital_list.
+
+    Hospitals that are not configured with illnesses have no graphs and are skipped.
+
+    Args:
+        hospital_list: Optional; Hospital names to enumerate.  Defaults to TPH_HOSPITAL_LIST.
+        sep_rooms: Optional; If true, dual-purpose rooms get a ' (diag)' and a ' (treat)' graph.
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # LOCAL VARIABLES
+    job_list = []     # Return value
+    room_dict = {}    # Room menu dictionary for hospital
+
+    # INPUT VALIDATION
+    if not isinstance(sep_rooms, bool):
+        raise TypeError(f'The sep_rooms argument must of type bool instead of {type(sep_rooms)}')
+
+    # ENUMERATE
+    for hospital in get_configured_hospitals(hospital_list):
+        job_list.append(RenderJob(JOB_HOSPITAL, hospital.get_name(), ''))
+        for ill_name in sorted(hospital.get_illness_names()):
+            job_list.append(RenderJob(JOB_ILLNESS, hospital.get_name(), ill_name))
+        room_dict = dict(enumerate(hospital.get_room_list(sort_list=True), 1))
+        if sep_rooms:
+            room_dict = create_sep_room_dict(room_dict)
+        for room_name in room_dict.values():
+            job_list.append(RenderJob(JOB_ROOM, hospital.get_name(), room_name))
+
+    # DONE
+    return job_list
+
+
+def print_render_summary(results: List[RenderResult], title: str = 'RENDER ALL') -> None:
+    """Print render totals, under title, followed by every failed job and its error."""
+    # LOCAL VARIABLES
+    failures = [result for result in results if result.error]  # Failed jobs
+
+    # INPUT VALIDATION
+    if not isinstance(results, list):
+        raise TypeError(f'The results argument must of type list instead of {type(results)}')
+    if not isinstance(title, str):
+        raise TypeError(f'The title argument must of type str instead of {type(title)}')
+
+    # PRINT IT
+    print_stats_table({'graphs': len(results), 'rendered': len(results) - len(failures),
+                       'failed': len(failures),
+                       'render seconds': f'{sum(result.seconds for result in results):.1f}'},
+                      title=title)
+    if failures:
+        print('\nFAILURES')
+        for result in failures:
+            print(f'    {_describe_job(result.job)}: {result.error}')
+
+
+# pylint: disable=too-many-arguments
+def render_all(graph_dir: str, sep_rooms: bool = False, weighted: bool = False, jobs: int = 1,
+               timeout: float = None, engine: str = 'dot', graph_format: str = 'png',
+               hospital_list: List[str] = None, cache: bool = True) -> List[RenderResult]:
+    """Render every hospital, illness, and room graph in parallel.
+
+    Args:
+        graph_dir: Directory to store the graph files in.
+        sep_rooms: Optional; If true, multi-purpose rooms are separated into ' (diag)' and
+            ' (treat)' versions on the graphs.
+        weighted: Optional; If true, parallel edges are collapsed into weighted edges.
+        jobs: Optional; Maximum number of worker processes.
+        timeout: Optional; Seconds one layout may run before its job fails.
+        engine: Optional; Digraph build engine: [dot], neato, sfdp, fdp
+        graph_format: Optional; File format for Digraph: [png], pdf, svg
+        hospital_list: Optional; Hospital names to render.  Defaults to TPH_HOSPITAL_LIST.
+        cache: Optional; If False, skip the RenderCache and pipe each graph straight to its file.
+
+    Returns:
+        One RenderResult per job, in enumeration order.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: jobs or timeout is not positive.
+    """
+    # DONE
+    return render_jobs(enumerate_jobs(hospital_list=hospital_list, sep_rooms=sep_rooms),
+                       graph_dir=graph_dir, sep_rooms=sep_rooms, weighted=weighted, jobs=jobs,
+                       timeout=timeout, engine=engine, graph_format=graph_format, cache=cache)
+# pylint: enable=too-many-arguments
+
+
+# pylint: disable=too-many-arguments
+# pylint: disable=too-many-locals
+def render_jobs(job_list: List[RenderJob], graph_dir: str, sep_rooms: bool = False,
+                weighted: bool = False, jobs: int = 1, timeout: float = None,
+                engine: str = 'dot', graph_format: str = 'png',
+                cache: bool = True) -> List[RenderResult]:
+    """Render the graphs in job_list in parallel.
+
+    A lone job, or a single worker, renders in this process instead of starting a pool.
+
+    Args:
+        job_list: RenderJobs to render. (see: enumerate_jobs())
+        graph_dir: Directory to store the graph files in.
+        sep_rooms: Optional; If true, multi-purpose rooms are separated into ' (diag)' and
+            ' (treat)' versions on the graphs.
+        weighted: Optional; If true, parallel edges are collapsed into weighted edges.
+        jobs: Optional; Maximum number of worker processes.
+        timeout: Optional; Seconds one layout may run before its job fails.
+        engine: Optional; Digraph build engine: [dot], neato, sfdp, fdp
+        graph_format: Optional; File format for Digraph: [png], pdf, svg
+        cache: Optional; If False, skip the RenderCache and pipe each graph straight to its file.
+
+    Returns:
+        One RenderResult per job, in job_list order.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: jobs or timeout is not positive.
+    """
+    # LOCAL VARIABLES
+    result_dict = {}  # Job index: RenderResult
+    future_dict = {}  # Future: Job index
+
+    # INPUT VALIDATION
+    if not isinstance(job_list, list):
+        raise TypeError(f'The job_list argument must of type list instead of {type(job_list)}')
+    if not isinstance(graph_dir, str):
+        raise TypeError(f'The graph_dir argument must of type str instead of {type(graph_dir)}')
+    if not isinstance(sep_rooms, bool):
+        raise TypeError(f'The sep_rooms argument must of type bool instead of {type(sep_rooms)}')
+    if not isinstance(weighted, bool):
+        raise TypeError(f'The weighted argument must of type bool instead of {type(weighted)}')
+    if not isinstance(jobs, int):
+        raise TypeError(f'The jobs argument must of type int instead of {type(jobs)}')
+    if jobs < 1:
+        raise ValueError(f'The jobs value ({jobs}) must be greater than zero')
+    if timeout is not None and timeout <= 0:
+        raise ValueError(f'The timeout value ({timeout}) must be greater than zero')
+    if not isinstance(cache, bool):
+        raise TypeError(f'The cache argument must of type bool instead of {type(cache)}')
+
+    # RENDER
+    if jobs == 1 or len(job_list) < 2:
+        return [_render_job(job, graph_dir, sep_rooms, weighted, engine, graph_format, timeout,
+                            cache) for job in job_list]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(job_list))) as executor:
+        for index, job in enumerate(job_list):
+            future_dict[executor.submit(_render_job, job, graph_dir, sep_rooms, weighted,
+                                        engine, graph_format, timeout, cache)] = index
+        for future in as_completed(future_dict):
+            try:
+                result_dict[future_dict[future]] = future.result()
+            except Exception as err:  # pylint:disable=broad-except
+                # The worker itself died (e.g., BrokenProcessPool)
+                result_dict[future_dict[future]] = RenderResult(
+                    job_list[future_dict[future]], '', f'{type(err).__name__}: {err}', 0.0)
+
+    # DONE
+    return [result_dict[index] for index in range(0, len(job_list))]
+# pylint: enable=too-many-arguments
+# pylint: enable=too-many-locals
+
+
+def _describe_job(job: RenderJob) -> str:
+    """Return a human-readable name for job."""
+    if job.kind == JOB_HOSPITAL:
+        return job.hospital_name
+    return f'{job.hospital_name} - {job.kind.capitalize()} - {job.item_name}'
+
+
+# pylint: disable=too-many-arguments
+def _render_job(job: RenderJob, graph_dir: str, sep_rooms: bool, weighted: bool, engine: str,
+                graph_format: str, timeout: float, cache: bool) -> RenderResult:
+    """Build and render one graph on behalf of render_all().  Runs in a worker process.
+
+    Never raises; errors are reported in the RenderResult.
+    """
+    # LOCAL VARIABLES
+    start = time.monotonic()               # Job start time
+    hospital = None                        # TPHHospital object
+    graph_obj = None                       # Graph to render
+    render_path = ''                       # Exported render path
+
+    # RENDER IT
+    try:
+        hospital = TPHHospital(job.hospital_name)
+        graph_obj = create_target_graph(hospital=hospital, graph_dir=graph_dir, kind=job.kind,
+                                        item_name=job.item_name, sep_rooms=sep_rooms,
+                                        engine=engine, graph_format=graph_format,
+                                        weighted=weighted)
+        render_path = graph_obj.filepath + '.' + graph_format
+        if cache:
+            # Per-process view of the shared on-disk cache
+            export_render(RenderCache(graph_dir).render(graph_obj, timeout=timeout), render_path)
+        else:
+            write_atomic(render_path, pipe_graph(graph_obj, timeout=timeout))
+    except subprocess.TimeoutExpired:
+        return RenderResult(job, '', f'{engine} timed out after {timeout} seconds',
+                            time.monotonic() - start)
+    except Exception as err:  # pylint:disable=broad-except
+        return RenderResult(job, '', f'{type(err).__name__}: {err}', time.monotonic() - start)
+
+    # DONE
+    return RenderResult(job, render_path, '', time.monotonic() - start)
+# pylint: enable=too-many-arguments
@@ -0,0 +1,325 @@
+"""Defines the Two Point Science room build order planner.
+
+Plans the order to build a hospital's rooms in so the illnesses it can diagnose and treat (see:
+coverage module) grow as fast as possible.  A plan's score is the area under its coverage curve:
+the covered weight after each room is built, summed, as a fraction of the best imaginable.  An
+illness' weight is its danger aggregate value or, counting illnesses by frequency, 1.
+
+Only the rooms an uncovered illness is missing are worth building next, and a set of missing rooms
+that contains another illness' missing rooms is never worth building first.  The greedy planner
+builds the set that covers the most weight per room.  The exact planner searches every order of
+those sets, remembering each set of built rooms it's solved, and is used for hospitals with up to
+EXACT_MAX_ROOMS rooms.  Hospitals are planned in parallel worker processes.
+
+    Typical usage example:
+
+    from tps.build_order import plan_all_build_orders, print_build_rankings
+    print_build_rankings(plan_all_build_orders(mode=BUILD_AUTO, jobs=4))
+"""
+
+# Standard
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+import os
+
+# Third Party
+
+# Local
+from tps.coverage import get_coverage_masks
+from tps.danger_strategies import validate_strategy
+from tps.misc import print_table
+from tps.tph_catalog import TPH_CATALOG
+from tps.tph_hospital import get_configured_hospitals, TPHHospital
+
+
+# MACROS
+# Planner modes
+BUILD_GREEDY = 'greedy'  # Most weight per room first
+BUILD_EXACT = 'exact'    # Best order, for up to EXACT_MAX_ROOMS rooms
+BUILD_AUTO = 'auto'      # Exact when the hospital is small enough, otherwise greedy
+BUILD_MODES = (BUILD_GREEDY, BUILD_EXACT, BUILD_AUTO)
+# Most rooms the exact planner will take on
+EXACT_MAX_ROOMS = 20
+# One room built; covered is the fraction of the weight covered once it's built and illnesses are
+# the names of the illnesses it completes
+BuildStep = namedtuple('BuildStep', 'room_name covered illnesses')
+# One hospital's plan; mode is the planner that was used and score is between zero and one
+BuildPlan = namedtuple('BuildPlan', 'hospital_name mode by_danger score steps')
+
+
+def plan_all_build_orders(hospital_list: List[str] = None, mode: str = BUILD_AUTO,
+                          by_danger: bool = True, strategy: int = 2,
+                          jobs: int = 1) -> Dict[str, BuildPlan]:
+    """Plan the room build order of every hospital in hospital_list.
+
+    Hospitals that are not configured with illnesses have nothing to plan and are skipped.
+
+    Args:
+        hospital_list: Optional; Hospital names to plan.  Defaults to every hospital.
+        mode: Optional; One of BUILD_MODES.  BUILD_EXACT plans hospitals with more than
+            EXACT_MAX_ROOMS rooms greedily, as BUILD_AUTO does.
+        by_danger: Optional; If True, illnesses are weighted by danger.  Otherwise, every illness
+            counts the same.
+        strategy: Optional; Danger aggregate strategy. (see: TPHIllness.get_aggregate_value())
+        jobs: Optional; Maximum number of worker processes.
+
+    Returns:
+        A dictionary of hospital name: BuildPlan namedtuple, in hospital_list order.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid hospital name, mode, strategy, or jobs.
+    """
+    # LOCAL VARIABLES
+    plans = []  # BuildPlans of the configured hospitals, in hospital_list order
+
+    # INPUT VALIDATION
+    _validate_plan_build_order(mode=mode, by_danger=by_danger, strategy=strategy)
+    if not isinstance(jobs, int):
+        raise TypeError(f'The jobs argument must of type int instead of {type(jobs)}')
+    if jobs < 1:
+        raise ValueError(f'The jobs value ({jobs}) must be greater than zero')
+    # Surface bad names here, not in a worker
+    hospital_list = [hospital.get_name() for hospital in get_configured_hospitals(hospital_list)]
+    if mode == BUILD_EXACT:
+        mode = BUILD_AUTO
+
+    # PLAN IT
+    if jobs == 1:
+        plans = [_plan_hospital(hospital_name, mode, by_danger, strategy)
+                 for hospital_name in hospital_list]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, os.cpu_count() or 1,
+                                                 max(len(hospital_list), 1))) as executor:
+            plans = list(executor.map(_plan_hospital, hospital_list,
+                                      [mode] * len(hospital_list),
+                                      [by_danger] * len(hospital_list),
+                                      [strategy] * len(hospital_list)))
+
+    # DONE
+    return {plan.hospital_name: plan for plan in plans}
+
+
+# pylint: disable=too-many-locals
+def plan_build_order(hospital: TPHHospital, mode: str = BUILD_AUTO, by_danger: bool = True,
+                     strategy: int = 2) -> BuildPlan:
+    """Plan the order to build hospital's rooms in.
+
+    Args:
+        hospital: TPHHospital object to plan.
+        mode: Optional; One of BUILD_MODES.
+        by_danger: Optional; If True, illnesses are weighted by danger.  Otherwise, every illness
+            counts the same.
+        strategy: Optional; Danger aggregate strategy. (see: TPHIllness.get_aggregate_value())
+
+    Returns:
+        A BuildPlan namedtuple.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid mode or strategy, or too many rooms for BUILD_EXACT.
+        RuntimeError: The hospital's illnesses have not been configured.
+    """
+    # LOCAL VARIABLES
+    coverage = None  # Required room masks of hospital's illnesses
+    weights = {}     # Required room mask: Total weight of the illnesses requiring it
+    all_rooms = 0    # Mask of every room some illness requires
+    groups = []      # Room masks, in the order they're built
+    steps = []       # BuildSteps
+    built = 0        # Mask of the rooms built so far
+    completed = []   # Indices of the illnesses one room completes
+    covered = 0.0    # Weight covered so far
+    area = 0.0       # Area under the coverage curve
+
+    # INPUT VALIDATION
+    _validate_plan_build_order(mode=mode, by_danger=by_danger, strategy=strategy)
+    coverage = get_coverage_masks(hospital, strategy=strategy)
+    for mask, danger in zip(coverage.masks, coverage.dangers):
+        weights[mask] = weights.get(mask, 0.0) + (danger if by_danger else 1.0)
+        all_rooms = all_rooms | mask
+    if mode == BUILD_EXACT and _popcount(all_rooms) > EXACT_MAX_ROOMS:
+        raise ValueError(f'{hospital.get_name()} has {_popcount(all_rooms)} rooms to build but '
+                         f'the exact planner is limited to {EXACT_MAX_ROOMS}')
+    if mode == BUILD_AUTO:
+        mode = BUILD_EXACT if _popcount(all_rooms) <= EXACT_MAX_ROOMS else BUILD_GREEDY
+
+    # PLAN IT
+    if mode == BUILD_EXACT:
+        groups = _exact_order(tuple(weights.items()))
+    else:
+        groups = _greedy_order(tuple(weights.items()))
+
+    # WALK IT
+    for group in groups:
+        # Order doesn't matter within a group, so the rooms the most illnesses need go first
+        for room_id in sorted(_room_ids(group), key=lambda room_id: (
+                -sum(1 for mask in coverage.masks if mask & (1 << room_id)), room_id)):
+            built = built | (1 << room_id)
+            # Illnesses completed by this room
+            completed = [index for index, mask in enumerate(coverage.masks)
+                         if mask & (1 << room_id) and not mask & ~built]
+            covered = covered + sum(coverage.dangers[index] if by_danger else 1.0
+                                    for index in completed)
+            area = area + covered
+            steps.append(BuildStep(TPH_CATALOG.room_names[room_id], covered,
+                                   tuple(coverage.illness_names[index] for index in completed)))
+
+    # DONE
+    return BuildPlan(hospital.get_name(), mode, by_danger,
+                     area / (covered * len(steps)) if covered else 0.0,
+                     [step._replace(covered=step.covered / covered if covered else 0.0)
+                      for step in steps])
+# pylint: enable=too-many-locals
+
+
+def print_build_order(plan: BuildPlan) -> None:
+    """Prints a BuildPlan, one room per row.
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # INPUT VALIDATION
+    if not isinstance(plan, BuildPlan):
+        raise TypeError(f'The plan argument must of type BuildPlan instead of {type(plan)}')
+
+    # PRINT IT
+    print(f'\n{plan.hospital_name}: {plan.mode} build order, weighted by '
+          f'{"danger" if plan.by_danger else "frequency"}, scores {plan.score:.1%}')
+    print_table([(index + 1, step.room_name, f'{step.covered:.0%}',
+                  ', '.join(step.illnesses) or '-') for index, step in enumerate(plan.steps)],
+                ('STEP', 'ROOM', 'COVERED', 'UNLOCKS'))
+
+
+def print_build_rankings(all_plans: Dict[str, BuildPlan], sort_desc: bool = True) -> None:
+    """Prints one line per hospital, ranked by how fast its build order covers its illnesses.
+
+    Args:
+        all_plans: Dictionary of hospital name: BuildPlan. (see: plan_all_build_orders())
+        sort_desc: Optional; If True, the best scores are listed first.  Otherwise, the table is
+            sorted in ascending order.
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # LOCAL VARIABLES
+    sort_list = []  # Plans to sort
+
+    # INPUT VALIDATION
+    if not isinstance(all_plans, dict):
+        raise TypeError(f'The all_plans argument must of type dict instead of {type(all_plans)}')
+    if not isinstance(sort_desc, bool):
+        raise TypeError(f'The sort_desc argument must of type bool instead of {type(sort_desc)}')
+
+    # SORT IT
+    sort_list = sorted(all_plans.values(), key=lambda plan: plan.hospital_name)
+    sort_list = sorted(sort_list, key=lambda plan: plan.score, reverse=sort_desc)
+
+    # PRINT IT
+    print_table([(plan.hospital_name, plan.mode, len(plan.steps), f'{plan.score:.1%}',
+                  ', '.join(step.room_name for step in plan.steps[:3]))
+                 for plan in sort_list], ('HOSPITAL', 'MODE', 'ROOMS', 'SCORE', 'FIRST ROOMS'))
+
+
+def _candidates(built: int, uncovered: Tuple[Tuple[int, float], ...]) -> List[int]:
+    """Return the missing room masks worth building next.
+
+    A missing room mask that contains another illness' missing room mask never is: building the
+    smaller one first covers that illness sooner and the other one no later.
+    """
+    # LOCAL VARIABLES
+    needs = {mask & ~built for mask, _ in uncovered}  # Missing room masks
+
+    # DONE
+    return sorted(need for need in needs
+                  if not any(other != need and not other & ~need for other in needs))
+
+
+def _exact_order(weights: Tuple[Tuple[int, float], ...]) -> List[int]:
+    """Return the room masks, in build order, with the largest area under the coverage curve."""
+    # LOCAL VARIABLES
+    memo = {}  # Built room mask: (Best area of the rooms left to build, their room masks)
+
+    # SEARCH IT
+    def search(built: int, covered: float,
+               uncovered: Tuple[Tuple[int, float], ...]) -> Tuple[float, tuple]:
+        """Return the best (area, room masks) left once built covers covered weight."""
+        # LOCAL VARIABLES
+        best = (-1.0, ())  # Best (area, room masks) found
+        gain = 0.0         # Weight one candidate covers
+        rest = ()          # Illnesses one candidate leaves uncovered
+
+        # SEARCH IT
+        if not uncovered:
+            return (0.0, ())
+        if built in memo:
+            return memo[built]
+        for need in _candidates(built, uncovered):
+            gain = sum(weight for mask, weight in uncovered if not mask & ~(built | need))
+            rest = tuple((mask, weight) for mask, weight in uncovered
+                         if mask & ~(built | need))
+            area, order = search(built | need, covered + gain, rest)
+            # Coverage holds until the candidate's last room is built
+            area = area + covered * (_popcount(need) - 1) + covered + gain
+            if area > best[0]:
+                best = (area, (need,) + order)
+        memo[built] = best
+        return best
+
+    # DONE
+    return list(search(0, 0.0, weights)[1])
+
+
+def _greedy_order(weights: Tuple[Tuple[int, float], ...]) -> List[int]:
+    """Return the room masks, in build order, picking the most weight per room each time."""
+    # LOCAL VARIABLES
+    built = 0               # Mask of the rooms built so far
+    uncovered = weights     # (Required room mask, weight) of the uncovered illnesses
+    groups = []             # Return value
+    best = (-1.0, -1.0, 0)  # (Weight per room, weight, missing room mask) of the best candidate
+    gain = 0.0              # Weight one candidate covers
+
+    # PICK IT
+    while uncovered:
+        best = (-1.0, -1.0, 0)  # Any candidate beats it
+        for need in _candidates(built, uncovered):
+            gain = sum(weight for mask, weight in uncovered if not mask & ~(built | need))
+            if (gain / _popcount(need), gain) > best[:2]:
+                best = (gain / _popcount(need), gain, need)
+        groups.append(best[2])
+        built = built | best[2]
+        uncovered = tuple((mask, weight) for mask, weight in uncovered if mask & ~built)
+
+    # DONE
+    return groups
+
+
+def _plan_hospital(hospital_name: str, mode: str, by_danger: bool,
+                   strategy: int) -> BuildPlan:
+    """Plan one configured hospital in a worker process."""
+    return plan_build_order(TPHHospital(hospital_name), mode=mode, by_danger=by_danger,
+                            strategy=strategy)
+
+
+def _popcount(mask: int) -> int:
+    """Return the number of rooms in mask."""
+    return bin(mask).count('1')
+
+
+def _room_ids(mask: int) -> List[int]:
+    """Return the room IDs in mask, lowest first."""
+    return [room_id for room_id in range(0, mask.bit_length()) if mask & (1 << room_id)]
+
+
+def _validate_plan_build_order(mode: str, by_danger: bool, strategy: int) -> None:
+    """Validate input on behalf of plan_build_order() and plan_all_build_orders()."""
+    # mode
+    if not isinstance(mode, str):
+        raise TypeError(f'The mode argument must of type str instead of {type(mode)}')
+    if mode not in BUILD_MODES:
+        raise ValueError(f'The mode "{mode}" is not one of {", ".join(BUILD_MODES)}')
+    # by_danger
+    if not isinstance(by_danger, bool):
+        raise TypeError(f'The by_danger argument must of type bool instead of {type(by_danger)}')
+    # strategy
+    validate_strategy(strategy)
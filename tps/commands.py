@@ -0,0 +1,250 @@
+"""Runs the Two Point Science subcommands without the menus.
+
+Every subcommand takes its hospital, illness, or room names on the command line and runs with no
+prompts and no screen clearing, so one process serves a whole batch of targets.  A bad target is
+reported and skipped instead of stopping the batch; the caller decides how to fail.
+(see: arguments module)
+
+Graph functionality (e.g., batch, dgraph, graphviz) is imported the first time a graph is
+rendered so that table subcommands start quickly.
+
+    Typical usage example:
+
+    python3 -m tps danger --sort 4 Smogley 'Grockle Bay'
+    python3 -m tps -g graphs room-graph -H Smogley Surgery Ward
+
+    from tps.commands import print_danger_tables
+    failures = print_danger_tables(['Smogley', 'Grockle Bay'], sort_by_col=4)
+"""
+
+# Standard
+from typing import TYPE_CHECKING, List
+
+# Third Party
+
+# Local
+from tps.danger_strategies import validate_strategy
+from tps.danger_table import DANGER_COLUMNS
+from tps.menu import enumerate_edges
+from tps.misc import print_danger_table, print_edge_table, print_exception
+from tps.tph_constants import TPH_ROOM_DICT
+from tps.tph_hospital import get_configured_hospitals, TPHHospital
+if TYPE_CHECKING:
+    from tps.batch import RenderResult  # Imported when the first graph is rendered
+
+
+# MACROS
+# Graph subcommand: Render job kind (see: batch module's JOB_* macros)
+COMMAND_JOB_KINDS = {'graph': 'hospital', 'illness-graph': 'illness', 'room-graph': 'room'}
+
+
+def check_target(kind: str, hospital_name: str, item_name: str, sep_rooms: bool) -> str:
+    """Return why a render target can't be rendered, an empty string if it can.
+
+    Args:
+        kind: 'hospital', 'illness', or 'room'.
+        hospital_name: Hospital to render.
+        item_name: Illness or room name to render (ignored for hospitals).
+        sep_rooms: If True, multi-purpose rooms are named ' (diag)' and ' (treat)'.
+    """
+    # pylint: disable=import-outside-toplevel
+    from tps.dgraph import create_sep_room_dict
+
+    # LOCAL VARIABLES
+    hospital = None  # TPHHospital object
+    room_dict = {}   # Room menu dictionary for hospital
+
+    # CHECK IT
+    try:
+        hospital = TPHHospital(hospital_name)
+        hospital.get_illness_ids()
+    except (NotImplementedError, RuntimeError, ValueError) as err:
+        return str(err)
+    if kind == 'illness' and item_name not in hospital.get_illness_names():
+        return 'Unknown illness name'
+    if kind == 'room':
+        room_dict = dict(enumerate(hospital.get_room_list(sort_list=True), 1))
+        if sep_rooms:
+            room_dict = create_sep_room_dict(room_dict)
+        if item_name not in room_dict.values():
+            return 'Unknown room name'
+
+    # DONE
+    return ''
+
+
+def print_danger_tables(hospital_names: List[str] = None, sort_by_col: int = 6, strategy: int = 2,
+                        sort_desc: bool = True) -> int:
+    """Print the illness danger table of every hospital in hospital_names.
+
+    Args:
+        hospital_names: Optional; Hospital names to print.  Defaults to every hospital configured
+            with illnesses.
+        sort_by_col: Optional; Column to sort the tables by. (see: danger_table module)
+        strategy: Optional; Aggregate strategy. (see: danger_strategies module)
+        sort_desc: Optional; If True, sort the tables in descending order.
+
+    Returns:
+        The number of hospitals whose table could not be printed.  Their errors are printed to
+        stderr.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid sort column or strategy.
+    """
+    # LOCAL VARIABLES
+    failures = 0     # Number of hospitals that failed
+    hospital = None  # TPHHospital object
+
+    # INPUT VALIDATION
+    if hospital_names is None:
+        hospital_names = [hospital.get_name() for hospital in get_configured_hospitals()]
+    _validate_hospital_names(hospital_names)
+    if not isinstance(sort_by_col, int):
+        raise TypeError(f'The sort_by_col argument must of type int instead of {type(sort_by_col)}')
+    if sort_by_col not in DANGER_COLUMNS:
+        raise ValueError(f'The sort_by_col value ({sort_by_col}) is not a danger table column')
+    validate_strategy(strategy)
+    if not isinstance(sort_desc, bool):
+        raise TypeError(f'The sort_desc argument must of type bool instead of {type(sort_desc)}')
+
+    # PRINT THEM
+    for hospital_name in hospital_names:
+        try:
+            hospital = TPHHospital(hospital_name)
+            print('\n' + hospital.get_name().upper() + ' ILLNESS DANGER')
+            print_danger_table(hospital, sort_by_col=sort_by_col, agg_strat=strategy,
+                               sort_desc=sort_desc)
+        except (NotImplementedError, RuntimeError, ValueError) as err:
+            print_exception(err)
+            failures += 1
+
+    # DONE
+    return failures
+
+
+def print_edge_tables(hospital_names: List[str] = None, sep_rooms: bool = False,
+                      sort_by_count: bool = True, sort_desc: bool = True) -> int:
+    """Print the room connection (edge) table of every hospital in hospital_names.
+
+    Args:
+        hospital_names: Optional; Hospital names to print.  Defaults to every hospital configured
+            with illnesses.
+        sep_rooms: Optional; If true, multi-purpose rooms are separated into ' (diag)' and
+            ' (treat)' versions on the tables.
+        sort_by_count: Optional; If True, sort the tables by edge count.  Otherwise, by name.
+        sort_desc: Optional; If True, sort the tables in descending order.
+
+    Returns:
+        The number of hospitals whose table could not be printed.  Their errors are printed to
+        stderr.
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # LOCAL VARIABLES
+    failures = 0     # Number of hospitals that failed
+    hospital = None  # TPHHospital object
+
+    # INPUT VALIDATION
+    if hospital_names is None:
+        hospital_names = [hospital.get_name() for hospital in get_configured_hospitals()]
+    _validate_hospital_names(hospital_names)
+    if not isinstance(sep_rooms, bool):
+        raise TypeError(f'The sep_rooms argument must of type bool instead of {type(sep_rooms)}')
+    if not isinstance(sort_by_count, bool):
+        raise TypeError(f'The sort_by_count argument must of type bool instead of '
+                        f'{type(sort_by_count)}')
+    if not isinstance(sort_desc, bool):
+        raise TypeError(f'The sort_desc argument must of type bool instead of {type(sort_desc)}')
+
+    # PRINT THEM
+    for hospital_name in hospital_names:
+        try:
+            hospital = TPHHospital(hospital_name)
+            print('\n' + hospital.get_name().upper() + ' ROOM CONNECTIONS')
+            print_edge_table(enumerate_edges(hospital, sep_rooms), TPH_ROOM_DICT,
+                             sort_by_count=sort_by_count, sort_desc=sort_desc)
+        except (NotImplementedError, RuntimeError, ValueError) as err:
+            print_exception(err)
+            failures += 1
+
+    # DONE
+    return failures
+
+
+# pylint: disable=too-many-arguments
+# pylint: disable=too-many-locals
+def render_targets(command: str, hospital_names: List[str], item_names: List[str],
+                   graph_dir: str, sep_rooms: bool = False, weighted: bool = False,
+                   **render_options) -> List['RenderResult']:
+    """Render the graph of every target of a graph subcommand, without viewing them.
+
+    Args:
+        command: Graph subcommand: graph, illness-graph, room-graph
+        hospital_names: Hospital names to render (graph) or the one hospital the items belong to.
+        item_names: Illness (illness-graph) or room (room-graph) names to render.
+        graph_dir: Directory to store the graph files in.
+        sep_rooms: Optional; If true, multi-purpose rooms are separated into ' (diag)' and
+            ' (treat)' versions on the graphs.
+        weighted: Optional; If true, parallel edges are collapsed into weighted edges.
+        render_options: Optional; jobs, timeout, engine, and graph_format.
+            (see: batch.render_jobs())
+
+    Returns:
+        One RenderResult per target, in command line order.  Unknown targets are failed
+        RenderResults instead of exceptions.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Unknown command, or invalid render options.
+    """
+    # pylint: disable=import-outside-toplevel
+    from tps.batch import RenderJob, RenderResult, render_jobs
+
+    # LOCAL VARIABLES
+    job_list = []     # Valid targets to render
+    result_list = []  # Return value, in command line order
+    error_dict = {}   # Target index: Error message, empty if the target is valid
+    rendered = None   # Iterator over the RenderResults of job_list
+
+    # INPUT VALIDATION
+    if command not in COMMAND_JOB_KINDS:
+        raise ValueError(f'The command {command} is not a graph subcommand')
+    _validate_hospital_names(hospital_names)
+    if not isinstance(item_names, list):
+        raise TypeError(f'The item_names argument must of type list instead of '
+                        f'{type(item_names)}')
+
+    # LIST JOBS
+    for index, job in enumerate([RenderJob(COMMAND_JOB_KINDS[command], hospital_name, '')
+                                 for hospital_name in hospital_names] if command == 'graph' else
+                                [RenderJob(COMMAND_JOB_KINDS[command], hospital_names[0],
+                                           item_name) for item_name in item_names]):
+        error_dict[index] = check_target(job.kind, job.hospital_name, job.item_name, sep_rooms)
+        if not error_dict[index]:
+            job_list.append(job)
+        result_list.append(RenderResult(job, '', error_dict[index], 0.0))
+
+    # RENDER THEM
+    rendered = iter(render_jobs(job_list, graph_dir=graph_dir, sep_rooms=sep_rooms,
+                                weighted=weighted, **render_options))
+
+    # DONE
+    return [result if error_dict[index] else next(rendered)
+            for index, result in enumerate(result_list)]
+# pylint: enable=too-many-arguments
+# pylint: enable=too-many-locals
+
+
+def _validate_hospital_names(hospital_names: List[str]) -> None:
+    """Validate the hospital_names argument on behalf of the public functions."""
+    if not isinstance(hospital_names, list):
+        raise TypeError(f'The hospital_names argument must of type list instead of '
+                        f'{type(hospital_names)}')
+    if not hospital_names:
+        raise ValueError('The hospital_names argument can not be empty')
+    for hospital_name in hospital_names:
+        if not isinstance(hospital_name, str):
+            raise TypeError(f'Found a hospital name of type {type(hospital_name)} in the '
+                            'hospital_names')
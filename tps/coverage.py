@@ -0,0 +1,323 @@
+"""Defines the Two Point Science room coverage queries.
+
+Answers "which illnesses can I treat with the rooms I've built?"  Every illness' required rooms
+(GP's Office, its diagnostic rooms, and its treatment room) are encoded as one integer bitmask
+over the catalog's room IDs, and each hospital's illnesses are stored as a tuple of those masks.
+Coverage, missing rooms, and the next room to build are then one bitwise pass over the masks.
+Masks are built once per hospital and shared through TPH_REGISTRY.
+
+    Typical usage example:
+
+    from tps.coverage import get_coverage, print_coverage_report
+    from tps.tph_hospital import TPHHospital
+    report = get_coverage(TPHHospital('Smogley'), ["GP's Office", 'Pharmacy', 'Ward'])
+    print_coverage_report(report)
+"""
+
+# Standard
+from collections import namedtuple
+from typing import Dict, Iterable, List
+
+# Third Party
+
+# Local
+from tps.danger_strategies import validate_strategy
+from tps.misc import print_table
+from tps.tph_catalog import NO_ROOM, TPH_CATALOG
+from tps.tph_hospital import get_configured_hospitals, TPHHospital, validate_hospital_list
+from tps.tph_registry import TPH_REGISTRY
+
+
+# MACROS
+# One hospital's required room masks and danger aggregate values, one entry per illness
+CoverageMasks = namedtuple('CoverageMasks', 'hospital_name illness_names masks dangers')
+# A room that would complete illnesses which are missing only that room
+RoomUnlock = namedtuple('RoomUnlock', 'room_name illnesses danger')
+# One hospital's answer.  built is the built room mask, covered is a tuple of illness names,
+# missing maps each uncovered illness name to its missing room mask (see: mask_rooms()), and
+# unlocks is a list of RoomUnlocks, best room first.
+CoverageReport = namedtuple('CoverageReport', 'hospital_name built covered missing unlocks')
+
+
+def get_all_coverage(built_rooms: Iterable[str], hospital_list: List[str] = None,
+                     strategy: int = 2) -> Dict[str, CoverageReport]:
+    """Check which illnesses built_rooms cover in every hospital in hospital_list.
+
+    Hospitals that are not configured with illnesses have nothing to cover and are skipped.
+
+    Args:
+        built_rooms: Names of the rooms that have been built.
+        hospital_list: Optional; Hospital names to check.  Defaults to every hospital.
+        strategy: Optional; Danger aggregate strategy used to rank the next rooms.
+            (see: TPHIllness.get_aggregate_value())
+
+    Returns:
+        A dictionary of hospital name: CoverageReport namedtuple.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid hospital name, room name, or strategy.
+    """
+    # LOCAL VARIABLES
+    all_reports = {}  # Return value
+    built = 0         # Mask of the built rooms
+    all_masks = ()    # CoverageMasks of every configured hospital in hospital_list
+
+    # INPUT VALIDATION
+    hospital_list = validate_hospital_list(hospital_list)
+    built = room_mask(built_rooms)
+    all_masks = TPH_REGISTRY.get((CoverageMasks, tuple(hospital_list), strategy),
+                                 lambda: _build_all_masks(hospital_list, strategy))
+
+    # CHECK IT
+    for coverage in all_masks:
+        all_reports[coverage.hospital_name] = _check_masks(coverage, built)
+
+    # DONE
+    return all_reports
+
+
+def get_coverage(hospital: TPHHospital, built_rooms: Iterable[str],
+                 strategy: int = 2) -> CoverageReport:
+    """Check which of hospital's illnesses built_rooms cover.
+
+    Args:
+        hospital: TPHHospital object to check.
+        built_rooms: Names of the rooms that have been built.
+        strategy: Optional; Danger aggregate strategy used to rank the next rooms.
+            (see: TPHIllness.get_aggregate_value())
+
+    Returns:
+        A CoverageReport namedtuple.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid room name or strategy.
+        RuntimeError: The hospital's illnesses have not been configured.
+    """
+    return _check_masks(get_coverage_masks(hospital, strategy=strategy), room_mask(built_rooms))
+
+
+def get_coverage_masks(hospital: TPHHospital, strategy: int = 2) -> CoverageMasks:
+    """Return the shared required room masks of hospital's illnesses.
+
+    Misconfigured illnesses, missing diagnostic rooms or a treatment room, can never be covered
+    and are left out.
+
+    Args:
+        hospital: TPHHospital object to encode.
+        strategy: Optional; Danger aggregate strategy. (see: TPHIllness.get_aggregate_value())
+
+    Returns:
+        A CoverageMasks namedtuple.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid strategy.
+        RuntimeError: The hospital's illnesses have not been configured.
+    """
+    # INPUT VALIDATION
+    if not isinstance(hospital, TPHHospital):
+        raise TypeError(f'The hospital can not be of type {type(hospital)}')
+    validate_strategy(strategy)
+
+    # DONE
+    return TPH_REGISTRY.get((CoverageMasks, hospital.get_name(), strategy),
+                            lambda: _build_masks(hospital, strategy))
+
+
+def next_room(report: CoverageReport) -> str:
+    """Return the name of the best room to build next, or an empty string if nothing is missing.
+
+    The best room completes the most illnesses (the first of report's unlocks).  If no one room
+    completes an illness, it's the room the most uncovered illnesses are missing.
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # LOCAL VARIABLES
+    demand = {}  # Room name: Number of uncovered illnesses missing it
+
+    # INPUT VALIDATION
+    if not isinstance(report, CoverageReport):
+        raise TypeError(f'The report argument must of type CoverageReport instead of '
+                        f'{type(report)}')
+
+    # PICK IT
+    if report.unlocks:
+        return report.unlocks[0].room_name
+    for needed in report.missing.values():
+        for room_name in mask_rooms(needed):
+            demand[room_name] = demand.get(room_name, 0) + 1
+
+    # DONE
+    return min(demand, key=lambda room_name: (-demand[room_name], room_name), default='')
+
+
+def print_coverage_report(report: CoverageReport) -> None:
+    """Prints a CoverageReport's uncovered illnesses and the best rooms to build next.
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # LOCAL VARIABLES
+    tuple_list = []  # Table entries
+
+    # INPUT VALIDATION
+    if not isinstance(report, CoverageReport):
+        raise TypeError(f'The report argument must of type CoverageReport instead of '
+                        f'{type(report)}')
+
+    # PRINT IT
+    print(f'\n{report.hospital_name}: {len(mask_rooms(report.built))} rooms built cover '
+          f'{len(report.covered)} of {len(report.covered) + len(report.missing)} illnesses')
+    if report.missing:
+        for illness_name, room_names in sorted(((illness_name, mask_rooms(needed))
+                                                for illness_name, needed in
+                                                report.missing.items()),
+                                               key=lambda item: (len(item[1]), item[0])):
+            tuple_list.append((illness_name, len(room_names), ', '.join(room_names)))
+        print_table(tuple_list, ('UNCOVERED ILLNESS', 'ROOMS', 'MISSING ROOMS'))
+    if report.unlocks:
+        print()
+        print_table([(unlock.room_name, len(unlock.illnesses), f'{unlock.danger:.2f}',
+                      ', '.join(unlock.illnesses)) for unlock in report.unlocks],
+                    ('NEXT ROOM', 'ILLNESSES', 'DANGER', 'UNLOCKS'))
+
+
+def print_coverage_totals(all_reports: Dict[str, CoverageReport]) -> None:
+    """Prints one line per hospital with its coverage and best room to build next.
+
+    Args:
+        all_reports: Dictionary of hospital name: CoverageReport. (see: get_all_coverage())
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # LOCAL VARIABLES
+    tuple_list = []  # Table entries
+    total = 0        # Number of illnesses one hospital can cover
+
+    # INPUT VALIDATION
+    if not isinstance(all_reports, dict):
+        raise TypeError('The all_reports argument must of type dict instead of '
+                        f'{type(all_reports)}')
+
+    # PRINT IT
+    for hospital_name, report in all_reports.items():
+        total = len(report.covered) + len(report.missing)
+        tuple_list.append((hospital_name, f'{len(report.covered)}/{total}',
+                           f'{len(report.covered) / total:.0%}' if total else 'N/A',
+                           next_room(report) or 'None'))
+    print_table(tuple_list, ('HOSPITAL', 'COVERED', 'PERCENT', 'NEXT ROOM'))
+
+
+def mask_rooms(mask: int) -> tuple:
+    """Decode a room mask into a tuple of room names, in catalog order.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: mask is negative.
+    """
+    # LOCAL VARIABLES
+    room_names = []  # Return value
+    lowest = 0       # Lowest set bit of what's left of mask
+
+    # INPUT VALIDATION
+    if not isinstance(mask, int):
+        raise TypeError(f'The mask argument must of type int instead of {type(mask)}')
+    if mask < 0:
+        raise ValueError(f'The mask value ({mask}) can not be negative')
+
+    # DECODE IT
+    while mask:
+        lowest = mask & -mask
+        room_names.append(TPH_CATALOG.room_names[lowest.bit_length() - 1])
+        mask = mask ^ lowest
+
+    # DONE
+    return tuple(room_names)
+
+
+def room_mask(room_names: Iterable[str]) -> int:
+    """Encode room_names as a bitmask over the catalog's room IDs.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Unknown room name.
+    """
+    # LOCAL VARIABLES
+    mask = 0  # Return value
+
+    # INPUT VALIDATION
+    if isinstance(room_names, str) or not isinstance(room_names, (list, tuple, set, frozenset)):
+        raise TypeError(f'The room_names argument can not be of type {type(room_names)}')
+
+    # ENCODE IT
+    for room_name in room_names:
+        if not isinstance(room_name, str):
+            raise TypeError(f'Found a room name of type {type(room_name)} in the room_names')
+        if not TPH_CATALOG.has_room(room_name):
+            raise ValueError(f'Room "{room_name}" could not be found')
+        mask = mask | (1 << TPH_CATALOG.get_room_id(room_name))
+
+    # DONE
+    return mask
+
+
+def _build_all_masks(hospital_list: List[str], strategy: int) -> tuple:
+    """Encode every configured hospital in hospital_list on behalf of get_all_coverage()."""
+    return tuple(get_coverage_masks(hospital, strategy=strategy)
+                 for hospital in get_configured_hospitals(hospital_list))
+
+
+def _build_masks(hospital: TPHHospital, strategy: int) -> CoverageMasks:
+    """Encode hospital's illnesses on behalf of get_coverage_masks()."""
+    # LOCAL VARIABLES
+    illness_names = []  # Names of the encoded illnesses
+    masks = []          # Required room mask of each illness
+    dangers = []        # Danger aggregate value of each illness
+
+    # BUILD IT
+    for illness_obj in hospital.get_illness_objects():
+        if not illness_obj.get_diag_ids() or illness_obj.get_treat_id() == NO_ROOM:
+            continue  # Misconfigured illnesses can never be covered
+        illness_names.append(illness_obj.get_name())
+        masks.append(room_mask([TPH_CATALOG.room_names[room_id] for room_id
+                                in illness_obj.get_diag_ids() + (illness_obj.get_treat_id(),)]))
+        dangers.append(illness_obj.get_aggregate_value(strategy))
+
+    # DONE
+    return CoverageMasks(hospital.get_name(), tuple(illness_names), tuple(masks), tuple(dangers))
+
+
+def _check_masks(coverage: CoverageMasks, built: int) -> CoverageReport:
+    """Check coverage against the built room mask on behalf of the get_*coverage() functions."""
+    # LOCAL VARIABLES
+    covered = []   # Names of the covered illnesses
+    missing = {}   # Illness name: Mask of its missing rooms
+    unlocks = {}   # Room ID: [Illness names missing only that room, sum of their dangers]
+    needed = 0     # Missing rooms of one illness
+    unlock = None  # Entry of unlocks
+
+    # CHECK IT
+    for illness_name, mask, danger in zip(coverage.illness_names, coverage.masks,
+                                          coverage.dangers):
+        needed = mask & ~built
+        if not needed:
+            covered.append(illness_name)
+            continue
+        missing[illness_name] = needed
+        if not needed & (needed - 1):
+            # Only one room is missing
+            unlock = unlocks.setdefault(needed.bit_length() - 1, [[], 0.0])
+            unlock[0].append(illness_name)
+            unlock[1] += danger
+
+    # DONE
+    return CoverageReport(coverage.hospital_name, built, tuple(covered), missing,
+                          sorted((RoomUnlock(TPH_CATALOG.room_names[room_id], tuple(names),
+                                             danger)
+                                  for room_id, (names, danger) in unlocks.items()),
+                                 key=lambda unlock: (-len(unlock.illnesses), -unlock.danger,
+                                                     unlock.room_name)))
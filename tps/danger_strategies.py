@@ -0,0 +1,250 @@
+"""Defines the Two Point Science danger aggregate strategy registry.
+
+A danger aggregate strategy turns an illness' difficulty, chance of death, and health decline
+into one danger value.  Strategies are registered by ID and evaluated for every illness in the
+catalog, every hospital's illnesses at once, the first time they're needed; the results are shared
+through TPH_REGISTRY.  TPHIllness.get_aggregate_value() looks its value up here.
+
+A strategy is a function of (xp, difficulty, death, decline) written with arithmetic operators and
+xp functions (e.g., xp.maximum()).  The factors are whole columns of the catalog, NaN marks the
+missing ones, and missing data is a mathematical pass: it's evaluated as 1.  xp is NumPy when it's
+installed and either already imported or the catalog has at least NUMPY_MIN_ILLNESSES illnesses.
+Otherwise, the strategy is evaluated one illness at a time, on floats, with a small math namespace
+standing in for NumPy; importing NumPy would take longer than that.
+
+    Typical usage example:
+
+    from tps.danger_strategies import evaluate_strategy, register_weighted_strategy
+    strategy = register_weighted_strategy('Deadly Mean', (1.0, 4.0, 1.0))
+    values = evaluate_strategy(strategy)  # One value per catalog illness ID
+"""
+
+# Standard
+from array import array
+from collections import namedtuple
+from typing import Callable, Dict, Tuple
+import math
+import sys
+
+# Third Party
+
+# Local
+from tps.tph_catalog import TPH_CATALOG
+from tps.tph_registry import TPH_REGISTRY
+
+
+# MACROS
+# One registered strategy; function(xp, difficulty, death, decline) returns the danger values
+DangerStrategy = namedtuple('DangerStrategy', 'name function')
+# Relative weights of difficulty, chance of death, and health decline in the weighted geometric
+# mean; dying counts double
+GEOMETRIC_WEIGHTS = (1.0, 2.0, 1.0)
+# Fewest catalog illnesses worth importing NumPy to evaluate a strategy
+NUMPY_MIN_ILLNESSES = 1024
+
+
+# pylint: disable=too-few-public-methods
+class _PythonMath:
+    """Stand-in for the few NumPy functions strategies use, on floats."""
+
+    exp = staticmethod(math.exp)
+    log = staticmethod(math.log)
+    maximum = staticmethod(max)
+    minimum = staticmethod(min)
+    sqrt = staticmethod(math.sqrt)
+# pylint: enable=too-few-public-methods
+
+
+# Registered strategies, by ID, in menu order
+_STRATEGIES = {}
+# (Normalized weights, geometric) of the weighted strategies, by ID
+_WEIGHTS = {}
+
+
+def evaluate_strategy(strategy: int) -> array:
+    """Return the strategy's danger value of every illness in the catalog, by illness ID.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Unknown strategy.
+    """
+    # INPUT VALIDATION
+    validate_strategy(strategy)
+
+    # DONE
+    return TPH_REGISTRY.get((DangerStrategy, strategy), lambda: _evaluate(strategy))
+
+
+def get_strategies() -> Dict[int, DangerStrategy]:
+    """Return a copy of the registered strategies, by ID."""
+    return dict(_STRATEGIES)
+
+
+def get_strategy_key(strategy: int) -> str:
+    """Return a key that identifies strategy's values in every process (e.g., in a result store).
+
+    Strategy IDs are handed out in registration order, so only the built-in strategy IDs mean
+    the same thing in every process.  The key is the strategy name, plus the weights of a
+    weighted strategy.  Other strategies registered at runtime are arbitrary functions, so they
+    have no key.
+
+    Raises:
+        TypeError: strategy is not an int.
+        ValueError: strategy is not registered, or is neither built-in nor weighted.
+    """
+    # INPUT VALIDATION
+    validate_strategy(strategy)
+
+    # DONE
+    if strategy in _WEIGHTS:
+        return (f'{_STRATEGIES[strategy].name} '
+                f'{"geometric" if _WEIGHTS[strategy][1] else "arithmetic"} {_WEIGHTS[strategy][0]}')
+    if strategy in BUILT_IN_STRATEGIES:
+        return _STRATEGIES[strategy].name
+    raise ValueError(f'The "{_STRATEGIES[strategy].name}" strategy is neither built-in nor '
+                     'weighted so it has no key')
+
+
+def register_strategy(name: str, function: Callable) -> int:
+    """Register a danger aggregate strategy and return its ID.
+
+    Args:
+        name: Name to list the strategy under (e.g., in the danger menu).
+        function: Function of (xp, difficulty, death, decline) returning the danger values.
+            (see: module docstring)
+
+    Returns:
+        The new strategy ID, one more than the largest registered ID.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: name is empty or already registered.
+    """
+    # LOCAL VARIABLES
+    strategy = max(_STRATEGIES, default=0) + 1  # New strategy ID
+
+    # INPUT VALIDATION
+    if not isinstance(name, str):
+        raise TypeError(f'The name argument must of type str instead of {type(name)}')
+    if not name:
+        raise ValueError('The name argument can not be empty')
+    if name in [registered.name for registered in _STRATEGIES.values()]:
+        raise ValueError(f'A strategy named "{name}" is already registered')
+    if not callable(function):
+        raise TypeError(f'The function argument can not be of type {type(function)}')
+
+    # REGISTER IT
+    _STRATEGIES[strategy] = DangerStrategy(name, function)
+
+    # DONE
+    return strategy
+
+
+def register_weighted_strategy(name: str, weights: Tuple[float, float, float],
+                               geometric: bool = False) -> int:
+    """Register a weighted mean of difficulty, chance of death, and health decline.
+
+    Args:
+        name: Name to list the strategy under.
+        weights: Relative weights of difficulty, chance of death, and health decline.
+        geometric: Optional; If True, register the weighted geometric mean.  Otherwise, register
+            the weighted arithmetic mean.
+
+    Returns:
+        The new strategy ID.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid name or weights.
+    """
+    # LOCAL VARIABLES
+    strategy = 0  # New strategy ID
+
+    # INPUT VALIDATION
+    if not isinstance(weights, (list, tuple)):
+        raise TypeError(f'The weights argument must of type tuple instead of {type(weights)}')
+    if len(weights) != 3:
+        raise ValueError(f'The weights argument must have 3 weights instead of {len(weights)}')
+    for weight in weights:
+        if not isinstance(weight, (int, float)):
+            raise TypeError(f'Found a weight of type {type(weight)} in the weights')
+        if not math.isfinite(weight) or weight < 0:
+            raise ValueError(f'The weight {weight} can not be negative')
+    if not sum(weights):
+        raise ValueError('The weights can not all be zero')
+    if not isinstance(geometric, bool):
+        raise TypeError(f'The geometric argument must of type bool instead of {type(geometric)}')
+
+    # REGISTER IT
+    weights = tuple(weight / sum(weights) for weight in weights)
+    if geometric:
+        strategy = register_strategy(name, lambda xp, diff, death, decline: (
+            diff ** weights[0] * death ** weights[1] * decline ** weights[2]))
+    else:
+        strategy = register_strategy(name, lambda xp, diff, death, decline: (
+            diff * weights[0] + death * weights[1] + decline * weights[2]))
+    _WEIGHTS[strategy] = (weights, geometric)
+
+    # DONE
+    return strategy
+
+
+def validate_strategy(strategy: int) -> None:
+    """Validate a strategy ID.
+
+    Raises:
+        TypeError: strategy is not an int.
+        ValueError: strategy is not registered.
+    """
+    if not isinstance(strategy, int):
+        raise TypeError(f'The strategy argument can not be of type {type(strategy)}')
+    if strategy not in _STRATEGIES:
+        raise ValueError(f'The strategy selection of {strategy} is invalid')
+
+
+def _evaluate(strategy: int) -> array:
+    """Evaluate strategy for every illness in the catalog on behalf of evaluate_strategy()."""
+    # LOCAL VARIABLES
+    function = _STRATEGIES[strategy].function  # Strategy to evaluate
+    illnesses = len(TPH_CATALOG.illness_names)  # Number of illnesses to evaluate
+    numpy = _import_numpy(illnesses)            # NumPy, if it's worth importing
+    factors = None                              # Difficulty, death, and decline columns
+    values = []                                 # Danger value of every illness
+
+    # EVALUATE IT
+    if numpy:
+        factors = numpy.array([TPH_CATALOG.difficulty, TPH_CATALOG.death, TPH_CATALOG.decline],
+                              dtype=float).reshape(3, illnesses)
+        factors[numpy.isnan(factors)] = 1.0  # Missing data is a mathematical pass
+        values = numpy.broadcast_to(function(numpy, *factors), (illnesses,)).tolist()
+    else:
+        for factors in zip(TPH_CATALOG.difficulty, TPH_CATALOG.death, TPH_CATALOG.decline):
+            values.append(function(_PythonMath, *(1.0 if math.isnan(factor) else factor
+                                                  for factor in factors)))
+
+    # DONE
+    return array('d', values)
+
+
+def _import_numpy(illnesses: int):
+    """Return numpy if it's worth importing to evaluate illnesses; None if not or not installed."""
+    if illnesses < NUMPY_MIN_ILLNESSES and 'numpy' not in sys.modules:
+        return None
+    # pylint: disable=import-outside-toplevel
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+# BUILT-IN STRATEGIES
+register_strategy('Product', lambda xp, diff, death, decline: diff * death * decline)
+register_strategy('Average', lambda xp, diff, death, decline: (diff + death + decline) / 3)
+register_strategy('Product & Average Mean', lambda xp, diff, death, decline: (
+    diff * death * decline + (diff + death + decline) / 3) / 2)
+register_strategy('Max', lambda xp, diff, death, decline: xp.maximum(xp.maximum(diff, death),
+                                                                     decline))
+register_weighted_strategy('Weighted Geometric Mean', GEOMETRIC_WEIGHTS, geometric=True)
+# IDs of the strategies registered above, which mean the same thing in every process
+BUILT_IN_STRATEGIES = tuple(_STRATEGIES)
@@ -0,0 +1,203 @@
+"""Defines the Two Point Science DangerTable class.
+
+A DangerTable is a hospital's illness danger table, built once per aggregate strategy: the raw
+numeric columns in arrays, every row already formatted, and the row order for every column in both
+directions.  Changing the sort column or direction is a lookup instead of a recompute.  Tables are
+shared through TPH_REGISTRY. (see: get_danger_table())
+
+Rows are sorted the way print_danger_table() always has: by the sort column, ties broken by
+illness name.  Missing values (MISSING_DATA or a misconfigured treatment room) sort last in either
+direction.
+
+    Typical usage example:
+
+    from tps.danger_table import DANGER_COL_AGGREGATE, get_danger_table
+    from tps.tph_hospital import TPHHospital
+    table = get_danger_table(TPHHospital('Smogley'), strategy=2)
+    for row in table.get_rows(DANGER_COL_AGGREGATE, sort_desc=True):
+        print(row)
+"""
+
+# Standard
+from array import array
+from typing import List, Tuple
+import math
+
+# Third Party
+
+# Local
+from tps.danger_strategies import validate_strategy
+from tps.tph_hospital import TPHHospital
+from tps.tph_registry import TPH_REGISTRY
+
+
+# MACROS
+# Sort columns, in print order
+DANGER_COL_ILLNESS = 1
+DANGER_COL_TREATMENT = 2
+DANGER_COL_DIFFICULTY = 3
+DANGER_COL_DEATH = 4
+DANGER_COL_DECLINE = 5
+DANGER_COL_AGGREGATE = 6
+DANGER_COLUMNS = (DANGER_COL_ILLNESS, DANGER_COL_TREATMENT, DANGER_COL_DIFFICULTY,
+                  DANGER_COL_DEATH, DANGER_COL_DECLINE, DANGER_COL_AGGREGATE)
+
+
+class DangerTable:
+    """One hospital's illness danger table for one aggregate strategy."""
+
+    def __init__(self, hospital: TPHHospital, strategy: int = 2) -> None:
+        """DangerTable class ctor.
+
+        Args:
+            hospital: TPHHospital object. (see: tph_hospital module)
+            strategy: Optional; Aggregate strategy. (see: TPHIllness.get_aggregate_value())
+
+        Raises:
+            TypeError: Bad data type passed in.
+            ValueError: Invalid strategy value.
+            RuntimeError: The hospital's illnesses have not been configured.
+        """
+        # INPUT VALIDATION
+        _validate_danger_table(hospital=hospital, strategy=strategy)
+
+        # INSTANCE ATTRIBUTES
+        self._hospital_name = hospital.get_name()  # Name of the hospital
+        self._strategy = strategy                  # Aggregate strategy
+        self._rows = []     # Formatted row tuples, in hospital order
+        self._columns = {}  # Sort column: Raw values (NaN or None if missing), in hospital order
+        self._orders = {}   # (Sort column, descending): Array of row indices
+
+        # BUILD IT
+        self._build_columns(hospital)
+        self._build_orders()
+
+    def get_hospital_name(self) -> str:
+        """Return the name of the hospital."""
+        return self._hospital_name
+
+    def get_order(self, sort_by_col: int, sort_desc: bool = True) -> array:
+        """Return the row indices sorted by sort_by_col.
+
+        Raises:
+            TypeError: Bad data type passed in.
+            ValueError: Invalid sort column.
+        """
+        # INPUT VALIDATION
+        if not isinstance(sort_by_col, int):
+            raise TypeError(f'The sort_by_col argument must of type int instead of '
+                            f'{type(sort_by_col)}')
+        if sort_by_col not in DANGER_COLUMNS:
+            raise ValueError(f'The sort_by_col value ({sort_by_col}) is not a danger table '
+                             'column')
+        if not isinstance(sort_desc, bool):
+            raise TypeError(f'The sort_desc argument must of type bool instead of '
+                            f'{type(sort_desc)}')
+
+        # DONE
+        return self._orders[(sort_by_col, sort_desc)]
+
+    def get_rows(self, sort_by_col: int, sort_desc: bool = True) -> List[Tuple[str, ...]]:
+        """Return the formatted rows sorted by sort_by_col.
+
+        Each row is (illness, treatment room, difficulty, death chance, health decline,
+        aggregate), all strings.
+
+        Raises:
+            TypeError: Bad data type passed in.
+            ValueError: Invalid sort column.
+        """
+        return [self._rows[index] for index in self.get_order(sort_by_col, sort_desc)]
+
+    def get_strategy(self) -> int:
+        """Return the aggregate strategy."""
+        return self._strategy
+
+    def get_values(self, sort_by_col: int) -> tuple:
+        """Return the raw values of sort_by_col, in hospital order.
+
+        Numeric columns are floats with NaN for MISSING_DATA.  A misconfigured treatment room is
+        None.
+
+        Raises:
+            TypeError: Bad data type passed in.
+            ValueError: Invalid sort column.
+        """
+        # INPUT VALIDATION
+        self.get_order(sort_by_col)
+
+        # DONE
+        return tuple(self._columns[sort_by_col])
+
+    def _build_columns(self, hospital: TPHHospital) -> None:
+        """Read every illness once into the raw columns and formatted rows."""
+        # LOCAL VARIABLES
+        names = []   # Illness names
+        treats = []  # Treatment room names
+        numbers = {column: array('d') for column in DANGER_COLUMNS[2:]}  # Numeric columns
+
+        # BUILD IT
+        for illness_obj in hospital.get_illness_objects():
+            names.append(illness_obj.get_name())
+            treats.append(illness_obj.get_treat())
+            numbers[DANGER_COL_DIFFICULTY].append(illness_obj.catalog.difficulty[
+                illness_obj.get_id()])
+            numbers[DANGER_COL_DEATH].append(illness_obj.catalog.death[illness_obj.get_id()])
+            numbers[DANGER_COL_DECLINE].append(illness_obj.catalog.decline[illness_obj.get_id()])
+            numbers[DANGER_COL_AGGREGATE].append(illness_obj.get_aggregate_value(self._strategy))
+            self._rows.append(tuple((illness_obj.get_name(), illness_obj.get_treat(),
+                                     illness_obj.get_difficulty_str(),
+                                     illness_obj.get_death_str(), illness_obj.get_decline_str(),
+                                     illness_obj.get_aggregate_str(self._strategy))))
+        self._columns = {DANGER_COL_ILLNESS: tuple(names), DANGER_COL_TREATMENT: tuple(treats)}
+        self._columns.update(numbers)
+
+    def _build_orders(self) -> None:
+        """Sort the rows by every column, in both directions."""
+        # LOCAL VARIABLES
+        by_name = sorted(range(0, len(self._rows)),
+                         key=lambda index: self._columns[DANGER_COL_ILLNESS][index])
+        values = ()   # Raw values of one column
+        present = []  # Row indices with a value in one column, in name order
+        missing = []  # Row indices missing a value in one column, in name order
+
+        # SORT IT
+        for column in DANGER_COLUMNS:
+            values = self._columns[column]
+            present = [index for index in by_name if not _is_missing(values[index])]
+            missing = [index for index in by_name if _is_missing(values[index])]
+            for sort_desc in (True, False):
+                # A stable sort keeps ties in name order
+                self._orders[(column, sort_desc)] = array(
+                    'l', sorted(present, key=values.__getitem__, reverse=sort_desc)
+                    + missing)
+
+
+def get_danger_table(hospital: TPHHospital, strategy: int = 2) -> DangerTable:
+    """Return the shared DangerTable of hospital and strategy, building it the first time.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid strategy value.
+        RuntimeError: The hospital's illnesses have not been configured.
+    """
+    # INPUT VALIDATION
+    _validate_danger_table(hospital=hospital, strategy=strategy)
+
+    # DONE
+    return TPH_REGISTRY.get((DangerTable, hospital.get_name(), strategy),
+                            lambda: DangerTable(hospital, strategy=strategy))
+
+
+def _is_missing(value) -> bool:
+    """Return True if a raw column value is missing (NaN or None)."""
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _validate_danger_table(hospital: TPHHospital, strategy: int) -> None:
+    """Validate input on behalf of DangerTable and get_danger_table()."""
+    # hospital
+    if not isinstance(hospital, TPHHospital):
+        raise TypeError(f'The hospital can not be of type {type(hospital)}')
+    # strategy
+    validate_strategy(strategy)
@@ -9,33 +9,52 @@ Defines functionality to facilitate the creation of a directed graph based on a
     hospital = TPHHospital('Grockle Bay')     # Create the hospital object
     graph = create_graph(hospital)            # Create the graph object
     graph.view()                              # View the directed graph
+
+    from tps.dgraph import GRAPH_ROOM, render_bytes  # Render without files or the viewer
+    svg_bytes = render_bytes(hospital, GRAPH_ROOM, 'Ward', engine='tps', graph_format='svg')
 """
 
 # Standard
 from typing import Dict
+import math
 import os
 
 # Third Party
 import graphviz
 
 # Local
-from tps.tph_constants import (TPH_DUAL_PURPOSE_LIST, TPH_ILLNESS_DICT, TPH_ILLNESS_LIST,
-                               TPH_NAME_ROOM_GP, TPH_ROOM_DICT, TPH_ROOM_LIST)
+from tps.edge_model import EdgeModel, get_edge_model
+from tps.render_cache import pipe_graph, RenderCache
+from tps.render_queue import RenderQueue
+from tps.svg_digraph import SVG_FORMAT, SVGDigraph, TPS_ENGINE
+from tps.tph_catalog import TPH_CATALOG
+from tps.tph_constants import TPH_ILLNESS_DICT, TPH_ROOM_DICT
 from tps.tph_hospital import TPHHospital
 from tps.menu import get_choice, Menu
-from tps.misc import print_edge_table
 
 
-def add_edges(hospital: TPHHospital, graph: graphviz.dot.Digraph,
-              sep_rooms: bool = False, focus_node: str = '') -> graphviz.dot.Digraph:
+# MACROS
+# Graph kinds: a hospital's graph, one of its illnesses' graph, or one of its rooms' graph
+GRAPH_HOSPITAL = 'hospital'
+GRAPH_ILLNESS = 'illness'
+GRAPH_ROOM = 'room'
+
+
+def add_edges(hospital: TPHHospital, graph: graphviz.dot.Digraph, sep_rooms: bool = False,
+              focus_node: str = '', weighted: bool = False) -> graphviz.dot.Digraph:
     """Adds edges to graph based on the illnesses found in hospital.
 
+    The edges are read from hospital's shared EdgeModel (see: edge_model module).  A focused
+    model only walks the illnesses that use the focus node's room.
+
     Args:
         hospital: TPHHospital object. (see: tph_hospital module)
         graph: Graph object to add edges to.
         sep_rooms: Optional; If true, multi-purpose rooms are separated into ' (diag)' and
             ' (treat)' versions on the graph.
         focus_node: Optional; Create a graph based on a specific room instead of the hospital
+        weighted: Optional; If true, parallel edges are collapsed into one edge whose label and
+            pen width show how many illnesses walk it.
 
     Returns:
         graph after edges have been added to it.
@@ -45,52 +64,22 @@ def add_edges(hospital: TPHHospital, graph: graphviz.dot.Digraph,
         NotImplementedError: hospital does not contain any illnesses or contains a misconfigured
             illness.
     """
-    # LOCAL VARIABLES
-    illness_obj_list = []  # List of illness objects from hospital
-    temp_diag_list = []    # Temporary list of diag rooms for a given illness
-    temp_treat_str = ''    # Temporary treat room for a given illness
-    temp_lead_edge = ''    # Temporary leading edge variable
-    temp_trail_edge = ''   # Temporary trailing edge variable
-
     # INPUT VALIDATION
     _validate_add_edges(hospital=hospital, graph=graph, sep_rooms=sep_rooms, focus_node=focus_node)
-
-    # DO IT
-    illness_obj_list = hospital.get_illness_objects()
-    if not illness_obj_list:
-        raise NotImplementedError(f'{hospital.get_name()} is not configured with illnesses')
-    for illness_obj in illness_obj_list:
-        # Diagnostic room edges
-        temp_diag_list = illness_obj.get_diag()
-        if temp_diag_list:
-            for index in range(0, len(temp_diag_list) - 1):
-                temp_lead_edge = temp_diag_list[index]
-                temp_trail_edge = temp_diag_list[index + 1]
-                graph = _graph_edges(graph=graph, edges=(temp_lead_edge, temp_trail_edge),
-                                     sep_rooms=sep_rooms, focus_node=focus_node, all_diag=True)
-        else:
-            raise NotImplementedError(
-                f'{hospital.get_name()} has an illness, '
-                f'{illness_obj.get_name()}, missing a list of diagnostic rooms.')
-        # Treatment room edge
-        temp_treat_str = illness_obj.get_treat()
-        if temp_treat_str:
-            temp_lead_edge = temp_diag_list[len(temp_diag_list) - 1]
-            temp_trail_edge = temp_treat_str
-            graph = _graph_edges(graph=graph, edges=(temp_lead_edge, temp_trail_edge),
-                                 sep_rooms=sep_rooms, focus_node=focus_node, all_diag=False)
-        else:
-            raise NotImplementedError(f'{hospital.get_name()} has an illness, '
-                                      f'{illness_obj.get_name()}, missing a treatment room.')
+    # weighted
+    if not isinstance(weighted, bool):
+        raise TypeError(f'The weighted argument must of type bool instead of {type(weighted)}')
 
     # DONE
-    return graph
+    return _render_edges(graph=graph, edge_model=get_edge_model(hospital, sep_rooms=sep_rooms,
+                                                                focus_node=focus_node),
+                         focus_node='', weighted=weighted)
 
 
 # pylint: disable=too-many-arguments
 def create_graph(hospital: TPHHospital, graph_dir: str, sep_rooms: bool = False,
-                 engine: str = 'dot', graph_format: str = 'png',
-                 focus_node: str = '', suffix_override: str = '') -> graphviz.dot.Digraph:
+                 engine: str = 'dot', graph_format: str = 'png', focus_node: str = '',
+                 suffix_override: str = '', weighted: bool = False) -> graphviz.dot.Digraph:
     """Create a hospital-based Digraph using graphviz.
 
     Args:
@@ -98,19 +87,24 @@ def create_graph(hospital: TPHHospital, graph_dir: str, sep_rooms: bool = False,
         graph_dir: Directory in which to create files
         sep_rooms: Optional; If true, multi-purpose rooms are separated into ' (diag)' and
             ' (treat)' versions on the graph.
-        engine: Optional; Digraph build engine: [dot], neato, sfdp, fdp
-        graph_format: Optional; File format for Digraph: [png], pdf
+        engine: Optional; Digraph build engine: [dot], neato, sfdp, fdp, tps
+            (in-process, svg only; see: svg_digraph module)
+        graph_format: Optional; File format for Digraph: [png], pdf, svg
         focus_node: Optional; Create a graph based on a specific room instead of the hospital.
             This string will be appended to the end of all filenames associated with this graph
             unless suffix_override is defined.
         suffix_override: Optional; If defined, will override focus_node to append a string to the
             end of the on-disk filenames
+        weighted: Optional; If true, parallel edges are collapsed into one edge whose label and
+            pen width show how many illnesses walk it.
 
     Returns:
-        Directed graph, complete with room edges, based on hospital.
+        Directed graph, complete with room edges, based on hospital.  An SVGDigraph
+        (see: svg_digraph module) if engine is 'tps'.
 
     Raises:
         TypeError: Bad data type passed in.
+        ValueError: The tps engine was asked for a format other than svg.
         NotImplementedError: hospital does not contain any illnesses or contains a misconfigured
             illness.
     """
@@ -135,7 +129,7 @@ def create_graph(hospital: TPHHospital, graph_dir: str, sep_rooms: bool = False,
 
     # ADD NODES/EDGES
     graph_obj = add_edges(hospital=hospital, graph=graph_obj, sep_rooms=sep_rooms,
-                          focus_node=focus_node)
+                          focus_node=focus_node, weighted=weighted)
 
     # DONE
     return graph_obj
@@ -145,7 +139,7 @@ def create_graph(hospital: TPHHospital, graph_dir: str, sep_rooms: bool = False,
 # pylint: disable=too-many-arguments
 def create_illness_graph(hospital: TPHHospital, graph_dir: str, ill_name: str,
                          sep_rooms: bool = False, engine: str = 'dot', graph_format: str = 'png',
-                         suffix_override: str = '') -> graphviz.dot.Digraph:
+                         suffix_override: str = '', weighted: bool = False) -> graphviz.dot.Digraph:
     """Create a hospital-based Digraph using graphviz.
 
     Args:
@@ -153,29 +147,30 @@ def create_illness_graph(hospital: TPHHospital, graph_dir: str, ill_name: str,
         graph_dir: Directory in which to create files
         sep_rooms: Optional; If true, multi-purpose rooms are separated into ' (diag)' and
             ' (treat)' versions on the graph.
-        engine: Optional; Digraph build engine: [dot], neato, sfdp, fdp
-        graph_format: Optional; File format for Digraph: [png], pdf
+        engine: Optional; Digraph build engine: [dot], neato, sfdp, fdp, tps
+            (in-process, svg only; see: svg_digraph module)
+        graph_format: Optional; File format for Digraph: [png], pdf, svg
         focus_node: Optional; Create a graph based on a specific room instead of the hospital.
             This string will be appended to the end of all filenames associated with this graph
             unless suffix_override is defined.
         suffix_override: Optional; If defined, will override focus_node to append a string to the
             end of the on-disk filenames
+        weighted: Optional; If true, parallel edges are collapsed into one edge whose label and
+            pen width show how many illnesses walk it.
 
     Returns:
-        Directed graph, complete with room edges, based on hospital.
+        Directed graph, complete with room edges, based on hospital.  An SVGDigraph
+        (see: svg_digraph module) if engine is 'tps'.
 
     Raises:
         TypeError: Bad data type passed in.
+        ValueError: The tps engine was asked for a format other than svg.
         NotImplementedError: hospital does not contain any illnesses or contains a misconfigured
             illness.
     """
     # LOCAL VARIABLES
-    graph_obj = None      # graphviz Digraph
-    ill_obj = None        # TPHIllness object
-    diag_list = []        # List of diagnosis rooms for ill_obj
-    treat_room = ''       # Treatment room for ill_obj
-    temp_lead_edge = ''   # Temporary leading edge
-    temp_trail_edge = ''  # Temporary trailing edge
+    graph_obj = None   # graphviz Digraph
+    edge_model = None  # EdgeModel of ill_name's edges
 
     # INPUT VALIDATION
     _validate_graph_menu(hospital=hospital, graph_dir=graph_dir, sep_rooms=sep_rooms,
@@ -183,210 +178,124 @@ def create_illness_graph(hospital: TPHHospital, graph_dir: str, ill_name: str,
     # ill_name
     if not isinstance(ill_name, str):
         raise TypeError(f'The ill_name argument must of type str instead of {type(ill_name)}')
-    if ill_name not in TPH_ILLNESS_LIST:
+    if not TPH_CATALOG.has_illness(ill_name):
         raise ValueError(f'Unknown illness name: {ill_name}')
     # suffix_override
     if not isinstance(suffix_override, str):
         raise TypeError(
             f'The suffix_override argument must of type str instead of {type(suffix_override)}')
+    # weighted
+    if not isinstance(weighted, bool):
+        raise TypeError(f'The weighted argument must of type bool instead of {type(weighted)}')
 
     # CREATE GRAPH
     graph_obj = _create_graph(hospital=hospital, graph_dir=graph_dir, engine=engine,
                               graph_format=graph_format, focus_node='',
                               suffix_override=suffix_override)
 
-    # GET ILLNESS OBJECT
-    for hospital_illness in hospital.get_illness_objects():
-        if hospital_illness.get_name() == ill_name:
-            ill_obj = hospital_illness
-            break
-    if not ill_obj:
-        raise RuntimeError(f'Illness "{ill_name}" passed validation but could not be found '
-                           f'in {hospital.get_name()}')
-
     # ADD NODES/EDGES
-    # Diag
-    diag_list = ill_obj.get_diag()
-    if diag_list and TPH_NAME_ROOM_GP not in diag_list:
-        diag_list = [TPH_NAME_ROOM_GP] + diag_list
-    elif not diag_list:
-        raise NotImplementedError(f'{hospital.get_name()} has an illness, '
-                                  f'{ill_obj.get_name()}, missing a list of diagnostic rooms.')
-    for index in range(0, len(diag_list) - 1):
-        temp_lead_edge = diag_list[index]
-        temp_trail_edge = diag_list[index + 1]
-        graph_obj = _graph_edges(graph=graph_obj, edges=tuple((temp_lead_edge, temp_trail_edge)),
-                                 sep_rooms=sep_rooms, focus_node='', all_diag=True)
-
-    # Treat
-    treat_room = ill_obj.get_treat()
-    if treat_room:
-        temp_lead_edge = diag_list[len(diag_list) - 1]
-        temp_trail_edge = treat_room
-        graph_obj = _graph_edges(graph=graph_obj, edges=tuple((temp_lead_edge, temp_trail_edge)),
-                                 sep_rooms=sep_rooms, focus_node='', all_diag=False)
-    else:
-        raise NotImplementedError(f'{hospital.get_name()} has an illness, '
-                                  f'{ill_obj.get_name()}, missing a treatment room.')
+    try:
+        edge_model = get_edge_model(hospital, sep_rooms=sep_rooms, ill_name=ill_name)
+    except ValueError as err:
+        raise RuntimeError(f'Illness "{ill_name}" passed validation but could not be found '
+                           f'in {hospital.get_name()}') from err
+    graph_obj = _render_edges(graph=graph_obj, edge_model=edge_model, focus_node='',
+                              weighted=weighted)
 
     # DONE
     return graph_obj
 # pylint: enable=too-many-arguments
 
 
-# pylint: disable=too-many-branches
-def edge_menu(graph: graphviz.dot.Digraph, sep_rooms: bool) -> None:
-    """Execute the Two Point Science edge (connection) menu.
-
-    This menu allows the user to print a table with room names, purpose, and an edge (connection)
-    count.  The menu also allows the user to sort the table by name or count as well as let the
-    user sort the table in ascending or descending order.
+def create_sep_room_dict(room_dict: dict) -> Dict[int, str]:
+    """Split the multi-purpose rooms of a room menu dictionary into ' (diag)' and ' (treat)' rooms.
 
     Args:
-        graph: Graph object to read the edges from.
-        sep_rooms: If true, multi-purpose rooms are separated into ' (diag)' and ' (treat)'
-            versions on the table.
+        room_dict: Dictionary of menu index: room name.
+
+    Returns:
+        A new dictionary of menu index (starting at 1): room name.
 
     Raises:
         TypeError: Bad data type passed in.
-        RuntimeError: Mismatch in internal sort column or sort order variables
     """
     # LOCAL VARIABLES
-    sort_col = 'count'    # Print current sort column in the menu title
-    sort_by_count = True  # Converts user sort column choice to print_edge_table() kwarg
-    sort_dir = 'desc'     # Print current sort direction in the menu title
-    sort_desc = True      # Converts user sort order choice to print_edge_table() kwarg
-    user_input = 0        # User selection
-    edge_dict = None      # Dictionary of room counts
-    clear_scr = True      # Clear the screen before printing a menu
-    max_chances = 3       # Maximum number of invalid inputs tolerated
-    current_err = ''      # Temp variable which controls error handling
-    # Template error message for invalid selections
-    err_template = '\n*** ERROR: {}***\n'
-    # Template menu title
-    menu_title_template = 'EDGE MENU\nSorted by {} in a {} order\n'
-    # Menu dictionary
-    menu_dict = {1: 'Print room connections', 2: 'Toggle Column', 3: 'Toggle Sort',
-                 999: 'Return to main menu'}
+    new_dict = {}  # Return value
+    index = 1      # New indices for the new dictionary
 
     # INPUT VALIDATION
-    _validate_edge_menu(graph=graph, sep_rooms=sep_rooms)
-
-    # EDGE MENU
-    while True:
-        user_input = get_choice(tph_menu=Menu(menu_title_template.format(sort_col, sort_dir),
-                                              menu_dict),
-                                clear_screen=clear_scr, choice_type=int,
-                                max_chances=max_chances, return_choice=True)
-        clear_scr = True  # Reset temp variable
-
-        # 1. Print Edges
-        if user_input == 1:
-            edge_dict = enumerate_edges(graph, sep_rooms)
-            print_edge_table(edge_dict, TPH_ROOM_DICT, sort_by_count=sort_by_count,
-                             sort_desc=sort_desc)
-            clear_scr = False  # Let them see the table
-        # 2. Toggle Column
-        elif user_input == 2:
-            if sort_col == 'count' and sort_by_count:
-                sort_col = 'room'
-                sort_by_count = False
-            elif sort_col == 'room' and not sort_by_count:
-                sort_col = 'count'
-                sort_by_count = True
-            else:
-                raise RuntimeError('Mismatch in edge menu sort column toggle settings')
-        # 3. Toggle Sort
-        elif user_input == 3:
-            if sort_dir == 'asc' and not sort_desc:
-                sort_dir = 'desc'
-                sort_desc = True
-            elif sort_dir == 'desc' and sort_desc:
-                sort_dir = 'asc'
-                sort_desc = False
+    if not isinstance(room_dict, dict):
+        raise TypeError(f'The room_dict argument must of type dict instead of {type(room_dict)}')
+
+    # DO IT
+    for _, room_name in room_dict.items():
+        try:
+            if TPH_ROOM_DICT[room_name].purpose == 'Both':
+                new_dict[index] = room_name + ' (diag)'
+                index = index + 1
+                new_dict[index] = room_name + ' (treat)'
             else:
-                raise RuntimeError('Mismatch in edge menu sort direction toggle settings')
-        # 999. Exit
-        elif user_input == 999:
-            return
+                new_dict[index] = room_name
+        except AttributeError:
+            pass  # <shrug>
         else:
-            current_err = err_template.format('INVALID SELECTION')
-
-        # Is there an error?
-        if current_err:
-            print(current_err)
-            max_chances = max_chances - 1
-            if max_chances < 1:
-                print(err_template.format('TOO MANY INVALID SELECTIONS'))
-                return
-            clear_scr = False  # Let them see the mistake they've made
-            current_err = ''
-# pylint: enable=too-many-branches
+            index = index + 1
 
+    # DONE
+    return new_dict
 
-# pylint: disable=too-many-branches
-def enumerate_edges(graph: graphviz.dot.Digraph, sep_rooms: bool) -> Dict[str, int]:
-    """Execute the Two Point Science edge (connection) menu.
 
-    This menu allows the user to print a table with room names, purpose, and an edge (connection)
-    count.  The menu also allows the user to sort the table by name or count as well as let the
-    user sort the table in ascending or descending order.
+# pylint: disable=too-many-arguments
+def create_target_graph(hospital: TPHHospital, graph_dir: str, kind: str = GRAPH_HOSPITAL,
+                        item_name: str = '', sep_rooms: bool = False, engine: str = 'dot',
+                        graph_format: str = 'png', weighted: bool = False) -> graphviz.dot.Digraph:
+    """Create a hospital, illness, or room graph, named the way the menus name them.
 
     Args:
-        graph: Graph object to read the edges from.
-        sep_rooms: If true, multi-purpose rooms are separated into ' (diag)' and ' (treat)'
-            versions on the table.
+        hospital: TPHHospital object. (see: tph_hospital module)
+        graph_dir: Directory in which to create files
+        kind: Optional; Graph kind: [GRAPH_HOSPITAL], GRAPH_ILLNESS, GRAPH_ROOM
+        item_name: Optional; Illness (GRAPH_ILLNESS) or room (GRAPH_ROOM) name
+        sep_rooms: Optional; If true, multi-purpose rooms are separated into ' (diag)' and
+            ' (treat)' versions on the graph.
+        engine: Optional; Digraph build engine: [dot], neato, sfdp, fdp, tps
+            (in-process, svg only; see: svg_digraph module)
+        graph_format: Optional; File format for Digraph: [png], pdf, svg
+        weighted: Optional; If true, parallel edges are collapsed into one weighted edge.
+
+    Returns:
+        Directed graph, complete with room edges.
 
     Raises:
         TypeError: Bad data type passed in.
-        RuntimeError: Mismatch in internal sort column or sort order variables
+        ValueError: Unknown kind or illness name, or the tps engine was asked for a format other
+            than svg.
+        NotImplementedError: hospital does not contain any illnesses or contains a misconfigured
+            illness.
     """
-    # LOCAL VARIABLES
-    edge_counts = {}      # Rooms: Room Count
-    temp_room_names = []  # Temporary variable to help resolve dual use rooms
-
     # INPUT VALIDATION
-    # graph
-    if not isinstance(graph, graphviz.dot.Digraph):
-        raise TypeError(f'The graph can not be of type {type(graph)}')
-    # sep_rooms
-    if not isinstance(sep_rooms, bool):
-        raise TypeError(f'The sep_rooms argument must of type bool instead of {type(sep_rooms)}')
-
-    # ENUMERATE IT
-    for part in graph.body:
-        for room in TPH_ROOM_LIST:
-            if room in part:
-                # List of room names to look for
-                if sep_rooms and TPH_ROOM_DICT[room].purpose == 'Both':
-                    temp_room_names.append(room + ' (diag)')
-                    temp_room_names.append(room + ' (treat)')
-                else:
-                    temp_room_names.append(room)
-                # Look for the room names
-                for temp_room_name in temp_room_names:
-                    if temp_room_name in edge_counts.keys():
-                        edge_counts[temp_room_name] = edge_counts[temp_room_name] + 1
-                    else:
-                        edge_counts[temp_room_name] = 1
-                # print(f'TEMP ROOM NAMES {temp_room_names}')
-                # Clear temp variables
-                temp_room_names = []
-
-    # VALIDATE RESULTS
-    for key, value in edge_counts.items():
-        if not isinstance(key, str):
-            raise TypeError('Invalid key type detected')
-        if not isinstance(value, int):
-            raise TypeError('Invalid value type detected')
+    if kind not in (GRAPH_HOSPITAL, GRAPH_ILLNESS, GRAPH_ROOM):
+        raise ValueError(f'The kind {kind} is not a graph kind')
+    if not isinstance(item_name, str):
+        raise TypeError(f'The item_name argument must of type str instead of {type(item_name)}')
 
     # DONE
-    return edge_counts
-# pylint: enable=too-many-branches
+    if kind == GRAPH_ILLNESS:
+        return create_illness_graph(hospital=hospital, graph_dir=graph_dir, ill_name=item_name,
+                                    sep_rooms=sep_rooms, engine=engine, graph_format=graph_format,
+                                    suffix_override='Illness - ' + item_name, weighted=weighted)
+    return create_graph(hospital=hospital, graph_dir=graph_dir, sep_rooms=sep_rooms,
+                        engine=engine, graph_format=graph_format,
+                        focus_node=item_name if kind == GRAPH_ROOM else '',
+                        suffix_override='Room - ' + item_name if kind == GRAPH_ROOM else '',
+                        weighted=weighted)
+# pylint: enable=too-many-arguments
 
 
+# pylint: disable=too-many-arguments
 def illness_menu(hospital: TPHHospital, graph_dir: str, sep_rooms: bool = False,
-                 engine: str = 'dot', graph_format: str = 'png') -> None:
+                 engine: str = 'dot', graph_format: str = 'png', weighted: bool = False,
+                 render_cache: RenderCache = None, render_queue: RenderQueue = None) -> None:
     """Execute the Two Point Science illness menu.
 
     Prompts the user for an illness associated with hospital and then creates a graph of all edges
@@ -396,8 +305,14 @@ def illness_menu(hospital: TPHHospital, graph_dir: str, sep_rooms: bool = False,
         hospital: TPHHospital object. (see: tph_hospital module)
         sep_rooms: Optional; If true, multi-purpose rooms are separated into ' (diag)' and
             ' (treat)' versions on the graph.
-        engine: Optional; Digraph build engine: [dot], neato, sfdp, fdp
-        graph_format: Optional; File format for Digraph: [png], pdf
+        engine: Optional; Digraph build engine: [dot], neato, sfdp, fdp, tps
+            (in-process, svg only; see: svg_digraph module)
+        graph_format: Optional; File format for Digraph: [png], pdf, svg
+        weighted: Optional; If true, parallel edges are collapsed into one weighted edge.
+        render_cache: Optional; Render the graph through this cache (see: render_cache module)
+            instead of invoking graphviz every time.
+        render_queue: Optional; Render the graph in the background with this queue
+            (see: render_queue module) instead of waiting on it.
 
     Raises:
         TypeError: Bad data type passed in.
@@ -429,13 +344,16 @@ def illness_menu(hospital: TPHHospital, graph_dir: str, sep_rooms: bool = False,
     # MAKE GRAPH
     graph_obj = create_illness_graph(hospital=hospital, graph_dir=graph_dir, ill_name=ill_name,
                                      sep_rooms=sep_rooms, engine=engine, graph_format=graph_format,
-                                     suffix_override='Illness - ' + ill_name)
+                                     suffix_override='Illness - ' + ill_name, weighted=weighted)
     print(f"Creating a directed graph of {hospital.get_name()}'s {ill_name} illness...")
-    graph_obj.view()
+    view_graph(graph_obj, render_cache=render_cache, render_queue=render_queue)
+# pylint: enable=too-many-arguments
 
 
+# pylint: disable=too-many-arguments
 def room_menu(hospital: TPHHospital, graph_dir: str, sep_rooms: bool = False, engine: str = 'dot',
-              graph_format: str = 'png') -> None:
+              graph_format: str = 'png', weighted: bool = False,
+              render_cache: RenderCache = None, render_queue: RenderQueue = None) -> None:
     """Execute the Two Point Science room menu.
 
     Prompts the user for a room associated with hospital and then creates a graph of all edges
@@ -445,8 +363,14 @@ def room_menu(hospital: TPHHospital, graph_dir: str, sep_rooms: bool = False, en
         hospital: TPHHospital object. (see: tph_hospital module)
         sep_rooms: Optional; If true, multi-purpose rooms are separated into ' (diag)' and
             ' (treat)' versions on the graph.
-        engine: Optional; Digraph build engine: [dot], neato, sfdp, fdp
-        graph_format: Optional; File format for Digraph: [png], pdf
+        engine: Optional; Digraph build engine: [dot], neato, sfdp, fdp, tps
+            (in-process, svg only; see: svg_digraph module)
+        graph_format: Optional; File format for Digraph: [png], pdf, svg
+        weighted: Optional; If true, parallel edges are collapsed into one weighted edge.
+        render_cache: Optional; Render the graph through this cache (see: render_cache module)
+            instead of invoking graphviz every time.
+        render_queue: Optional; Render the graph in the background with this queue
+            (see: render_queue module) instead of waiting on it.
 
     Raises:
         TypeError: Bad data type passed in.
@@ -468,7 +392,7 @@ def room_menu(hospital: TPHHospital, graph_dir: str, sep_rooms: bool = False, en
     new_dict = {i+1: room_list[i] for i in range(0, len(room_list))}
     # Separate rooms
     if sep_rooms:
-        new_dict = _create_sep_room_dict(new_dict)
+        new_dict = create_sep_room_dict(new_dict)
     local_room_menu = Menu(hospital.get_name().upper() + ' ROOM LIST', new_dict)
     # Get user input
     user_choice = get_choice(local_room_menu, clear_screen=True, choice_type=int)
@@ -476,9 +400,95 @@ def room_menu(hospital: TPHHospital, graph_dir: str, sep_rooms: bool = False, en
     # MAKE GRAPH
     graph_obj = create_graph(hospital=hospital, graph_dir=graph_dir, sep_rooms=sep_rooms,
                              engine=engine, graph_format=graph_format, focus_node=user_choice,
-                             suffix_override='Room - ' + user_choice)
+                             suffix_override='Room - ' + user_choice, weighted=weighted)
     print(f"Creating a directed graph of {hospital.get_name()}'s {user_choice} room...")
-    graph_obj.view()
+    view_graph(graph_obj, render_cache=render_cache, render_queue=render_queue)
+# pylint: enable=too-many-arguments
+
+
+# pylint: disable=too-many-arguments
+def render_bytes(hospital: TPHHospital, kind: str = GRAPH_HOSPITAL, item_name: str = '',
+                 sep_rooms: bool = False, engine: str = 'dot', graph_format: str = 'png',
+                 weighted: bool = False, timeout: float = None,
+                 render_cache: RenderCache = None) -> bytes:
+    """Render a hospital, illness, or room graph straight to bytes.
+
+    The DOT source is piped through the layout engine's stdin and stdout; neither the source nor
+    the render is written to disk and no viewer is opened.
+
+    Args:
+        hospital: TPHHospital object. (see: tph_hospital module)
+        kind: Optional; Graph kind: [GRAPH_HOSPITAL], GRAPH_ILLNESS, GRAPH_ROOM
+        item_name: Optional; Illness (GRAPH_ILLNESS) or room (GRAPH_ROOM) name
+        sep_rooms: Optional; If true, multi-purpose rooms are separated into ' (diag)' and
+            ' (treat)' versions on the graph.
+        engine: Optional; Digraph build engine: [dot], neato, sfdp, fdp, tps
+            (in-process, svg only; see: svg_digraph module)
+        graph_format: Optional; Output format: [png], pdf, svg
+        weighted: Optional; If true, parallel edges are collapsed into one weighted edge.
+        timeout: Optional; Seconds to wait on the layout engine before giving up.
+        render_cache: Optional; Reuse identical renders from, and save new renders to, this
+            cache (see: render_cache module).
+
+    Returns:
+        The rendered graph.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Unknown kind or illness name, or the tps engine was asked for a format other
+            than svg.
+        NotImplementedError: hospital does not contain any illnesses or contains a misconfigured
+            illness.
+        RuntimeError: The layout engine failed.
+        subprocess.TimeoutExpired: The layout engine exceeded timeout.
+        FileNotFoundError: The layout engine is not installed.
+    """
+    # LOCAL VARIABLES
+    graph_obj = None  # Graph to render
+
+    # INPUT VALIDATION
+    if render_cache is not None and not isinstance(render_cache, RenderCache):
+        raise TypeError(f'The render_cache can not be of type {type(render_cache)}')
+
+    # RENDER IT
+    graph_obj = create_target_graph(hospital=hospital, graph_dir='', kind=kind,
+                                    item_name=item_name, sep_rooms=sep_rooms, engine=engine,
+                                    graph_format=graph_format, weighted=weighted)
+
+    # DONE
+    if render_cache:
+        return render_cache.pipe(graph_obj, timeout=timeout)
+    return pipe_graph(graph_obj, timeout=timeout)
+# pylint: enable=too-many-arguments
+
+
+def view_graph(graph: graphviz.dot.Digraph, render_cache: RenderCache = None,
+               render_queue: RenderQueue = None) -> None:
+    """Render and view graph, through render_queue or render_cache if one is given.
+
+    Args:
+        graph: Graph object to view.
+        render_cache: Optional; RenderCache to reuse identical renders from.  If None, graph is
+            rendered by graphviz every time.
+        render_queue: Optional; RenderQueue to render graph in the background.  Takes precedence
+            over render_cache and returns without waiting for the render.
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # INPUT VALIDATION
+    if render_cache is not None and not isinstance(render_cache, RenderCache):
+        raise TypeError(f'The render_cache can not be of type {type(render_cache)}')
+    if render_queue is not None and not isinstance(render_queue, RenderQueue):
+        raise TypeError(f'The render_queue can not be of type {type(render_queue)}')
+
+    # VIEW IT
+    if render_queue:
+        render_queue.view(graph)
+    elif render_cache:
+        render_cache.view(graph)
+    else:
+        graph.view()
 
 
 # pylint: disable=too-many-arguments
@@ -494,8 +504,9 @@ def _create_graph(hospital: TPHHospital, graph_dir: str, engine: str = 'dot',
     Args:
         hospital: TPHHospital object. (see: tph_hospital module)
         graph_dir: Directory in which to create files
-        engine: Optional; Digraph build engine: [dot], neato, sfdp, fdp
-        graph_format: Optional; File format for Digraph: [png], pdf
+        engine: Optional; Digraph build engine: [dot], neato, sfdp, fdp, tps
+            (in-process, svg only; see: svg_digraph module)
+        graph_format: Optional; File format for Digraph: [png], pdf, svg
         focus_node: Optional; Create a graph based on a specific room instead of the hospital.
             This string will be appended to the end of all filenames associated with this graph
             unless suffix_override is defined.
@@ -518,75 +529,46 @@ def _create_graph(hospital: TPHHospital, graph_dir: str, engine: str = 'dot',
         filename = filename + ' - ' + focus_node
     filename = filename + f' ({engine})'
     # Instantiate the object
-    graph_obj = graphviz.Digraph(name=hospital.get_name(),
-                                 filename=os.path.join(graph_dir, filename),
-                                 engine=engine, format=graph_format)
+    if engine == TPS_ENGINE:
+        graph_obj = SVGDigraph(name=hospital.get_name(),
+                               filename=os.path.join(graph_dir, filename),
+                               graph_format=graph_format)
+    else:
+        graph_obj = graphviz.Digraph(name=hospital.get_name(),
+                                     filename=os.path.join(graph_dir, filename),
+                                     engine=engine, format=graph_format)
 
     # DONE
     return graph_obj
 # pylint: enable=too-many-arguments
 
 
-def _create_sep_room_dict(room_dict: dict) -> Dict[int, str]:
-    # LOCAL VARIABLES
-    new_dict = {}  # Return value
-    index = 1      # New indices for the new dictionary
-
-    # INPUT VALIDATION
-    if not isinstance(room_dict, dict):
-        raise TypeError(f'The room_dict argument must of type dict instead of {type(room_dict)}')
-
-    # DO IT
-    for _, room_name in room_dict.items():
-        try:
-            if TPH_ROOM_DICT[room_name].purpose == 'Both':
-                new_dict[index] = room_name + ' (diag)'
-                index = index + 1
-                new_dict[index] = room_name + ' (treat)'
-            else:
-                new_dict[index] = room_name
-        except AttributeError:
-            pass  # <shrug>
-        else:
-            index = index + 1
+def _count_to_penwidth(count: int) -> str:
+    """Convert a weighted edge count into a graphviz penwidth string.
 
-    # DONE
-    return new_dict
+    Width grows logarithmically so a hospital's busiest edges don't drown out everything else.
+    """
+    return f'{1 + 1.5 * math.log2(count):.2f}'
 
 
-def _graph_edges(graph: graphviz.dot.Digraph, edges: tuple,
-                 sep_rooms: bool, focus_node: str, all_diag: bool) -> graphviz.dot.Digraph:
-    """Adds edges to graph in a particular way on behalf of add_edges().
+def _render_edges(graph: graphviz.dot.Digraph, edge_model: EdgeModel, focus_node: str,
+                  weighted: bool = False) -> graphviz.dot.Digraph:
+    """Serialize edge_model's edges into graph on behalf of the create_*() functions.
 
     WARNING: Does not validate input!
 
-    A lot of assumptions are made in this function.  Most importantly are use cases:
-        (1) diag -> diag and (2) diag -> treat.  If all_diag is True, use case (1) is used.
-        Otherwise, (2).
+    Each distinct edge is added once per illness that walks it.  If weighted is True, each
+    distinct (lead, trail) pair is added once, labeled with its count, and drawn with a pen width
+    that grows with the count.
     """
-    # LOCAL VARIABLES
-    temp_lead_edge = edges[0]   # We might need to modify the leading edge
-    temp_trail_edge = edges[1]  # We might need to modify the trailing edge
-    diag_suffix = ' (diag)'     # If dual-use rooms are separate, diagnostic suffix
-    treat_suffix = ' (treat)'   # If dual-use rooms are separate, treatment suffix
-    trail_suffix = ''           # Determined by all_diag
-
-    # DO IT (and don't ask questions)
-    # Determine trailing suffix
-    if all_diag:
-        trail_suffix = diag_suffix
+    if weighted:
+        for edge in edge_model.get_weighted_edges(focus_node=focus_node):
+            graph.edge(edge.lead, edge.trail, label=str(edge.count),
+                       penwidth=_count_to_penwidth(edge.count))
     else:
-        trail_suffix = treat_suffix
-    # Graph the edge
-    if sep_rooms and temp_lead_edge in TPH_DUAL_PURPOSE_LIST:
-        temp_lead_edge = temp_lead_edge + diag_suffix
-    if sep_rooms and temp_trail_edge in TPH_DUAL_PURPOSE_LIST:
-        temp_trail_edge = temp_trail_edge + trail_suffix
-    if focus_node:
-        if focus_node in (temp_lead_edge, temp_trail_edge):
-            graph.edge(temp_lead_edge, temp_trail_edge)
-    else:
-        graph.edge(temp_lead_edge, temp_trail_edge)
+        for edge in edge_model.get_edges(focus_node=focus_node):
+            for _ in range(0, edge.count):
+                graph.edge(edge.lead, edge.trail)
 
     # DONE
     return graph
@@ -603,7 +585,7 @@ def _validate_add_edges(hospital: TPHHospital, graph: graphviz.dot.Digraph,
     if not illness_obj_list:
         raise NotImplementedError(f'{hospital.get_name()} does not appear to be defined')
     # graph
-    if not isinstance(graph, graphviz.dot.Digraph):
+    if not isinstance(graph, (graphviz.dot.Digraph, SVGDigraph)):
         raise TypeError(f'The graph can not be of type {type(graph)}')
     # sep_rooms
     if not isinstance(sep_rooms, bool):
@@ -613,17 +595,6 @@ def _validate_add_edges(hospital: TPHHospital, graph: graphviz.dot.Digraph,
         raise TypeError(f'The focus_node argument must of type str instead of {type(focus_node)}')
 
 
-def _validate_edge_menu(graph: graphviz.dot.Digraph, sep_rooms: bool) -> None:
-    """Validate input on behalf of edge_menu()."""
-    # INPUT VALIDATION
-    # graph
-    if not isinstance(graph, graphviz.dot.Digraph):
-        raise TypeError(f'The graph can not be of type {type(graph)}')
-    # sep_rooms
-    if not isinstance(sep_rooms, bool):
-        raise TypeError(f'The sep_rooms argument must of type bool instead of {type(sep_rooms)}')
-
-
 def _validate_graph_menu(hospital: TPHHospital, graph_dir: str, sep_rooms: bool, engine: str,
                          graph_format: str) -> None:
     """Validate input on behalf of functions that create graphs."""
@@ -643,3 +614,5 @@ def _validate_graph_menu(hospital: TPHHospital, graph_dir: str, sep_rooms: bool,
     # graph_format
     if not isinstance(graph_format, str):
         raise TypeError(f'The graph_format can not be of type {type(graph_format)}')
+    if engine == TPS_ENGINE and graph_format != SVG_FORMAT:
+        raise ValueError(f'The {TPS_ENGINE} engine only writes {SVG_FORMAT}, not {graph_format}')
@@ -0,0 +1,273 @@
+"""Defines the Two Point Science edge model.
+
+EdgeModel is the native, in-memory multiset of room-to-room edges (lead room, trail room,
+diag/treat role, multiplicity) derived from a hospital's illnesses.  Room connection counts are
+computed directly from the model and graphs are rendered from it in a single serialization pass.
+
+    Typical usage example:
+
+    from tps.edge_model import get_edge_model
+    from tps.tph_hospital import TPHHospital
+    model = get_edge_model(TPHHospital('Grockle Bay'), sep_rooms=True)
+    for edge in model.get_edges():
+        print(f'{edge.lead} -> {edge.trail} ({edge.role}) x{edge.count}')
+    print(model.get_degree_counts())
+"""
+
+# Standard
+from collections import namedtuple
+from typing import Dict, Iterator, List, Tuple
+
+# Third Party
+
+# Local
+from tps.tph_catalog import NO_ROOM, PURPOSE_DIAG, PURPOSE_TREAT, TPH_CATALOG
+from tps.tph_hospital import TPHHospital
+from tps.tph_illness import TPHIllness
+from tps.tph_registry import TPH_REGISTRY
+
+
+# MACROS
+# Edge roles
+EDGE_ROLE_DIAG = 'diag'    # diag -> diag
+EDGE_ROLE_TREAT = 'treat'  # diag -> treat
+EDGE_ROLE_MIXED = 'mixed'  # Weighted edge walked in both roles
+# Dual-purpose room name suffixes, used when rooms are separated
+DIAG_SUFFIX = ' (diag)'
+TREAT_SUFFIX = ' (treat)'
+
+# One distinct edge, with node names already translated for output
+Edge = namedtuple('Edge', 'lead trail role count')
+
+
+class EdgeModel:
+    """Multiset of room edges for one hospital (or one of its illnesses, or the edges touching
+    one of its rooms) and sep_rooms setting."""
+
+    def __init__(self, hospital: TPHHospital, sep_rooms: bool = False,
+                 ill_name: str = '', focus_node: str = '') -> None:
+        """EdgeModel class ctor.
+
+        Args:
+            hospital: TPHHospital object. (see: tph_hospital module)
+            sep_rooms: Optional; If true, multi-purpose rooms are separated into ' (diag)' and
+                ' (treat)' nodes.
+            ill_name: Optional; Model only this illness instead of every illness in hospital.
+            focus_node: Optional; Model only the edges that lead from, or trail to, this node.
+                Only the illnesses that use the node's room are walked.
+
+        Raises:
+            TypeError: Bad data type passed in.
+            ValueError: ill_name is not an illness found in hospital.
+            NotImplementedError: hospital does not contain any illnesses or contains a
+                misconfigured illness.
+        """
+        # LOCAL VARIABLES
+        illness_obj_list = []  # List of illness objects to model
+
+        # INPUT VALIDATION
+        if not isinstance(hospital, TPHHospital):
+            raise TypeError(f'The hospital can not be of type {type(hospital)}')
+        if not isinstance(sep_rooms, bool):
+            raise TypeError(f'The sep_rooms can not be of type {type(sep_rooms)}')
+        if not isinstance(ill_name, str):
+            raise TypeError(f'The ill_name argument must of type str instead of {type(ill_name)}')
+        if not isinstance(focus_node, str):
+            raise TypeError(f'The focus_node argument must of type str instead of '
+                            f'{type(focus_node)}')
+
+        # INSTANCE ATTRIBUTES
+        self._hospital_name = hospital.get_name()  # Name of the modeled hospital
+        self._sep_rooms = sep_rooms                # Separate dual-purpose rooms
+        self._ill_name = ill_name                  # Name of the modeled illness, if any
+        self._focus_node = focus_node              # Name of the modeled node, if any
+        self._edges = {}                           # (lead ID, trail ID, role): multiplicity
+        self._node_names = {}                      # (room ID, role): node name
+
+        # BUILD IT
+        if not hospital.get_illness_objects():
+            raise NotImplementedError(f'{hospital.get_name()} is not configured with illnesses')
+        if ill_name:
+            illness_obj_list = [hospital.get_illness_object(ill_name)]
+        else:
+            illness_obj_list = hospital.get_illness_objects()
+        if focus_node:
+            illness_obj_list = self._focus_illnesses(hospital, illness_obj_list)
+        for illness_obj in illness_obj_list:
+            for step in illness_steps(illness_obj, hospital_name=hospital.get_name()):
+                if not focus_node or focus_node in (self.get_node_name(step[0], EDGE_ROLE_DIAG),
+                                                    self.get_node_name(step[1], step[2])):
+                    self._edges[step] = self._edges.get(step, 0) + 1
+
+    def get_degree_counts(self) -> Dict[str, int]:
+        """Return the number of edges connected to each node, keyed by node name.
+
+        Parallel edges are counted once per illness.  An edge from a node back to itself is
+        counted once.
+        """
+        # LOCAL VARIABLES
+        edge_counts = {}  # Node name: Edge count
+
+        # COUNT IT
+        for edge in self.get_edges():
+            edge_counts[edge.lead] = edge_counts.get(edge.lead, 0) + edge.count
+            if edge.trail != edge.lead:
+                edge_counts[edge.trail] = edge_counts.get(edge.trail, 0) + edge.count
+
+        # DONE
+        return edge_counts
+
+    def get_edge_keys(self) -> List[Tuple[int, int, str]]:
+        """Return the distinct (lead room ID, trail room ID, role) keys in order of appearance."""
+        return list(self._edges)
+
+    def get_edges(self, focus_node: str = '') -> List[Edge]:
+        """Return the distinct edges, translated to node names, in order of first appearance.
+
+        Args:
+            focus_node: Optional; Only return edges that lead from, or trail to, this node name.
+        """
+        # LOCAL VARIABLES
+        edge_list = []  # Return value
+        lead = ''       # Leading node name
+        trail = ''      # Trailing node name
+
+        # TRANSLATE
+        for (lead_id, trail_id, role), count in self._edges.items():
+            lead = self.get_node_name(lead_id, EDGE_ROLE_DIAG)
+            trail = self.get_node_name(trail_id, role)
+            if not focus_node or focus_node in (lead, trail):
+                edge_list.append(Edge(lead, trail, role, count))
+
+        # DONE
+        return edge_list
+
+    def get_focus_node(self) -> str:
+        """Return the name of the node this model is limited to, if any."""
+        return self._focus_node
+
+    def get_hospital_name(self) -> str:
+        """Return the name of the modeled hospital."""
+        return self._hospital_name
+
+    def get_multiplicity(self, lead_id: int, trail_id: int, role: str) -> int:
+        """Return the number of times an edge appears in the model (0 if it doesn't)."""
+        return self._edges.get((lead_id, trail_id, role), 0)
+
+    def get_node_name(self, room_id: int, role: str) -> str:
+        """Translate a room ID, in a given role, into its node name."""
+        # LOCAL VARIABLES
+        node_name = self._node_names.get((room_id, role))  # Return value
+
+        # TRANSLATE
+        if node_name is None:
+            node_name = TPH_CATALOG.room_names[room_id]
+            if self._sep_rooms and TPH_CATALOG.is_dual_purpose(room_id):
+                node_name = node_name + (DIAG_SUFFIX if role == EDGE_ROLE_DIAG else TREAT_SUFFIX)
+            self._node_names[(room_id, role)] = node_name
+
+        # DONE
+        return node_name
+
+    def get_sep_rooms(self) -> bool:
+        """Return True if dual-purpose rooms are separated in this model."""
+        return self._sep_rooms
+
+    def get_weighted_edges(self, focus_node: str = '') -> List[Edge]:
+        """Return one edge per distinct (lead, trail) node pair with the counts summed.
+
+        Roles are merged, so an edge walked as both diag and treat has a role of
+        EDGE_ROLE_MIXED.
+
+        Args:
+            focus_node: Optional; Only return edges that lead from, or trail to, this node name.
+        """
+        # LOCAL VARIABLES
+        weighted = {}  # (Lead, Trail): Edge
+        prior = None   # Edge previously collapsed into the same (lead, trail) pair
+
+        # COLLAPSE
+        for edge in self.get_edges(focus_node=focus_node):
+            if (edge.lead, edge.trail) in weighted:
+                prior = weighted[(edge.lead, edge.trail)]
+                weighted[(edge.lead, edge.trail)] = Edge(
+                    edge.lead, edge.trail,
+                    prior.role if prior.role == edge.role else EDGE_ROLE_MIXED,
+                    prior.count + edge.count)
+            else:
+                weighted[(edge.lead, edge.trail)] = edge
+
+        # DONE
+        return list(weighted.values())
+
+    def _focus_illnesses(self, hospital: TPHHospital,
+                         illness_obj_list: List[TPHIllness]) -> List[TPHIllness]:
+        """Return the illnesses in illness_obj_list whose walks can touch the focus node."""
+        # LOCAL VARIABLES
+        room_name = self._focus_node            # Room name of the focus node
+        purpose = PURPOSE_DIAG | PURPOSE_TREAT  # Roles the focus node's room plays
+
+        # PARSE NODE
+        if self._sep_rooms and room_name.endswith(DIAG_SUFFIX) \
+                and TPH_CATALOG.has_room(room_name[:-len(DIAG_SUFFIX)]):
+            room_name = room_name[:-len(DIAG_SUFFIX)]
+            purpose = PURPOSE_DIAG
+        elif self._sep_rooms and room_name.endswith(TREAT_SUFFIX) \
+                and TPH_CATALOG.has_room(room_name[:-len(TREAT_SUFFIX)]):
+            room_name = room_name[:-len(TREAT_SUFFIX)]
+            purpose = PURPOSE_TREAT
+        if not TPH_CATALOG.has_room(room_name):
+            return []  # Not a room, so no edges
+
+        # DONE
+        illness_obj_list = set(illness_obj_list)
+        return [illness_obj for illness_obj in
+                hospital.get_room_illness_objects(TPH_CATALOG.get_room_id(room_name),
+                                                  purpose=purpose)
+                if illness_obj in illness_obj_list]
+
+
+def get_edge_model(hospital: TPHHospital, sep_rooms: bool = False, ill_name: str = '',
+                   focus_node: str = '') -> EdgeModel:
+    """Return the shared EdgeModel for these arguments, building it if needed.
+
+    Models are held by TPH_REGISTRY (see: tph_registry) so every consumer reuses the same model.
+    Same arguments and exceptions as the EdgeModel ctor.
+    """
+    # INPUT VALIDATION
+    if not isinstance(hospital, TPHHospital):
+        raise TypeError(f'The hospital can not be of type {type(hospital)}')
+
+    # DONE
+    return TPH_REGISTRY.get((EdgeModel, hospital.get_name(), sep_rooms, ill_name, focus_node),
+                            lambda: EdgeModel(hospital, sep_rooms=sep_rooms, ill_name=ill_name,
+                                              focus_node=focus_node))
+
+
+def illness_steps(illness: TPHIllness,
+                  hospital_name: str = '') -> Iterator[Tuple[int, int, str]]:
+    """Yield the (lead room ID, trail room ID, role) steps a patient with illness walks.
+
+    Args:
+        illness: TPHIllness object. (see: tph_illness module)
+        hospital_name: Optional; Hospital name to use in exception messages.
+
+    Raises:
+        NotImplementedError: illness is missing diagnostic rooms or a treatment room.
+    """
+    # LOCAL VARIABLES
+    diag_ids = illness.get_diag_ids()  # Diagnostic room IDs, GP's Office first
+    treat_id = illness.get_treat_id()  # Treatment room ID
+
+    # INTERNAL VALIDATION
+    if not diag_ids:
+        raise NotImplementedError(f'{hospital_name} has an illness, {illness.get_name()}, '
+                                  'missing a list of diagnostic rooms.')
+    if treat_id == NO_ROOM:
+        raise NotImplementedError(f'{hospital_name} has an illness, {illness.get_name()}, '
+                                  'missing a treatment room.')
+
+    # WALK IT
+    for index in range(0, len(diag_ids) - 1):
+        yield tuple((diag_ids[index], diag_ids[index + 1], EDGE_ROLE_DIAG))
+    yield tuple((diag_ids[len(diag_ids) - 1], treat_id, EDGE_ROLE_TREAT))
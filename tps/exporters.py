@@ -0,0 +1,362 @@
+"""Exports the Two Point Science tables in machine-readable formats.
+
+The room connection (edge) and illness danger tables are streamed, one hospital at a time, from
+row generators into CSV, JSON Lines, or (when pyarrow is installed) Arrow IPC and Parquet files.
+Every export has typed columns (see: EDGE_EXPORT_COLUMNS, DANGER_EXPORT_COLUMNS): counts are
+ints, danger values are raw floats (e.g., 0.4 instead of '40%'), and missing data is empty in
+CSV and null everywhere else.  Hospitals that are not configured with illnesses are skipped.
+
+    Typical usage example:
+
+    python3 -m tps danger --output danger.parquet
+    python3 -m tps edges --output - Smogley 'Grockle Bay'   # CSV on stdout
+
+    from tps.exporters import export_danger_table
+    rows = export_danger_table('danger.jsonl', strategy=4)
+"""
+
+# Standard
+from typing import Any, Iterable, Iterator, List, Tuple
+import csv
+import json
+import math
+import os
+import sys
+
+# Third Party
+
+# Local
+from tps.danger_strategies import validate_strategy
+from tps.danger_table import DANGER_COL_ILLNESS, DANGER_COLUMNS, get_danger_table
+from tps.edge_model import get_edge_model
+from tps.misc import loose_lookup
+from tps.tph_constants import TPH_ROOM_DICT
+from tps.tph_hospital import get_configured_hospitals, TPHHospital
+
+
+# MACROS
+# Export formats
+EXPORT_CSV = 'csv'
+EXPORT_JSONL = 'jsonl'
+EXPORT_ARROW = 'arrow'       # Arrow IPC file (requires pyarrow)
+EXPORT_PARQUET = 'parquet'   # Requires pyarrow
+EXPORT_FORMATS = (EXPORT_CSV, EXPORT_JSONL, EXPORT_ARROW, EXPORT_PARQUET)
+# Export formats that can stream to stdout
+EXPORT_TEXT_FORMATS = (EXPORT_CSV, EXPORT_JSONL)
+# Export path that writes to stdout
+EXPORT_STDOUT = '-'
+# Bytes buffered before a text export is written
+EXPORT_BUFFER_BYTES = 1 << 20
+# Rows per Arrow record batch
+EXPORT_BATCH_ROWS = 4096
+
+# (Column name, Python type) of every export
+EDGE_EXPORT_COLUMNS = (('hospital', str), ('room', str), ('purpose', str), ('count', int))
+DANGER_EXPORT_COLUMNS = (('hospital', str), ('illness', str), ('treatment', str),
+                         ('difficulty', float), ('death', float), ('decline', float),
+                         ('aggregate', float), ('strategy', int))
+
+
+class _RowCounter:
+    """Iterates over rows, counting them."""
+
+    def __init__(self, rows: Iterable[tuple]) -> None:
+        """_RowCounter class ctor."""
+        self._rows = iter(rows)  # Rows to count
+        self.count = 0           # Rows iterated so far
+
+    def __iter__(self) -> '_RowCounter':
+        return self
+
+    def __next__(self) -> tuple:
+        row = next(self._rows)
+        self.count += 1
+        return row
+
+
+def export_danger_table(path: str, hospital_list: List[str] = None, strategy: int = 2,
+                        export_format: str = '') -> int:
+    """Export the illness danger table of every hospital in hospital_list.
+
+    Args:
+        path: File to write, or '-' for stdout (CSV and JSON Lines only).
+        hospital_list: Optional; Hospital names to export.  Defaults to TPH_HOSPITAL_LIST.
+        strategy: Optional; Aggregate strategy. (see: danger_strategies module)
+        export_format: Optional; One of EXPORT_FORMATS.  Defaults to path's extension, then CSV.
+
+    Returns:
+        The number of rows written.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid strategy, hospital name, or export format.
+        RuntimeError: An Arrow or Parquet export was requested without pyarrow installed.
+    """
+    return export_rows(iter_danger_rows(hospital_list=hospital_list, strategy=strategy),
+                       DANGER_EXPORT_COLUMNS, path, export_format=export_format)
+
+
+def export_edge_table(path: str, hospital_list: List[str] = None, sep_rooms: bool = False,
+                      export_format: str = '') -> int:
+    """Export the room connection (edge) table of every hospital in hospital_list.
+
+    Args:
+        path: File to write, or '-' for stdout (CSV and JSON Lines only).
+        hospital_list: Optional; Hospital names to export.  Defaults to TPH_HOSPITAL_LIST.
+        sep_rooms: Optional; If true, multi-purpose rooms are separated into ' (diag)' and
+            ' (treat)' rows.
+        export_format: Optional; One of EXPORT_FORMATS.  Defaults to path's extension, then CSV.
+
+    Returns:
+        The number of rows written.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid hospital name or export format.
+        RuntimeError: An Arrow or Parquet export was requested without pyarrow installed.
+        NotImplementedError: A hospital contains a misconfigured illness.
+    """
+    return export_rows(iter_edge_rows(hospital_list=hospital_list, sep_rooms=sep_rooms),
+                       EDGE_EXPORT_COLUMNS, path, export_format=export_format)
+
+
+def export_rows(rows: Iterable[tuple], columns: Tuple[Tuple[str, type], ...], path: str,
+                export_format: str = '') -> int:
+    """Stream rows into path as export_format and return the number of rows written.
+
+    Args:
+        rows: Row tuples (e.g., from iter_danger_rows()).  Consumed once, as they're written.
+            A stdout export stops quietly when the reader closes the pipe (e.g., | head).
+        columns: (Column name, Python type) of every row field.  Types are str, int, or float.
+        path: File to write, or '-' for stdout (CSV and JSON Lines only).
+        export_format: Optional; One of EXPORT_FORMATS.  Defaults to path's extension, then CSV.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid export format.
+        RuntimeError: An Arrow or Parquet export was requested without pyarrow installed.
+    """
+    # INPUT VALIDATION
+    export_format = _validate_export_rows(columns=columns, path=path,
+                                          export_format=export_format)
+
+    # EXPORT IT
+    if export_format in EXPORT_TEXT_FORMATS:
+        if path == EXPORT_STDOUT:
+            return _write_stdout(rows, columns, export_format)
+        with open(path, 'w', newline='', encoding='utf-8',
+                  buffering=EXPORT_BUFFER_BYTES) as out_file:
+            return _write_text(rows, columns, out_file, export_format)
+    return _write_arrow(rows, columns, path, export_format)
+
+
+def iter_danger_rows(hospital_list: List[str] = None, strategy: int = 2) -> Iterator[tuple]:
+    """Generate the illness danger table rows, by hospital and illness name.
+
+    Rows match DANGER_EXPORT_COLUMNS.  Missing values are None.  The arguments are validated
+    before the first row is generated, so a bad hospital name never leaves a partial export.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid strategy or hospital name.
+    """
+    # INPUT VALIDATION
+    validate_strategy(strategy)
+
+    # DONE
+    return _gen_danger_rows(get_configured_hospitals(hospital_list), strategy)
+
+
+def iter_edge_rows(hospital_list: List[str] = None, sep_rooms: bool = False) -> Iterator[tuple]:
+    """Generate the room connection (edge) table rows, by hospital and room name.
+
+    Rows match EDGE_EXPORT_COLUMNS.  The arguments are validated before the first row is
+    generated, so a bad hospital name never leaves a partial export.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid hospital name.
+        NotImplementedError: A hospital contains a misconfigured illness.  Raised by the
+            generator, when that hospital's rows are reached, like the danger rows' errors.
+    """
+    # INPUT VALIDATION
+    if not isinstance(sep_rooms, bool):
+        raise TypeError(f'The sep_rooms argument must of type bool instead of {type(sep_rooms)}')
+
+    # DONE
+    return _gen_edge_rows(get_configured_hospitals(hospital_list), sep_rooms)
+
+
+def raw_value(value: Any) -> Any:
+    """Return a raw column value with NaN (MISSING_DATA) translated to None (JSON null)."""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _gen_danger_rows(hospitals: List[TPHHospital], strategy: int) -> Iterator[tuple]:
+    """Generate the illness danger table rows on behalf of iter_danger_rows()."""
+    # LOCAL VARIABLES
+    table = None  # DangerTable of one hospital
+    values = []   # Raw columns of table
+
+    # GENERATE THEM
+    for hospital in hospitals:
+        table = get_danger_table(hospital, strategy=strategy)
+        values = [table.get_values(column) for column in DANGER_COLUMNS]
+        for index in table.get_order(DANGER_COL_ILLNESS, sort_desc=False):
+            yield tuple([hospital.get_name()] + [raw_value(column[index]) for column in values]
+                        + [strategy])
+
+
+def _gen_edge_rows(hospitals: List[TPHHospital], sep_rooms: bool) -> Iterator[tuple]:
+    """Generate the room connection (edge) table rows on behalf of iter_edge_rows()."""
+    # LOCAL VARIABLES
+    edge_counts = {}  # Room name: Edge count, for one hospital
+    details = None    # RoomDetails of one room
+
+    # GENERATE THEM
+    for hospital in hospitals:
+        edge_counts = get_edge_model(hospital, sep_rooms=sep_rooms).get_degree_counts()
+        for room_name in sorted(edge_counts):
+            details = loose_lookup(TPH_ROOM_DICT, room_name)
+            yield (hospital.get_name(), room_name,
+                   getattr(details, 'purpose', 'Unspecified') if details else 'Not Found',
+                   edge_counts[room_name])
+
+
+def _import_pyarrow(export_format: str) -> Any:
+    """Import pyarrow and the module that writes export_format.
+
+    Raises:
+        RuntimeError: pyarrow is not installed.
+    """
+    # pylint: disable=import-outside-toplevel
+    try:
+        import pyarrow
+        if export_format == EXPORT_PARQUET:
+            import pyarrow.parquet
+        else:
+            import pyarrow.ipc
+    except ImportError as err:
+        raise RuntimeError(f'The {export_format} export format requires pyarrow') from err
+
+    # DONE
+    return pyarrow
+
+
+def _record_batch(pyarrow: Any, schema: Any, batch: List[tuple]) -> Any:
+    """Transpose a batch of rows into an Arrow RecordBatch of schema."""
+    return pyarrow.RecordBatch.from_arrays([pyarrow.array(column, type=schema.field(index).type)
+                                            for index, column in enumerate(zip(*batch))],
+                                           schema=schema)
+
+
+def _validate_export_rows(columns: Tuple[Tuple[str, type], ...], path: str,
+                          export_format: str) -> str:
+    """Validate input on behalf of export_rows() and return the export format to write."""
+    # columns
+    if not isinstance(columns, tuple):
+        raise TypeError(f'The columns argument must of type tuple instead of {type(columns)}')
+    for column in columns:
+        if not isinstance(column, tuple) or len(column) != 2:
+            raise TypeError(f'Found an invalid column of type {type(column)} in the columns')
+        if column[1] not in (str, int, float):
+            raise ValueError(f'The {column[0]} column type {column[1]} is not str, int, or float')
+    # path
+    if not isinstance(path, str):
+        raise TypeError(f'The path argument must of type str instead of {type(path)}')
+    if not path:
+        raise ValueError('The path argument can not be empty')
+    # export_format
+    if not isinstance(export_format, str):
+        raise TypeError(f'The export_format argument must of type str instead of '
+                        f'{type(export_format)}')
+    if not export_format:
+        export_format = os.path.splitext(path)[1].lstrip('.').lower()
+        if export_format not in EXPORT_FORMATS:
+            export_format = EXPORT_CSV
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f'The export_format {export_format} is not one of {EXPORT_FORMATS}')
+    if path == EXPORT_STDOUT and export_format not in EXPORT_TEXT_FORMATS:
+        raise ValueError(f'The {export_format} export format can not be written to stdout')
+
+    # DONE
+    return export_format
+
+
+def _write_arrow(rows: Iterable[tuple], columns: Tuple[Tuple[str, type], ...], path: str,
+                 export_format: str) -> int:
+    """Write rows to path, in Arrow record batches, on behalf of export_rows()."""
+    # LOCAL VARIABLES
+    pyarrow = _import_pyarrow(export_format)  # pyarrow, with parquet or ipc imported
+    # Arrow type of each column's Python type
+    schema = pyarrow.schema([(name, {str: pyarrow.string(), int: pyarrow.int64(),
+                                     float: pyarrow.float64()}[col_type])
+                             for name, col_type in columns])
+    batch = []       # Rows of the current record batch
+    row_count = 0    # Rows written
+    writer = None    # Parquet or Arrow IPC file writer
+
+    # WRITE IT
+    if export_format == EXPORT_PARQUET:
+        writer = pyarrow.parquet.ParquetWriter(path, schema)
+    else:
+        writer = pyarrow.ipc.new_file(path, schema)
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) == EXPORT_BATCH_ROWS:
+                writer.write_batch(_record_batch(pyarrow, schema, batch))
+                row_count += len(batch)
+                batch = []
+        if batch:
+            writer.write_batch(_record_batch(pyarrow, schema, batch))
+            row_count += len(batch)
+    finally:
+        writer.close()
+
+    # DONE
+    return row_count
+
+
+def _write_stdout(rows: Iterable[tuple], columns: Tuple[Tuple[str, type], ...],
+                  export_format: str) -> int:
+    """Write rows to stdout on behalf of export_rows(), stopping quietly on a closed pipe.
+
+    When the reader goes away, stdout is pointed at os.devnull so the interpreter's final flush
+    doesn't fail too, and the rows generated so far are counted as written.
+    """
+    # LOCAL VARIABLES
+    counter = _RowCounter(rows)  # Counts the rows as they're generated
+
+    # WRITE IT
+    try:
+        return _write_text(counter, columns, sys.stdout, export_format)
+    except BrokenPipeError:
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+    # DONE
+    return counter.count
+
+
+def _write_text(rows: Iterable[tuple], columns: Tuple[Tuple[str, type], ...], out_file: Any,
+                export_format: str) -> int:
+    """Write rows to out_file as CSV or JSON Lines on behalf of export_rows()."""
+    # LOCAL VARIABLES
+    names = [name for name, _ in columns]  # Column names
+    counter = _RowCounter(rows)            # Counts the rows as they're written
+    csv_writer = None                      # CSV writer of out_file
+
+    # WRITE IT
+    if export_format == EXPORT_CSV:
+        csv_writer = csv.writer(out_file, lineterminator='\n')
+        csv_writer.writerow(names)
+        csv_writer.writerows(counter)
+    else:
+        out_file.writelines(json.dumps(dict(zip(names, row)), separators=(',', ':')) + '\n'
+                            for row in counter)
+    out_file.flush()
+
+    # DONE
+    return counter.count
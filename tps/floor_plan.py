@@ -0,0 +1,402 @@
+"""Defines the Two Point Science floor plan optimizer.
+
+Assigns a hospital's rooms to a grid of plots so that patients walk as little as possible: the
+number of patients walking between two rooms (the weighted edges graphs are drawn from, see:
+edge_model module) times the walking (Manhattan) distance between their plots, summed over every
+pair of rooms.  That's a quadratic assignment problem, solved by Taillard's robust tabu search:
+every swap of two plots is scored from a delta matrix that's updated in constant time per swap
+after each move, recently undone assignments are tabu for a random tenure, and restarts from
+different random plans run in parallel worker processes until the time budget runs out.
+
+    Typical usage example:
+
+    from tps.floor_plan import optimize_floor_plan, print_floor_plan, save_floor_plan
+    from tps.tph_hospital import TPHHospital
+    plan = optimize_floor_plan(TPHHospital('Smogley'), seconds=2.0, jobs=4, seed=1)
+    print_floor_plan(plan)
+    save_floor_plan(plan, 'graphs/Smogley_floor_plan.svg')
+"""
+
+# Standard
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+from xml.sax.saxutils import escape
+import math
+import os
+import random
+import time
+
+# Third Party
+
+# Local
+from tps.edge_model import get_edge_model
+from tps.tph_hospital import TPHHospital
+
+
+# MACROS
+# Default seconds each restart may search
+FLOOR_PLAN_SECONDS = 2.0
+# Most tabu search moves per restart, regardless of time
+FLOOR_PLAN_MOVES = 100000
+# Characters per plot in the ASCII floor plan
+ASCII_PLOT_WIDTH = 6
+# Pixels per plot, and the gap between plots, in the SVG floor plan
+SVG_PLOT_SIZE = 120
+SVG_PLOT_GAP = 20
+# An optimized floor plan: plots holds a room name, or '' if the plot is empty, for each plot in
+# row-major order and walk is the traffic-weighted walking distance, in plots
+FloorPlan = namedtuple('FloorPlan', 'hospital_name rows cols plots walk flows')
+# Patients walking between two rooms, in either direction
+Flow = namedtuple('Flow', 'room_a room_b count')
+
+
+def floor_plan_to_ascii(plan: FloorPlan) -> str:
+    """Draw plan as an ASCII grid of room abbreviations followed by a legend.
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # LOCAL VARIABLES
+    abbreviations = {}  # Room name: Abbreviation
+    border = ''         # Line between rows of plots
+    lines = []          # Return value, one line at a time
+
+    # INPUT VALIDATION
+    if not isinstance(plan, FloorPlan):
+        raise TypeError(f'The plan argument must of type FloorPlan instead of {type(plan)}')
+
+    # DRAW IT
+    abbreviations = _abbreviate([room_name for room_name in plan.plots if room_name])
+    border = '+' + ('-' * ASCII_PLOT_WIDTH + '+') * plan.cols
+    lines.append(f'{plan.hospital_name} floor plan (walking distance: {plan.walk})')
+    lines.append(border)
+    for row in range(0, plan.rows):
+        lines.append('|' + '|'.join(
+            f'{abbreviations.get(plan.plots[row * plan.cols + col], ""): ^{ASCII_PLOT_WIDTH}}'
+            for col in range(0, plan.cols)) + '|')
+        lines.append(border)
+    for room_name, abbreviation in sorted(abbreviations.items(), key=lambda item: item[1]):
+        lines.append(f'{abbreviation: <{ASCII_PLOT_WIDTH}}{room_name}')
+
+    # DONE
+    return '\n'.join(lines)
+
+
+def floor_plan_to_svg(plan: FloorPlan) -> str:
+    """Draw plan as an SVG document; lines between rooms are as thick as their traffic.
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # LOCAL VARIABLES
+    step = SVG_PLOT_SIZE + SVG_PLOT_GAP  # Pixels from one plot to the next
+    centers = {}                         # Room name: (x, y) center of its plot
+    max_count = 0                        # Busiest flow
+    body = []                            # SVG elements
+    x_pos = 0                            # Left edge of a plot
+    y_pos = 0                            # Top edge of a plot
+
+    # INPUT VALIDATION
+    if not isinstance(plan, FloorPlan):
+        raise TypeError(f'The plan argument must of type FloorPlan instead of {type(plan)}')
+
+    # DRAW IT
+    # Plots
+    for index, room_name in enumerate(plan.plots):
+        x_pos = SVG_PLOT_GAP + (index % plan.cols) * step
+        y_pos = SVG_PLOT_GAP + (index // plan.cols) * step + SVG_PLOT_GAP
+        body.append(f'<rect x="{x_pos}" y="{y_pos}" width="{SVG_PLOT_SIZE}" '
+                    f'height="{SVG_PLOT_SIZE}" fill="{"#e8f0fe" if room_name else "#f4f4f4"}" '
+                    'stroke="#5f6368"/>')
+        if room_name:
+            centers[room_name] = (x_pos + SVG_PLOT_SIZE / 2, y_pos + SVG_PLOT_SIZE / 2)
+    # Traffic
+    max_count = max([flow.count for flow in plan.flows] + [1])
+    for flow in plan.flows:
+        body.append(f'<line x1="{centers[flow.room_a][0]}" y1="{centers[flow.room_a][1]}" '
+                    f'x2="{centers[flow.room_b][0]}" y2="{centers[flow.room_b][1]}" '
+                    f'stroke="#d93025" stroke-opacity="0.5" '
+                    f'stroke-width="{1 + 7 * flow.count / max_count:.1f}"/>')
+    # Labels
+    for room_name, (x_pos, y_pos) in centers.items():
+        body.append(f'<text x="{x_pos}" y="{y_pos}" text-anchor="middle" '
+                    f'dominant-baseline="middle" font-family="sans-serif" font-size="12">'
+                    f'{escape(room_name)}</text>')
+
+    # DONE
+    return '\n'.join([f'<svg xmlns="http://www.w3.org/2000/svg" '
+                      f'width="{SVG_PLOT_GAP + plan.cols * step}" '
+                      f'height="{2 * SVG_PLOT_GAP + plan.rows * step}">',
+                      f'<text x="{SVG_PLOT_GAP}" y="{SVG_PLOT_GAP}" font-family="sans-serif" '
+                      f'font-size="14">{escape(plan.hospital_name)} floor plan (walking '
+                      f'distance: {plan.walk})</text>']
+                     + body + ['</svg>', ''])
+
+
+def get_flows(hospital: TPHHospital) -> List[Flow]:
+    """Count the patients walking between each pair of hospital's rooms, in either direction.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        RuntimeError: The hospital's illnesses have not been configured.
+        NotImplementedError: hospital contains a misconfigured illness.
+    """
+    # LOCAL VARIABLES
+    flow_dict = {}  # (Room name, room name), alphabetically: Count
+
+    # INPUT VALIDATION
+    if not isinstance(hospital, TPHHospital):
+        raise TypeError(f'The hospital can not be of type {type(hospital)}')
+
+    # COUNT IT
+    for edge in get_edge_model(hospital, sep_rooms=False).get_weighted_edges():
+        if edge.lead != edge.trail:
+            key = tuple(sorted((edge.lead, edge.trail)))
+            flow_dict[key] = flow_dict.get(key, 0) + edge.count
+
+    # DONE
+    return [Flow(room_a, room_b, count) for (room_a, room_b), count in flow_dict.items()]
+
+
+# pylint: disable=too-many-arguments
+# pylint: disable=too-many-locals
+def optimize_floor_plan(hospital: TPHHospital, rows: int = 0, cols: int = 0,
+                        seconds: float = FLOOR_PLAN_SECONDS, jobs: int = 1,
+                        seed: int = None) -> FloorPlan:
+    """Assign hospital's rooms to a rows by cols grid of plots, minimizing walking distance.
+
+    Args:
+        hospital: TPHHospital object to plan.
+        rows: Optional; Rows of plots.  Defaults to the fewest that fit the rooms in a grid
+            about as wide as it is tall.
+        cols: Optional; Columns of plots.  Defaults to the fewest that fit the rooms in rows.
+        seconds: Optional; Seconds each restart may search.
+        jobs: Optional; Number of restarts, each in its own worker process.
+        seed: Optional; Random number generator seed.  Results are reproducible for a given seed
+            if no restart runs out of time.
+
+    Returns:
+        The best FloorPlan found.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid rows, cols, seconds, or jobs, or too few plots for the rooms.
+        RuntimeError: The hospital's illnesses have not been configured.
+        NotImplementedError: hospital contains a misconfigured illness.
+    """
+    # LOCAL VARIABLES
+    room_list = []   # Rooms to place; padded with '' (empty plots) to one per plot
+    flows = []       # Patients walking between each pair of rooms
+    flow = []        # Flow matrix, indexed by position in room_list
+    dist = []        # Walking distance matrix, indexed by plot number
+    room_index = {}  # Room name: Position in room_list
+    results = []     # (Walking distance, plot of each room) from each restart
+    seeds = []       # Seed of each restart
+
+    # INPUT VALIDATION
+    _validate_optimize_floor_plan(hospital=hospital, rows=rows, cols=cols, seconds=seconds,
+                                  jobs=jobs, seed=seed)
+
+    # SETUP
+    room_list = hospital.get_room_list()
+    flows = get_flows(hospital)
+    if not rows:
+        rows = max(1, math.ceil(len(room_list) / (cols or math.ceil(math.sqrt(len(room_list))))))
+    if not cols:
+        cols = math.ceil(len(room_list) / rows)
+    if rows * cols < len(room_list):
+        raise ValueError(f'A {rows} by {cols} grid can not hold {len(room_list)} rooms')
+    room_list = room_list + [''] * (rows * cols - len(room_list))
+    room_index = {room_name: index for index, room_name in enumerate(room_list) if room_name}
+    flow = [[0] * len(room_list) for _ in room_list]
+    for entry in flows:
+        flow[room_index[entry.room_a]][room_index[entry.room_b]] = entry.count
+        flow[room_index[entry.room_b]][room_index[entry.room_a]] = entry.count
+    dist = [[abs(plot_a // cols - plot_b // cols) + abs(plot_a % cols - plot_b % cols)
+             for plot_b in range(0, rows * cols)] for plot_a in range(0, rows * cols)]
+    seeds = [random.Random(seed).getrandbits(64) + restart for restart in range(0, jobs)]
+
+    # SEARCH
+    if jobs == 1:
+        results = [_tabu_search(flow, dist, seeds[0], seconds, FLOOR_PLAN_MOVES)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, os.cpu_count() or 1)) as executor:
+            results = list(executor.map(_tabu_search, [flow] * jobs, [dist] * jobs, seeds,
+                                        [seconds] * jobs, [FLOOR_PLAN_MOVES] * jobs))
+
+    # DONE
+    walk, perm = min(results)
+    plots = [''] * (rows * cols)
+    for index, plot in enumerate(perm):
+        plots[plot] = room_list[index]
+    return FloorPlan(hospital.get_name(), rows, cols, tuple(plots), walk // 2, flows)
+# pylint: enable=too-many-arguments
+# pylint: enable=too-many-locals
+
+
+def print_floor_plan(plan: FloorPlan) -> None:
+    """Prints plan as an ASCII grid.  See: floor_plan_to_ascii()."""
+    print('\n' + floor_plan_to_ascii(plan))
+
+
+def save_floor_plan(plan: FloorPlan, filename: str) -> str:
+    """Write plan to filename as an SVG document and return filename.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        OSError: filename could not be written.
+    """
+    # INPUT VALIDATION
+    if not isinstance(filename, str):
+        raise TypeError(f'The filename argument must of type str instead of {type(filename)}')
+
+    # SAVE IT
+    if os.path.dirname(filename):
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(filename, 'w', encoding='utf-8') as out_file:
+        out_file.write(floor_plan_to_svg(plan))
+
+    # DONE
+    return filename
+
+
+def _abbreviate(room_names: List[str]) -> dict:
+    """Return a unique abbreviation, no wider than an ASCII plot, for each room name."""
+    # LOCAL VARIABLES
+    abbreviations = {}  # Return value
+    words = []          # Words in a room name
+    candidate = ''      # Abbreviation being considered
+    suffix = 1          # Disambiguates clashing abbreviations
+
+    # ABBREVIATE
+    for room_name in sorted(room_names):
+        words = room_name.replace('.', ' ').replace('-', ' ').replace("'", '').split()
+        if len(words) > 1:
+            candidate = ''.join(word[0] for word in words).upper()[:ASCII_PLOT_WIDTH - 2]
+        else:
+            candidate = room_name[:3].upper()
+        suffix = 1
+        while candidate in abbreviations.values():
+            suffix = suffix + 1
+            candidate = f'{candidate.rstrip("0123456789")[:ASCII_PLOT_WIDTH - 3]}{suffix}'
+        abbreviations[room_name] = candidate
+
+    # DONE
+    return abbreviations
+
+
+def _swap_delta(flow: list, dist: list, perm: list, room_r: int, room_s: int) -> int:
+    """Return the change in walking distance if rooms room_r and room_s swapped plots."""
+    # LOCAL VARIABLES
+    plot_r = perm[room_r]  # Plot of room_r
+    plot_s = perm[room_s]  # Plot of room_s
+    delta = 0              # Return value
+
+    # CALCULATE IT
+    for room_k, plot_k in enumerate(perm):
+        if room_k not in (room_r, room_s):
+            delta += (flow[room_s][room_k] - flow[room_r][room_k]) \
+                * (dist[plot_r][plot_k] - dist[plot_s][plot_k])
+
+    # DONE
+    return 2 * delta
+
+
+# pylint: disable=too-many-locals
+# pylint: disable=too-many-branches
+def _tabu_search(flow: list, dist: list, seed: int, seconds: float,
+                 max_moves: int) -> Tuple[int, List[int]]:
+    """Robust tabu search for the plot of each room.  Runs in a worker process.
+
+    Returns:
+        A tuple of the best walking distance, counted in both directions, and the plot of each
+        room that walks it.
+    """
+    # LOCAL VARIABLES
+    rng = random.Random(seed)                   # Random number generator
+    size = len(flow)                            # Number of rooms, and of plots
+    perm = rng.sample(range(0, size), size)     # Plot of each room
+    # Walking distance, counted in both directions
+    walk = sum(flow[room_a][room_b] * dist[perm[room_a]][perm[room_b]]
+               for room_a in range(0, size) for room_b in range(0, size))
+    delta = [[0] * size for _ in range(0, size)]  # Swap deltas; room_r < room_s
+    tabu = [[0] * size for _ in range(0, size)]   # Room, plot: Move it's tabu through
+    best_walk = walk                            # Shortest walking distance found
+    best_perm = list(perm)                      # Plot of each room for best_walk
+    deadline = time.monotonic() + seconds       # Give up after this
+    tenure = (max(2, int(0.9 * size)), max(3, int(1.1 * size)))  # Tabu tenure range
+    move = None                                 # Rooms swapped this move
+    move_delta = 0                              # Change in walk this move
+
+    # SETUP
+    for room_r in range(0, size - 1):
+        for room_s in range(room_r + 1, size):
+            delta[room_r][room_s] = _swap_delta(flow, dist, perm, room_r, room_s)
+
+    # SEARCH
+    for move_num in range(1, max_moves + 1):
+        if not move_num % 32 and time.monotonic() > deadline:
+            break
+        # Choose the best swap that isn't tabu, unless it beats the best plan
+        move = None
+        move_delta = math.inf
+        for room_r in range(0, size - 1):
+            for room_s in range(room_r + 1, size):
+                if delta[room_r][room_s] < move_delta \
+                        and (walk + delta[room_r][room_s] < best_walk
+                             or tabu[room_r][perm[room_s]] < move_num
+                             or tabu[room_s][perm[room_r]] < move_num):
+                    move = (room_r, room_s)
+                    move_delta = delta[room_r][room_s]
+        if move is None:
+            continue  # Everything is tabu; wait for a tenure to expire
+        # Swap, and forbid moving either room back for a while
+        room_u, room_v = move
+        perm[room_u], perm[room_v] = perm[room_v], perm[room_u]
+        walk = walk + move_delta
+        tabu[room_u][perm[room_v]] = move_num + rng.randint(*tenure)
+        tabu[room_v][perm[room_u]] = move_num + rng.randint(*tenure)
+        if walk < best_walk:
+            best_walk = walk
+            best_perm = list(perm)
+        # Update the deltas: O(1) for swaps disjoint from this one, O(size) for the rest
+        for room_r in range(0, size - 1):
+            for room_s in range(room_r + 1, size):
+                if room_r in move or room_s in move:
+                    delta[room_r][room_s] = _swap_delta(flow, dist, perm, room_r, room_s)
+                else:
+                    delta[room_r][room_s] += 2 * (
+                        flow[room_r][room_u] - flow[room_r][room_v]
+                        + flow[room_s][room_v] - flow[room_s][room_u]) * (
+                            dist[perm[room_s]][perm[room_u]] - dist[perm[room_s]][perm[room_v]]
+                            + dist[perm[room_r]][perm[room_v]] - dist[perm[room_r]][perm[room_u]])
+
+    # DONE
+    return tuple((best_walk, best_perm))
+# pylint: enable=too-many-locals
+# pylint: enable=too-many-branches
+
+
+# pylint: disable=too-many-arguments
+def _validate_optimize_floor_plan(hospital: TPHHospital, rows: int, cols: int, seconds: float,
+                                  jobs: int, seed: int) -> None:
+    """Validate input on behalf of optimize_floor_plan()."""
+    # hospital
+    if not isinstance(hospital, TPHHospital):
+        raise TypeError(f'The hospital can not be of type {type(hospital)}')
+    # rows, cols, and jobs
+    for name, value in (('rows', rows), ('cols', cols), ('jobs', jobs)):
+        if not isinstance(value, int):
+            raise TypeError(f'The {name} argument must of type int instead of {type(value)}')
+        if value < 0 or (name == 'jobs' and value < 1):
+            raise ValueError(f'The {name} value ({value}) must be greater than zero')
+    # seconds
+    if not isinstance(seconds, (int, float)):
+        raise TypeError(f'The seconds argument can not be of type {type(seconds)}')
+    if not math.isfinite(seconds) or seconds <= 0:
+        raise ValueError(f'The seconds value ({seconds}) must be greater than zero')
+    # seed
+    if seed is not None and not isinstance(seed, int):
+        raise TypeError(f'The seed argument must of type int instead of {type(seed)}')
+# pylint: enable=too-many-arguments
@@ -0,0 +1,394 @@
+"""Lays out directed graphs in pure Python.
+
+Defines a Sugiyama-style layered layout: cycles are broken by reversing depth-first back edges,
+nodes are assigned to layers by longest path, long edges are split by dummy nodes, crossings are
+reduced with alternating barycenter sweeps, and x coordinates are assigned by isotonic regression
+toward each node's neighbours.  The result is consumed by the svg_digraph module.
+
+    Typical usage example:
+
+    from tps.layout import layered_layout
+    layout = layered_layout(["GP's Office", 'Ward'], [("GP's Office", 'Ward')])
+    for node in layout.nodes:
+        print(f'{node.name}: ({node.x}, {node.y})')
+"""
+
+# Standard
+from bisect import bisect_right, insort
+from collections import namedtuple
+from typing import Dict, List, Sequence, Set, Tuple
+
+# Third Party
+
+# Local
+
+
+# MACROS
+# Geometry, in SVG user units (pixels)
+MARGIN = 20.0          # Space around the drawing
+NODE_HEIGHT = 36.0     # Height of every node
+NODE_SPACING = 24.0    # Minimum horizontal gap between neighbouring nodes in a layer
+LAYER_SPACING = 90.0   # Vertical distance between layer centers
+CHAR_WIDTH = 7.0       # Approximate width of one label character
+NODE_PADDING = 24.0    # Horizontal space around a node label
+MIN_NODE_WIDTH = 54.0  # Narrowest node
+# Effort
+CROSSING_SWEEPS = 12    # Maximum number of down/up barycenter sweep pairs
+COORDINATE_PASSES = 8   # Number of coordinate assignment passes
+
+# One positioned node: center coordinates and size
+NodeBox = namedtuple('NodeBox', 'name x y width height')
+# One routed edge: index into the input edge list, tail and head names, the points the edge
+# passes through (tail center first, head center last; empty for self loops), and its offset
+# among the edges joining the same pair of nodes (0.0 for a lone edge).  Offsets are signed so
+# that offsetting perpendicular to each edge's own direction never overlaps an opposite edge.
+EdgeRoute = namedtuple('EdgeRoute', 'index tail head points offset')
+# A complete layout
+Layout = namedtuple('Layout', 'nodes routes width height')
+
+
+# pylint: disable=too-many-locals
+def layered_layout(nodes: Sequence[str], edges: Sequence[Tuple[str, str]]) -> Layout:
+    """Lay out a directed multigraph in layers, top to bottom.
+
+    Args:
+        nodes: Node names, in their preferred left-to-right order.  Nodes that only appear in
+            edges are added after these.
+        edges: (Tail name, head name) pairs.  Parallel edges and self loops are allowed.
+
+    Returns:
+        Layout whose routes are in the same order as edges.
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # LOCAL VARIABLES
+    node_list = []          # Every node name
+    node_ids = {}           # Node name: Vertex ID
+    dag_edges = []          # Distinct, acyclic (tail ID, head ID) edges
+    reversed_edges = set()  # Input (tail ID, head ID) edges reversed to break cycles
+    layer_of = []           # Vertex ID: Layer index
+    layers = []             # Layer index: Vertex IDs in left-to-right order
+    chains = {}             # DAG edge: Vertex IDs from tail to head, including dummies
+    widths = []             # Vertex ID: Width (dummies are 0.0)
+    x_of = []               # Vertex ID: Center x coordinate
+
+    # INPUT VALIDATION
+    if isinstance(nodes, str) or not isinstance(nodes, (list, tuple)):
+        raise TypeError(f'The nodes argument must of type list instead of {type(nodes)}')
+    if not isinstance(edges, (list, tuple)):
+        raise TypeError(f'The edges argument must of type list instead of {type(edges)}')
+    for edge in edges:
+        if not isinstance(edge, tuple) or len(edge) != 2:
+            raise TypeError(f'Each edge must be a (tail, head) tuple instead of {edge}')
+
+    # LAYER ASSIGNMENT
+    node_list = list(dict.fromkeys(list(nodes) + [name for edge in edges for name in edge]))
+    node_ids = {name: node_id for node_id, name in enumerate(node_list)}
+    dag_edges = list(dict.fromkeys((node_ids[tail], node_ids[head]) for tail, head in edges
+                                   if tail != head))
+    reversed_edges = _find_back_edges(len(node_list), dag_edges)
+    dag_edges = list(dict.fromkeys((head, tail) if (tail, head) in reversed_edges
+                                   else (tail, head) for tail, head in dag_edges))
+    layer_of = _assign_layers(len(node_list), dag_edges)
+
+    # DUMMY NODES
+    widths = [max(MIN_NODE_WIDTH, len(name) * CHAR_WIDTH + NODE_PADDING) for name in node_list]
+    layers = [[] for _ in range(0, max(layer_of, default=-1) + 1)]
+    for node_id in range(0, len(node_list)):
+        layers[layer_of[node_id]].append(node_id)
+    for tail, head in dag_edges:
+        chains[(tail, head)] = [tail]
+        for layer in range(layer_of[tail] + 1, layer_of[head]):
+            layer_of.append(layer)
+            widths.append(0.0)
+            layers[layer].append(len(layer_of) - 1)
+            chains[(tail, head)].append(len(layer_of) - 1)
+        chains[(tail, head)].append(head)
+
+    # CROSSING REDUCTION
+    layers = _reduce_crossings(layers, _chain_segments(chains))
+
+    # COORDINATE ASSIGNMENT
+    x_of = _assign_coordinates(layers, _chain_segments(chains), widths)
+
+    # DONE
+    return _build_layout(node_list, node_ids, edges, layer_of, widths, x_of, chains,
+                         reversed_edges)
+# pylint: enable=too-many-locals
+
+
+# pylint: disable=too-many-locals
+def _assign_coordinates(layers: List[List[int]], segments: List[Tuple[int, int]],
+                        widths: List[float]) -> List[float]:
+    """Assign every vertex an x coordinate, keeping layer order and minimum separation."""
+    # LOCAL VARIABLES
+    x_of = [0.0] * len(widths)        # Return value
+    up_nbrs = [[] for _ in widths]    # Vertex ID: Vertices in the layer above
+    down_nbrs = [[] for _ in widths]  # Vertex ID: Vertices in the layer below
+    seps = []                         # Minimum center distances within one layer
+    desired = []                      # Preferred x coordinates within one layer
+    left = 0.0                        # Left edge of the drawing
+
+    # NEIGHBOURS
+    for tail, head in segments:
+        down_nbrs[tail].append(head)
+        up_nbrs[head].append(tail)
+
+    # PACK
+    for layer in layers:
+        for index, vertex in enumerate(layer):
+            x_of[vertex] = (widths[vertex] / 2 if index == 0 else
+                            x_of[layer[index - 1]]
+                            + _separation(widths[layer[index - 1]], widths[vertex]))
+
+    # BALANCE
+    for pass_num in range(0, COORDINATE_PASSES + 1):
+        for layer in (layers if pass_num % 2 == 0 else reversed(layers)):
+            desired = []
+            for vertex in layer:
+                nbrs = up_nbrs[vertex] if pass_num % 2 == 0 else down_nbrs[vertex]
+                if pass_num == COORDINATE_PASSES:
+                    nbrs = up_nbrs[vertex] + down_nbrs[vertex]  # Final pass balances both
+                desired.append(sum(x_of[nbr] for nbr in nbrs) / len(nbrs) if nbrs
+                               else x_of[vertex])
+            seps = [_separation(widths[layer[index]], widths[layer[index + 1]])
+                    for index in range(0, len(layer) - 1)]
+            for vertex, x_coord in zip(layer, _place_layer(desired, seps)):
+                x_of[vertex] = x_coord
+
+    # NORMALIZE
+    left = min((x_of[vertex] - widths[vertex] / 2 for vertex in range(0, len(widths))),
+               default=0.0)
+    x_of = [x_coord - left + MARGIN for x_coord in x_of]
+
+    # DONE
+    return x_of
+# pylint: enable=too-many-locals
+
+
+def _assign_layers(num_nodes: int, dag_edges: List[Tuple[int, int]]) -> List[int]:
+    """Assign every node a layer by longest path, then pull sources down next to their heads."""
+    # LOCAL VARIABLES
+    layer_of = [0] * num_nodes                 # Return value
+    in_degree = [0] * num_nodes                # Node ID: Unprocessed incoming edges
+    succs = [[] for _ in range(0, num_nodes)]  # Node ID: Head node IDs
+    order = []                                 # Topological order
+
+    # TOPOLOGICAL ORDER
+    for tail, head in dag_edges:
+        succs[tail].append(head)
+        in_degree[head] = in_degree[head] + 1
+    order = [node_id for node_id in range(0, num_nodes) if not in_degree[node_id]]
+    for node_id in order:  # order grows as nodes become sources
+        for head in succs[node_id]:
+            layer_of[head] = max(layer_of[head], layer_of[node_id] + 1)
+            in_degree[head] = in_degree[head] - 1
+            if not in_degree[head]:
+                order.append(head)
+
+    # TIGHTEN SOURCES
+    for tail, head in dag_edges:
+        in_degree[head] = in_degree[head] + 1
+    for node_id in range(0, num_nodes):
+        if not in_degree[node_id] and succs[node_id]:
+            layer_of[node_id] = min(layer_of[head] for head in succs[node_id]) - 1
+
+    # DONE
+    return layer_of
+
+
+# pylint: disable=too-many-arguments
+# pylint: disable=too-many-locals
+def _build_layout(node_list: List[str], node_ids: Dict[str, int],
+                  edges: Sequence[Tuple[str, str]], layer_of: List[int], widths: List[float],
+                  x_of: List[float], chains: Dict[Tuple[int, int], List[int]],
+                  reversed_edges: Set[Tuple[int, int]]) -> Layout:
+    """Translate vertex coordinates into a Layout on behalf of layered_layout()."""
+    # LOCAL VARIABLES
+    y_of = [MARGIN + NODE_HEIGHT / 2 + layer * LAYER_SPACING for layer in layer_of]  # Centers
+    pair_counts = {}  # Unordered node ID pair: Number of edges joining them
+    pair_seen = {}    # Unordered node ID pair: Number of those edges routed so far
+    routes = []       # Layout routes
+    chain = []        # Vertex IDs of one route
+
+    # COUNT PARALLEL EDGES
+    for tail, head in edges:
+        pair = frozenset((node_ids[tail], node_ids[head]))
+        pair_counts[pair] = pair_counts.get(pair, 0) + 1
+
+    # ROUTE
+    for index, (tail, head) in enumerate(edges):
+        pair = frozenset((node_ids[tail], node_ids[head]))
+        pair_seen[pair] = pair_seen.get(pair, 0) + 1
+        if tail == head:
+            chain = []
+        elif (node_ids[tail], node_ids[head]) in reversed_edges:
+            chain = list(reversed(chains[(node_ids[head], node_ids[tail])]))
+        elif (node_ids[tail], node_ids[head]) in chains:
+            chain = chains[(node_ids[tail], node_ids[head])]
+        else:
+            # The opposite edge was reversed onto this one
+            chain = list(reversed(chains[(node_ids[head], node_ids[tail])]))
+        routes.append(EdgeRoute(index, tail, head,
+                                [tuple((x_of[vertex], y_of[vertex])) for vertex in chain],
+                                (pair_seen[pair] - 1 - (pair_counts[pair] - 1) / 2)
+                                * (-1 if node_ids[tail] > node_ids[head] else 1)))
+
+    # DONE
+    return Layout([NodeBox(name, x_of[node_id], y_of[node_id], widths[node_id], NODE_HEIGHT)
+                   for node_id, name in enumerate(node_list)], routes,
+                  max((x_of[vertex] + widths[vertex] / 2 for vertex in range(0, len(x_of))),
+                      default=0.0) + MARGIN,
+                  max(y_of, default=0.0) + NODE_HEIGHT / 2 + MARGIN)
+# pylint: enable=too-many-arguments
+# pylint: enable=too-many-locals
+
+
+def _chain_segments(chains: Dict[Tuple[int, int], List[int]]) -> List[Tuple[int, int]]:
+    """Return the layer-to-adjacent-layer segments of every chain."""
+    return [tuple((chain[index], chain[index + 1])) for chain in chains.values()
+            for index in range(0, len(chain) - 1)]
+
+
+def _count_crossings(layers: List[List[int]], segments: List[Tuple[int, int]],
+                     layer_of: Dict[int, int]) -> int:
+    """Count the segment crossings between every pair of adjacent layers."""
+    # LOCAL VARIABLES
+    position = {vertex: index for layer in layers for index, vertex in enumerate(layer)}
+    by_layer = [[] for _ in layers]  # Upper layer index: (Upper position, lower position)
+    crossings = 0                    # Return value
+    seen = []                        # Sorted lower positions already visited
+
+    # COUNT
+    for tail, head in segments:
+        by_layer[layer_of[tail]].append(tuple((position[tail], position[head])))
+    for layer_segments in by_layer:
+        seen = []
+        for _, lower in sorted(layer_segments):
+            crossings = crossings + len(seen) - bisect_right(seen, lower)
+            insort(seen, lower)
+
+    # DONE
+    return crossings
+
+
+def _find_back_edges(num_nodes: int, edges: List[Tuple[int, int]]) -> Set[Tuple[int, int]]:
+    """Return the edges a depth-first search finds pointing back up the search stack."""
+    # LOCAL VARIABLES
+    succs = [[] for _ in range(0, num_nodes)]  # Node ID: Head node IDs
+    state = [0] * num_nodes                    # 0 unvisited, 1 on the stack, 2 finished
+    back_edges = set()                         # Return value
+    stack = []                                 # (Node ID, next successor index)
+
+    # SEARCH
+    for tail, head in edges:
+        succs[tail].append(head)
+    for root in range(0, num_nodes):
+        if state[root]:
+            continue
+        state[root] = 1
+        stack = [[root, 0]]
+        while stack:
+            node_id, next_index = stack[-1]
+            if next_index == len(succs[node_id]):
+                state[node_id] = 2
+                stack.pop()
+                continue
+            stack[-1][1] = next_index + 1
+            head = succs[node_id][next_index]
+            if state[head] == 1:
+                back_edges.add(tuple((node_id, head)))
+            elif not state[head]:
+                state[head] = 1
+                stack.append([head, 0])
+
+    # DONE
+    return back_edges
+
+
+def _place_layer(desired: List[float], seps: List[float]) -> List[float]:
+    """Return the coordinates closest to desired (least squares) that keep each neighbour at
+    least seps apart, in order.
+
+    Shifting each coordinate by the cumulative separation turns this into isotonic regression,
+    which the pool adjacent violators algorithm solves exactly.
+    """
+    # LOCAL VARIABLES
+    offsets = [0.0]  # Cumulative separation of each position
+    blocks = []      # [Mean shifted target, number of positions]
+    shifted = []     # Return value, before shifting back
+
+    # SHIFT
+    for sep in seps:
+        offsets.append(offsets[-1] + sep)
+
+    # POOL ADJACENT VIOLATORS
+    for target, offset in zip(desired, offsets):
+        blocks.append([target - offset, 1])
+        while len(blocks) > 1 and blocks[-2][0] > blocks[-1][0]:
+            mean, count = blocks.pop()
+            blocks[-1] = [(blocks[-1][0] * blocks[-1][1] + mean * count)
+                          / (blocks[-1][1] + count), blocks[-1][1] + count]
+    for mean, count in blocks:
+        shifted.extend([mean] * count)
+
+    # DONE
+    return [value + offset for value, offset in zip(shifted, offsets)]
+
+
+def _reduce_crossings(layers: List[List[int]],
+                      segments: List[Tuple[int, int]]) -> List[List[int]]:
+    """Reorder each layer with alternating barycenter sweeps and return the best ordering."""
+    # LOCAL VARIABLES
+    layer_of = {vertex: index for index, layer in enumerate(layers) for vertex in layer}
+    up_nbrs = {vertex: [] for vertex in layer_of}    # Vertex ID: Vertices in the layer above
+    down_nbrs = {vertex: [] for vertex in layer_of}  # Vertex ID: Vertices in the layer below
+    best = [list(layer) for layer in layers]         # Return value
+    best_crossings = _count_crossings(layers, segments, layer_of)  # Crossings of best
+    crossings = 0                                    # Crossings of the current ordering
+
+    # NEIGHBOURS
+    for tail, head in segments:
+        down_nbrs[tail].append(head)
+        up_nbrs[head].append(tail)
+
+    # SWEEP
+    layers = [list(layer) for layer in layers]
+    for _ in range(0, CROSSING_SWEEPS):
+        if not best_crossings:
+            break
+        for index in range(1, len(layers)):
+            _sort_by_barycenter(layers[index], layers[index - 1], up_nbrs)
+        for index in range(len(layers) - 2, -1, -1):
+            _sort_by_barycenter(layers[index], layers[index + 1], down_nbrs)
+        crossings = _count_crossings(layers, segments, layer_of)
+        if crossings >= best_crossings:
+            break  # Converged
+        best = [list(layer) for layer in layers]
+        best_crossings = crossings
+
+    # DONE
+    return best
+
+
+def _separation(left_width: float, right_width: float) -> float:
+    """Return the minimum distance between the centers of two neighbouring vertices."""
+    return (left_width + right_width) / 2 + NODE_SPACING
+
+
+def _sort_by_barycenter(layer: List[int], fixed_layer: List[int],
+                        nbrs: Dict[int, List[int]]) -> None:
+    """Sort layer, in place, by the mean position of each vertex's neighbours in fixed_layer.
+
+    Vertices without neighbours keep their current position as their sort key.
+    """
+    # LOCAL VARIABLES
+    position = {vertex: index for index, vertex in enumerate(fixed_layer)}  # Fixed positions
+    keys = {}  # Vertex ID: Sort key
+
+    # SORT
+    for index, vertex in enumerate(layer):
+        keys[vertex] = (sum(position[nbr] for nbr in nbrs[vertex]) / len(nbrs[vertex])
+                        if nbrs[vertex] else index * len(fixed_layer) / max(len(layer), 1))
+    layer.sort(key=lambda vertex: keys[vertex])
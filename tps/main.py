@@ -2,6 +2,10 @@
 
 Defines main() which will construct and print a graphy for one Two Point Hospital hospital.
 
+Graph functionality (e.g., dgraph, graphviz, the render queue) and batch rendering are imported
+the first time they're needed so that --help and table-only actions start quickly.
+(see: startup_bench module)
+
     Typical usage example:
 
     from tps.tph_main import main
@@ -9,15 +13,23 @@ Defines main() which will construct and print a graphy for one Two Point Hospita
 """
 
 # Standard
+from typing import TYPE_CHECKING
+import os
 
 # Third Party
 
 # Local
-from tps.arguments import parse_arguments, graph_directory, separate_rooms
-from tps.dgraph import create_graph, edge_menu, illness_menu, room_menu
-from tps.menu import _check_for_error, danger_menu, get_choice, Menu
+from tps.arguments import (command_name, command_targets, graph_directory, GRAPH_COMMANDS,
+                           parse_arguments, render_options, separate_rooms, serve_options,
+                           table_options, TABLE_COMMANDS, weighted_edges)
+from tps.commands import print_danger_tables, print_edge_tables, render_targets
+from tps.menu import (_check_for_error, coverage_menu, danger_menu, edge_menu, get_choice, Menu,
+                      room_count_menu, simulation_menu)
+from tps.misc import print_stats_table
 from tps.tph_constants import TPH_HOSPITAL_LIST
 from tps.tph_hospital import TPHHospital
+if TYPE_CHECKING:
+    from tps.render_queue import RenderQueue  # Imported when the first graph is requested
 
 
 # MACROS
@@ -25,7 +37,9 @@ from tps.tph_hospital import TPHHospital
 MAIN_MENU = Menu('TWO POINT SCIENCE', {1: 'Choose a hospital', 2: 'Graph hospital',
                                        3: 'Graph illness', 4: 'Graph room',
                                        5: 'Print room connections', 6: 'Print illness danger',
-                                       999: 'EXIT'})
+                                       7: 'Print render stats', 8: 'Simulate patient flow',
+                                       9: 'Suggest rooms and staff', 10: 'Plan floor layout',
+                                       11: 'Check room coverage', 999: 'EXIT'})
 
 HOSPITAL_MENU = Menu('TWO POINT HOSPITAL LIST', {i+1: TPH_HOSPITAL_LIST[i] for i in
                                                  range(0, len(TPH_HOSPITAL_LIST))})
@@ -33,12 +47,14 @@ HOSPITAL_MENU = Menu('TWO POINT HOSPITAL LIST', {i+1: TPH_HOSPITAL_LIST[i] for i
 
 # pylint: disable=too-many-branches
 # pylint: disable=too-many-statements
-def main_menu(sep_rooms: bool, graph_dir: str) -> None:
+def main_menu(sep_rooms: bool, graph_dir: str, weighted: bool = False) -> None:
     """Execute the Two Point Science top-level menu.
 
     Args:
         sep_rooms: If true, multi-purpose rooms are separated into ' (diag)' and ' (treat)'
             versions for user output.
+        graph_dir: Directory to store the graph files in.
+        weighted: Optional; If true, parallel edges are collapsed into weighted edges on graphs.
 
     Raises:
         TypeError: Bad data type passed in.
@@ -48,7 +64,8 @@ def main_menu(sep_rooms: bool, graph_dir: str) -> None:
     hospital_obj = None  # TPH Hospital object for the user-chosen hospital
     max_chances = 3      # Maximum number of invalid inputs tolerated
     clear_screen = True  # Clear the screen before printing a menu
-    graph_obj = None     # GraphViz object for hospital's directed graph
+    no_error = True      # False if the user's selection was invalid
+    render_queue = None  # Renders graphs in the background, through a RenderCache
     curr_err = ''        # Temp variable which controls error handling
     # Template error message for invalid selections
     err_template = '\n*** ERROR: {}***\n'
@@ -60,10 +77,17 @@ def main_menu(sep_rooms: bool, graph_dir: str) -> None:
     # graph_dir
     if not isinstance(graph_dir, str):
         raise TypeError(f'The graph_dir argument must of type str instead of {type(graph_dir)}')
+    # weighted
+    if not isinstance(weighted, bool):
+        raise TypeError(f'The weighted argument must of type bool instead of {type(weighted)}')
 
     # DO IT
     while True:
-        user_input = get_choice(MAIN_MENU, clear_screen=clear_screen, choice_type=int,
+        # Show the background renders, if any, under the menu name
+        user_input = get_choice(Menu('\n'.join([MAIN_MENU.name, render_queue.get_status()]
+                                               + render_queue.get_notices())
+                                     if render_queue else MAIN_MENU.name, MAIN_MENU.dictionary),
+                                clear_screen=clear_screen, choice_type=int,
                                 max_chances=max_chances, return_choice=True)
         clear_screen = True  # Reset temp variable
         curr_err = ''  # Reset temp variable
@@ -73,26 +97,14 @@ def main_menu(sep_rooms: bool, graph_dir: str) -> None:
             # Hospital chosen by the user
             user_input = get_choice(HOSPITAL_MENU, choice_type=int, clear_screen=clear_screen)
             hospital_obj = TPHHospital(user_input)
-            graph_obj = None  # Time to make a new a graphy object
         # 2. Graph Hospital
-        elif user_input == 2:
-            if hospital_obj:
-                graph_obj = create_graph(hospital=hospital_obj, graph_dir=graph_dir,
-                                         sep_rooms=sep_rooms)
-                print(f'Creating a directed graph of {hospital_obj.get_name()}...')
-                graph_obj.view()
-            else:
-                curr_err = err_template.format('CHOOSE A HOSPITAL')
         # 3. Graph Illness
-        elif user_input == 3:
-            if hospital_obj:
-                illness_menu(hospital=hospital_obj, graph_dir=graph_dir, sep_rooms=sep_rooms)
-            else:
-                curr_err = err_template.format('CHOOSE A HOSPITAL')
         # 4. Graph Room
-        elif user_input == 4:
+        elif user_input in (2, 3, 4):
             if hospital_obj:
-                room_menu(hospital=hospital_obj, graph_dir=graph_dir, sep_rooms=sep_rooms)
+                render_queue = render_queue or _start_render_queue(graph_dir)
+                _graph_menu(user_input=user_input, hospital=hospital_obj, graph_dir=graph_dir,
+                            sep_rooms=sep_rooms, weighted=weighted, render_queue=render_queue)
             else:
                 curr_err = err_template.format('CHOOSE A HOSPITAL')
         # 5. Count Edges
@@ -100,9 +112,7 @@ def main_menu(sep_rooms: bool, graph_dir: str) -> None:
             if not hospital_obj:
                 curr_err = err_template.format('CHOOSE A HOSPITAL')
             else:
-                graph_obj = create_graph(hospital=hospital_obj, graph_dir=graph_dir,
-                                         sep_rooms=sep_rooms)
-                edge_menu(graph_obj, sep_rooms=sep_rooms)
+                edge_menu(hospital_obj, sep_rooms=sep_rooms)
                 clear_screen = False  # User needs to see it
         # 6. Calculate Danger
         elif user_input == 6:
@@ -111,18 +121,54 @@ def main_menu(sep_rooms: bool, graph_dir: str) -> None:
             else:
                 danger_menu(hospital=hospital_obj)
                 clear_screen = False  # User needs to see it
+        # 7. Render Stats
+        elif user_input == 7:
+            if render_queue:
+                print_stats_table(render_queue.get_counts(), title='RENDER QUEUE')
+                print_stats_table(render_queue.get_render_cache().get_stats(),
+                                  title='RENDER CACHE')
+            else:
+                print('\nNo graphs have been requested')
+            clear_screen = False  # User needs to see it
+        # 8. Simulate Patient Flow
+        elif user_input == 8:
+            if not hospital_obj:
+                curr_err = err_template.format('CHOOSE A HOSPITAL')
+            else:
+                simulation_menu(hospital=hospital_obj)
+        # 9. Suggest Rooms And Staff
+        elif user_input == 9:
+            if not hospital_obj:
+                curr_err = err_template.format('CHOOSE A HOSPITAL')
+            else:
+                room_count_menu(hospital=hospital_obj)
+        # 10. Plan Floor Layout
+        elif user_input == 10:
+            if not hospital_obj:
+                curr_err = err_template.format('CHOOSE A HOSPITAL')
+            else:
+                _plan_floor(hospital=hospital_obj, graph_dir=graph_dir)
+                clear_screen = False  # User needs to see it
+        # 11. Check Room Coverage
+        elif user_input == 11:
+            if not hospital_obj:
+                curr_err = err_template.format('CHOOSE A HOSPITAL')
+            else:
+                coverage_menu(hospital=hospital_obj, graph_dir=graph_dir)
         # 999. Exit
         elif user_input == 999:
+            _finish_renders(render_queue)
             return
         else:
             curr_err = err_template.format('INVALID SELECTION')
 
         # Is there an error?
         try:
-            max_chances, clear_screen = _check_for_error(curr_err=curr_err,
-                                                         max_chances=max_chances)
+            max_chances, no_error = _check_for_error(curr_err=curr_err, max_chances=max_chances)
+            clear_screen = clear_screen and no_error  # Don't clear away output the user needs
         except RuntimeWarning as err:
             print(err_template.format(err.args[0]))
+            _finish_renders(render_queue)
             return
 # pylint: enable=too-many-branches
 # pylint: enable=too-many-statements
@@ -136,9 +182,182 @@ def main() -> None:
     sep_rooms = separate_rooms(tps_args)
     # Directory to store the graph files in
     graph_dir = graph_directory(tps_args)
+    # Collapse parallel edges?
+    weighted = weighted_edges(tps_args)
+    results = []  # render-all and graph subcommand results
+    failures = 0  # Number of table subcommand hospitals that failed
 
+    # RENDER ALL
+    if command_name(tps_args) == 'render-all':
+        # pylint: disable=import-outside-toplevel
+        from tps.batch import print_render_summary, render_all
+        results = render_all(graph_dir=graph_dir, sep_rooms=sep_rooms, weighted=weighted,
+                             **render_options(tps_args))
+        print_render_summary(results)
+        if any(result.error for result in results):
+            raise RuntimeError(f'{len([result for result in results if result.error])} of '
+                               f'{len(results)} graphs failed to render')
+    # GRAPH SUBCOMMANDS
+    elif command_name(tps_args) in GRAPH_COMMANDS:
+        # pylint: disable=import-outside-toplevel
+        from tps.batch import print_render_summary
+        results = render_targets(command_name(tps_args), graph_dir=graph_dir, sep_rooms=sep_rooms,
+                                 weighted=weighted, **command_targets(tps_args),
+                                 **render_options(tps_args))
+        for result in results:
+            if not result.error:
+                print(result.path)
+        if any(result.error for result in results):
+            print_render_summary(results, title=command_name(tps_args).upper())
+            raise RuntimeError(f'{len([result for result in results if result.error])} of '
+                               f'{len(results)} graphs failed to render')
+    # TABLE EXPORTS
+    elif command_name(tps_args) in TABLE_COMMANDS and table_options(tps_args)['output']:
+        _export_table(command_name(tps_args), command_targets(tps_args)['hospital_names'],
+                      sep_rooms=sep_rooms, output=table_options(tps_args)['output'],
+                      strategy=table_options(tps_args)['strategy'])
+    # TABLE SUBCOMMANDS
+    elif command_name(tps_args) == 'edges':
+        failures = print_edge_tables(command_targets(tps_args)['hospital_names'] or None,
+                                     sep_rooms=sep_rooms,
+                                     sort_by_count=table_options(tps_args)['sort_by_count'],
+                                     sort_desc=table_options(tps_args)['sort_desc'])
+    elif command_name(tps_args) == 'danger':
+        failures = print_danger_tables(command_targets(tps_args)['hospital_names'] or None,
+                                       sort_by_col=table_options(tps_args)['sort_by_col'],
+                                       strategy=table_options(tps_args)['strategy'],
+                                       sort_desc=table_options(tps_args)['sort_desc'])
+    # SERVE
+    elif command_name(tps_args) == 'serve':
+        _serve(graph_dir=graph_dir, **serve_options(tps_args))
     # MAIN MENU
-    main_menu(sep_rooms=sep_rooms, graph_dir=graph_dir)
+    else:
+        main_menu(sep_rooms=sep_rooms, graph_dir=graph_dir, weighted=weighted)
+
+    # DONE
+    if failures:
+        raise RuntimeError(f'{failures} table(s) failed to print')
+
+
+def _export_table(command: str, hospital_names: list, sep_rooms: bool, output: str,
+                  strategy: int) -> None:
+    """Export a table subcommand's tables to output instead of printing them.
+
+    The exporters (and pyarrow, if it's needed) are imported here, the first time they're needed.
+    Exports are ordered by hospital and name, so the sort options don't apply.
+    """
+    # pylint: disable=import-outside-toplevel
+    from tps.exporters import EXPORT_STDOUT, export_danger_table, export_edge_table
+
+    # LOCAL VARIABLES
+    row_count = 0  # Rows exported
+
+    # EXPORT IT
+    if command == 'edges':
+        row_count = export_edge_table(output, hospital_list=hospital_names or None,
+                                      sep_rooms=sep_rooms)
+    else:
+        row_count = export_danger_table(output, hospital_list=hospital_names or None,
+                                        strategy=strategy)
+    if output != EXPORT_STDOUT:
+        print(f'Exported {row_count} row(s) to {output}')
+
+
+def _finish_renders(render_queue: 'RenderQueue') -> None:
+    """Wait for render_queue's background renders, if any, to finish and print how they went."""
+    # LOCAL VARIABLES
+    counts = {}  # Current render counts
+
+    # WAIT
+    if not render_queue:
+        return
+    counts = render_queue.get_counts()
+    if counts['pending'] or counts['running']:
+        print(f'Waiting on background renders... ({render_queue.get_status()})')
+    render_queue.shutdown(wait=True)
+    for notice in render_queue.get_notices():
+        print(notice)
+
+
+# pylint: disable=too-many-arguments
+def _graph_menu(user_input: int, hospital: TPHHospital, graph_dir: str, sep_rooms: bool,
+                weighted: bool, render_queue: 'RenderQueue') -> None:
+    """Create and view the graph chosen from the main menu.  Does not validate input.
+
+    Graph functionality (and graphviz) is imported here, the first time a graph is requested.
+    """
+    # pylint: disable=import-outside-toplevel
+    from tps.dgraph import create_graph, illness_menu, room_menu, view_graph
+
+    # 2. Graph Hospital
+    if user_input == 2:
+        graph_obj = create_graph(hospital=hospital, graph_dir=graph_dir, sep_rooms=sep_rooms,
+                                 weighted=weighted)
+        print(f'Creating a directed graph of {hospital.get_name()}...')
+        view_graph(graph_obj, render_queue=render_queue)
+    # 3. Graph Illness
+    elif user_input == 3:
+        illness_menu(hospital=hospital, graph_dir=graph_dir, sep_rooms=sep_rooms,
+                     weighted=weighted, render_queue=render_queue)
+    # 4. Graph Room
+    elif user_input == 4:
+        room_menu(hospital=hospital, graph_dir=graph_dir, sep_rooms=sep_rooms, weighted=weighted,
+                  render_queue=render_queue)
+# pylint: enable=too-many-arguments
+
+
+def _plan_floor(hospital: TPHHospital, graph_dir: str) -> None:
+    """Optimize, print, and save hospital's floor plan as an SVG in graph_dir.
+
+    The floor plan optimizer (and its process pool) is imported here, the first time it's needed.
+    """
+    # pylint: disable=import-outside-toplevel
+    from tps.floor_plan import (FLOOR_PLAN_SECONDS, optimize_floor_plan, print_floor_plan,
+                                save_floor_plan)
+
+    # LOCAL VARIABLES
+    jobs = os.cpu_count() or 1  # One restart per core
+    plan = None                 # Optimized floor plan
+
+    # PLAN IT
+    print(f'Planning {hospital.get_name()} for {FLOOR_PLAN_SECONDS} seconds on {jobs} core(s)...')
+    plan = optimize_floor_plan(hospital, jobs=jobs)
+    print_floor_plan(plan)
+    print('\nSaved ' + save_floor_plan(plan, os.path.join(graph_dir, hospital.get_name()
+                                                          + ' - Floor Plan.svg')))
+
+
+def _serve(graph_dir: str, port: int, timeout: float, cache_renders: bool) -> None:
+    """Answer HTTP queries on localhost until interrupted.
+
+    The server (and graphviz) is imported here, the first time it's needed.
+    """
+    # pylint: disable=import-outside-toplevel
+    from tps.server import TPSServer
+
+    # LOCAL VARIABLES
+    server = TPSServer(graph_dir, port=port, timeout=timeout,
+                       cache_renders=cache_renders)  # Bound, not yet serving
+
+    # SERVE IT
+    print(f'Serving on http://{server.server_address[0]}:{server.server_address[1]}/ '
+          '(Ctrl+C to stop)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def _start_render_queue(graph_dir: str) -> 'RenderQueue':
+    """Import the render queue and start one that renders through graph_dir's render cache."""
+    # pylint: disable=import-outside-toplevel
+    from tps.render_cache import RenderCache
+    from tps.render_queue import RenderQueue
+
+    # DONE
+    return RenderQueue(RenderCache(graph_dir))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,261 @@
+"""Defines the Two Point Science Markov chain room load model.
+
+Models a hospital's patient traffic as an absorbing Markov chain.  The transient states are rooms
+in a role (diagnosing or treating) and leaving a treatment room is the one absorbing state.
+Transition probabilities come from the illnesses' steps (see: edge_model module), weighted by how
+often each illness arrives.  The fundamental matrix gives the expected visits to every state per
+patient, solved with NumPy linear algebra instead of simulated, and Little's law turns visits
+into each room's steady-state occupancy.  Rooms take as long as they do in the simulator (see:
+simulation module), so the loads match a long simulation's utilization.  A steady state only
+exists while a room's utilization is under 1: a saturated room's line grows without bound, so
+its occupancy is only the work offered to it and is reported as such.
+
+NumPy is optional; solve_room_load() raises RuntimeError without it.
+
+    Typical usage example:
+
+    from tps.markov import print_markov_report, solve_room_load
+    from tps.tph_hospital import TPHHospital
+    print_markov_report(solve_room_load(TPHHospital('Smogley'), arrival_minutes=5.0))
+"""
+
+# Standard
+from collections import namedtuple
+from typing import Dict, Tuple
+import math
+
+# Third Party
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Local
+from tps.edge_model import EDGE_ROLE_DIAG, illness_steps
+from tps.misc import print_table
+from tps.simulation import (ARRIVAL_MINUTES, DIAG_MINUTES, get_treat_minutes,
+                            validate_room_servers)
+from tps.tph_catalog import TPH_CATALOG
+from tps.tph_hospital import TPHHospital
+
+
+# MACROS
+# The transition structure of one hospital.  States are (room ID, role) tuples.  transitions maps
+# a state to {next state: probability}, exits maps a state to its probability of leaving the
+# hospital, start maps a state to the fraction of patients who start there, and service maps a
+# state to its average minutes per visit.
+MarkovChain = namedtuple('MarkovChain', 'states transitions exits start service')
+# One room's steady-state load; visits and occupancy are per patient arrival and in patients.
+# A room is saturated when its utilization is at least 1; it has no steady state, so its
+# occupancy is the offered load, not what a long run would average.
+RoomLoad = namedtuple('RoomLoad', 'room_name visits arrival_rate service_minutes occupancy '
+                                  'utilization saturated')
+MarkovReport = namedtuple('MarkovReport', 'hospital_name path_length minutes rooms')
+
+
+def build_chain(hospital: TPHHospital, illness_weights: Dict[str, float] = None) -> MarkovChain:
+    """Build the sparse transition structure of hospital's patient traffic.
+
+    Args:
+        hospital: TPHHospital object to model.
+        illness_weights: Optional; Relative arrival frequency of each illness, by name.  Illnesses
+            that aren't listed have a weight of 1.
+
+    Returns:
+        A MarkovChain namedtuple.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Unknown illness name or negative weight.
+        RuntimeError: The hospital's illnesses have not been configured.
+        NotImplementedError: hospital contains a misconfigured illness.
+    """
+    # LOCAL VARIABLES
+    counts = {}         # State: {Next state: Weighted count}
+    exits = {}          # State: Weighted count leaving the hospital
+    start = {}          # State: Weighted count starting there
+    service = {}        # State: Weighted sum of minutes per visit
+    visits = {}         # State: Weighted count of visits
+    weight = 0.0        # Weight of one illness, normalized
+    total_weight = 0.0  # Sum of every illness' weight
+    state = None        # Current (room ID, role)
+    outflow = 0.0       # Weighted count leaving one state
+
+    # INPUT VALIDATION
+    _validate_build_chain(hospital=hospital, illness_weights=illness_weights)
+    illness_weights = illness_weights or {}
+    total_weight = sum(illness_weights.get(illness_obj.get_name(), 1.0)
+                       for illness_obj in hospital.get_illness_objects())
+    if total_weight <= 0:
+        raise ValueError('The illness_weights can not all be zero')
+
+    # COUNT IT
+    for illness_obj in hospital.get_illness_objects():
+        weight = illness_weights.get(illness_obj.get_name(), 1.0) / total_weight
+        state = None
+        for lead_id, trail_id, role in illness_steps(illness_obj,
+                                                     hospital_name=hospital.get_name()):
+            if state is None:
+                state = (lead_id, EDGE_ROLE_DIAG)
+                start[state] = start.get(state, 0.0) + weight
+            counts.setdefault(state, {})
+            counts[state][(trail_id, role)] = counts[state].get((trail_id, role), 0.0) + weight
+            _add_visit(visits, service, state, weight, DIAG_MINUTES)
+            state = (trail_id, role)
+        _add_visit(visits, service, state, weight, get_treat_minutes(illness_obj))
+        exits[state] = exits.get(state, 0.0) + weight
+
+    # NORMALIZE IT
+    # Outflow of a state is its transitions plus its exits
+    for state in set(counts).union(exits):
+        outflow = sum(counts.get(state, {}).values()) + exits.get(state, 0.0)
+        counts[state] = {next_state: count / outflow
+                         for next_state, count in counts.get(state, {}).items()}
+        exits[state] = exits.get(state, 0.0) / outflow
+
+    # DONE
+    return MarkovChain(tuple(sorted(visits)), counts, exits, start,
+                       {state: service[state] / state_visits
+                        for state, state_visits in visits.items()})
+
+
+def print_markov_report(report: MarkovReport) -> None:
+    """Prints a MarkovReport's per-room load table, busiest rooms first.
+
+    Saturated rooms have no steady-state occupancy, so theirs is printed as SATURATED.
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # LOCAL VARIABLES
+    tuple_list = []  # Table entries
+
+    # INPUT VALIDATION
+    if not isinstance(report, MarkovReport):
+        raise TypeError(f'The report argument must of type MarkovReport instead of '
+                        f'{type(report)}')
+
+    # PRINT IT
+    print(f'\n{report.hospital_name}: A patient arrives every {report.minutes} minutes and '
+          f'visits {report.path_length:.2f} rooms')
+    for room in sorted(report.rooms, key=lambda room: room.utilization, reverse=True):
+        tuple_list.append((room.room_name, f'{room.visits:.3f}',
+                           f'{room.arrival_rate * 60:.1f}', f'{room.service_minutes:.1f}',
+                           'SATURATED' if room.saturated else f'{room.occupancy:.2f}',
+                           f'{room.utilization:.0%}'))
+    print_table(tuple_list, ('ROOM', 'VISITS/PATIENT', 'PATIENTS/HOUR', 'MINUTES', 'OCCUPANCY',
+                             'UTILIZATION'))
+
+
+# pylint: disable=too-many-locals
+def solve_room_load(hospital: TPHHospital, arrival_minutes: float = ARRIVAL_MINUTES,
+                    room_servers: Dict[str, int] = None,
+                    illness_weights: Dict[str, float] = None) -> MarkovReport:
+    """Solve hospital's absorbing Markov chain for each room's steady-state load.
+
+    Occupancy only holds for rooms with a utilization under 1.  Rooms at or over 1 can't keep up,
+    have no steady state, and are marked saturated.
+
+    Args:
+        hospital: TPHHospital object to model.
+        arrival_minutes: Optional; Average minutes between patient arrivals.
+        room_servers: Optional; Number of copies of each room, by room name.  Rooms that aren't
+            listed have one copy.
+        illness_weights: Optional; Relative arrival frequency of each illness, by name.
+
+    Returns:
+        A MarkovReport namedtuple.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid minutes, room name, room count, illness name, or weight.
+        RuntimeError: NumPy isn't installed or the hospital's illnesses have not been configured.
+        NotImplementedError: hospital contains a misconfigured illness.
+    """
+    # LOCAL VARIABLES
+    chain = None       # Transition structure
+    index = {}         # State: Row/column of the matrices
+    transient = None   # Q, transient to transient transition probabilities
+    start = None       # Fraction of patients starting in each state
+    visits = None      # Expected visits to each state per patient
+    room_dict = {}     # Room name: [visits, sum of minutes spent per patient]
+    room_name = ''     # Name of a state's room
+    utilization = 0.0  # Fraction of the time one room's copies are busy
+    rooms = []         # RoomLoad namedtuples
+
+    # INPUT VALIDATION
+    _validate_solve_room_load(arrival_minutes=arrival_minutes, room_servers=room_servers)
+    chain = build_chain(hospital, illness_weights=illness_weights)
+    room_servers = room_servers or {}
+
+    # SOLVE IT
+    index = {state: position for position, state in enumerate(chain.states)}
+    transient = numpy.zeros((len(index), len(index)))
+    start = numpy.zeros(len(index))
+    for state, next_states in chain.transitions.items():
+        for next_state, probability in next_states.items():
+            transient[index[state], index[next_state]] = probability
+    for state, fraction in chain.start.items():
+        start[index[state]] = fraction
+    # Expected visits are the start vector times the fundamental matrix, N = (I - Q)^-1
+    visits = numpy.linalg.solve((numpy.eye(len(index)) - transient).T, start)
+
+    # REPORT IT
+    for state, position in index.items():
+        room_name = TPH_CATALOG.room_names[state[0]]
+        room_dict.setdefault(room_name, [0.0, 0.0])
+        room_dict[room_name][0] += float(visits[position])
+        room_dict[room_name][1] += float(visits[position]) * chain.service[state]
+    for room_name, (room_visits, room_minutes) in room_dict.items():
+        # Little's law: occupancy is arrivals per minute times minutes per arrival
+        utilization = room_minutes / arrival_minutes / room_servers.get(room_name, 1)
+        rooms.append(RoomLoad(room_name, room_visits, room_visits / arrival_minutes,
+                              room_minutes / room_visits, room_minutes / arrival_minutes,
+                              utilization, utilization >= 1))
+
+    # DONE
+    return MarkovReport(hospital.get_name(), float(visits.sum()), arrival_minutes, rooms)
+# pylint: enable=too-many-locals
+
+
+def _add_visit(visits: dict, service: dict, state: Tuple[int, str], weight: float,
+               minutes: float) -> None:
+    """Add weight visits of minutes each to state on behalf of build_chain()."""
+    visits[state] = visits.get(state, 0.0) + weight
+    service[state] = service.get(state, 0.0) + weight * minutes
+
+
+def _validate_build_chain(hospital: TPHHospital, illness_weights: Dict[str, float]) -> None:
+    """Validate input on behalf of build_chain()."""
+    # hospital
+    if not isinstance(hospital, TPHHospital):
+        raise TypeError(f'The hospital can not be of type {type(hospital)}')
+    # illness_weights
+    if illness_weights is not None:
+        if not isinstance(illness_weights, dict):
+            raise TypeError('The illness_weights argument must of type dict instead of '
+                            f'{type(illness_weights)}')
+        for illness_name, weight in illness_weights.items():
+            if illness_name not in hospital.get_illness_names():
+                raise ValueError(f'Illness "{illness_name}" could not be found in '
+                                 f'{hospital.get_name()}')
+            if not isinstance(weight, (int, float)):
+                raise TypeError(f'The {illness_name} weight can not be of type {type(weight)}')
+            if not math.isfinite(weight) or weight < 0:
+                raise ValueError(f'The {illness_name} weight ({weight}) can not be negative')
+
+
+def _validate_solve_room_load(arrival_minutes: float, room_servers: Dict[str, int]) -> None:
+    """Validate input on behalf of solve_room_load()."""
+    # numpy
+    if numpy is None:
+        raise RuntimeError('The Markov chain model requires NumPy (e.g., pip install numpy)')
+    # arrival_minutes
+    if not isinstance(arrival_minutes, (int, float)):
+        raise TypeError(f'The arrival_minutes argument can not be of type '
+                        f'{type(arrival_minutes)}')
+    if not math.isfinite(arrival_minutes) or arrival_minutes <= 0:
+        raise ValueError(f'The arrival_minutes value ({arrival_minutes}) must be greater than '
+                         'zero')
+    # room_servers
+    validate_room_servers(room_servers)
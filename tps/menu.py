@@ -12,17 +12,131 @@ Defines a get_choice() API and Menu namedtuple to reduce redundancy.
 
 # Standard Imports
 from collections import namedtuple
+import os
 
 # Third Party Imports
-from typing import Any
+from typing import Any, Dict
 
 # Local Imports
-from tps.misc import clear_screen as clr_screen, print_danger_table
+from tps.coverage import (get_all_coverage, get_coverage, next_room, print_coverage_report,
+                          print_coverage_totals)
+from tps.danger_strategies import get_strategies
+from tps.edge_model import get_edge_model
+from tps.misc import (clear_screen as clr_screen, print_danger_table, print_edge_table,
+                      print_exception)
+from tps.simulation import (ARRIVAL_MINUTES, HospitalSimulation, print_simulation_report,
+                            SIM_PATIENTS)
+from tps.suggest_rooms import (print_room_suggestions, print_room_totals, suggest_all_rooms,
+                               suggest_rooms, TARGET_WAIT_MINUTES)
+from tps.suggest_staff import (print_staff_roster, print_staff_totals, suggest_all_staff,
+                               suggest_staff)
+from tps.tph_constants import TPH_ROOM_DICT
 from tps.tph_hospital import TPHHospital
 
 Menu = namedtuple('Menu', 'name dictionary')
 
 
+# pylint: disable=too-many-branches
+def coverage_menu(hospital: TPHHospital, graph_dir: str = '') -> None:
+    """Execute the Two Point Science room coverage menu.
+
+    This menu allows the user to list the rooms they've built and print which of hospital's
+    illnesses those rooms can diagnose and treat, what each uncovered illness is missing, and
+    which room to build next.  The same rooms can be checked against every hospital.  The menu
+    also plans the order to build every room in (see: build_order module).
+
+    Args:
+        hospital: TPHHospital object. (see: tph_hospital module)
+        graph_dir: Optional; Read build orders from, and save them to, the result store in this
+            directory (see: result_store module) instead of planning them every time.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        RuntimeError: The hospital's illnesses have not been configured.
+    """
+    # LOCAL VARIABLES
+    built_rooms = []     # Names of the rooms the user has built
+    user_input = 0       # User selection
+    room_name = ''       # User-chosen room name
+    clear_screen = True  # Clear the screen before printing a menu
+    max_chances = 3      # Maximum number of invalid inputs tolerated
+    curr_err = ''        # Temp variable which controls error handling
+    # Template error message for invalid selections
+    err_template = '\n*** ERROR: {}***\n'
+    # Template menu title
+    menu_title_template = 'ROOM COVERAGE MENU\nBuilt rooms: {}\n'
+    # Menu dictionary
+    menu_dict = {1: 'Print coverage', 2: 'Print coverage for every hospital',
+                 3: 'Add a built room', 4: 'Build the best next room', 5: 'Remove built rooms',
+                 6: 'Print build order', 7: 'Print build orders for every hospital',
+                 999: 'Return to main menu'}
+
+    # INPUT VALIDATION
+    # hospital
+    if not isinstance(hospital, TPHHospital):
+        raise TypeError(f'The hospital can not be of type {type(hospital)}')
+    # graph_dir
+    if not isinstance(graph_dir, str):
+        raise TypeError(f'The graph_dir argument must of type str instead of {type(graph_dir)}')
+
+    # COVERAGE MENU
+    while True:
+        user_input = get_choice(
+            tph_menu=Menu(menu_title_template.format(', '.join(built_rooms) or 'None'),
+                          menu_dict),
+            clear_screen=clear_screen, choice_type=int, max_chances=max_chances,
+            return_choice=True)
+        clear_screen = True  # Reset temp variable
+
+        # 1. Print Coverage
+        if user_input == 1:
+            print_coverage_report(get_coverage(hospital, built_rooms))
+            clear_screen = False  # Let them see the table
+        # 2. Print Every Hospital
+        elif user_input == 2:
+            print_coverage_totals(get_all_coverage(built_rooms))
+            clear_screen = False  # Let them see the table
+        # 3. Add A Room
+        elif user_input == 3:
+            room_name = get_choice(tph_menu=Menu('ADD A BUILT ROOM',
+                                                 {i+1: name for i, name in
+                                                  enumerate(hospital.get_room_list())}),
+                                   clear_screen=False, choice_type=int, max_chances=max_chances)
+            if room_name not in built_rooms:
+                built_rooms.append(room_name)
+        # 4. Build Next Room
+        elif user_input == 4:
+            room_name = next_room(get_coverage(hospital, built_rooms))
+            if room_name:
+                built_rooms.append(room_name)
+            else:
+                curr_err = err_template.format('EVERY ILLNESS IS COVERED')
+        # 5. Remove Rooms
+        elif user_input == 5:
+            built_rooms = []
+        # 6. Print Build Order
+        # 7. Print Every Build Order
+        elif user_input in (6, 7):
+            _print_build_orders(hospital, all_hospitals=user_input == 7, graph_dir=graph_dir)
+            clear_screen = False  # Let them see the table
+        # 999. Exit
+        elif user_input == 999:
+            return
+        else:
+            curr_err = err_template.format('INVALID SELECTION')
+
+        # Is there an error?
+        if curr_err:
+            print(curr_err)
+            max_chances = max_chances - 1
+            if max_chances < 1:
+                print(err_template.format('TOO MANY INVALID SELECTIONS'))
+                return
+            clear_screen = False  # Let them see the mistake they've made
+            curr_err = ''
+# pylint: enable=too-many-branches
+
+
 # pylint: disable=too-many-branches
 def danger_menu(hospital: TPHHospital) -> None:
     """Execute the Two Point Science danger table menu.
@@ -51,8 +165,9 @@ def danger_menu(hospital: TPHHospital) -> None:
     # Dictionary of sort options
     sort_dict = {1: 'Illness', 2: 'Treatment Room', 3: 'Difficulty', 4: 'Death Chance',
                  5: 'Health Decline', 6: 'Aggregate'}
-    # Dictionary of aggregate strategy options
-    aggregate_dict = {1: 'Product', 2: 'Average', 3: 'Product & Average Mean'}
+    # Dictionary of aggregate strategy options, as registered
+    aggregate_dict = {strategy: registered.name
+                      for strategy, registered in get_strategies().items()}
     # Template error message for invalid selections
     err_template = '\n*** ERROR: {}***\n'
     # Template menu title
@@ -60,7 +175,8 @@ def danger_menu(hospital: TPHHospital) -> None:
         'ILLNESS DANGER MENU\nSorted by {} in a {} order\nAggregate strategy: {}\n'
     # Menu dictionary
     menu_dict = {1: 'Print illness danger table', 2: 'Change Column', 3: 'Toggle Sort',
-                 4: 'Change aggregate strategy', 999: 'Return to main menu'}
+                 4: 'Change aggregate strategy', 5: 'Print Monte Carlo outcome estimates',
+                 999: 'Return to main menu'}
 
     # INPUT VALIDATION
     # hospital
@@ -101,6 +217,10 @@ def danger_menu(hospital: TPHHospital) -> None:
             agg_strat = get_choice(tph_menu=Menu('CHANGE AGGREGATE STRATEGY', aggregate_dict),
                                    clear_screen=False, choice_type=int, max_chances=max_chances,
                                    return_choice=True)
+        # 5. Monte Carlo Estimates
+        elif user_input == 5:
+            _print_outcome_estimates(hospital, sort_desc=sort_desc)
+            clear_screen = False  # Let them see the table
         # 999. Exit
         elif user_input == 999:
             return
@@ -119,6 +239,122 @@ def danger_menu(hospital: TPHHospital) -> None:
 # pylint: enable=too-many-branches
 
 
+# pylint: disable=too-many-branches
+def edge_menu(hospital: TPHHospital, sep_rooms: bool) -> None:
+    """Execute the Two Point Science edge (connection) menu.
+
+    This menu allows the user to print a table with room names, purpose, and an edge (connection)
+    count.  The menu also allows the user to sort the table by name or count as well as let the
+    user sort the table in ascending or descending order.
+
+    Args:
+        hospital: TPHHospital object to count the edges of. (see: tph_hospital module)
+        sep_rooms: If true, multi-purpose rooms are separated into ' (diag)' and ' (treat)'
+            versions on the table.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        RuntimeError: Mismatch in internal sort column or sort order variables
+    """
+    # LOCAL VARIABLES
+    sort_col = 'count'    # Print current sort column in the menu title
+    sort_by_count = True  # Converts user sort column choice to print_edge_table() kwarg
+    sort_dir = 'desc'     # Print current sort direction in the menu title
+    sort_desc = True      # Converts user sort order choice to print_edge_table() kwarg
+    user_input = 0        # User selection
+    edge_dict = None      # Dictionary of room counts
+    clear_scr = True      # Clear the screen before printing a menu
+    max_chances = 3       # Maximum number of invalid inputs tolerated
+    current_err = ''      # Temp variable which controls error handling
+    # Template error message for invalid selections
+    err_template = '\n*** ERROR: {}***\n'
+    # Template menu title
+    menu_title_template = 'EDGE MENU\nSorted by {} in a {} order\n'
+    # Menu dictionary
+    menu_dict = {1: 'Print room connections', 2: 'Toggle Column', 3: 'Toggle Sort',
+                 999: 'Return to main menu'}
+
+    # INPUT VALIDATION
+    _validate_edge_menu(hospital=hospital, sep_rooms=sep_rooms)
+
+    # EDGE MENU
+    while True:
+        user_input = get_choice(tph_menu=Menu(menu_title_template.format(sort_col, sort_dir),
+                                              menu_dict),
+                                clear_screen=clear_scr, choice_type=int,
+                                max_chances=max_chances, return_choice=True)
+        clear_scr = True  # Reset temp variable
+
+        # 1. Print Edges
+        if user_input == 1:
+            edge_dict = enumerate_edges(hospital, sep_rooms)
+            print_edge_table(edge_dict, TPH_ROOM_DICT, sort_by_count=sort_by_count,
+                             sort_desc=sort_desc)
+            clear_scr = False  # Let them see the table
+        # 2. Toggle Column
+        elif user_input == 2:
+            if sort_col == 'count' and sort_by_count:
+                sort_col = 'room'
+                sort_by_count = False
+            elif sort_col == 'room' and not sort_by_count:
+                sort_col = 'count'
+                sort_by_count = True
+            else:
+                raise RuntimeError('Mismatch in edge menu sort column toggle settings')
+        # 3. Toggle Sort
+        elif user_input == 3:
+            if sort_dir == 'asc' and not sort_desc:
+                sort_dir = 'desc'
+                sort_desc = True
+            elif sort_dir == 'desc' and sort_desc:
+                sort_dir = 'asc'
+                sort_desc = False
+            else:
+                raise RuntimeError('Mismatch in edge menu sort direction toggle settings')
+        # 999. Exit
+        elif user_input == 999:
+            return
+        else:
+            current_err = err_template.format('INVALID SELECTION')
+
+        # Is there an error?
+        if current_err:
+            print(current_err)
+            max_chances = max_chances - 1
+            if max_chances < 1:
+                print(err_template.format('TOO MANY INVALID SELECTIONS'))
+                return
+            clear_scr = False  # Let them see the mistake they've made
+            current_err = ''
+# pylint: enable=too-many-branches
+
+
+def enumerate_edges(hospital: TPHHospital, sep_rooms: bool) -> Dict[str, int]:
+    """Count the edges (connections) of every room in hospital.
+
+    Counts are read directly from hospital's shared EdgeModel (see: edge_model module) so
+    dual-purpose rooms are only credited with the edges they actually have.
+
+    Args:
+        hospital: TPHHospital object. (see: tph_hospital module)
+        sep_rooms: If true, multi-purpose rooms are separated into ' (diag)' and ' (treat)'
+            versions on the table.
+
+    Returns:
+        Dictionary of room names to edge counts.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        NotImplementedError: hospital does not contain any illnesses or contains a misconfigured
+            illness.
+    """
+    # INPUT VALIDATION
+    _validate_edge_menu(hospital=hospital, sep_rooms=sep_rooms)
+
+    # DONE
+    return get_edge_model(hospital, sep_rooms=sep_rooms).get_degree_counts()
+
+
 def get_choice(tph_menu: Menu, clear_screen: bool = True, choice_type: type = str,
                max_chances: int = 3, return_choice: bool = False) -> Any:
     """Prints a menu, reads/converts user input, returns choice.
@@ -219,6 +455,196 @@ def read_user_input(choice_type: type) -> Any:
     return user_choice
 
 
+# pylint: disable=too-many-branches
+def room_count_menu(hospital: TPHHospital) -> None:
+    """Execute the Two Point Science room count menu.
+
+    This menu allows the user to print the suggested number of copies of each of hospital's rooms,
+    the suggested staff for those rooms, or the suggested totals for every hospital, given how
+    often patients arrive and how long they may wait in line.  The menu also allows the user to
+    change those assumptions.
+
+    Args:
+        hospital: TPHHospital object. (see: tph_hospital module)
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # LOCAL VARIABLES
+    arrival_minutes = ARRIVAL_MINUTES  # Average minutes between patient arrivals
+    target_wait = TARGET_WAIT_MINUTES  # Longest average wait in line
+    user_input = 0                     # User selection
+    clear_screen = True                # Clear the screen before printing a menu
+    max_chances = 3                    # Maximum number of invalid inputs tolerated
+    curr_err = ''                      # Temp variable which controls error handling
+    # Dictionary of arrival options
+    arrival_dict = {1: 1.0, 2: 2.0, 3: 5.0, 4: 10.0, 5: ARRIVAL_MINUTES, 6: 20.0, 7: 30.0}
+    # Dictionary of target wait options
+    wait_dict = {1: 5.0, 2: 10.0, 3: TARGET_WAIT_MINUTES, 4: 30.0, 5: 60.0}
+    # Template error message for invalid selections
+    err_template = '\n*** ERROR: {}***\n'
+    # Template menu title
+    menu_title_template = \
+        'ROOM COUNT MENU\nA patient arrives every {} minutes\nTarget wait: {} minutes\n'
+    # Menu dictionary
+    menu_dict = {1: 'Print suggested rooms', 2: 'Print suggested totals for every hospital',
+                 3: 'Change patient arrivals', 4: 'Change target wait', 5: 'Print suggested staff',
+                 6: 'Print suggested staff for every hospital', 999: 'Return to main menu'}
+
+    # INPUT VALIDATION
+    # hospital
+    if not isinstance(hospital, TPHHospital):
+        raise TypeError(f'The hospital can not be of type {type(hospital)}')
+
+    # ROOM COUNT MENU
+    while True:
+        user_input = get_choice(
+            tph_menu=Menu(menu_title_template.format(arrival_minutes, target_wait), menu_dict),
+            clear_screen=clear_screen, choice_type=int, max_chances=max_chances,
+            return_choice=True)
+        clear_screen = True  # Reset temp variable
+
+        # 1. Print Suggestions
+        if user_input == 1:
+            print_room_suggestions(suggest_rooms(hospital, arrival_minutes=arrival_minutes,
+                                                 target_wait=target_wait))
+            clear_screen = False  # Let them see the table
+        # 2. Print Totals
+        elif user_input == 2:
+            print_room_totals(suggest_all_rooms(arrival_minutes=arrival_minutes,
+                                                target_wait=target_wait))
+            clear_screen = False  # Let them see the table
+        # 3. Change Arrivals
+        elif user_input == 3:
+            arrival_minutes = get_choice(tph_menu=Menu('MINUTES BETWEEN PATIENT ARRIVALS',
+                                                       arrival_dict),
+                                         clear_screen=False, choice_type=int,
+                                         max_chances=max_chances)
+        # 4. Change Target Wait
+        elif user_input == 4:
+            target_wait = get_choice(tph_menu=Menu('TARGET WAIT IN MINUTES', wait_dict),
+                                     clear_screen=False, choice_type=int, max_chances=max_chances)
+        # 5. Print Staff
+        elif user_input == 5:
+            print_staff_roster(suggest_staff(hospital, arrival_minutes=arrival_minutes,
+                                             target_wait=target_wait))
+            clear_screen = False  # Let them see the table
+        # 6. Print Staff Totals
+        elif user_input == 6:
+            print_staff_totals(suggest_all_staff(arrival_minutes=arrival_minutes,
+                                                 target_wait=target_wait))
+            clear_screen = False  # Let them see the table
+        # 999. Exit
+        elif user_input == 999:
+            return
+        else:
+            curr_err = err_template.format('INVALID SELECTION')
+
+        # Is there an error?
+        if curr_err:
+            print(curr_err)
+            max_chances = max_chances - 1
+            if max_chances < 1:
+                print(err_template.format('TOO MANY INVALID SELECTIONS'))
+                return
+            clear_screen = False  # Let them see the mistake they've made
+            curr_err = ''
+# pylint: enable=too-many-branches
+
+
+# pylint: disable=too-many-branches
+def simulation_menu(hospital: TPHHospital) -> None:
+    """Execute the Two Point Science patient flow simulation menu.
+
+    This menu allows the user to simulate patients moving through hospital's diagnosis and
+    treatment rooms and print each room's utilization, lines, and waits along with what became
+    of the patients.  The menu also allows the user to change the number of patients and the
+    number of copies of a room to evaluate a layout before building it, and to solve each room's
+    load analytically (see: markov module) without simulating anything.
+
+    Args:
+        hospital: TPHHospital object. (see: tph_hospital module)
+
+    Raises:
+        TypeError: Bad data type passed in.
+        RuntimeError: The hospital's illnesses have not been configured.
+    """
+    # LOCAL VARIABLES
+    patients = SIM_PATIENTS  # Number of patients to simulate
+    room_servers = {}        # Number of copies of each room, by room name
+    user_input = 0           # User selection
+    room_name = ''           # User-chosen room name
+    clear_screen = True      # Clear the screen before printing a menu
+    max_chances = 3          # Maximum number of invalid inputs tolerated
+    curr_err = ''            # Temp variable which controls error handling
+    # Dictionary of patient count options
+    patients_dict = {1: 1000, 2: 10000, 3: 100000, 4: 500000}
+    # Template error message for invalid selections
+    err_template = '\n*** ERROR: {}***\n'
+    # Template menu title
+    menu_title_template = 'PATIENT FLOW MENU\nPatients: {}\nExtra rooms: {}\n'
+    # Menu dictionary
+    menu_dict = {1: 'Simulate patient flow', 2: 'Change number of patients',
+                 3: 'Add a copy of a room', 4: 'Remove extra rooms',
+                 5: 'Print analytic room load (Markov chain)', 999: 'Return to main menu'}
+
+    # INPUT VALIDATION
+    # hospital
+    if not isinstance(hospital, TPHHospital):
+        raise TypeError(f'The hospital can not be of type {type(hospital)}')
+
+    # SIMULATION MENU
+    while True:
+        user_input = get_choice(
+            tph_menu=Menu(menu_title_template.format(
+                patients, ', '.join(f'{name} x{count}' for name, count in room_servers.items())
+                or 'None'), menu_dict),
+            clear_screen=clear_screen, choice_type=int, max_chances=max_chances,
+            return_choice=True)
+        clear_screen = True  # Reset temp variable
+
+        # 1. Simulate
+        if user_input == 1:
+            print(f'Simulating {patients} patients at {hospital.get_name()}...')
+            print_simulation_report(HospitalSimulation(hospital,
+                                                       room_servers=room_servers).run(patients))
+            clear_screen = False  # Let them see the table
+        # 2. Change Patients
+        elif user_input == 2:
+            patients = get_choice(tph_menu=Menu('CHANGE NUMBER OF PATIENTS', patients_dict),
+                                  clear_screen=False, choice_type=int, max_chances=max_chances)
+        # 3. Add A Room
+        elif user_input == 3:
+            room_name = get_choice(tph_menu=Menu('ADD A COPY OF A ROOM',
+                                                 {i+1: name for i, name in
+                                                  enumerate(hospital.get_room_list())}),
+                                   clear_screen=False, choice_type=int, max_chances=max_chances)
+            room_servers[room_name] = room_servers.get(room_name, 1) + 1
+        # 4. Remove Rooms
+        elif user_input == 4:
+            room_servers = {}
+        # 5. Analytic Room Load
+        elif user_input == 5:
+            _print_markov_report(hospital, room_servers=room_servers)
+            clear_screen = False  # Let them see the table
+        # 999. Exit
+        elif user_input == 999:
+            return
+        else:
+            curr_err = err_template.format('INVALID SELECTION')
+
+        # Is there an error?
+        if curr_err:
+            print(curr_err)
+            max_chances = max_chances - 1
+            if max_chances < 1:
+                print(err_template.format('TOO MANY INVALID SELECTIONS'))
+                return
+            clear_screen = False  # Let them see the mistake they've made
+            curr_err = ''
+# pylint: enable=too-many-branches
+
+
 def _check_for_error(curr_err: str, max_chances: int) -> (int, bool):
     """Internal validation functionality for callers implementing a user menu.
 
@@ -256,6 +682,82 @@ def _check_for_error(curr_err: str, max_chances: int) -> (int, bool):
     return tuple((new_chances, clear_screen))
 
 
+def _print_build_orders(hospital: TPHHospital, all_hospitals: bool, graph_dir: str) -> None:
+    """Plan and print hospital's, or every hospital's, build order on behalf of coverage_menu().
+
+    If graph_dir is given, build orders already in its result store are read instead of planned
+    and new ones are saved.  The build order planner (and its process pool) and the result store
+    are imported here, the first time they're requested.
+    """
+    # pylint: disable=import-outside-toplevel
+    from tps.build_order import (plan_all_build_orders, plan_build_order, print_build_order,
+                                 print_build_rankings)
+    from tps.result_store import get_store_path, RESULT_BUILD_ORDER, ResultStore
+
+    # LOCAL VARIABLES
+    plans = {}  # Hospital name: BuildPlan
+
+    # PLAN IT
+    print('Planning every hospital...' if all_hospitals else f'Planning {hospital.get_name()}...')
+    if graph_dir:
+        with ResultStore(get_store_path(graph_dir)) as store:
+            plans = store.compute(RESULT_BUILD_ORDER,
+                                  None if all_hospitals else [hospital.get_name()],
+                                  jobs=os.cpu_count() or 1)
+    elif all_hospitals:
+        plans = plan_all_build_orders(jobs=os.cpu_count() or 1)
+    else:
+        plans = {hospital.get_name(): plan_build_order(hospital)}
+
+    # PRINT IT
+    if all_hospitals:
+        print_build_rankings(plans)
+    else:
+        print_build_order(plans[hospital.get_name()])
+
+
+def _print_markov_report(hospital: TPHHospital, room_servers: dict) -> None:
+    """Solve and print hospital's analytic room load on behalf of simulation_menu().
+
+    The Markov chain model (and NumPy) is imported here, the first time it's requested.
+    """
+    # pylint: disable=import-outside-toplevel
+    from tps.markov import print_markov_report, solve_room_load
+
+    # PRINT IT
+    try:
+        print_markov_report(solve_room_load(hospital, room_servers=room_servers))
+    except RuntimeError as err:
+        print_exception(err)
+
+
+def _print_outcome_estimates(hospital: TPHHospital, sort_desc: bool) -> None:
+    """Estimate and print hospital's outcome table on behalf of danger_menu().
+
+    The Monte Carlo estimator (and NumPy) is imported here, the first time it's requested.
+    """
+    # pylint: disable=import-outside-toplevel
+    from tps.monte_carlo import estimate_outcomes, print_outcome_table
+
+    # PRINT IT
+    print(f'Sampling {hospital.get_name()} patient outcomes...')
+    try:
+        print_outcome_table(estimate_outcomes(hospital), sort_desc=sort_desc)
+    except RuntimeError as err:
+        print_exception(err)
+
+
+def _validate_edge_menu(hospital: TPHHospital, sep_rooms: bool) -> None:
+    """Validate input on behalf of edge_menu() and enumerate_edges()."""
+    # INPUT VALIDATION
+    # hospital
+    if not isinstance(hospital, TPHHospital):
+        raise TypeError(f'The hospital can not be of type {type(hospital)}')
+    # sep_rooms
+    if not isinstance(sep_rooms, bool):
+        raise TypeError(f'The sep_rooms argument must of type bool instead of {type(sep_rooms)}')
+
+
 def _validate_get_choice(tph_menu: Menu, clear_screen: bool, choice_type: type, max_chances: int,
                          return_choice: bool) -> None:
     """Validate input on behalf of get_choice()."""
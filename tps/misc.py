@@ -21,6 +21,7 @@ from typing import Any
 import platform
 
 # Local Imports
+from tps.danger_table import get_danger_table
 from tps.tph_hospital import TPHHospital
 
 
@@ -46,6 +47,40 @@ def clear_screen() -> None:
     subprocess.call([command], shell=True)
 
 
+def loose_lookup(haystack: dict, needle: str) -> Any:
+    """Return the haystack value of the first key needle starts with, ignoring case.
+
+    Args:
+        haystack: Dictionary with string keys (e.g., TPH_ROOM_DICT).
+        needle: String to look up (e.g., 'Ward (treat)').
+
+    Returns:
+        The value, or None if needle doesn't start with any key.
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # LOCAL VARIABLES
+    found_it = None  # Return value
+
+    # INPUT VALIDATION
+    # haystack
+    if not isinstance(haystack, dict):
+        raise TypeError(f'The haystack argument must of type dict instead of {type(haystack)}')
+    # needle
+    if not isinstance(needle, str):
+        raise TypeError(f'The needle argument must be of type str instead of {type(needle)}')
+
+    # FIND IT
+    for key, value in haystack.items():
+        if needle.lower().startswith(key.lower()):
+            found_it = value
+            break
+
+    # DONE
+    return found_it
+
+
 def print_exception(error: Exception) -> str:
     """Standardizes exception messages and prints to stderr.
 
@@ -149,7 +184,7 @@ def print_edge_table(edge_dict: dict, room_lookup: dict, sort_by_count: bool = T
     # Form the list of tuples
     for key, value in local_dict.items():
         # Find the room purpose
-        temp_room_details = _loose_lookup(room_lookup, key)
+        temp_room_details = loose_lookup(room_lookup, key)
         if temp_room_details:
             try:
                 temp_room_purpose = temp_room_details.purpose
@@ -159,7 +194,7 @@ def print_edge_table(edge_dict: dict, room_lookup: dict, sort_by_count: bool = T
             temp_room_purpose = 'Not Found'
         tuple_list.append(tuple((key, temp_room_purpose, value)))
     # 2. Print Table
-    _print_table(tuple_list, tuple(('ROOM', 'PURPOSE', 'COUNT')))
+    print_table(tuple_list, tuple(('ROOM', 'PURPOSE', 'COUNT')))
 
 
 def print_danger_table(hospital: TPHHospital, sort_by_col: int, agg_strat: int,
@@ -180,10 +215,6 @@ def print_danger_table(hospital: TPHHospital, sort_by_col: int, agg_strat: int,
         TypeError: Bad data type passed in.
         ValueError: Invalid value found in the arguments.
     """
-    # LOCAL VARIABLES
-    sort_list = []   # List of lists containing raw data to sort by
-    tuple_list = []  # List of sorted tuples formed from the hospital illness list
-
     # INPUT VALIDATION
     # hospital
     if not isinstance(hospital, TPHHospital):
@@ -198,99 +229,73 @@ def print_danger_table(hospital: TPHHospital, sort_by_col: int, agg_strat: int,
     if not isinstance(sort_desc, bool):
         raise TypeError(f'The sort_desc argument must of type bool instead of {type(sort_desc)}')
 
-    # CREATE LIST
-    # Create List (to sort)
-    for illness_obj in hospital.get_illness_objects():
-        # Make sort list entry
-        sort_list.append([illness_obj, illness_obj.get_name(), illness_obj.get_treat(),
-                          illness_obj.get_difficulty_value(), illness_obj.get_death_value(),
-                          illness_obj.get_decline_value(),
-                          illness_obj.get_aggregate_value(agg_strat)])
-    # Sort List
-    if sort_by_col != 1:
-        sort_list = sorted(sort_list, key=lambda item: item[1])
-    sort_list = sorted(sort_list, key=lambda item: item[sort_by_col], reverse=sort_desc)
-    # Create Real List
-    for illness_entry in sort_list:
-        illness_obj = illness_entry[0]
-        tuple_list.append(tuple((illness_obj.get_name(), illness_obj.get_treat(),
-                                 illness_obj.get_difficulty_str(), illness_obj.get_death_str(),
-                                 illness_obj.get_decline_str(),
-                                 illness_obj.get_aggregate_str(agg_strat))))
-
     # PRINT TABLE
-    _print_table(tuple_list, tuple(('ILLNESS', 'TREATMENT', 'DIFFICULTY  ', 'DEATH CHANCE  ',
-                                    'RATE OF DECLINE  ', 'AGGREGATE')))
+    print_table(get_danger_table(hospital, strategy=agg_strat).get_rows(sort_by_col, sort_desc),
+                tuple(('ILLNESS', 'TREATMENT', 'DIFFICULTY  ', 'DEATH CHANCE  ',
+                       'RATE OF DECLINE  ', 'AGGREGATE')))
 
 
-def _loose_lookup(haystack: dict, needle: str) -> Any:
-    # LOCAL VARIABLES
-    found_it = None  # Return value
+def print_stats_table(stats: dict, title: str = '') -> None:
+    """Prints a two column table of statistic names and values.
+
+    Args:
+        stats: Dictionary containing statistic names as keys and statistic values as values.
+        title: Optional; Line to print above the table.
 
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid value found in the arguments.
+    """
     # INPUT VALIDATION
-    # haystack
-    if not isinstance(haystack, dict):
-        raise TypeError(f'The haystack argument must of type dict instead of {type(haystack)}')
-    # needle
-    if not isinstance(needle, str):
-        raise TypeError(f'The needle argument must be of type str instead of {type(needle)}')
+    # stats
+    if not isinstance(stats, dict):
+        raise TypeError(f'The stats argument must of type dict instead of {type(stats)}')
+    # title
+    if not isinstance(title, str):
+        raise TypeError(f'The title argument must of type str instead of {type(title)}')
 
-    # FIND IT
-    for key, value in haystack.items():
-        if needle.lower().startswith(key.lower()):
-            found_it = value
-            break
+    # PRINT TABLE
+    if title:
+        print('\n' + title)
+    print_table([tuple((str(key).upper(), value)) for key, value in stats.items()],
+                tuple(('STATISTIC', 'VALUE')))
 
-    # DONE
-    return found_it
 
+def print_table(tuple_list: list, col_headers: tuple) -> None:
+    """Prints a left-justified table of tuple_list entries under col_headers.
+
+    Args:
+        tuple_list: Non-empty list of tuples, one per row, all the length of col_headers.
+        col_headers: Tuple of column header strings.
 
-def _print_table(tuple_list: list, col_headers: tuple) -> None:
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid value found in the arguments.
+    """
     # LOCAL VARIABLES
-    longest_line = 0  # Longest line to print
     col_widths = []   # A list of maximum column widths
     num_columns = 0   # Number of columns to print
-    temp_line = ''    # Dynamically built string to print one line
+    line_format = ''  # Format string of one left-justified line
 
     # INPUT VALIDATION
     num_columns = _validate_print_table(tuple_list=tuple_list, col_headers=col_headers)
 
     # SIZE IT
-    # Column Widths
-    for width in range(0, num_columns):
-        col_widths.append(0)
-    # Tuple List Indices
+    # Column Widths: Longest entry or header, plus one
+    col_widths = [len(header) + 1 for header in col_headers]
     for entry in tuple_list:
         for index in range(0, num_columns):
-            if len(str(entry[index])) + 1 > col_widths[index]:
-                col_widths[index] = len(str(entry[index])) + 1
-    # Column Header Indices
-    for index in range(0, num_columns):
-        if len(col_headers[index]) + 1 > col_widths[index]:
-            col_widths[index] = len(col_headers[index]) + 1
-
-    # Longest Line
-    for width in col_widths:
-        longest_line = longest_line + width
+            col_widths[index] = max(col_widths[index], len(str(entry[index])) + 1)
+    line_format = ''.join(f'{{{index}: <{width}}}' for index, width in enumerate(col_widths))
 
     # PRINT IT
-    # 1. Header
-    temp_line = '\n'  # Reset temp variable
-    for index in range(0, num_columns):
-        temp_line = temp_line + '{0: <{width}}'.format(col_headers[index], width=col_widths[index])
-    print(temp_line)
-    # 2. Separator
-    print('-' * longest_line)
-    # 3. Table Entries
-    for entry in tuple_list:
-        temp_line = ''  # Reset temp variable
-        for index in range(0, num_columns):
-            temp_line = temp_line + '{0: <{width}}'.format(entry[index], width=col_widths[index])
-        print(temp_line)
+    # Header, separator, and table entries in one write
+    print('\n'.join(['\n' + line_format.format(*col_headers), '-' * sum(col_widths)]
+                    + [line_format.format(*entry) for entry in tuple_list]))
 
 
 def _validate_print_table(tuple_list: list, col_headers: tuple) -> int:
-    """Validate arguments on behalf of _print_table() and returns number of columns."""
+    """Validate arguments on behalf of print_table() and returns number of columns."""
     # LOCAL VARIABLES
     num_columns = 0   # Number of columns detected
 
@@ -0,0 +1,236 @@
+"""Defines the Two Point Science Monte Carlo outcome estimator.
+
+Draws patient outcomes for all of a hospital's illnesses at once, as NumPy arrays, instead of
+reducing each illness to one aggregate value.  Each sampled patient waits in line for every room on
+the illness' path, losing health at the illness' health decline (see: simulation module), and dies
+in line if it runs out.  Survivors are treated, which fails as often as the illness' difficulty,
+and a failed treatment kills as often as the illness' chance of death.  Any values of
+MISSING_DATA are sampled as 1.
+
+Every illness draws from its own random stream, keyed by seed and catalog illness ID, so an
+illness' estimate is reproducible no matter which hospital it's sampled in.  NumPy is optional;
+estimate_outcomes() raises RuntimeError without it.
+
+    Typical usage example:
+
+    from tps.monte_carlo import estimate_outcomes, print_outcome_table
+    from tps.tph_hospital import TPHHospital
+    estimates = estimate_outcomes(TPHHospital('Smogley'), samples=1000000, seed=1)
+    print_outcome_table(estimates)
+"""
+
+# Standard
+from collections import namedtuple
+from typing import List, Tuple
+import math
+
+# Third Party
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Local
+from tps.misc import print_table
+from tps.simulation import DECLINE_PER_MINUTE
+from tps.tph_catalog import NO_ROOM, TPH_CATALOG
+from tps.tph_hospital import TPHHospital
+
+
+# MACROS
+# Default number of patients sampled per illness
+MC_SAMPLES = 100000
+# Maximum number of patients sampled per illness at a time, bounding memory use
+MC_CHUNK = 65536
+# Average minutes spent in line for each room
+WAIT_MINUTES = 30.0
+# Two-sided 95% standard normal quantile used for the confidence intervals
+CONFIDENCE_Z = 1.959964
+# Results; rates are fractions and intervals are (low, high) fractions
+OutcomeEstimate = namedtuple('OutcomeEstimate', 'illness_name samples cure_rate cure_interval '
+                                                'death_rate death_interval')
+
+
+# pylint: disable=too-many-locals
+def estimate_outcomes(hospital: TPHHospital, samples: int = MC_SAMPLES, seed: int = None,
+                      wait_minutes: float = WAIT_MINUTES) -> List[OutcomeEstimate]:
+    """Estimate the cure and death rates of hospital's illnesses by sampling patient outcomes.
+
+    Args:
+        hospital: TPHHospital object to sample the illnesses of.
+        samples: Optional; Number of patients to sample per illness.
+        seed: Optional; Random number generator seed.  Results are reproducible for a given seed.
+        wait_minutes: Optional; Average minutes spent in line for each room.
+
+    Returns:
+        A list of OutcomeEstimate namedtuples, one per illness with a path to walk, in hospital
+        order.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: samples or wait_minutes is not positive.
+        RuntimeError: NumPy isn't installed or the hospital's illnesses have not been configured.
+    """
+    # LOCAL VARIABLES
+    illness_ids = []  # Catalog IDs of the sampled illnesses
+    path_lens = []    # Number of rooms each sampled illness waits in line for
+    root_seed = None  # Seed sequence every illness' stream is spawned from
+    streams = []      # One random number generator per sampled illness
+    factors = None    # Difficulty, chance of death, and health decline, per illness
+    cured = None      # Number of patients cured, per illness
+    died = None       # Number of patients who died, per illness
+    chunk = 0         # Number of patients per illness sampled this pass
+
+    # INPUT VALIDATION
+    _validate_estimate_outcomes(hospital=hospital, samples=samples, seed=seed,
+                                wait_minutes=wait_minutes)
+
+    # SETUP
+    for illness_obj in hospital.get_illness_objects():
+        path_lens.append(len(illness_obj.get_diag_ids())
+                         + int(illness_obj.get_treat_id() != NO_ROOM))
+        illness_ids.append(illness_obj.get_id())
+        if not path_lens[-1]:
+            path_lens.pop()  # Misconfigured illnesses don't have a path to walk
+            illness_ids.pop()
+    if not illness_ids:
+        raise RuntimeError(f'{hospital.get_name()} has no illnesses to sample')
+    root_seed = numpy.random.SeedSequence(seed)
+    streams = [numpy.random.default_rng(numpy.random.SeedSequence(root_seed.entropy,
+                                                                  spawn_key=(illness_id,)))
+               for illness_id in illness_ids]
+    # Missing data is a mathematical pass
+    factors = numpy.nan_to_num(numpy.array([[TPH_CATALOG.difficulty[illness_id],
+                                             TPH_CATALOG.death[illness_id],
+                                             TPH_CATALOG.decline[illness_id]]
+                                            for illness_id in illness_ids]), nan=1.0)
+    cured = numpy.zeros(len(illness_ids), dtype=numpy.int64)
+    died = numpy.zeros(len(illness_ids), dtype=numpy.int64)
+
+    # SAMPLE IT
+    for start in range(0, samples, MC_CHUNK):
+        chunk = min(MC_CHUNK, samples - start)
+        cured_chunk, died_chunk = _sample_chunk(streams, factors, path_lens, chunk,
+                                                wait_minutes)
+        cured += cured_chunk
+        died += died_chunk
+
+    # DONE
+    return [OutcomeEstimate(TPH_CATALOG.illness_names[illness_id], samples,
+                            int(cured[index]) / samples,
+                            _wilson_interval(int(cured[index]), samples),
+                            int(died[index]) / samples, _wilson_interval(int(died[index]), samples))
+            for index, illness_id in enumerate(illness_ids)]
+# pylint: enable=too-many-locals
+
+
+def print_outcome_table(estimates: List[OutcomeEstimate], sort_desc: bool = True) -> None:
+    """Prints the estimated outcome table, sorted by death rate then cure rate.
+
+    Args:
+        estimates: List of OutcomeEstimate namedtuples. (see: estimate_outcomes())
+        sort_desc: Optional; If True, the deadliest illnesses are listed first.
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # LOCAL VARIABLES
+    tuple_list = []  # Table entries
+
+    # INPUT VALIDATION
+    if not isinstance(estimates, list):
+        raise TypeError(f'The estimates argument must of type list instead of {type(estimates)}')
+    for estimate in estimates:
+        if not isinstance(estimate, OutcomeEstimate):
+            raise TypeError(f'Found an estimate of type {type(estimate)} in the estimates list')
+    if not isinstance(sort_desc, bool):
+        raise TypeError(f'The sort_desc argument must of type bool instead of {type(sort_desc)}')
+
+    # PRINT IT
+    for estimate in sorted(estimates, key=lambda estimate: (estimate.death_rate,
+                                                            -estimate.cure_rate),
+                           reverse=sort_desc):
+        tuple_list.append((estimate.illness_name, f'{estimate.death_rate:.2%}',
+                           _format_interval(estimate.death_interval),
+                           f'{estimate.cure_rate:.2%}', _format_interval(estimate.cure_interval),
+                           estimate.samples))
+    print_table(tuple_list, ('ILLNESS', 'DEATH RATE', '95% CI', 'CURE RATE', '95% CI',
+                             'SAMPLES'))
+
+
+def _format_interval(interval: Tuple[float, float]) -> str:
+    """Format a (low, high) confidence interval as percentages."""
+    return f'{interval[0]:.2%} - {interval[1]:.2%}'
+
+
+def _sample_chunk(streams: list, factors: 'numpy.ndarray', path_lens: List[int], chunk: int,
+                  wait_minutes: float) -> Tuple['numpy.ndarray', 'numpy.ndarray']:
+    """Sample chunk patients for each illness and return the cured and died counts per illness.
+
+    Each illness fills its own row of the draws from its own stream; the outcomes are then
+    computed for every illness at once.  Each row of factors holds an illness' difficulty,
+    chance of death, and health decline.
+    """
+    # LOCAL VARIABLES
+    failure = factors[:, 0:1]  # Chance treatment fails
+    death = factors[:, 1:2]    # Chance a failed treatment kills
+    decline = factors[:, 2:3] * DECLINE_PER_MINUTE  # Health lost per minute in line
+    waited = numpy.empty((len(streams), chunk))      # Minutes spent in line
+    draws = numpy.empty((2, len(streams), chunk))    # Treatment failure and death draws
+    died_waiting = None                              # Ran out of health in line
+    failed = None                                    # Treatment failed
+
+    # DRAW IT
+    for index, stream in enumerate(streams):
+        # The sum of path_lens exponential waits is gamma distributed
+        waited[index] = stream.standard_gamma(path_lens[index], size=chunk)
+        draws[:, index] = stream.random((2, chunk))
+    waited *= wait_minutes
+
+    # DECIDE IT
+    died_waiting = waited * decline >= 1.0
+    failed = draws[0] < failure
+    # DONE
+    return (numpy.count_nonzero(~died_waiting & ~failed, axis=1),
+            numpy.count_nonzero(died_waiting | (failed & (draws[1] < death)), axis=1))
+
+
+def _validate_estimate_outcomes(hospital: TPHHospital, samples: int, seed: int,
+                                wait_minutes: float) -> None:
+    """Validate input on behalf of estimate_outcomes()."""
+    # numpy
+    if numpy is None:
+        raise RuntimeError('Monte Carlo estimates require NumPy (e.g., pip install numpy)')
+    # hospital
+    if not isinstance(hospital, TPHHospital):
+        raise TypeError(f'The hospital can not be of type {type(hospital)}')
+    # samples
+    if not isinstance(samples, int):
+        raise TypeError(f'The samples argument must of type int instead of {type(samples)}')
+    if samples < 1:
+        raise ValueError(f'The samples value ({samples}) must be greater than zero')
+    # seed
+    if seed is not None and not isinstance(seed, int):
+        raise TypeError(f'The seed argument must of type int instead of {type(seed)}')
+    # wait_minutes
+    if not isinstance(wait_minutes, (int, float)):
+        raise TypeError(f'The wait_minutes argument can not be of type {type(wait_minutes)}')
+    if not math.isfinite(wait_minutes) or wait_minutes <= 0:
+        raise ValueError(f'The wait_minutes value ({wait_minutes}) must be greater than zero')
+
+
+def _wilson_interval(successes: int, samples: int) -> Tuple[float, float]:
+    """Return the 95% Wilson score interval of successes out of samples."""
+    # LOCAL VARIABLES
+    rate = successes / samples                 # Observed rate
+    z_squared = CONFIDENCE_Z * CONFIDENCE_Z    # Quantile squared
+    center = 0.0                               # Interval center
+    half_width = 0.0                           # Interval half width
+
+    # CALCULATE IT
+    center = (rate + z_squared / (2 * samples)) / (1 + z_squared / samples)
+    half_width = (CONFIDENCE_Z / (1 + z_squared / samples)
+                  * math.sqrt(rate * (1 - rate) / samples + z_squared / (4 * samples * samples)))
+
+    # DONE
+    return (max(0.0, center - half_width), min(1.0, center + half_width))
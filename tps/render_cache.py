@@ -0,0 +1,352 @@
+"""Defines the Two Point Science render cache.
+
+RenderCache is a content-addressed, size-bounded cache of rendered graphs.  Renders are keyed by
+a hash of the DOT source, layout engine, and output format so an identical graph reuses the
+previously rendered file instead of invoking the layout engine again.  pipe_graph() renders a graph
+straight to bytes, piping the DOT source through the layout engine's stdin and stdout, for callers
+that have no use for files on disk.
+
+    Typical usage example:
+
+    from tps.dgraph import create_graph
+    from tps.render_cache import pipe_graph, RenderCache
+    cache = RenderCache('graphs')
+    graph = create_graph(TPHHospital('Grockle Bay'), 'graphs')
+    cache.view(graph)              # Renders with dot
+    cache.view(graph)              # Opens the cached file
+    print(cache.get_stats())
+    png_bytes = pipe_graph(graph)  # Renders with dot, no files
+"""
+
+# Standard
+from typing import Any, Dict
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+
+# Third Party
+
+# Local
+from tps.svg_digraph import TPS_ENGINE
+
+
+# MACROS
+# Name of the cache directory created inside the graph directory
+RENDER_CACHE_DIRNAME = '.tps_render_cache'
+# Default maximum size, in bytes, of all cached renders
+RENDER_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+class RenderCache:
+    """Content-addressed, LRU-evicted cache of rendered graph files."""
+
+    def __init__(self, graph_dir: str, max_bytes: int = RENDER_CACHE_MAX_BYTES) -> None:
+        """RenderCache class ctor.
+
+        Args:
+            graph_dir: Graph storage directory.  The cache lives in a RENDER_CACHE_DIRNAME
+                directory inside it.
+            max_bytes: Optional; Maximum total size of cached renders before the least recently
+                used renders are evicted.
+
+        Raises:
+            TypeError: Bad data type passed in.
+            ValueError: Invalid max_bytes.
+        """
+        # INPUT VALIDATION
+        if not isinstance(graph_dir, str):
+            raise TypeError(f'The graph_dir argument must of type str instead of {type(graph_dir)}')
+        if not isinstance(max_bytes, int):
+            raise TypeError(f'The max_bytes argument must of type int instead of {type(max_bytes)}')
+        if max_bytes < 1:
+            raise ValueError(f'The max_bytes value ({max_bytes}) must be greater than zero')
+
+        # INSTANCE ATTRIBUTES
+        self._cache_dir = os.path.join(graph_dir, RENDER_CACHE_DIRNAME)  # Cached renders
+        self._max_bytes = max_bytes                                      # Size bound
+        self._index = None             # Filename: (last use, size); loaded on first use
+        self._lock = threading.Lock()  # Guards the index and stats
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get_cache_dir(self) -> str:
+        """Return the directory holding the cached renders."""
+        return self._cache_dir
+
+    def get_key(self, source: str, engine: str, graph_format: str) -> str:
+        """Return the content-addressed cache key for a DOT source, engine, and format."""
+        # LOCAL VARIABLES
+        hasher = hashlib.sha256()  # Hashes the render inputs
+
+        # HASH IT
+        for part in (engine, graph_format, source):
+            hasher.update(part.encode('utf-8'))
+            hasher.update(b'\0')
+
+        # DONE
+        return hasher.hexdigest()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return a copy of the cache statistics, including the number and size of renders."""
+        with self._lock:
+            self._load_index()
+            stats = dict(self._stats)
+            stats['entries'] = len(self._index)
+            stats['bytes'] = sum(size for _, size in self._index.values())
+            stats['max bytes'] = self._max_bytes
+        return stats
+
+    def pipe(self, graph: Any, timeout: float = None) -> bytes:
+        """Render graph, or reuse an identical cached render, and return the rendered bytes.
+
+        A miss is stored in the cache but never read back from it.
+
+        Args:
+            graph: Graph object with source, engine, and format attributes
+                (e.g., graphviz.Digraph).
+            timeout: Optional; Seconds to wait on the layout engine before giving up.
+
+        Raises:
+            RuntimeError: The layout engine failed.
+            subprocess.TimeoutExpired: The layout engine exceeded timeout.
+            FileNotFoundError: The layout engine is not installed.
+        """
+        # LOCAL VARIABLES
+        cache_path = self._check(graph)  # Cached render path, empty on a miss
+        data = b''                       # Rendered bytes
+
+        # READ IT
+        if cache_path:
+            try:
+                with open(cache_path, 'rb') as render_file:
+                    return render_file.read()
+            except FileNotFoundError:
+                pass  # Evicted by another process since the check; render it again
+
+        # RENDER IT
+        data = pipe_graph(graph, timeout=timeout)
+        self._store(graph, data)
+
+        # DONE
+        return data
+
+    def render(self, graph: Any, timeout: float = None) -> str:
+        """Render graph, or reuse an identical cached render, and return the rendered file path.
+
+        Args:
+            graph: Graph object with source, engine, and format attributes
+                (e.g., graphviz.Digraph).
+            timeout: Optional; Seconds to wait on the layout engine before giving up.
+
+        Raises:
+            RuntimeError: The layout engine failed.
+            subprocess.TimeoutExpired: The layout engine exceeded timeout.
+            FileNotFoundError: The layout engine is not installed.
+        """
+        # LOCAL VARIABLES
+        cache_path = self._check(graph)  # Cached render path, empty on a miss
+
+        # RENDER IT
+        if not cache_path:
+            cache_path = self._store(graph, pipe_graph(graph, timeout=timeout))
+
+        # DONE
+        return cache_path
+
+    def view(self, graph: Any, export: bool = True, timeout: float = None) -> str:
+        """Render graph through the cache and open it in the system viewer.
+
+        Args:
+            graph: Graph object with source, engine, format, and filepath attributes
+                (e.g., graphviz.Digraph).
+            export: Optional; If True, also link the render to graph's usual on-disk filename
+                (e.g., graph_dir/Grockle Bay (dot).png).
+            timeout: Optional; Seconds to wait on the layout engine before giving up.
+
+        Returns:
+            The path of the file that was opened.
+        """
+        # LOCAL VARIABLES
+        view_path = self.render(graph, timeout=timeout)  # Path to open
+
+        # EXPORT IT
+        if export:
+            view_path = export_render(view_path, graph.filepath + '.' + graph.format)
+
+        # VIEW IT
+        import graphviz  # pylint: disable=import-outside-toplevel
+        graphviz.view(view_path)
+
+        # DONE
+        return view_path
+
+    def _check(self, graph: Any) -> str:
+        """Return the path of graph's cached render, counting the hit, or count the miss."""
+        # LOCAL VARIABLES
+        filename = self._get_filename(graph)                  # Cached render filename
+        cache_path = os.path.join(self._cache_dir, filename)  # Cached render path
+
+        # CHECK CACHE
+        with self._lock:
+            self._load_index()
+            if filename in self._index and os.path.isfile(cache_path):
+                self._touch(filename, cache_path)
+                self._stats['hits'] = self._stats['hits'] + 1
+                return cache_path
+            self._stats['misses'] = self._stats['misses'] + 1
+
+        # DONE
+        return ''
+
+    def _evict(self, keep: str) -> None:
+        """Evict least recently used renders, never keep, until under max_bytes.  Hold the lock."""
+        # LOCAL VARIABLES
+        total = sum(size for _, size in self._index.values())  # Current cache size
+
+        # EVICT
+        for filename, (_, size) in sorted(self._index.items(), key=lambda item: item[1][0]):
+            if total <= self._max_bytes:
+                break
+            if filename == keep:
+                continue
+            try:
+                os.remove(os.path.join(self._cache_dir, filename))
+            except FileNotFoundError:
+                pass  # Another process beat us to it
+            del self._index[filename]
+            total = total - size
+            self._stats['evictions'] = self._stats['evictions'] + 1
+
+    def _get_filename(self, graph: Any) -> str:
+        """Return the cached render filename of graph."""
+        return self.get_key(graph.source, graph.engine, graph.format) + '.' + graph.format
+
+    def _load_index(self) -> None:
+        """Build the index from the cache directory, if it hasn't been built.  Hold the lock."""
+        if self._index is not None:
+            return
+        self._index = {}
+        if os.path.isdir(self._cache_dir):
+            for entry in os.scandir(self._cache_dir):
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    self._index[entry.name] = tuple((entry.stat().st_mtime,
+                                                     entry.stat().st_size))
+
+    def _touch(self, filename: str, cache_path: str) -> None:
+        """Mark filename as most recently used.  Hold the lock."""
+        os.utime(cache_path)
+        self._index[filename] = tuple((os.path.getmtime(cache_path), self._index[filename][1]))
+
+    def _store(self, graph: Any, data: bytes) -> str:
+        """Store graph's rendered data in the cache, evicting as needed, and return its path."""
+        # LOCAL VARIABLES
+        filename = self._get_filename(graph)                  # Cached render filename
+        cache_path = os.path.join(self._cache_dir, filename)  # Cached render path
+
+        # STORE IT
+        write_atomic(cache_path, data)
+        with self._lock:
+            self._load_index()
+            self._index[filename] = tuple((os.path.getmtime(cache_path), len(data)))
+            self._evict(keep=filename)
+
+        # DONE
+        return cache_path
+
+
+def export_render(render_path: str, export_path: str) -> str:
+    """Hard link (or copy) a rendered file to export_path and return export_path."""
+    # INPUT VALIDATION
+    if not isinstance(render_path, str):
+        raise TypeError(f'The render_path must of type str instead of {type(render_path)}')
+    if not isinstance(export_path, str):
+        raise TypeError(f'The export_path must of type str instead of {type(export_path)}')
+
+    # EXPORT IT
+    if os.path.dirname(export_path):
+        os.makedirs(os.path.dirname(export_path), exist_ok=True)
+    if os.path.lexists(export_path):
+        os.remove(export_path)
+    try:
+        os.link(render_path, export_path)
+    except OSError:
+        shutil.copyfile(render_path, export_path)
+
+    # DONE
+    return export_path
+
+
+def pipe_graph(graph: Any, timeout: float = None) -> bytes:
+    """Render graph straight to bytes, without writing its source or its render to disk.
+
+    Args:
+        graph: Graph object with source, engine, and format attributes (e.g., graphviz.Digraph).
+            An SVGDigraph (see: svg_digraph module) renders in-process.
+        timeout: Optional; Seconds to wait on the layout engine before giving up.  Doesn't apply
+            to in-process renders.
+
+    Raises:
+        RuntimeError: The layout engine failed.
+        subprocess.TimeoutExpired: The layout engine exceeded timeout.
+        FileNotFoundError: The layout engine is not installed.
+    """
+    if graph.engine == TPS_ENGINE:
+        return graph.pipe()
+    return pipe_source(graph.source, engine=graph.engine, graph_format=graph.format,
+                       timeout=timeout)
+
+
+def pipe_source(source: str, engine: str = 'dot', graph_format: str = 'png',
+                timeout: float = None) -> bytes:
+    """Lay out DOT source with the engine binary through stdin/stdout and return the output.
+
+    Args:
+        source: DOT source (e.g., graphviz.Digraph.source).
+        engine: Optional; Layout engine binary: [dot], neato, sfdp, fdp
+        graph_format: Optional; Output format: [png], pdf, svg
+        timeout: Optional; Seconds to wait on the layout engine before giving up.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        RuntimeError: The layout engine failed.
+        subprocess.TimeoutExpired: The layout engine exceeded timeout.
+        FileNotFoundError: The layout engine is not installed.
+    """
+    # LOCAL VARIABLES
+    result = None  # Completed layout engine process
+
+    # INPUT VALIDATION
+    for arg_name, arg_value in (('source', source), ('engine', engine),
+                                ('graph_format', graph_format)):
+        if not isinstance(arg_value, str):
+            raise TypeError(f'The {arg_name} argument must of type str instead of '
+                            f'{type(arg_value)}')
+
+    # PIPE IT
+    result = subprocess.run([engine, '-T' + graph_format], input=source.encode('utf-8'),
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout,
+                            check=False)
+    if result.returncode:
+        raise RuntimeError(f'{engine} failed with exit code {result.returncode}: '
+                           f'{result.stderr.decode("utf-8", errors="replace").strip()}')
+
+    # DONE
+    return result.stdout
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Write data to path so concurrent readers never see a partial file.
+
+    Data is written to a temp file beside path, which then replaces path.  path's directory is
+    created if necessary.
+    """
+    # LOCAL VARIABLES
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'  # Unique temp file
+
+    # WRITE IT
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(temp_path, 'wb') as out_file:
+        out_file.write(data)
+    os.replace(temp_path, path)
@@ -0,0 +1,161 @@
+"""Defines the Two Point Science background render queue.
+
+RenderQueue lays graphs out on background worker threads so the interactive menus never wait on
+the layout engine.  Identical in-flight requests are deduplicated, finished renders are opened in
+the system viewer, and the queue reports how many renders are pending, running, completed, and
+failed.
+
+    Typical usage example:
+
+    from tps.render_cache import RenderCache
+    from tps.render_queue import RenderQueue
+    render_queue = RenderQueue(RenderCache('graphs'))
+    render_queue.view(graph)          # Returns immediately
+    print(render_queue.get_status())  # Renders: 0 pending, 1 running, 0 completed, 0 failed
+    render_queue.shutdown()           # Wait for the rest
+"""
+
+# Standard
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List
+import threading
+
+# Third Party
+
+# Local
+from tps.render_cache import RenderCache
+
+
+# MACROS
+# Default number of renders laid out at the same time
+RENDER_QUEUE_WORKERS = 2
+# Maximum number of unread completion notices kept
+RENDER_QUEUE_NOTICES = 10
+
+
+class RenderQueue:
+    """Deduplicating background queue of graph renders."""
+
+    def __init__(self, render_cache: RenderCache, max_workers: int = RENDER_QUEUE_WORKERS) -> None:
+        """RenderQueue class ctor.
+
+        Args:
+            render_cache: RenderCache to render through. (see: render_cache module)
+            max_workers: Optional; Maximum number of renders laid out at the same time.
+
+        Raises:
+            TypeError: Bad data type passed in.
+            ValueError: Invalid max_workers.
+        """
+        # INPUT VALIDATION
+        if not isinstance(render_cache, RenderCache):
+            raise TypeError(f'The render_cache can not be of type {type(render_cache)}')
+        if not isinstance(max_workers, int):
+            raise TypeError(f'The max_workers argument must of type int instead of '
+                            f'{type(max_workers)}')
+        if max_workers < 1:
+            raise ValueError(f'The max_workers value ({max_workers}) must be greater than zero')
+
+        # INSTANCE ATTRIBUTES
+        self._render_cache = render_cache  # Renders go through this cache
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='tps-render')
+        self._in_flight = {}               # (Cache key, export path): Future
+        self._notices = deque(maxlen=RENDER_QUEUE_NOTICES)  # Unread completion notices
+        self._lock = threading.Lock()      # Guards everything above and the counts
+        self._counts = {'pending': 0, 'running': 0, 'completed': 0, 'failed': 0,
+                        'deduplicated': 0}
+
+    def get_counts(self) -> Dict[str, int]:
+        """Return a copy of the pending, running, completed, failed, and deduplicated counts."""
+        with self._lock:
+            return dict(self._counts)
+
+    def get_notices(self) -> List[str]:
+        """Return, and forget, the completion notices that haven't been read yet."""
+        with self._lock:
+            notices = list(self._notices)
+            self._notices.clear()
+        return notices
+
+    def get_render_cache(self) -> RenderCache:
+        """Return the RenderCache renders go through."""
+        return self._render_cache
+
+    def get_status(self) -> str:
+        """Return a one-line summary of the queue counts."""
+        # LOCAL VARIABLES
+        counts = self.get_counts()  # Current counts
+
+        # DONE
+        return (f"Renders: {counts['pending']} pending, {counts['running']} running, "
+                f"{counts['completed']} completed, {counts['failed']} failed")
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting renders.  If wait is True, block until the queued renders finish."""
+        self._executor.shutdown(wait=wait)
+
+    def submit(self, graph: Any, view: bool = True, timeout: float = None) -> Future:
+        """Queue graph to be rendered, and opened if view is True, on a worker thread.
+
+        A request identical to one that is still pending or running is not queued again; the
+        in-flight request's Future is returned instead.
+
+        Args:
+            graph: Graph object with source, engine, format, and filepath attributes
+                (e.g., graphviz.Digraph).
+            view: Optional; If True, open the render in the system viewer when it's done.
+            timeout: Optional; Seconds to wait on the layout engine before giving up.
+
+        Returns:
+            A Future whose result is the rendered file path.
+        """
+        # LOCAL VARIABLES
+        # Requests with the same content and on-disk filename are the same request
+        request_key = tuple((self._render_cache.get_key(graph.source, graph.engine, graph.format),
+                             graph.filepath))
+        future = None  # Return value
+
+        # QUEUE IT
+        with self._lock:
+            if request_key in self._in_flight:
+                self._counts['deduplicated'] = self._counts['deduplicated'] + 1
+                return self._in_flight[request_key]
+            self._counts['pending'] = self._counts['pending'] + 1
+            future = self._executor.submit(self._run, graph, view, timeout)
+            self._in_flight[request_key] = future
+        future.add_done_callback(lambda done: self._finish(request_key, graph.filepath, done))
+
+        # DONE
+        return future
+
+    def view(self, graph: Any, timeout: float = None) -> Future:
+        """Queue graph to be rendered and opened in the system viewer.  See: submit()."""
+        return self.submit(graph, view=True, timeout=timeout)
+
+    def _finish(self, request_key: tuple, filepath: str, future: Future) -> None:
+        """Record the outcome of a render.  Called once future is done."""
+        with self._lock:
+            self._in_flight.pop(request_key, None)
+            if future.cancelled():
+                self._counts['pending'] = self._counts['pending'] - 1
+            elif future.exception():
+                self._counts['failed'] = self._counts['failed'] + 1
+                self._notices.append(f'FAILED {filepath}: {future.exception()}')
+            else:
+                self._counts['completed'] = self._counts['completed'] + 1
+                self._notices.append(f'Rendered {future.result()}')
+
+    def _run(self, graph: Any, view: bool, timeout: float) -> str:
+        """Render graph on a worker thread."""
+        with self._lock:
+            self._counts['pending'] = self._counts['pending'] - 1
+            self._counts['running'] = self._counts['running'] + 1
+        try:
+            if view:
+                return self._render_cache.view(graph, timeout=timeout)
+            return self._render_cache.render(graph, timeout=timeout)
+        finally:
+            with self._lock:
+                self._counts['running'] = self._counts['running'] - 1
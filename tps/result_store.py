@@ -0,0 +1,461 @@
+"""Defines the Two Point Science result store.
+
+ResultStore is an on-disk SQLite cache of per-hospital computed results (e.g., edge counts,
+danger aggregates, build orders, simulation summaries).  Every result is stored under a hash of
+the catalog it was computed from (TPH_ROOM_DICT, TPH_ILLNESS_DICT, and TPH_HOSPITAL_DICT, with
+MISSING_DATA serialized canonically) so results computed from older data are never read as
+current.  They're kept, instead, as a history across data revisions until they're pruned.
+
+Results are JSON.  Each result kind (see: RESULT_KINDS) knows how to compute one hospital's
+result and how to rebuild its namedtuples (e.g., BuildPlan) when the result is read back.
+Results of every hospital are read with one indexed query and written with one bulk insert.
+Danger strategies are stored by key (see: danger_strategies.get_strategy_key()), not by ID,
+since the IDs of strategies registered at runtime differ from process to process.
+
+    Typical usage example:
+
+    from tps.result_store import RESULT_BUILD_ORDER, ResultStore
+    with ResultStore('graphs/tps_results.sqlite3') as store:
+        plans = store.compute(RESULT_BUILD_ORDER, jobs=4)  # Hospital name: BuildPlan
+        plans = store.compute(RESULT_BUILD_ORDER, jobs=4)  # Read back, not recomputed
+"""
+
+# Standard
+from collections import namedtuple
+from typing import Any, Dict, List, Tuple
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+
+# Third Party
+
+# Local
+from tps.danger_strategies import get_strategy_key
+from tps.danger_table import (DANGER_COL_AGGREGATE, DANGER_COL_DEATH, DANGER_COL_DECLINE,
+                              DANGER_COL_DIFFICULTY, DANGER_COL_ILLNESS, get_danger_table)
+from tps.edge_model import get_edge_model
+from tps.missing_data import MissingData
+from tps.simulation import SIM_PATIENTS
+from tps.tph_constants import TPH_HOSPITAL_DICT, TPH_ILLNESS_DICT, TPH_ROOM_DICT
+from tps.tph_hospital import get_configured_hospitals, TPHHospital, validate_hospital_list
+from tps.tph_registry import TPH_REGISTRY
+
+
+# MACROS
+# Version of the tables below; a store with any other version is rebuilt
+RESULT_STORE_SCHEMA = 2
+# Name of the result store created inside the graph directory
+RESULT_STORE_FILENAME = 'tps_results.sqlite3'
+# Result kinds
+RESULT_EDGES = 'edges'            # Room name: Edge count
+RESULT_DANGER = 'danger'          # Illness name: [difficulty, death, decline, aggregate]
+RESULT_BUILD_ORDER = 'build_order'  # BuildPlan (see: build_order module)
+RESULT_SIMULATION = 'simulation'  # SimulationReport (see: simulation module)
+
+# One result kind: default keyword parameters, compute(hospital, **params) returning the result,
+# decode(JSON value) rebuilding the result's namedtuples, and (or None) compute_many(hospital
+# names, jobs, **params) returning many hospitals' results, by name, from up to jobs processes
+ResultKind = namedtuple('ResultKind', 'defaults compute decode compute_many')
+
+# Tables
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS catalogs (catalog_hash TEXT PRIMARY KEY, first_seen REAL NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS results (catalog_hash TEXT NOT NULL, kind TEXT NOT NULL, '
+    'params TEXT NOT NULL, hospital TEXT NOT NULL, value TEXT NOT NULL, computed REAL NOT NULL, '
+    'PRIMARY KEY (catalog_hash, kind, params, hospital)) WITHOUT ROWID',
+    'CREATE INDEX IF NOT EXISTS results_by_hospital ON results (hospital, kind, params)',
+)
+
+
+class ResultStore:
+    """SQLite store of per-hospital results, keyed by the catalog they were computed from."""
+
+    def __init__(self, path: str) -> None:
+        """ResultStore class ctor.  Opens (or creates) the store.
+
+        Args:
+            path: SQLite database file.  Its directory is created if necessary.
+
+        Raises:
+            TypeError: Bad data type passed in.
+            ValueError: Empty path.
+            sqlite3.Error: The database could not be opened.
+        """
+        # INPUT VALIDATION
+        if not isinstance(path, str):
+            raise TypeError(f'The path argument must of type str instead of {type(path)}')
+        if not path:
+            raise ValueError('The path argument can not be empty')
+
+        # INSTANCE ATTRIBUTES
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._path = path                       # Database file
+        self._lock = threading.Lock()           # Serializes use of the connection
+        self._stats = {'hits': 0, 'misses': 0}  # Results read vs. computed
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+
+        # OPEN IT
+        self._open()
+
+    def __enter__(self) -> 'ResultStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def compute(self, kind: str, hospital_list: List[str] = None, jobs: int = 1,
+                **params) -> Dict[str, Any]:
+        """Return the kind result of every hospital in hospital_list, computing any not stored.
+
+        Stored results are read in one query and the computed ones are stored in one bulk
+        insert.  Hospitals that are not configured with illnesses are skipped.
+
+        Args:
+            kind: Result kind. (see: RESULT_KINDS)
+            hospital_list: Optional; Hospital names.  Defaults to TPH_HOSPITAL_LIST.
+            jobs: Optional; Maximum number of worker processes.  Kinds that can't compute in
+                parallel compute one hospital at a time.
+            params: Optional; The kind's parameters (e.g., strategy=2).  Defaults are filled in.
+
+        Returns:
+            Dictionary of hospital names to results, in hospital_list order.
+
+        Raises:
+            TypeError: Bad data type passed in.
+            ValueError: Unknown kind, parameter, or hospital name, a strategy with no key, or
+                invalid jobs.
+        """
+        # LOCAL VARIABLES
+        params = _validate_params(kind, params)  # Every parameter of kind
+        stored = {}                              # Hospital name: Stored result
+        missing = []                             # Hospital names to compute
+        computed = {}                            # Hospital name: JSON-able computed result
+
+        # INPUT VALIDATION
+        hospital_list = validate_hospital_list(hospital_list)
+        if not isinstance(jobs, int):
+            raise TypeError(f'The jobs argument must of type int instead of {type(jobs)}')
+        if jobs < 1:
+            raise ValueError(f'The jobs value ({jobs}) must be greater than zero')
+
+        # READ IT
+        stored = self.get_all(kind, **params)
+
+        # COMPUTE THE REST
+        missing = [hospital_name for hospital_name in hospital_list if hospital_name not in stored]
+        if RESULT_KINDS[kind].compute_many and jobs > 1 and len(missing) > 1:
+            computed = {hospital_name: _to_json_value(result) for hospital_name, result in
+                        RESULT_KINDS[kind].compute_many(missing, jobs, **params).items()}
+        else:
+            computed = {hospital.get_name(): _to_json_value(RESULT_KINDS[kind].compute(hospital,
+                                                                                       **params))
+                        for hospital in get_configured_hospitals(missing)}
+        if computed:
+            self.put_many(kind, computed, **params)
+        with self._lock:
+            self._stats['hits'] = self._stats['hits'] + len(hospital_list) - len(missing)
+            self._stats['misses'] = self._stats['misses'] + len(computed)
+
+        # DONE
+        return {hospital_name: (stored[hospital_name] if hospital_name in stored else
+                                RESULT_KINDS[kind].decode(computed[hospital_name]))
+                for hospital_name in hospital_list
+                if hospital_name in stored or hospital_name in computed}
+
+    def get(self, kind: str, hospital_name: str, **params) -> Any:
+        """Return hospital_name's current kind result, None if it hasn't been stored.
+
+        Raises:
+            TypeError: Bad data type passed in.
+            ValueError: Unknown kind or parameter, or a strategy with no key.
+        """
+        # LOCAL VARIABLES
+        params = _validate_params(kind, params)  # Every parameter of kind
+        row = None                               # Stored value column
+
+        # INPUT VALIDATION
+        if not isinstance(hospital_name, str):
+            raise TypeError(f'The hospital_name argument must of type str instead of '
+                            f'{type(hospital_name)}')
+
+        # READ IT
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT value FROM results WHERE catalog_hash = ? AND kind = ? AND params = ? '
+                'AND hospital = ?', (catalog_hash(), kind, _get_params_key(params),
+                                     hospital_name)).fetchone()
+
+        # DONE
+        return RESULT_KINDS[kind].decode(json.loads(row[0])) if row else None
+
+    def get_all(self, kind: str, **params) -> Dict[str, Any]:
+        """Return every hospital's current kind result that has been stored, by hospital name.
+
+        Raises:
+            TypeError: Bad data type passed in.
+            ValueError: Unknown kind or parameter, or a strategy with no key.
+        """
+        # LOCAL VARIABLES
+        params = _validate_params(kind, params)  # Every parameter of kind
+        rows = []                                # (Hospital name, value) rows
+
+        # READ IT
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT hospital, value FROM results WHERE catalog_hash = ? AND kind = ? '
+                'AND params = ?', (catalog_hash(), kind, _get_params_key(params))).fetchall()
+
+        # DONE
+        return {hospital_name: RESULT_KINDS[kind].decode(json.loads(value))
+                for hospital_name, value in rows}
+
+    def get_history(self, kind: str, hospital_name: str, **params) -> List[Tuple[str, float, Any]]:
+        """Return hospital_name's kind result for every catalog it was computed from.
+
+        Returns:
+            A list of (catalog hash, seconds since the epoch it was computed, result), oldest
+            first.
+
+        Raises:
+            TypeError: Bad data type passed in.
+            ValueError: Unknown kind or parameter, or a strategy with no key.
+        """
+        # LOCAL VARIABLES
+        params = _validate_params(kind, params)  # Every parameter of kind
+        rows = []                                # (Catalog hash, computed, value) rows
+
+        # INPUT VALIDATION
+        if not isinstance(hospital_name, str):
+            raise TypeError(f'The hospital_name argument must of type str instead of '
+                            f'{type(hospital_name)}')
+
+        # READ IT
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT catalog_hash, computed, value FROM results WHERE hospital = ? AND '
+                'kind = ? AND params = ? ORDER BY computed',
+                (hospital_name, kind, _get_params_key(params))).fetchall()
+
+        # DONE
+        return [tuple((row[0], row[1], RESULT_KINDS[kind].decode(json.loads(row[2]))))
+                for row in rows]
+
+    def get_path(self) -> str:
+        """Return the database file."""
+        return self._path
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return a copy of the store statistics, including the number of stored results."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['current results'] = self._connection.execute(
+                'SELECT COUNT(*) FROM results WHERE catalog_hash = ?',
+                (catalog_hash(),)).fetchone()[0]
+            stats['historical results'] = self._connection.execute(
+                'SELECT COUNT(*) FROM results WHERE catalog_hash != ?',
+                (catalog_hash(),)).fetchone()[0]
+        return stats
+
+    def prune(self) -> int:
+        """Delete every result computed from another catalog and return how many were deleted."""
+        with self._lock, self._connection:
+            return self._connection.execute('DELETE FROM results WHERE catalog_hash != ?',
+                                            (catalog_hash(),)).rowcount
+
+    def put_many(self, kind: str, results: Dict[str, Any], **params) -> None:
+        """Store the current kind result of many hospitals in one transaction.
+
+        Args:
+            kind: Result kind. (see: RESULT_KINDS)
+            results: Dictionary of hospital names to JSON-able results (namedtuples are stored as
+                JSON objects).  Existing results are replaced.
+            params: Optional; The kind's parameters the results were computed with.
+
+        Raises:
+            TypeError: Bad data type passed in.
+            ValueError: Unknown kind or parameter, or a strategy with no key.
+        """
+        # LOCAL VARIABLES
+        params = _validate_params(kind, params)  # Every parameter of kind
+        params_key = _get_params_key(params)     # Serialized params
+        now = time.time()                        # Computed time of every result
+
+        # INPUT VALIDATION
+        if not isinstance(results, dict):
+            raise TypeError(f'The results argument must of type dict instead of {type(results)}')
+
+        # STORE IT
+        with self._lock, self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)',
+                [(catalog_hash(), kind, params_key, hospital_name,
+                  _dump(_to_json_value(result)), now)
+                 for hospital_name, result in results.items()])
+
+    def _open(self) -> None:
+        """Create or upgrade the tables and record the current catalog."""
+        # LOCAL VARIABLES
+        version = None  # Stored schema version row
+
+        # OPEN IT
+        with self._lock, self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')  # Readers don't block writers
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.execute(_SCHEMA[0])
+            version = self._connection.execute(
+                "SELECT value FROM meta WHERE key = 'schema'").fetchone()
+            if version and version[0] != str(RESULT_STORE_SCHEMA):
+                self._connection.execute('DROP TABLE IF EXISTS results')
+                self._connection.execute('DROP TABLE IF EXISTS catalogs')
+            for statement in _SCHEMA[1:]:
+                self._connection.execute(statement)
+            self._connection.execute("INSERT OR REPLACE INTO meta VALUES ('schema', ?)",
+                                     (str(RESULT_STORE_SCHEMA),))
+            self._connection.execute('INSERT OR IGNORE INTO catalogs VALUES (?, ?)',
+                                     (catalog_hash(), time.time()))
+
+
+def catalog_hash() -> str:
+    """Return the SHA-256 hash of TPH_ROOM_DICT, TPH_ILLNESS_DICT, and TPH_HOSPITAL_DICT.
+
+    The dictionaries are hashed once per catalog compile. (see: tph_registry module)
+    """
+    return TPH_REGISTRY.get((ResultStore, 'catalog_hash'), lambda: hashlib.sha256(
+        _dump([_canonical(TPH_ROOM_DICT), _canonical(TPH_ILLNESS_DICT),
+               _canonical(TPH_HOSPITAL_DICT)]).encode('utf-8')).hexdigest())
+
+
+def get_store_path(graph_dir: str) -> str:
+    """Return the path of the result store inside graph_dir."""
+    if not isinstance(graph_dir, str):
+        raise TypeError(f'The graph_dir argument must of type str instead of {type(graph_dir)}')
+    return os.path.join(graph_dir, RESULT_STORE_FILENAME)
+
+
+def _canonical(value: Any) -> Any:
+    """Translate a tph_constants value into plain, deterministically ordered JSON values."""
+    if isinstance(value, MissingData):
+        return {'missing_data': repr(value.get_data())}
+    if isinstance(value, dict):
+        return [[str(key), _canonical(item)] for key, item in sorted(value.items())]
+    if isinstance(value, tuple) and hasattr(value, '_fields'):
+        return {field: _canonical(item) for field, item in zip(value._fields, value)}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    return value
+
+
+def _compute_build_order(hospital: TPHHospital, mode: str, by_danger: bool,
+                         strategy: int) -> Any:
+    """Plan hospital's build order.  The planner is imported the first time it's needed."""
+    # pylint: disable=import-outside-toplevel
+    from tps.build_order import plan_build_order
+    return plan_build_order(hospital, mode=mode, by_danger=by_danger, strategy=strategy)
+
+
+def _compute_build_orders(hospital_list: List[str], jobs: int, mode: str, by_danger: bool,
+                          strategy: int) -> Dict[str, Any]:
+    """Plan many hospitals' build orders in up to jobs processes."""
+    # pylint: disable=import-outside-toplevel
+    from tps.build_order import plan_all_build_orders
+    return plan_all_build_orders(hospital_list, mode=mode, by_danger=by_danger, strategy=strategy,
+                                 jobs=jobs)
+
+
+def _compute_danger(hospital: TPHHospital, strategy: int) -> Dict[str, list]:
+    """Return hospital's raw danger values, by illness name."""
+    # LOCAL VARIABLES
+    table = get_danger_table(hospital, strategy=strategy)  # Shared DangerTable
+    values = [table.get_values(column) for column in (DANGER_COL_DIFFICULTY, DANGER_COL_DEATH,
+                                                      DANGER_COL_DECLINE, DANGER_COL_AGGREGATE)]
+
+    # DONE
+    return {name: [column[index] for column in values]
+            for index, name in enumerate(table.get_values(DANGER_COL_ILLNESS))}
+
+
+def _compute_simulation(hospital: TPHHospital, patients: int, seed: int) -> Any:
+    """Simulate hospital.  The simulator is imported the first time it's needed."""
+    # pylint: disable=import-outside-toplevel
+    from tps.simulation import HospitalSimulation
+    return HospitalSimulation(hospital, seed=seed).run(patients=patients)
+
+
+def _decode_build_order(value: dict) -> Any:
+    """Rebuild a stored BuildPlan."""
+    # pylint: disable=import-outside-toplevel
+    from tps.build_order import BuildPlan, BuildStep
+    return BuildPlan(**dict(value, steps=[BuildStep(step['room_name'], step['covered'],
+                                                    tuple(step['illnesses']))
+                                          for step in value['steps']]))
+
+
+def _decode_simulation(value: dict) -> Any:
+    """Rebuild a stored SimulationReport."""
+    # pylint: disable=import-outside-toplevel
+    from tps.simulation import RoomReport, SimulationReport
+    return SimulationReport(**dict(value, rooms=[RoomReport(**room) for room in value['rooms']]))
+
+
+def _dump(value: Any) -> str:
+    """Serialize value as compact, key-sorted JSON."""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), allow_nan=False)
+
+
+def _get_params_key(params: dict) -> str:
+    """Serialize params as the results' params column, with the strategy ID as its key.
+
+    Raises:
+        ValueError: The strategy has no key. (see: danger_strategies.get_strategy_key())
+    """
+    if 'strategy' in params:
+        return _dump(dict(params, strategy=get_strategy_key(params['strategy'])))
+    return _dump(params)
+
+
+def _to_json_value(value: Any) -> Any:
+    """Translate a result into JSON values: namedtuples to objects and NaN to null."""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, tuple) and hasattr(value, '_fields'):
+        return {field: _to_json_value(item) for field, item in zip(value._fields, value)}
+    if isinstance(value, dict):
+        return {str(key): _to_json_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json_value(item) for item in value]
+    return value
+
+
+def _validate_params(kind: str, params: dict) -> dict:
+    """Validate kind and params and return params with the kind's defaults filled in."""
+    if kind not in RESULT_KINDS:
+        raise ValueError(f'The result kind {kind} is not one of {tuple(RESULT_KINDS)}')
+    for name in params:
+        if name not in RESULT_KINDS[kind].defaults:
+            raise ValueError(f'The {kind} results have no {name} parameter')
+    return dict(RESULT_KINDS[kind].defaults, **params)
+
+
+# Result kind: ResultKind
+RESULT_KINDS = {
+    RESULT_EDGES: ResultKind({'sep_rooms': False}, lambda hospital, sep_rooms: get_edge_model(
+        hospital, sep_rooms=sep_rooms).get_degree_counts(), dict, None),
+    RESULT_DANGER: ResultKind({'strategy': 2}, _compute_danger, dict, None),
+    # 'auto' is BUILD_AUTO; the build_order module is imported the first time it's needed
+    RESULT_BUILD_ORDER: ResultKind({'mode': 'auto', 'by_danger': True, 'strategy': 2},
+                                   _compute_build_order, _decode_build_order,
+                                   _compute_build_orders),
+    RESULT_SIMULATION: ResultKind({'patients': SIM_PATIENTS, 'seed': 1}, _compute_simulation,
+                                  _decode_simulation, None),
+}
@@ -0,0 +1,386 @@
+"""Defines the Two Point Science local HTTP service.
+
+TPSServer is a threaded HTTP server, bound to localhost, that answers JSON queries about the
+hospitals and serves rendered graphs as SVG or PNG (or PDF).  The process stays warm: hospitals,
+illnesses, edge models, and danger tables are built once and shared through TPH_REGISTRY, graphs
+are piped through the layout engine straight to bytes (see: dgraph.render_bytes()) without
+touching the disk, and every response body is kept in a byte-bounded, least-recently-used
+ResponseCache.  Renders can also be kept in the on-disk RenderCache (see: render_cache module) so
+they outlive the process.  Identical requests that arrive while a response
+is being built wait for it instead of building it again.
+
+Endpoints (GET):
+    /hospitals                                      Every hospital and whether it's configured
+    /hospitals/<hospital>                           Illness and room names
+    /hospitals/<hospital>/edges?sep_rooms=1         Room connection (edge) counts
+    /hospitals/<hospital>/danger?strategy=2&sort=6&desc=1
+                                                    Illness danger table, raw values
+    /hospitals/<hospital>/graph.<format>            Hospital graph
+    /hospitals/<hospital>/illnesses/<illness>/graph.<format>
+    /hospitals/<hospital>/rooms/<room>/graph.<format>
+    /strategies                                     Danger aggregate strategies
+    /stats                                          Cache statistics
+
+Graph endpoints take engine (dot, neato, sfdp, fdp, tps), sep_rooms, and weighted query
+parameters.  Names are URL-encoded (e.g., /hospitals/Grockle%20Bay).  Other query parameters
+are ignored.  Errors are JSON objects with an error message.  /stats is never cached.
+
+    Typical usage example:
+
+    python3 -m tps -g graphs serve --port 8080 --cache-renders
+    curl 'http://127.0.0.1:8080/hospitals/Smogley/danger?sort=4'
+
+    from tps.server import TPSServer
+    server = TPSServer('graphs', port=8080)
+    server.serve_forever()
+"""
+
+# Standard
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Hashable, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+import json
+import threading
+
+# Third Party
+
+# Local
+from tps.commands import check_target
+from tps.danger_strategies import get_strategies
+from tps.danger_table import DANGER_COL_AGGREGATE, get_danger_table
+from tps.dgraph import GRAPH_HOSPITAL, GRAPH_ILLNESS, GRAPH_ROOM, render_bytes
+from tps.exporters import DANGER_EXPORT_COLUMNS, EDGE_EXPORT_COLUMNS, iter_edge_rows, raw_value
+from tps.render_cache import RenderCache
+from tps.tph_catalog import TPH_CATALOG
+from tps.tph_constants import TPH_HOSPITAL_LIST
+from tps.tph_hospital import get_configured_hospitals, TPHHospital
+from tps.tph_registry import TPH_REGISTRY
+
+
+# MACROS
+# The only interface the service listens on
+SERVE_HOST = '127.0.0.1'
+# Default port
+SERVE_PORT = 8080
+# Default maximum size, in bytes, of all cached response bodies
+SERVE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Default number of seconds one graph may render
+SERVE_TIMEOUT = 60.0
+# Content type of each response format
+CONTENT_TYPES = {'json': 'application/json', 'svg': 'image/svg+xml', 'png': 'image/png',
+                 'pdf': 'application/pdf'}
+# Query parameter values that mean True
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+# Query parameters the endpoints read; any others are ignored and kept out of the cache key
+QUERY_PARAMETERS = ('desc', 'engine', 'sep_rooms', 'sort', 'strategy', 'weighted')
+
+
+class ResponseCache:
+    """Byte-bounded, thread-safe LRU cache of response bodies that builds each body once."""
+
+    def __init__(self, max_bytes: int = SERVE_CACHE_MAX_BYTES) -> None:
+        """ResponseCache class ctor.
+
+        Args:
+            max_bytes: Optional; Maximum total size of cached bodies before the least recently
+                used bodies are evicted.
+
+        Raises:
+            TypeError: Bad data type passed in.
+            ValueError: Invalid max_bytes.
+        """
+        # INPUT VALIDATION
+        if not isinstance(max_bytes, int):
+            raise TypeError(f'The max_bytes argument must of type int instead of {type(max_bytes)}')
+        if max_bytes < 1:
+            raise ValueError(f'The max_bytes value ({max_bytes}) must be greater than zero')
+
+        # INSTANCE ATTRIBUTES
+        self._max_bytes = max_bytes     # Size bound
+        self._entries = OrderedDict()   # Key: (Content type, body), least recently used first
+        self._building = {}             # Key: Event set when the key's body is built (or fails)
+        self._bytes = 0                 # Total size of the cached bodies
+        self._lock = threading.Lock()   # Guards everything above and the stats
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, key: Hashable, factory: Callable[[], Tuple[str, bytes]]) -> Tuple[str, bytes]:
+        """Return the (content type, body) cached as key, calling factory() to build it if needed.
+
+        factory() runs without the lock held, so slow renders don't block other requests.
+        Exceptions raised by factory() propagate to the request that built it and nothing is
+        cached; requests that were waiting on it try again.
+        """
+        # LOCAL VARIABLES
+        event = None  # Set when another request finishes building key
+
+        # CHECK CACHE
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] = self._stats['hits'] + 1
+                    return self._entries[key]
+                event = self._building.get(key)
+                if not event:
+                    self._stats['misses'] = self._stats['misses'] + 1
+                    self._building[key] = threading.Event()
+                    break
+            event.wait()
+
+        # BUILD IT
+        try:
+            entry = factory()
+            with self._lock:
+                self._entries[key] = entry
+                self._bytes = self._bytes + len(entry[1])
+                self._evict(keep=key)
+        finally:
+            with self._lock:
+                self._building.pop(key).set()
+
+        # DONE
+        return entry
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return a copy of the cache statistics, including the number and size of bodies."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+            stats['max bytes'] = self._max_bytes
+        return stats
+
+    def _evict(self, keep: Hashable) -> None:
+        """Evict least recently used bodies, never keep, until under max_bytes.  Hold the lock."""
+        for key in list(self._entries):
+            if self._bytes <= self._max_bytes:
+                break
+            if key == keep:
+                continue
+            self._bytes = self._bytes - len(self._entries.pop(key)[1])
+            self._stats['evictions'] = self._stats['evictions'] + 1
+
+
+class TPSServer(ThreadingHTTPServer):
+    """Threaded localhost HTTP server answering Two Point Science queries."""
+
+    daemon_threads = True
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, graph_dir: str, port: int = SERVE_PORT,
+                 max_bytes: int = SERVE_CACHE_MAX_BYTES, timeout: float = SERVE_TIMEOUT,
+                 cache_renders: bool = False) -> None:
+        """TPSServer class ctor.  Binds SERVE_HOST:port.
+
+        Args:
+            graph_dir: Directory to store the render cache in, if renders are cached.
+            port: Optional; Port to listen on.  Zero picks a free port. (see: server_address)
+            max_bytes: Optional; Maximum total size of cached response bodies.
+            timeout: Optional; Seconds one graph may render before its request fails.
+            cache_renders: Optional; If True, keep renders in graph_dir's on-disk RenderCache,
+                shared with the menus, too.  Otherwise, nothing is written to disk.
+
+        Raises:
+            TypeError: Bad data type passed in.
+            ValueError: Invalid port, max_bytes, or timeout.
+            OSError: The port could not be bound.
+        """
+        # INPUT VALIDATION
+        if not isinstance(graph_dir, str):
+            raise TypeError(f'The graph_dir argument must of type str instead of {type(graph_dir)}')
+        if not isinstance(port, int):
+            raise TypeError(f'The port argument must of type int instead of {type(port)}')
+        if port < 0 or port > 65535:
+            raise ValueError(f'The port value ({port}) is not a valid port')
+        if not isinstance(timeout, (int, float)):
+            raise TypeError(f'The timeout argument can not be of type {type(timeout)}')
+        if timeout <= 0:
+            raise ValueError(f'The timeout value ({timeout}) must be greater than zero')
+        if not isinstance(cache_renders, bool):
+            raise TypeError(f'The cache_renders argument must of type bool instead of '
+                            f'{type(cache_renders)}')
+
+        # INSTANCE ATTRIBUTES
+        self.graph_dir = graph_dir                      # Graph storage directory
+        self.render_cache = None                        # On-disk renders, if they're cached
+        self.response_cache = ResponseCache(max_bytes)  # In-memory response bodies
+        self.render_timeout = timeout                   # Seconds one graph may render
+        if cache_renders:
+            self.render_cache = RenderCache(graph_dir)  # Shared with the menus
+
+        # BIND IT
+        super().__init__((SERVE_HOST, port), TPSRequestHandler)
+    # pylint: enable=too-many-arguments
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return the response cache, render cache (if any), and registry statistics."""
+        # LOCAL VARIABLES
+        stats = {'responses': self.response_cache.get_stats()}  # Return value
+
+        # GATHER THEM
+        if self.render_cache:
+            stats['renders'] = self.render_cache.get_stats()
+        stats['registry'] = TPH_REGISTRY.get_stats()
+
+        # DONE
+        return stats
+
+
+class TPSRequestHandler(BaseHTTPRequestHandler):
+    """Answers one TPSServer request.  Responses are built through the server's ResponseCache."""
+
+    server_version = 'TwoPointScience'
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Answer a GET request with a cached JSON, SVG, PNG, or PDF body."""
+        # LOCAL VARIABLES
+        url = urlsplit(self.path)                             # Parsed request path
+        parts = [unquote(part) for part in url.path.split('/') if part]  # Path segments
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()
+                 if key in QUERY_PARAMETERS}                  # Known query parameters
+        content_type = ''                                     # Response content type
+        body = b''                                            # Response body
+
+        # ANSWER IT
+        try:
+            if parts == ['stats']:
+                # Statistics change with every request; never cache them
+                content_type, body = CONTENT_TYPES['json'], _to_json(self.server.get_stats())
+            else:
+                content_type, body = self.server.response_cache.get(
+                    (TPH_CATALOG.generation, tuple(parts), tuple(sorted(query.items()))),
+                    lambda: _build_response(self.server, parts, query))
+            self._send(200, content_type, body)
+        except LookupError as err:
+            self._send_error(404, err)
+        except (TypeError, ValueError) as err:
+            self._send_error(400, err)
+        except Exception as err:  # pylint:disable=broad-except
+            self._send_error(500, err)
+
+    def log_message(self, format: str, *args) -> None:  # pylint: disable=redefined-builtin
+        """Keep the console quiet; requests are not logged."""
+
+    def _send(self, status: int, content_type: str, body: bytes) -> None:
+        """Send a complete response."""
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, error: Exception) -> None:
+        """Send error as a JSON error message."""
+        self._send(status, CONTENT_TYPES['json'],
+                   _to_json({'error': f'{type(error).__name__}: {error}'}))
+
+
+def _build_response(server: TPSServer, parts: list, query: dict) -> Tuple[str, bytes]:
+    """Route a request path, split into parts, and build its (content type, body).
+
+    Raises:
+        LookupError: Unknown endpoint, hospital, illness, or room.
+        ValueError: Invalid query parameter.
+    """
+    # LOCAL VARIABLES
+    hospital = None  # TPHHospital object named by the path
+    configured = []  # Names of the hospitals configured with illnesses
+
+    # ROUTE IT
+    if parts == ['hospitals']:
+        configured = [hospital.get_name() for hospital in get_configured_hospitals()]
+        return CONTENT_TYPES['json'], _to_json([{'name': name, 'configured': name in configured}
+                                                for name in TPH_HOSPITAL_LIST])
+    if parts == ['strategies']:
+        return CONTENT_TYPES['json'], _to_json([{'strategy': strategy, 'name': registered.name}
+                                                for strategy, registered in
+                                                get_strategies().items()])
+    if len(parts) < 2 or parts[0] != 'hospitals':
+        raise LookupError(f'Unknown endpoint: /{"/".join(parts)}')
+    if parts[1] not in TPH_HOSPITAL_LIST:
+        raise LookupError(f'Unknown hospital name: {parts[1]}')
+    if not get_configured_hospitals([parts[1]]):
+        raise LookupError(f'No illnesses configured for {parts[1]}')
+    hospital = TPHHospital(parts[1])
+    if len(parts) == 2:
+        return CONTENT_TYPES['json'], _to_json({
+            'name': hospital.get_name(), 'illnesses': sorted(hospital.get_illness_names()),
+            'rooms': hospital.get_room_list(sort_list=True)})
+    if parts[2:] == ['edges']:
+        return CONTENT_TYPES['json'], _to_json([
+            dict(zip([name for name, _ in EDGE_EXPORT_COLUMNS[1:]], row[1:]))
+            for row in iter_edge_rows([hospital.get_name()],
+                                      sep_rooms=_query_bool(query, 'sep_rooms'))])
+    if parts[2:] == ['danger']:
+        return CONTENT_TYPES['json'], _to_json(_danger_rows(hospital, query))
+    if parts[-1].startswith('graph.') and len(parts) in (3, 5):
+        return _render(server, hospital, parts, query)
+    raise LookupError(f'Unknown endpoint: /{"/".join(parts)}')
+
+
+def _danger_rows(hospital: TPHHospital, query: dict) -> list:
+    """Return hospital's danger table rows, as dictionaries of raw values, sorted by query."""
+    # LOCAL VARIABLES
+    table = get_danger_table(hospital, strategy=_query_int(query, 'strategy', 2))
+    names = [name for name, _ in DANGER_EXPORT_COLUMNS[1:-1]]  # Danger column names
+    values = [table.get_values(column) for column in range(1, len(names) + 1)]
+
+    # DONE
+    return [dict(zip(names, [raw_value(column[index]) for column in values]))
+            for index in table.get_order(_query_int(query, 'sort', DANGER_COL_AGGREGATE),
+                                         sort_desc=_query_bool(query, 'desc', True))]
+
+
+def _query_bool(query: dict, name: str, default: bool = False) -> bool:
+    """Return the bool query parameter name, default if it's absent."""
+    return query[name].lower() in TRUE_VALUES if name in query else default
+
+
+def _query_int(query: dict, name: str, default: int) -> int:
+    """Return the int query parameter name, default if it's absent.
+
+    Raises:
+        ValueError: The parameter is not an int.
+    """
+    try:
+        return int(query[name]) if name in query else default
+    except ValueError as err:
+        raise ValueError(f'The {name} query parameter must be an int') from err
+
+
+def _render(server: TPSServer, hospital: TPHHospital, parts: list,
+            query: dict) -> Tuple[str, bytes]:
+    """Render a graph endpoint straight to bytes, through the server's RenderCache if it has one.
+
+    Raises:
+        LookupError: Unknown illness or room.
+        ValueError: Invalid format or engine.
+    """
+    # LOCAL VARIABLES
+    graph_format = parts[-1][len('graph.'):]                 # Requested format
+    engine = query.get('engine', 'dot')                      # Layout engine
+    sep_rooms = _query_bool(query, 'sep_rooms')              # Separate dual-purpose rooms
+    weighted = _query_bool(query, 'weighted')                # Collapse parallel edges
+    kind = ({'illnesses': GRAPH_ILLNESS, 'rooms': GRAPH_ROOM}.get(parts[2], '')
+            if len(parts) == 5 else GRAPH_HOSPITAL)          # Graph kind
+
+    # INPUT VALIDATION
+    if graph_format not in CONTENT_TYPES or graph_format == 'json':
+        raise ValueError(f'The graph format {graph_format} is not svg, png, or pdf')
+    if not kind:
+        raise LookupError(f'Unknown endpoint: /{"/".join(parts)}')
+    if kind != GRAPH_HOSPITAL and check_target(kind, hospital.get_name(), parts[3], sep_rooms):
+        raise LookupError(f'{check_target(kind, hospital.get_name(), parts[3], sep_rooms)}: '
+                          f'{parts[3]}')
+
+    # DONE
+    return CONTENT_TYPES[graph_format], render_bytes(
+        hospital, kind=kind, item_name=parts[3] if kind != GRAPH_HOSPITAL else '',
+        sep_rooms=sep_rooms, engine=engine, graph_format=graph_format, weighted=weighted,
+        timeout=server.render_timeout, render_cache=server.render_cache)
+
+
+def _to_json(value: Any) -> bytes:
+    """Serialize value as a compact JSON body."""
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
@@ -0,0 +1,396 @@
+"""Defines the Two Point Science patient-flow simulator.
+
+HospitalSimulation is a discrete-event simulation of patients walking a hospital's pathing: each
+patient arrives with one of the hospital's illnesses, queues for every diagnostic room (GP's
+Office first) and then the treatment room.  Patients lose health while they wait, scaled by the
+illness' health decline, and die in the queue if it runs out.  Treatment fails as often as the
+illness' difficulty and a failed treatment kills as often as the illness' chance of death.
+Any values of MISSING_DATA are simulated as 1.
+
+Events live in a heap and per-patient state lives in flat arrays so a run scales to hundreds of
+thousands of patients.  Results are reproducible for a given seed.
+
+    Typical usage example:
+
+    from tps.simulation import HospitalSimulation, print_simulation_report
+    from tps.tph_hospital import TPHHospital
+    simulation = HospitalSimulation(TPHHospital('Smogley'), seed=1)
+    print_simulation_report(simulation.run(patients=100000))
+"""
+
+# Standard
+from array import array
+from collections import deque, namedtuple
+from typing import Any, Dict
+import heapq
+import math
+import random
+
+# Third Party
+
+# Local
+from tps.misc import print_stats_table, print_table
+from tps.tph_catalog import NO_ROOM, TPH_CATALOG
+from tps.tph_constants import MISSING_DATA
+from tps.tph_hospital import TPHHospital
+from tps.tph_illness import TPHIllness
+
+
+# MACROS
+# Average minutes between patient arrivals
+ARRIVAL_MINUTES = 12.5
+# Average minutes a diagnostic room takes with one patient
+DIAG_MINUTES = 8.0
+# Average minutes a treatment room takes with one patient, before difficulty is added
+TREAT_MINUTES = 10.0
+# Health lost per minute of waiting at a health decline of 100%; patients start with 1.0
+DECLINE_PER_MINUTE = 0.004
+# Default number of patients to simulate
+SIM_PATIENTS = 10000
+# Events; same-minute events are handled in the order they were scheduled
+EVENT_ARRIVE = 0  # A patient walks into the hospital
+EVENT_DEPART = 1  # A patient leaves a room
+EVENT_DEATH = 2   # A waiting patient runs out of health
+# Patient outcomes
+OUTCOME_CURED = 'cured'
+OUTCOME_SENT_HOME = 'sent home'
+OUTCOME_DIED_WAITING = 'died waiting'
+OUTCOME_DIED_TREATMENT = 'died in treatment'
+# Results
+RoomReport = namedtuple('RoomReport', 'name servers served utilization mean_queue max_queue '
+                                      'mean_wait max_wait')
+SimulationReport = namedtuple('SimulationReport', 'hospital_name patients minutes outcomes rooms')
+
+
+# pylint: disable=too-many-instance-attributes
+class HospitalSimulation:
+    """Discrete-event simulation of patients moving through one hospital."""
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, hospital: TPHHospital, room_servers: Dict[str, int] = None,
+                 arrival_minutes: float = ARRIVAL_MINUTES, diag_minutes: float = DIAG_MINUTES,
+                 treat_minutes: float = TREAT_MINUTES, seed: int = None) -> None:
+        """HospitalSimulation class ctor.
+
+        Args:
+            hospital: TPHHospital object to simulate.
+            room_servers: Optional; Number of copies of each room, by room name.  Rooms that
+                aren't listed have one copy.
+            arrival_minutes: Optional; Average minutes between patient arrivals.
+            diag_minutes: Optional; Average minutes a diagnostic room takes with one patient.
+            treat_minutes: Optional; Average minutes a treatment room takes with one patient,
+                before the illness' difficulty is added.
+            seed: Optional; Random number generator seed.
+
+        Raises:
+            TypeError: Bad data type passed in.
+            ValueError: Invalid room name, room count, or minutes.
+            RuntimeError: The hospital's illnesses have not been configured.
+        """
+        # INPUT VALIDATION
+        _validate_simulation(hospital=hospital, room_servers=room_servers,
+                             arrival_minutes=arrival_minutes, diag_minutes=diag_minutes,
+                             treat_minutes=treat_minutes, seed=seed)
+
+        # INSTANCE ATTRIBUTES
+        self._hospital = hospital                # Hospital to simulate
+        self._arrival_minutes = arrival_minutes  # Average minutes between arrivals
+        self._seed = seed                        # Seeds every run()
+        self._paths = []      # Room IDs each illness visits, indexed by illness index
+        self._minutes = []    # Average minutes spent in each room of each illness' path
+        self._failure = array('d')     # Chance treatment fails, indexed by illness index
+        self._death = array('d')       # Chance a failed treatment kills, by illness index
+        self._decline = array('d')     # Health lost per minute waiting, by illness index
+        self._room_ids = []   # Catalog room IDs visited by any illness
+        self._servers = {}    # Catalog room ID: number of copies
+        self._build_paths(diag_minutes=diag_minutes, treat_minutes=treat_minutes,
+                          room_servers=room_servers or {})
+    # pylint: enable=too-many-arguments
+
+    def get_hospital(self) -> TPHHospital:
+        """Return the simulated hospital."""
+        return self._hospital
+
+    # pylint: disable=too-many-branches
+    # pylint: disable=too-many-locals
+    # pylint: disable=too-many-statements
+    def run(self, patients: int = SIM_PATIENTS) -> SimulationReport:
+        """Simulate patients patients arriving and return what happened to them and the rooms.
+
+        Args:
+            patients: Optional; Number of patients to send through the hospital.
+
+        Returns:
+            A SimulationReport namedtuple.
+
+        Raises:
+            TypeError: Bad data type passed in.
+            ValueError: patients is not positive.
+        """
+        # LOCAL VARIABLES
+        rng = random.Random(self._seed)        # Random number generator
+        expovariate = rng.expovariate          # Exponential random draw
+        uniform = rng.random                   # Uniform random draw
+        arrival_rate = 1 / self._arrival_minutes  # Patients per minute
+        events = []                            # Heap of (minute, sequence, event, patient)
+        sequence = 0                           # Breaks ties between same-minute events
+        now = 0.0                              # Current minute
+        arrived = 0                            # Number of patients who have arrived
+        # Rooms, as indices into the per-room state, and minutes spent in them, by illness index
+        paths = [tuple(self._room_ids.index(room_id) for room_id in path)
+                 for path in self._paths]
+        minutes = self._minutes
+        # Per-patient state, indexed by patient number
+        illness = array('i', [0]) * patients   # Illness index
+        stage = array('i', [0]) * patients     # Index into the illness' path
+        health = array('d', [1.0]) * patients  # Remaining health
+        queued = array('d', [-1.0]) * patients  # Minute the patient got in line; -1 if not
+        deadline = array('d', [0.0]) * patients  # Minute the patient dies if still in line
+        # Per-room state, indexed by position in self._room_ids
+        num_rooms = len(self._room_ids)        # Number of simulated rooms
+        servers = [self._servers[room_id] for room_id in self._room_ids]  # Copies of each room
+        busy = [0] * num_rooms                 # Copies in use
+        lines = [deque() for _ in range(0, num_rooms)]  # Patients in line, dead ones included
+        line_len = [0] * num_rooms             # Living patients in line
+        last_change = [0.0] * num_rooms        # Minute busy or line_len last changed
+        busy_area = [0.0] * num_rooms          # Integral of busy over time
+        line_area = [0.0] * num_rooms          # Integral of line_len over time
+        max_line = [0] * num_rooms             # Longest line
+        served = [0] * num_rooms               # Patients seen
+        wait_sum = [0.0] * num_rooms           # Minutes patients spent in line
+        wait_max = [0.0] * num_rooms           # Longest time in line
+        outcomes = {OUTCOME_CURED: 0, OUTCOME_SENT_HOME: 0, OUTCOME_DIED_WAITING: 0,
+                    OUTCOME_DIED_TREATMENT: 0}
+        event = 0                              # Current event type
+        patient = 0                            # Current patient number
+        room = 0                               # Current room index
+        ill = 0                                # Current illness index
+        waited = 0.0                           # Minutes a patient waited in line
+
+        # INPUT VALIDATION
+        if not isinstance(patients, int):
+            raise TypeError(f'The patients argument must of type int instead of {type(patients)}')
+        if patients < 1:
+            raise ValueError(f'The patients value ({patients}) must be greater than zero')
+
+        # SIMULATE IT
+        heapq.heappush(events, (expovariate(arrival_rate), 0, EVENT_ARRIVE, 0))
+        while events:
+            now, _, event, patient = heapq.heappop(events)
+            ill = illness[patient]
+            # 1. Arrival: Choose an illness and schedule the next arrival
+            if event == EVENT_ARRIVE:
+                ill = int(uniform() * len(paths))
+                illness[patient] = ill
+                arrived = arrived + 1
+                if arrived < patients:
+                    sequence = sequence + 1
+                    heapq.heappush(events, (now + expovariate(arrival_rate), sequence,
+                                            EVENT_ARRIVE, arrived))
+            # 2. Departure: Free the room, see the next living patient in line, and move on
+            elif event == EVENT_DEPART:
+                room = paths[ill][stage[patient]]
+                busy_area[room] += busy[room] * (now - last_change[room])
+                line_area[room] += line_len[room] * (now - last_change[room])
+                last_change[room] = now
+                busy[room] = busy[room] - 1
+                while lines[room] and busy[room] < servers[room]:
+                    waiting = lines[room].popleft()
+                    if queued[waiting] < 0:
+                        continue  # Died in line
+                    waited = now - queued[waiting]
+                    health[waiting] = health[waiting] - waited * self._decline[illness[waiting]]
+                    queued[waiting] = -1.0
+                    line_len[room] = line_len[room] - 1
+                    busy[room] = busy[room] + 1
+                    served[room] = served[room] + 1
+                    wait_sum[room] += waited
+                    wait_max[room] = max(wait_max[room], waited)
+                    sequence = sequence + 1
+                    heapq.heappush(events, (now + expovariate(
+                        1 / minutes[illness[waiting]][stage[waiting]]), sequence, EVENT_DEPART,
+                                            waiting))
+                stage[patient] = stage[patient] + 1
+                # Finished the path
+                if stage[patient] == len(paths[ill]):
+                    if uniform() >= self._failure[ill]:
+                        outcomes[OUTCOME_CURED] += 1
+                    elif uniform() < self._death[ill]:
+                        outcomes[OUTCOME_DIED_TREATMENT] += 1
+                    else:
+                        outcomes[OUTCOME_SENT_HOME] += 1
+                    continue
+            # 3. Death: Leave the line, unless the patient has already been seen
+            else:
+                if queued[patient] >= 0 and deadline[patient] == now:
+                    room = paths[ill][stage[patient]]
+                    busy_area[room] += busy[room] * (now - last_change[room])
+                    line_area[room] += line_len[room] * (now - last_change[room])
+                    last_change[room] = now
+                    line_len[room] = line_len[room] - 1
+                    queued[patient] = -1.0
+                    health[patient] = 0.0
+                    outcomes[OUTCOME_DIED_WAITING] += 1
+                continue
+
+            # Walk into the patient's next room or get in line
+            room = paths[ill][stage[patient]]
+            busy_area[room] += busy[room] * (now - last_change[room])
+            line_area[room] += line_len[room] * (now - last_change[room])
+            last_change[room] = now
+            if busy[room] < servers[room]:
+                busy[room] = busy[room] + 1
+                served[room] = served[room] + 1
+                sequence = sequence + 1
+                heapq.heappush(events, (now + expovariate(1 / minutes[ill][stage[patient]]),
+                                        sequence, EVENT_DEPART, patient))
+            else:
+                lines[room].append(patient)
+                line_len[room] = line_len[room] + 1
+                max_line[room] = max(max_line[room], line_len[room])
+                queued[patient] = now
+                if self._decline[ill] > 0:
+                    deadline[patient] = now + health[patient] / self._decline[ill]
+                    sequence = sequence + 1
+                    heapq.heappush(events, (deadline[patient], sequence, EVENT_DEATH, patient))
+
+        # DONE
+        return SimulationReport(
+            self._hospital.get_name(), patients, now, outcomes,
+            [RoomReport(TPH_CATALOG.room_names[room_id], servers[room], served[room],
+                        busy_area[room] / (servers[room] * now) if now else 0.0,
+                        line_area[room] / now if now else 0.0, max_line[room],
+                        wait_sum[room] / served[room] if served[room] else 0.0, wait_max[room])
+             for room, room_id in enumerate(self._room_ids)])
+    # pylint: enable=too-many-branches
+    # pylint: enable=too-many-locals
+    # pylint: enable=too-many-statements
+
+    def _build_paths(self, diag_minutes: float, treat_minutes: float,
+                     room_servers: Dict[str, int]) -> None:
+        """Compile each of the hospital's illnesses into a room path and danger factors."""
+        # LOCAL VARIABLES
+        path = ()     # Room IDs visited by one illness
+        minutes = ()  # Average minutes spent in each room of path
+
+        # BUILD IT
+        for illness_obj in self._hospital.get_illness_objects():
+            path = tuple(illness_obj.get_diag_ids())
+            minutes = (diag_minutes,) * len(path)
+            if illness_obj.get_treat_id() != NO_ROOM:
+                path = path + (illness_obj.get_treat_id(),)
+                minutes = minutes + (get_treat_minutes(illness_obj, treat_minutes),)
+            if not path:
+                continue  # Misconfigured illnesses don't have a path to walk
+            self._paths.append(path)
+            self._minutes.append(minutes)
+            self._failure.append(_as_factor(illness_obj.get_difficulty_value()))
+            self._death.append(_as_factor(illness_obj.get_death_value()))
+            self._decline.append(_as_factor(illness_obj.get_decline_value())
+                                 * DECLINE_PER_MINUTE)
+            for room_id in path:
+                if room_id not in self._servers:
+                    self._room_ids.append(room_id)
+                    self._servers[room_id] = room_servers.get(TPH_CATALOG.room_names[room_id], 1)
+        if not self._paths:
+            raise RuntimeError(f'{self._hospital.get_name()} has no illnesses to simulate')
+# pylint: enable=too-many-instance-attributes
+
+
+def get_treat_minutes(illness: TPHIllness, treat_minutes: float = TREAT_MINUTES) -> float:
+    """Return the average minutes a treatment room takes with one patient with illness.
+
+    Harder illnesses take longer to treat: treat_minutes is scaled by one plus the illness'
+    difficulty.  The Markov model and the room recommender share it so their room loads match
+    the simulator's.
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # INPUT VALIDATION
+    if not isinstance(illness, TPHIllness):
+        raise TypeError(f'The illness can not be of type {type(illness)}')
+
+    # DONE
+    return treat_minutes * (1 + _as_factor(illness.get_difficulty_value()))
+
+
+def print_simulation_report(report: SimulationReport) -> None:
+    """Print a SimulationReport's patient outcomes and per-room table.
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # LOCAL VARIABLES
+    # Table column headers
+    col_headers = ('ROOM', 'COPIES', 'SERVED', 'UTILIZATION', 'MEAN LINE', 'MAX LINE',
+                   'MEAN WAIT', 'MAX WAIT')
+    tuple_list = []  # Table entries
+
+    # INPUT VALIDATION
+    if not isinstance(report, SimulationReport):
+        raise TypeError(f'The report argument must of type SimulationReport instead of '
+                        f'{type(report)}')
+
+    # PRINT IT
+    print_stats_table(dict({'patients': report.patients,
+                            'hours': f'{report.minutes / 60:.1f}'}, **report.outcomes),
+                      title=f'{report.hospital_name.upper()} PATIENT FLOW')
+    for room in sorted(report.rooms, key=lambda room: room.utilization, reverse=True):
+        tuple_list.append((room.name, room.servers, room.served, f'{room.utilization:.0%}',
+                           f'{room.mean_queue:.1f}', room.max_queue, f'{room.mean_wait:.1f} min',
+                           f'{room.max_wait:.1f} min'))
+    print_table(tuple_list, col_headers)
+
+
+def validate_room_servers(room_servers: Dict[str, int]) -> None:
+    """Validate a room_servers dictionary of room name: number of copies, if it's not None.
+
+    The room load models (e.g., markov) take the same room_servers argument as the simulator.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Unknown room name or a count less than one.
+    """
+    if room_servers is None:
+        return
+    if not isinstance(room_servers, dict):
+        raise TypeError('The room_servers argument must of type dict instead of '
+                        f'{type(room_servers)}')
+    for room_name, count in room_servers.items():
+        if not TPH_CATALOG.has_room(room_name):
+            raise ValueError(f'Unknown room name: {room_name}')
+        if not isinstance(count, int):
+            raise TypeError(f'The {room_name} count can not be of type {type(count)}')
+        if count < 1:
+            raise ValueError(f'The {room_name} count ({count}) must be greater than zero')
+
+
+def _as_factor(value: Any) -> float:
+    """Translate an illness danger factor into a float; MISSING_DATA translates to 1."""
+    if value == MISSING_DATA:
+        return 1.0  # Missing data is a mathematical pass
+    return float(value)
+
+
+# pylint: disable=too-many-arguments
+def _validate_simulation(hospital: TPHHospital, room_servers: Dict[str, int],
+                         arrival_minutes: float, diag_minutes: float, treat_minutes: float,
+                         seed: int) -> None:
+    """Validate HospitalSimulation ctor arguments on behalf of HospitalSimulation."""
+    # hospital
+    if not isinstance(hospital, TPHHospital):
+        raise TypeError(f'The hospital can not be of type {type(hospital)}')
+    # room_servers
+    validate_room_servers(room_servers)
+    # minutes
+    for name, minutes in (('arrival_minutes', arrival_minutes), ('diag_minutes', diag_minutes),
+                          ('treat_minutes', treat_minutes)):
+        if not isinstance(minutes, (int, float)):
+            raise TypeError(f'The {name} argument can not be of type {type(minutes)}')
+        if not math.isfinite(minutes) or minutes <= 0:
+            raise ValueError(f'The {name} value ({minutes}) must be greater than zero')
+    # seed
+    if seed is not None and not isinstance(seed, int):
+        raise TypeError(f'The seed argument must of type int instead of {type(seed)}')
+# pylint: enable=too-many-arguments
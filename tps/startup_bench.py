@@ -0,0 +1,128 @@
+"""Benchmarks Two Point Science start up.
+
+Measures how long `python -m tps --help` takes, in fresh interpreters, against an import-time
+budget and verifies that graph functionality (e.g., graphviz, dgraph) isn't imported until a
+graph is requested.  Exits non-zero if either check fails.
+
+    Typical usage example:
+
+    python3 -m tps.startup_bench                   # Default budget and runs
+    python3 -m tps.startup_bench --budget 100 --runs 20
+"""
+
+# Standard
+from typing import List
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+# Third Party
+
+# Local
+from tps.misc import print_stats_table
+
+
+# MACROS
+# Median wall time, in milliseconds, `python -m tps --help` may take
+STARTUP_BUDGET_MS = 150.0
+# Default number of fresh interpreters to time
+STARTUP_RUNS = 10
+# Modules that must not be imported by the package entry point
+LAZY_MODULES = ('graphviz', 'tps.batch', 'tps.build_order', 'tps.dgraph', 'tps.exporters',
+                'tps.floor_plan', 'tps.markov', 'tps.monte_carlo', 'tps.render_cache',
+                'tps.render_queue', 'tps.result_store', 'tps.server', 'concurrent.futures',
+                'http.server', 'multiprocessing', 'numpy', 'pyarrow', 'sqlite3')
+
+
+def find_eager_imports(module_name: str = 'tps.main') -> List[str]:
+    """Return the LAZY_MODULES a fresh interpreter imports along with module_name."""
+    # LOCAL VARIABLES
+    # Prints every module imported by module_name, one per line
+    script = f'import sys, {module_name}; print("\\n".join(sys.modules))'
+    result = None  # Completed interpreter process
+
+    # INPUT VALIDATION
+    if not isinstance(module_name, str):
+        raise TypeError(f'The module_name argument must of type str instead of '
+                        f'{type(module_name)}')
+
+    # FIND THEM
+    result = subprocess.run([sys.executable, '-c', script], stdout=subprocess.PIPE, check=True)
+
+    # DONE
+    return sorted(set(result.stdout.decode('utf-8').split()).intersection(LAZY_MODULES))
+
+
+def measure_startup(runs: int = STARTUP_RUNS, argv: tuple = ('--help',)) -> List[float]:
+    """Time `python -m tps <argv>` in runs fresh interpreters and return the milliseconds taken.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: runs is not positive.
+        subprocess.CalledProcessError: The package exited with an error.
+    """
+    # LOCAL VARIABLES
+    times = []  # Return value
+    start = 0   # Start time of one run
+
+    # INPUT VALIDATION
+    if not isinstance(runs, int):
+        raise TypeError(f'The runs argument must of type int instead of {type(runs)}')
+    if runs < 1:
+        raise ValueError(f'The runs value ({runs}) must be greater than zero')
+    if not isinstance(argv, tuple):
+        raise TypeError(f'The argv argument must of type tuple instead of {type(argv)}')
+
+    # TIME IT
+    for _ in range(0, runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-m', 'tps'] + list(argv), stdout=subprocess.DEVNULL,
+                       check=True)
+        times.append((time.perf_counter() - start) * 1000)
+
+    # DONE
+    return times
+
+
+def main() -> int:
+    """Run the start up benchmark and return 0 if the package is within budget, 1 otherwise."""
+    # LOCAL VARIABLES
+    parser = argparse.ArgumentParser(description='Benchmark Two Point Science start up')
+    args = None         # Parsed arguments
+    times = []          # Start up times, in milliseconds
+    eager_modules = []  # LAZY_MODULES imported at start up
+    exit_val = 0        # 0 on success, 1 on failure
+
+    # PARSE ARGUMENTS
+    parser.add_argument('-b', '--budget', type=float, default=STARTUP_BUDGET_MS,
+                        help=f'Median start up budget in milliseconds '
+                             f'(default: {STARTUP_BUDGET_MS})')
+    parser.add_argument('-r', '--runs', type=int, default=STARTUP_RUNS,
+                        help=f'Number of fresh interpreters to time (default: {STARTUP_RUNS})')
+    args = parser.parse_args()
+
+    # BENCHMARK
+    times = measure_startup(runs=args.runs)
+    eager_modules = find_eager_imports()
+    print_stats_table({'runs': len(times), 'median ms': f'{statistics.median(times):.1f}',
+                       'min ms': f'{min(times):.1f}', 'max ms': f'{max(times):.1f}',
+                       'budget ms': f'{args.budget:.1f}',
+                       'eager imports': ', '.join(eager_modules) or 'None'},
+                      title='PYTHON -M TPS --HELP')
+
+    # CHECK IT
+    if statistics.median(times) > args.budget:
+        print(f'\nFAIL: Median start up exceeded the {args.budget:.1f} ms budget')
+        exit_val = 1
+    if eager_modules:
+        print(f'\nFAIL: {", ".join(eager_modules)} imported before a graph was requested')
+        exit_val = 1
+
+    # DONE
+    return exit_val
+
+
+if __name__ == '__main__':
+    sys.exit(main())
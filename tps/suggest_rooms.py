@@ -0,0 +1,279 @@
+"""Defines the Two Point Science room count recommender.
+
+Turns a hospital's illness mix into per-room patient arrival rates and sizes every room as an
+M/M/c (Erlang C) queue: the fewest copies of the room that keep the average wait in line, and the
+utilization, at or under their targets.  Patients arrive with each of the hospital's illnesses
+equally often and walk each illness' steps (see: edge_model.illness_steps()): every diagnostic
+step takes DIAG_MINUTES and the treatment step takes simulation.get_treat_minutes(), longer for
+harder illnesses.  Each room's load therefore matches the Markov model's
+(see: markov.solve_room_load()).
+
+    Typical usage example:
+
+    from tps.suggest_rooms import print_room_suggestions, suggest_rooms
+    from tps.tph_hospital import TPHHospital
+    print_room_suggestions(suggest_rooms(TPHHospital('Smogley'), arrival_minutes=5.0))
+"""
+
+# Standard
+from collections import namedtuple
+from typing import Dict, List, Tuple
+import math
+
+# Third Party
+
+# Local
+from tps.edge_model import illness_steps
+from tps.misc import print_table
+from tps.simulation import ARRIVAL_MINUTES, DIAG_MINUTES, get_treat_minutes
+from tps.tph_catalog import TPH_CATALOG
+from tps.tph_hospital import get_configured_hospitals, TPHHospital
+
+
+# MACROS
+# Default longest average wait in line, in minutes, a room may have
+TARGET_WAIT_MINUTES = 15.0
+# Default highest fraction of the time a room may be busy
+TARGET_UTILIZATION = 0.85
+# One room's recommendation
+RoomSuggestion = namedtuple('RoomSuggestion', 'room_name arrival_rate service_minutes load rooms '
+                                              'utilization wait_minutes')
+
+
+def erlang_c(servers: int, load: float) -> float:
+    """Return the chance a patient has to wait in line at an M/M/c queue.
+
+    Args:
+        servers: Number of copies of the room (c).
+        load: Offered load, in Erlangs; the arrival rate times the average service time.
+
+    Returns:
+        The Erlang C probability of waiting.  A room that can't keep up (load >= servers) always
+        makes patients wait, so 1.0 is returned.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: servers is not positive or load is negative.
+    """
+    # LOCAL VARIABLES
+    erlang_b = 1.0  # Erlang B blocking probability, built up one server at a time
+
+    # INPUT VALIDATION
+    if not isinstance(servers, int):
+        raise TypeError(f'The servers argument must of type int instead of {type(servers)}')
+    if servers < 1:
+        raise ValueError(f'The servers value ({servers}) must be greater than zero')
+    if not isinstance(load, (int, float)):
+        raise TypeError(f'The load argument can not be of type {type(load)}')
+    if load < 0:
+        raise ValueError(f'The load value ({load}) can not be negative')
+
+    # CALCULATE IT
+    if load >= servers:
+        return 1.0
+    for count in range(1, servers + 1):
+        erlang_b = load * erlang_b / (count + load * erlang_b)
+
+    # DONE
+    return servers * erlang_b / (servers - load * (1 - erlang_b))
+
+
+def print_room_suggestions(suggestions: List[RoomSuggestion]) -> None:
+    """Prints the suggested room table, busiest rooms first.
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # LOCAL VARIABLES
+    tuple_list = []  # Table entries
+
+    # INPUT VALIDATION
+    if not isinstance(suggestions, list):
+        raise TypeError('The suggestions argument must of type list instead of '
+                        f'{type(suggestions)}')
+    for suggestion in suggestions:
+        if not isinstance(suggestion, RoomSuggestion):
+            raise TypeError(f'Found a suggestion of type {type(suggestion)} in the suggestions '
+                            'list')
+
+    # PRINT IT
+    for suggestion in sorted(suggestions, key=lambda suggestion: suggestion.load, reverse=True):
+        tuple_list.append((suggestion.room_name, suggestion.rooms,
+                           f'{suggestion.arrival_rate * 60:.1f}',
+                           f'{suggestion.service_minutes:.1f}', f'{suggestion.load:.2f}',
+                           f'{suggestion.utilization:.0%}',
+                           f'{suggestion.wait_minutes:.1f} min'))
+    print_table(tuple_list, ('ROOM', 'ROOMS', 'PATIENTS/HOUR', 'MINUTES', 'LOAD',
+                             'UTILIZATION', 'AVG WAIT'))
+
+
+def print_room_totals(all_suggestions: Dict[str, List[RoomSuggestion]]) -> None:
+    """Prints one line per hospital with the total number of suggested rooms.
+
+    Args:
+        all_suggestions: Dictionary of hospital name: suggestions. (see: suggest_all_rooms())
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # LOCAL VARIABLES
+    tuple_list = []  # Table entries
+
+    # INPUT VALIDATION
+    if not isinstance(all_suggestions, dict):
+        raise TypeError('The all_suggestions argument must of type dict instead of '
+                        f'{type(all_suggestions)}')
+
+    # PRINT IT
+    for hospital_name, suggestions in all_suggestions.items():
+        tuple_list.append((hospital_name, len(suggestions),
+                           sum(suggestion.rooms for suggestion in suggestions),
+                           max(suggestions, key=lambda suggestion: suggestion.load).room_name))
+    print_table(tuple_list, ('HOSPITAL', 'ROOM TYPES', 'TOTAL ROOMS', 'BUSIEST ROOM'))
+
+
+def suggest_all_rooms(hospital_list: List[str] = None, arrival_minutes: float = ARRIVAL_MINUTES,
+                      target_wait: float = TARGET_WAIT_MINUTES,
+                      target_utilization: float = TARGET_UTILIZATION
+                      ) -> Dict[str, List[RoomSuggestion]]:
+    """Suggest room counts for every hospital in hospital_list.
+
+    Hospitals that are not configured with illnesses have nothing to suggest and are skipped.
+
+    Args:
+        hospital_list: Optional; Hospital names to suggest rooms for.  Defaults to every
+            hospital.
+        arrival_minutes: Optional; Average minutes between patient arrivals.
+        target_wait: Optional; Longest average wait in line, in minutes, a room may have.
+        target_utilization: Optional; Highest fraction of the time a room may be busy.
+
+    Returns:
+        A dictionary of hospital name: list of RoomSuggestion namedtuples.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid hospital name, minutes, or utilization.
+    """
+    # LOCAL VARIABLES
+    all_suggestions = {}  # Return value
+
+    # SUGGEST IT
+    for hospital in get_configured_hospitals(hospital_list):
+        all_suggestions[hospital.get_name()] = suggest_rooms(
+            hospital, arrival_minutes=arrival_minutes, target_wait=target_wait,
+            target_utilization=target_utilization)
+
+    # DONE
+    return all_suggestions
+
+
+def suggest_rooms(hospital: TPHHospital, arrival_minutes: float = ARRIVAL_MINUTES,
+                  target_wait: float = TARGET_WAIT_MINUTES,
+                  target_utilization: float = TARGET_UTILIZATION) -> List[RoomSuggestion]:
+    """Suggest the fewest copies of each of hospital's rooms that meet the targets.
+
+    Args:
+        hospital: TPHHospital object to suggest rooms for.
+        arrival_minutes: Optional; Average minutes between patient arrivals.
+        target_wait: Optional; Longest average wait in line, in minutes, a room may have.
+        target_utilization: Optional; Highest fraction of the time a room may be busy.
+
+    Returns:
+        A list of RoomSuggestion namedtuples, one per room patients visit.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid minutes or utilization.
+        RuntimeError: The hospital's illnesses have not been configured.
+        NotImplementedError: hospital contains a misconfigured illness.
+    """
+    # LOCAL VARIABLES
+    suggestions = []     # Return value
+    num_illnesses = 0    # Number of illnesses patients arrive with
+    arrival_rate = 0.0   # Patients per minute arriving at one room
+    service_mins = 0.0   # Average minutes one room takes with one patient, over every visit
+    load = 0.0           # Offered load of one room, in Erlangs
+    rooms = 0            # Suggested number of copies of one room
+    wait_mins = 0.0      # Average wait in line for one room
+
+    # INPUT VALIDATION
+    _validate_suggest_rooms(hospital=hospital, arrival_minutes=arrival_minutes,
+                            target_wait=target_wait, target_utilization=target_utilization)
+
+    # SUGGEST IT
+    num_illnesses = len(hospital.get_illness_objects())
+    for room_id, (visits, minutes) in _get_room_minutes(hospital).items():
+        arrival_rate = visits / num_illnesses / arrival_minutes
+        service_mins = minutes / visits
+        load = arrival_rate * service_mins
+        rooms = max(1, math.ceil(load / target_utilization))
+        wait_mins = _erlang_c_wait(rooms, load, service_mins)
+        while wait_mins > target_wait:
+            rooms = rooms + 1
+            wait_mins = _erlang_c_wait(rooms, load, service_mins)
+        suggestions.append(RoomSuggestion(TPH_CATALOG.room_names[room_id], arrival_rate,
+                                          service_mins, load, rooms, load / rooms, wait_mins))
+
+    # DONE
+    return suggestions
+
+
+def _add_room_minutes(room_dict: dict, room_id: int, minutes: float) -> None:
+    """Add one visit of minutes to room_id on behalf of _get_room_minutes()."""
+    room_dict[room_id] = (room_dict.get(room_id, (0, 0.0))[0] + 1,
+                          room_dict.get(room_id, (0, 0.0))[1] + minutes)
+
+
+def _erlang_c_wait(servers: int, load: float, service_minutes: float) -> float:
+    """Return the average minutes spent in line at an M/M/c queue; infinite if it can't keep up."""
+    if load >= servers:
+        return math.inf
+    return erlang_c(servers, load) * service_minutes / (servers - load)
+
+
+def _get_room_minutes(hospital: TPHHospital) -> Dict[int, Tuple[int, float]]:
+    """Sum the visits to, and minutes spent in, each room over one patient per illness.
+
+    Every step of an illness leads out of a diagnostic room, which takes DIAG_MINUTES, and the
+    last step trails into the treatment room, which takes as long as the simulator takes to treat
+    the illness.
+
+    Returns:
+        A dictionary of catalog room ID: (visits, minutes).
+
+    Raises:
+        NotImplementedError: hospital contains a misconfigured illness.
+    """
+    # LOCAL VARIABLES
+    room_dict = {}  # Return value
+    trail_id = 0    # Catalog room ID of the last step's trail room
+
+    # SUM IT
+    for illness_obj in hospital.get_illness_objects():
+        for lead_id, trail_id, _ in illness_steps(illness_obj, hospital_name=hospital.get_name()):
+            _add_room_minutes(room_dict, lead_id, DIAG_MINUTES)
+        _add_room_minutes(room_dict, trail_id, get_treat_minutes(illness_obj))
+
+    # DONE
+    return room_dict
+
+
+def _validate_suggest_rooms(hospital: TPHHospital, arrival_minutes: float, target_wait: float,
+                            target_utilization: float) -> None:
+    """Validate input on behalf of suggest_rooms()."""
+    # hospital
+    if not isinstance(hospital, TPHHospital):
+        raise TypeError(f'The hospital can not be of type {type(hospital)}')
+    # minutes
+    for name, minutes in (('arrival_minutes', arrival_minutes), ('target_wait', target_wait)):
+        if not isinstance(minutes, (int, float)):
+            raise TypeError(f'The {name} argument can not be of type {type(minutes)}')
+        if not math.isfinite(minutes) or minutes <= 0:
+            raise ValueError(f'The {name} value ({minutes}) must be greater than zero')
+    # target_utilization
+    if not isinstance(target_utilization, (int, float)):
+        raise TypeError('The target_utilization argument can not be of type '
+                        f'{type(target_utilization)}')
+    if not 0 < target_utilization < 1:
+        raise ValueError(f'The target_utilization value ({target_utilization}) must be between '
+                         'zero and one')
@@ -0,0 +1,367 @@
+"""Defines the Two Point Science staff roster optimizer.
+
+Turns a hospital's suggested rooms (see: suggest_rooms module) into staff duties: every copy of a
+room needs the staff listed in TPH_ROOM_STAFF_DICT for as much of the time as the room is busy,
+every copy needs a janitor's upkeep, and the reception desk needs assistants for every arriving
+patient.  Duties are then packed into the fewest staff members per role.  A staff member can take
+on duties until they're busy STAFF_UTILIZATION of the time and can hold at most
+MAX_QUALIFICATIONS distinct qualifications.
+
+Packing is a bin packing problem, solved exactly by branch and bound: duties are placed largest
+first, duplicate staff members are skipped, and any branch that can't beat the best roster found
+so far (starting from first fit decreasing) is pruned.  SEARCH_NODES bounds the search, in which
+case the best roster found is returned.
+
+    Typical usage example:
+
+    from tps.suggest_staff import print_staff_roster, suggest_staff
+    from tps.tph_hospital import TPHHospital
+    print_staff_roster(suggest_staff(TPHHospital('Smogley'), arrival_minutes=5.0))
+"""
+
+# Standard
+from collections import namedtuple
+from typing import Dict, List
+import math
+
+# Third Party
+
+# Local
+from tps.misc import print_table
+from tps.simulation import ARRIVAL_MINUTES
+from tps.suggest_rooms import suggest_rooms, TARGET_WAIT_MINUTES
+from tps.tph_constants import (TPH_NAME_STAFF_AS, TPH_NAME_STAFF_DO, TPH_NAME_STAFF_JA,
+                               TPH_NAME_STAFF_NU, TPH_ROOM_STAFF_DICT)
+from tps.tph_hospital import get_configured_hospitals, TPHHospital
+
+
+# MACROS
+# Highest fraction of the time a staff member may be busy
+STAFF_UTILIZATION = 0.9
+# Most qualifications one staff member can hold
+MAX_QUALIFICATIONS = 5
+# Fraction of a janitor's time one copy of a room needs for upkeep
+JANITOR_LOAD = 0.1
+# Minutes an assistant spends at the reception desk with one patient
+RECEPTION_MINUTES = 2.0
+# Most branch and bound nodes explored per role before settling for the best roster found
+SEARCH_NODES = 200000
+# Staff roles, in roster order
+STAFF_ROLES = (TPH_NAME_STAFF_DO, TPH_NAME_STAFF_NU, TPH_NAME_STAFF_AS, TPH_NAME_STAFF_JA)
+# Qualifications of the duties that aren't listed in TPH_ROOM_STAFF_DICT
+QUALIFICATION_RECEPTION = 'Customer Service'
+QUALIFICATION_UPKEEP = 'Maintenance'
+# One staff member's share of one room, or of the reception desk
+StaffDuty = namedtuple('StaffDuty', 'role qualification room_name load')
+# One suggested staff member
+StaffMember = namedtuple('StaffMember', 'role qualifications duties load')
+
+
+def pack_duties(duties: List[StaffDuty], capacity: float = STAFF_UTILIZATION,
+                max_qualifications: int = MAX_QUALIFICATIONS) -> List[StaffMember]:
+    """Pack duties into the fewest staff members.
+
+    Duties are only packed with other duties of the same role.  A duty that's heavier than
+    capacity is given a staff member of its own.
+
+    Args:
+        duties: List of StaffDuty namedtuples.
+        capacity: Optional; Highest fraction of the time a staff member may be busy.
+        max_qualifications: Optional; Most qualifications one staff member can hold.
+
+    Returns:
+        A list of StaffMember namedtuples, in STAFF_ROLES order.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid capacity or max_qualifications.
+    """
+    # LOCAL VARIABLES
+    roster = []     # Return value
+    role_list = []  # Roles found in duties, in roster order
+
+    # INPUT VALIDATION
+    _validate_pack_duties(duties=duties, capacity=capacity,
+                          max_qualifications=max_qualifications)
+
+    # PACK IT
+    role_list = [role for role in STAFF_ROLES if any(duty.role == role for duty in duties)]
+    role_list.extend(sorted(set(duty.role for duty in duties).difference(STAFF_ROLES)))
+    for role in role_list:
+        roster.extend(_pack_role([duty for duty in duties if duty.role == role], capacity,
+                                 max_qualifications))
+
+    # DONE
+    return roster
+
+
+def print_staff_roster(roster: List[StaffMember]) -> None:
+    """Prints one line per suggested staff member.
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # LOCAL VARIABLES
+    tuple_list = []  # Table entries
+
+    # INPUT VALIDATION
+    if not isinstance(roster, list):
+        raise TypeError(f'The roster argument must of type list instead of {type(roster)}')
+
+    # PRINT IT
+    for number, member in enumerate(roster):
+        tuple_list.append((number + 1, member.role, ', '.join(member.qualifications),
+                           ', '.join(sorted(set(duty.room_name for duty in member.duties))),
+                           f'{member.load:.0%}'))
+    print_table(tuple_list, ('STAFF', 'ROLE', 'QUALIFICATIONS', 'ROOMS', 'BUSY'))
+
+
+def print_staff_totals(all_rosters: Dict[str, List[StaffMember]]) -> None:
+    """Prints one line per hospital with the number of suggested staff members of each role.
+
+    Args:
+        all_rosters: Dictionary of hospital name: roster. (see: suggest_all_staff())
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # LOCAL VARIABLES
+    tuple_list = []  # Table entries
+
+    # INPUT VALIDATION
+    if not isinstance(all_rosters, dict):
+        raise TypeError('The all_rosters argument must of type dict instead of '
+                        f'{type(all_rosters)}')
+
+    # PRINT IT
+    for hospital_name, roster in all_rosters.items():
+        tuple_list.append(tuple([hospital_name]
+                                + [len([member for member in roster if member.role == role])
+                                   for role in STAFF_ROLES]
+                                + [len(roster)]))
+    print_table(tuple_list, tuple(['HOSPITAL'] + [role.upper() + 'S' for role in STAFF_ROLES]
+                                  + ['TOTAL']))
+
+
+def staff_duties(hospital: TPHHospital, arrival_minutes: float = ARRIVAL_MINUTES,
+                 target_wait: float = TARGET_WAIT_MINUTES) -> List[StaffDuty]:
+    """List the staff duties of hospital's rooms, reception desk, and upkeep.
+
+    Every room in hospital.get_room_list() is staffed for as many copies as suggest_rooms()
+    suggests.
+
+    Args:
+        hospital: TPHHospital object to staff.
+        arrival_minutes: Optional; Average minutes between patient arrivals.
+        target_wait: Optional; Longest average wait in line, in minutes, a room may have.
+
+    Returns:
+        A list of StaffDuty namedtuples.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid minutes.
+        RuntimeError: The hospital's illnesses have not been configured.
+        NotImplementedError: hospital contains a misconfigured illness.
+    """
+    # LOCAL VARIABLES
+    duties = []       # Return value
+    suggestions = {}  # Room name: RoomSuggestion
+    desk_load = 0.0   # Fraction of the time the reception desk is busy
+    desks = 0         # Number of assistants the reception desk needs
+
+    # SUGGEST ROOMS
+    suggestions = {suggestion.room_name: suggestion for suggestion in
+                   suggest_rooms(hospital, arrival_minutes=arrival_minutes,
+                                 target_wait=target_wait)}
+
+    # LIST THEM
+    # Rooms
+    for room_name in hospital.get_room_list():
+        if room_name not in suggestions:
+            continue  # No patients visit it
+        for _ in range(0, suggestions[room_name].rooms):
+            for staff in TPH_ROOM_STAFF_DICT.get(room_name, ()):
+                duties.append(StaffDuty(staff.role, staff.qualification, room_name,
+                                        suggestions[room_name].utilization))
+            duties.append(StaffDuty(TPH_NAME_STAFF_JA, QUALIFICATION_UPKEEP, room_name,
+                                    JANITOR_LOAD))
+    # Reception
+    desk_load = RECEPTION_MINUTES / arrival_minutes
+    desks = max(1, math.ceil(desk_load / STAFF_UTILIZATION))
+    for _ in range(0, desks):
+        duties.append(StaffDuty(TPH_NAME_STAFF_AS, QUALIFICATION_RECEPTION, 'Reception',
+                                desk_load / desks))
+
+    # DONE
+    return duties
+
+
+def suggest_all_staff(hospital_list: List[str] = None, arrival_minutes: float = ARRIVAL_MINUTES,
+                      target_wait: float = TARGET_WAIT_MINUTES
+                      ) -> Dict[str, List[StaffMember]]:
+    """Suggest staff rosters for every hospital in hospital_list.
+
+    Hospitals that are not configured with illnesses have nothing to staff and are skipped.
+
+    Args:
+        hospital_list: Optional; Hospital names to staff.  Defaults to every hospital.
+        arrival_minutes: Optional; Average minutes between patient arrivals.
+        target_wait: Optional; Longest average wait in line, in minutes, a room may have.
+
+    Returns:
+        A dictionary of hospital name: list of StaffMember namedtuples.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Invalid hospital name or minutes.
+    """
+    # LOCAL VARIABLES
+    all_rosters = {}  # Return value
+
+    # STAFF IT
+    for hospital in get_configured_hospitals(hospital_list):
+        all_rosters[hospital.get_name()] = suggest_staff(hospital, arrival_minutes=arrival_minutes,
+                                                         target_wait=target_wait)
+
+    # DONE
+    return all_rosters
+
+
+def suggest_staff(hospital: TPHHospital, arrival_minutes: float = ARRIVAL_MINUTES,
+                  target_wait: float = TARGET_WAIT_MINUTES) -> List[StaffMember]:
+    """Suggest the smallest staff roster that covers hospital's duties.
+
+    Same arguments and exceptions as staff_duties().  See: pack_duties().
+    """
+    return pack_duties(staff_duties(hospital, arrival_minutes=arrival_minutes,
+                                    target_wait=target_wait))
+
+
+def _pack_role(duties: List[StaffDuty], capacity: float,
+               max_qualifications: int) -> List[StaffMember]:
+    """Branch and bound the fewest staff members that cover duties, all of one role."""
+    # LOCAL VARIABLES
+    # Duties, heaviest first, as (load, qualification) with their original positions
+    order = sorted(range(0, len(duties)), key=lambda index: duties[index].load, reverse=True)
+    loads = [min(duties[index].load, capacity) for index in order]  # Overweight duties fill one
+    quals = [duties[index].qualification for index in order]
+    # Load of the duties from position i onwards
+    remaining = [sum(loads[index:]) for index in range(0, len(loads) + 1)]
+    best = _first_fit(loads, quals, capacity, max_qualifications)  # Best assignment found
+    assignment = [0] * len(loads)  # Staff member of each duty, on the current branch
+    bin_loads = []                 # Load of each staff member on the current branch
+    bin_quals = []                 # Qualifications of each staff member on the current branch
+    nodes = 0                      # Branch and bound nodes explored
+    epsilon = 1e-9                 # Floating point slack
+
+    # BRANCH AND BOUND
+    def search(position: int) -> None:
+        nonlocal best, nodes
+        nodes = nodes + 1
+        if position == len(loads):
+            best = list(assignment)
+            return
+        # Bound: Count the staff members the remaining duties need beyond the free time
+        if len(bin_loads) + max(0, math.ceil((remaining[position]
+                                              - sum(capacity - load for load in bin_loads))
+                                             / capacity - epsilon)) >= max(best) + 1:
+            return
+        tried = set()  # Staff members already tried for this duty, by (load, qualifications)
+        for member, member_load in enumerate(bin_loads):
+            if nodes >= SEARCH_NODES:
+                return
+            state = (round(member_load, 9), frozenset(bin_quals[member]))
+            if state in tried or member_load + loads[position] > capacity + epsilon \
+                    or (quals[position] not in bin_quals[member]
+                        and len(bin_quals[member]) >= max_qualifications):
+                continue
+            tried.add(state)
+            bin_loads[member] += loads[position]
+            added = quals[position] not in bin_quals[member]
+            bin_quals[member].add(quals[position])
+            assignment[position] = member
+            search(position + 1)
+            bin_loads[member] -= loads[position]
+            if added:
+                bin_quals[member].discard(quals[position])
+        # Hire a new staff member, if that can still beat the best roster
+        if len(bin_loads) + 1 < max(best) + 1:
+            bin_loads.append(loads[position])
+            bin_quals.append({quals[position]})
+            assignment[position] = len(bin_loads) - 1
+            search(position + 1)
+            bin_loads.pop()
+            bin_quals.pop()
+
+    # First fit decreasing is often optimal already
+    if loads and max(best) + 1 > math.ceil(remaining[0] / capacity - epsilon):
+        search(0)
+
+    # DONE
+    return _build_members([duties[index] for index in order], best)
+
+
+def _build_members(duties: List[StaffDuty], assignment: List[int]) -> List[StaffMember]:
+    """Translate an assignment of duties to staff member numbers into StaffMember namedtuples."""
+    # LOCAL VARIABLES
+    members = {}  # Staff member number: duties
+
+    # BUILD IT
+    for duty, member in zip(duties, assignment):
+        members.setdefault(member, []).append(duty)
+
+    # DONE
+    return [StaffMember(member_duties[0].role,
+                        tuple(sorted(set(duty.qualification for duty in member_duties))),
+                        tuple(member_duties), sum(duty.load for duty in member_duties))
+            for _, member_duties in sorted(members.items())]
+
+
+def _first_fit(loads: List[float], quals: List[str], capacity: float,
+               max_qualifications: int) -> List[int]:
+    """Assign loads, heaviest first, to the first staff member they fit; returns staff numbers."""
+    # LOCAL VARIABLES
+    assignment = []  # Return value
+    bin_loads = []   # Load of each staff member
+    bin_quals = []   # Qualifications of each staff member
+
+    # ASSIGN IT
+    for load, qual in zip(loads, quals):
+        for member in range(0, len(bin_loads) + 1):
+            if member == len(bin_loads):
+                bin_loads.append(0.0)
+                bin_quals.append(set())
+            if bin_loads[member] + load <= capacity + 1e-9 \
+                    and (qual in bin_quals[member] or len(bin_quals[member]) < max_qualifications):
+                bin_loads[member] += load
+                bin_quals[member].add(qual)
+                assignment.append(member)
+                break
+
+    # DONE
+    return assignment
+
+
+def _validate_pack_duties(duties: List[StaffDuty], capacity: float,
+                          max_qualifications: int) -> None:
+    """Validate input on behalf of pack_duties()."""
+    # duties
+    if not isinstance(duties, list):
+        raise TypeError(f'The duties argument must of type list instead of {type(duties)}')
+    for duty in duties:
+        if not isinstance(duty, StaffDuty):
+            raise TypeError(f'Found a duty of type {type(duty)} in the duties list')
+    # capacity
+    if not isinstance(capacity, (int, float)):
+        raise TypeError(f'The capacity argument can not be of type {type(capacity)}')
+    if not 0 < capacity <= 1:
+        raise ValueError(f'The capacity value ({capacity}) must be greater than zero and at '
+                         'most one')
+    # max_qualifications
+    if not isinstance(max_qualifications, int):
+        raise TypeError('The max_qualifications argument must of type int instead of '
+                        f'{type(max_qualifications)}')
+    if max_qualifications < 1:
+        raise ValueError(f'The max_qualifications value ({max_qualifications}) must be greater '
+                         'than zero')
@@ -0,0 +1,302 @@
+"""Defines the SVGDigraph class, an in-process render engine.
+
+SVGDigraph mimics the parts of graphviz.Digraph Two Point Science uses (edge(), node(), body,
+source, filepath, pipe(), render(), view()) but lays graphs out with the pure-Python layered
+layout (see: layout module) and writes SVG directly.  It needs neither the graphviz binaries nor
+a subprocess.  Select it with the 'tps' engine.
+
+    Typical usage example:
+
+    from tps.dgraph import create_graph
+    graph = create_graph(TPHHospital('Grockle Bay'), 'graphs', engine='tps', graph_format='svg')
+    svg_bytes = graph.pipe()   # No subprocess
+    graph.render()             # graphs/Grockle Bay (tps).svg
+"""
+
+# Standard
+from typing import Dict, List, Tuple
+from xml.sax.saxutils import escape
+import math
+import os
+
+# Third Party
+
+# Local
+from tps.layout import EdgeRoute, Layout, layered_layout, NodeBox
+
+
+# MACROS
+# Engine name that selects SVGDigraph
+TPS_ENGINE = 'tps'
+# The only output format SVGDigraph writes
+SVG_FORMAT = 'svg'
+# Distance, in pixels, between parallel edges
+PARALLEL_SPACING = 12.0
+# Width reserved to the right of the drawing for self loops
+LOOP_SPACE = 36.0
+
+
+# pylint: disable=too-many-instance-attributes
+class SVGDigraph:
+    """Directed graph which renders itself to SVG without graphviz."""
+
+    def __init__(self, name: str = None, filename: str = None, directory: str = '',
+                 graph_format: str = SVG_FORMAT) -> None:
+        """SVGDigraph class ctor.
+
+        Args:
+            name: Optional; Graph name.
+            filename: Optional; Filename for saving the source.  Defaults to name + '.gv'.
+            directory: Optional; Directory for saving the source and the render.
+            graph_format: Optional; Output format.  Only 'svg' is supported.
+
+        Raises:
+            TypeError: Bad data type passed in.
+            ValueError: Unsupported graph_format.
+        """
+        # INPUT VALIDATION
+        if name is not None and not isinstance(name, str):
+            raise TypeError(f'The name argument must of type str instead of {type(name)}')
+        if filename is not None and not isinstance(filename, str):
+            raise TypeError(f'The filename argument must of type str instead of {type(filename)}')
+        if not isinstance(directory, str):
+            raise TypeError(f'The directory argument must of type str instead of '
+                            f'{type(directory)}')
+        if graph_format != SVG_FORMAT:
+            raise ValueError(f'The {TPS_ENGINE} engine only writes {SVG_FORMAT}, '
+                             f'not {graph_format}')
+
+        # INSTANCE ATTRIBUTES
+        self.name = name                                       # Graph name
+        self.filename = filename or f'{name or "Digraph"}.gv'  # Source filename
+        self.directory = directory                             # Source and render directory
+        self.engine = TPS_ENGINE                               # Layout engine name
+        self.format = graph_format                             # Output format
+        self.body = []                                         # DOT statements, like graphviz
+        self._nodes = {}                                       # Node name: Attributes
+        self._edges = []                                       # (Tail, head, attributes)
+
+    @property
+    def filepath(self) -> str:
+        """Return the path the source is saved to; renders add '.svg'."""
+        return os.path.join(self.directory, self.filename)
+
+    @property
+    def source(self) -> str:
+        """Return the graph as DOT source text."""
+        # LOCAL VARIABLES
+        header = f'digraph {_quote(self.name)} {{\n' if self.name else 'digraph {\n'  # First line
+
+        # DONE
+        return header + ''.join(self.body) + '}\n'
+
+    def edge(self, tail_name: str, head_name: str, label: str = None, **attrs) -> None:
+        """Add an edge from tail_name to head_name.  label and penwidth are drawn."""
+        if label is not None:
+            attrs['label'] = label
+        self._edges.append(tuple((tail_name, head_name, attrs)))
+        self.body.append(f'\t{_quote(tail_name)} -> {_quote(head_name)}{_attr_list(attrs)}\n')
+
+    def node(self, name: str, label: str = None, **attrs) -> None:
+        """Add (or update) a node.  label is drawn instead of name."""
+        if label is not None:
+            attrs['label'] = label
+        self._nodes.setdefault(name, {}).update(attrs)
+        self.body.append(f'\t{_quote(name)}{_attr_list(attrs)}\n')
+
+    def pipe(self, format: str = None) -> bytes:  # pylint: disable=redefined-builtin
+        """Lay out the graph and return the SVG, as graphviz.Digraph.pipe() would.
+
+        Raises:
+            ValueError: format is not 'svg'.
+        """
+        if format not in (None, SVG_FORMAT):
+            raise ValueError(f'The {TPS_ENGINE} engine only writes {SVG_FORMAT}, not {format}')
+        return self.to_svg().encode('utf-8')
+
+    def render(self, filename: str = None, directory: str = None, view: bool = False) -> str:
+        """Save the source, write the SVG next to it, and return the SVG path.
+
+        Args:
+            filename: Optional; Replaces the filename given to the ctor.
+            directory: Optional; Replaces the directory given to the ctor.
+            view: Optional; Open the SVG in the system viewer.
+        """
+        # LOCAL VARIABLES
+        render_path = ''  # Return value
+
+        # RENDER IT
+        self.save(filename=filename, directory=directory)
+        render_path = self.filepath + '.' + self.format
+        with open(render_path, 'wb') as out_file:
+            out_file.write(self.pipe())
+        if view:
+            # The graphviz package's viewer launcher doesn't need the graphviz binaries
+            import graphviz  # pylint: disable=import-outside-toplevel
+            graphviz.view(render_path)
+
+        # DONE
+        return render_path
+
+    def save(self, filename: str = None, directory: str = None) -> str:
+        """Save the DOT source to filepath and return filepath."""
+        if filename is not None:
+            self.filename = filename
+        if directory is not None:
+            self.directory = directory
+        if os.path.dirname(self.filepath):
+            os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+        with open(self.filepath, 'w', encoding='utf-8') as out_file:
+            out_file.write(self.source)
+        return self.filepath
+
+    def to_svg(self) -> str:
+        """Lay out the graph and return it as an SVG document."""
+        # LOCAL VARIABLES
+        layout = layered_layout(list(self._nodes),
+                                [tuple((tail, head)) for tail, head, _ in self._edges])
+
+        # DONE
+        return layout_to_svg(layout, [attrs for _, _, attrs in self._edges], self._nodes,
+                             self.name)
+
+    def view(self, filename: str = None, directory: str = None) -> str:
+        """Render the graph and open it in the system viewer.  See: render()."""
+        return self.render(filename=filename, directory=directory, view=True)
+# pylint: enable=too-many-instance-attributes
+
+
+def layout_to_svg(layout: Layout, edge_attrs: List[dict], node_attrs: Dict[str, dict] = None,
+                  title: str = None) -> str:
+    """Write a Layout as an SVG document.
+
+    Args:
+        layout: Layout to draw. (see: layout module)
+        edge_attrs: Attributes (e.g., label, penwidth) of each edge, in layout.routes order.
+        node_attrs: Optional; Node name: Attributes (e.g., label).
+        title: Optional; Document title.
+
+    Raises:
+        TypeError: Bad data type passed in.
+    """
+    # LOCAL VARIABLES
+    boxes = {node.name: node for node in layout.nodes}  # Node name: NodeBox
+    width = layout.width  # Document width
+    lines = []            # Return value, one element per line
+
+    # INPUT VALIDATION
+    if not isinstance(layout, Layout):
+        raise TypeError(f'The layout can not be of type {type(layout)}')
+    node_attrs = node_attrs or {}
+    if any(not route.points for route in layout.routes):
+        width = width + LOOP_SPACE  # Room for self loops
+
+    # HEADER
+    lines.append('<?xml version="1.0" encoding="UTF-8" standalone="no"?>')
+    lines.append(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}pt" '
+                 f'height="{layout.height:.0f}pt" viewBox="0 0 {width:.2f} '
+                 f'{layout.height:.2f}">')
+    if title:
+        lines.append(f'<title>{escape(title)}</title>')
+    lines.append('<defs><marker id="arrow" markerWidth="10" markerHeight="10" refX="9" refY="5" '
+                 'orient="auto" markerUnits="userSpaceOnUse"><path d="M0,1 L9,5 L0,9 z" '
+                 'fill="black"/></marker></defs>')
+    lines.append(f'<rect width="{width:.2f}" height="{layout.height:.2f}" fill="white"/>')
+
+    # EDGES
+    for route in layout.routes:
+        lines.extend(_draw_edge(route, boxes, edge_attrs[route.index]))
+
+    # NODES
+    for node in layout.nodes:
+        lines.append(f'<g class="node"><title>{escape(node.name)}</title>'
+                     f'<ellipse cx="{node.x:.2f}" cy="{node.y:.2f}" rx="{node.width / 2:.2f}" '
+                     f'ry="{node.height / 2:.2f}" fill="white" stroke="black"/>'
+                     f'<text x="{node.x:.2f}" y="{node.y + 4:.2f}" text-anchor="middle" '
+                     f'font-family="Times,serif" font-size="14">'
+                     f'{escape(str(node_attrs.get(node.name, {}).get("label", node.name)))}'
+                     '</text></g>')
+
+    # DONE
+    lines.append('</svg>')
+    return '\n'.join(lines) + '\n'
+
+
+def _attr_list(attrs: dict) -> str:
+    """Format attrs as a DOT attribute list (e.g., ' [label=3 penwidth=2.50]')."""
+    if not attrs:
+        return ''
+    return ' [' + ' '.join(f'{key}={_quote(str(value))}' for key, value in attrs.items()) + ']'
+
+
+def _clip_to_node(center: Tuple[float, float], toward: Tuple[float, float],
+                  node: NodeBox) -> Tuple[float, float]:
+    """Return where the segment from node's center toward a point leaves node's ellipse."""
+    # LOCAL VARIABLES
+    d_x = toward[0] - center[0]  # Segment direction
+    d_y = toward[1] - center[1]  # Segment direction
+    scale = 0.0                  # Fraction of the segment inside the ellipse
+
+    # CLIP IT
+    if not d_x and not d_y:
+        return center
+    scale = 1 / math.sqrt((d_x / (node.width / 2)) ** 2 + (d_y / (node.height / 2)) ** 2)
+
+    # DONE
+    return tuple((center[0] + d_x * scale, center[1] + d_y * scale))
+
+
+def _draw_edge(route: EdgeRoute, boxes: Dict[str, NodeBox], attrs: dict) -> List[str]:
+    """Return the SVG elements for one routed edge on behalf of layout_to_svg()."""
+    # LOCAL VARIABLES
+    points = [tuple(point) for point in route.points]  # Route points, clipped below
+    stroke = float(attrs.get('penwidth', 1.0))          # Line width
+    path = ''                                           # SVG path data
+    label_at = None                                     # Label position
+    normal = (0.0, 0.0)                                 # Unit normal of the first segment
+    shift = route.offset * PARALLEL_SPACING             # Parallel edge displacement
+
+    # ROUTE IT
+    if not points:
+        # Self loop: a bulge off the node's right side, further out for each parallel loop
+        node = boxes[route.tail]
+        reach = node.width / 2 + 18 + abs(shift) + shift
+        path = (f'M{node.x + node.width * 0.4:.2f},{node.y - node.height * 0.3:.2f} '
+                f'C{node.x + reach:.2f},{node.y - 24:.2f} {node.x + reach:.2f},{node.y + 24:.2f} '
+                f'{node.x + node.width * 0.4:.2f},{node.y + node.height * 0.3:.2f}')
+        label_at = tuple((node.x + reach - 6, node.y))
+    else:
+        length = math.hypot(points[-1][0] - points[0][0], points[-1][1] - points[0][1]) or 1.0
+        normal = tuple(((points[0][1] - points[-1][1]) / length,
+                        (points[-1][0] - points[0][0]) / length))
+        if len(points) == 2:
+            # Bend parallel edges with one quadratic control point
+            control = tuple(((points[0][0] + points[1][0]) / 2 + normal[0] * shift * 2,
+                             (points[0][1] + points[1][1]) / 2 + normal[1] * shift * 2))
+            start = _clip_to_node(points[0], control, boxes[route.tail])
+            end = _clip_to_node(points[1], control, boxes[route.head])
+            path = (f'M{start[0]:.2f},{start[1]:.2f} Q{control[0]:.2f},{control[1]:.2f} '
+                    f'{end[0]:.2f},{end[1]:.2f}')
+            label_at = tuple(((start[0] + 2 * control[0] + end[0]) / 4,
+                              (start[1] + 2 * control[1] + end[1]) / 4))
+        else:
+            # Long edges pass through their dummy nodes, displaced for parallel edges
+            points = [points[0]] + [tuple((x_coord + shift, y_coord)) for x_coord, y_coord
+                                    in points[1:-1]] + [points[-1]]
+            points[0] = _clip_to_node(points[0], points[1], boxes[route.tail])
+            points[-1] = _clip_to_node(points[-1], points[-2], boxes[route.head])
+            path = 'M' + ' L'.join(f'{x_coord:.2f},{y_coord:.2f}' for x_coord, y_coord in points)
+            label_at = points[len(points) // 2]
+
+    # DONE
+    return [f'<g class="edge"><title>{escape(route.tail)}&#45;&gt;{escape(route.head)}</title>'
+            f'<path d="{path}" fill="none" stroke="black" stroke-width="{stroke:.2f}" '
+            'marker-end="url(#arrow)"/>'
+            + (f'<text x="{label_at[0] + 4:.2f}" y="{label_at[1]:.2f}" font-family="Times,serif" '
+               f'font-size="12">{escape(str(attrs["label"]))}</text>' if 'label' in attrs else '')
+            + '</g>']
+
+
+def _quote(name: str) -> str:
+    """Quote a DOT ID."""
+    return '"' + name.replace('\\', '\\\\').replace('"', '\\"') + '"'
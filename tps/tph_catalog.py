@@ -0,0 +1,339 @@
+"""Defines the compiled Two Point Science catalog.
+
+TPHCatalog interns every room, illness, and hospital name found in tph_constants to a dense
+integer ID and stores diagnostic sequences, treatment rooms, and danger factors in compact arrays.
+The catalog is compiled once, at import, so the rest of the package can work on integer IDs and
+only translate back to names at output time.
+
+    Typical usage example:
+
+    from tps.tph_catalog import TPH_CATALOG
+    clamp_id = TPH_CATALOG.get_illness_id('Clamp')
+    for room_id in TPH_CATALOG.get_diag_ids(clamp_id):
+        print(TPH_CATALOG.room_names[room_id])                     # GP's Office
+    print(TPH_CATALOG.room_names[TPH_CATALOG.treat_rooms[clamp_id]])  # Pharmacy
+"""
+
+# Standard
+from array import array
+from typing import Optional, Tuple
+import math
+
+# Third Party
+
+# Local
+from tps.tph_constants import (MISSING_DATA, TPH_HOSPITAL_DICT, TPH_ILLNESS_DICT,
+                               TPH_NAME_ROOM_GP, TPH_ROOM_DICT)
+
+
+# MACROS
+# Room purpose bit flags
+PURPOSE_DIAG = 1   # Room can diagnose
+PURPOSE_TREAT = 2  # Room can treat
+# Room purpose string to bit flags
+PURPOSE_FLAGS = {'Diagnostic': PURPOSE_DIAG, 'Treatment': PURPOSE_TREAT,
+                 'Both': PURPOSE_DIAG | PURPOSE_TREAT}
+# Placeholder ID for a missing or misconfigured room
+NO_ROOM = -1
+
+
+# pylint: disable=too-many-instance-attributes
+class TPHCatalog:
+    """Compiled, integer-interned view of the Two Point Hospital constants.
+
+    All public attributes are read-only by convention.  IDs are dense, zero-based, and follow the
+    insertion order of the source dictionaries.
+
+    Attributes:
+        room_names: Tuple of room names, indexed by room ID.
+        room_purpose: Array of PURPOSE_* bit flags, indexed by room ID.
+        gp_room_id: Room ID of the GP's Office (NO_ROOM if it isn't defined).
+        illness_names: Tuple of illness names, indexed by illness ID.
+        diag_offsets: Array of offsets into diag_rooms, indexed by illness ID (length + 1).
+        diag_rooms: Flattened array of diagnostic room IDs, GP's Office prepended.
+        treat_rooms: Array of treatment room IDs (NO_ROOM if invalid), indexed by illness ID.
+        difficulty: Array of difficulty values (NaN if missing), indexed by illness ID.
+        death: Array of chance of death values (NaN if missing), indexed by illness ID.
+        decline: Array of health decline values (NaN if missing), indexed by illness ID.
+        hospital_names: Tuple of hospital names, indexed by hospital ID.
+        hospital_offsets: Array of offsets into hospital_illnesses, indexed by hospital ID
+            (length + 1).
+        hospital_illnesses: Flattened array of illness IDs, in hospital list order.
+    """
+
+    def __init__(self, room_dict: dict, illness_dict: dict, hospital_dict: dict) -> None:
+        """TPHCatalog class ctor.
+
+        Compiles the catalog from the tph_constants dictionaries.  Malformed entries do not raise
+        here.  Instead, the exception is recorded and raised by the get_*_error() lookups so
+        callers see errors at the same point they always have.
+
+        Args:
+            room_dict: Dictionary of room names to RoomDetails (see: TPH_ROOM_DICT).
+            illness_dict: Dictionary of illness names to IllnessDetails (see: TPH_ILLNESS_DICT).
+            hospital_dict: Dictionary of hospital names to HospitalDetails
+                (see: TPH_HOSPITAL_DICT).
+
+        Raises:
+            TypeError: Bad data type passed in.
+        """
+        # INSTANCE ATTRIBUTES
+        self.generation = 0  # Incremented every time the catalog is (re)compiled
+
+        # COMPILE
+        self.compile(room_dict, illness_dict, hospital_dict)
+
+    # pylint: disable=attribute-defined-outside-init
+    def compile(self, room_dict: dict, illness_dict: dict, hospital_dict: dict) -> None:
+        """(Re)compile the catalog from the tph_constants dictionaries.
+
+        Replaces all existing IDs and arrays and increments generation.  Registries of objects
+        built against an older generation (see: tph_registry) use generation to invalidate
+        themselves.
+
+        Raises:
+            TypeError: Bad data type passed in.
+        """
+        # INPUT VALIDATION
+        for arg_name, arg_value in (('room_dict', room_dict), ('illness_dict', illness_dict),
+                                    ('hospital_dict', hospital_dict)):
+            if not isinstance(arg_value, dict):
+                raise TypeError(f'The {arg_name} argument must of type dict instead of '
+                                f'{type(arg_value)}')
+
+        # INSTANCE ATTRIBUTES
+        # Rooms
+        self.room_names = tuple(room_dict.keys())
+        self._room_ids = {name: index for index, name in enumerate(self.room_names)}
+        self.room_purpose = array('b', [0] * len(self.room_names))
+        self.gp_room_id = self._room_ids.get(TPH_NAME_ROOM_GP, NO_ROOM)
+        # Illnesses
+        self.illness_names = tuple(illness_dict.keys())
+        self._illness_ids = {name: index for index, name in enumerate(self.illness_names)}
+        self.diag_offsets = array('l', [0])
+        self.diag_rooms = array('l')
+        self.treat_rooms = array('l')
+        self.difficulty = array('d')
+        self.death = array('d')
+        self.decline = array('d')
+        self._illness_errors = {}  # Illness ID: Exception raised on construction
+        # Hospitals
+        self.hospital_names = tuple(hospital_dict.keys())
+        self._hospital_ids = {name: index for index, name in enumerate(self.hospital_names)}
+        self.hospital_offsets = array('l', [0])
+        self.hospital_illnesses = array('l')
+        self._hospital_errors = {}  # Hospital ID: Exception raised on construction
+        self._list_errors = {}      # Hospital ID: Exception raised retrieving the illness list
+
+        # COMPILE
+        self._compile_rooms(room_dict)
+        self._compile_illnesses(illness_dict)
+        self._compile_hospitals(hospital_dict)
+        self.generation = self.generation + 1
+    # pylint: enable=attribute-defined-outside-init
+
+    def get_diag_ids(self, illness_id: int) -> Tuple[int, ...]:
+        """Return the diagnostic room IDs for illness_id, GP's Office first.
+
+        An empty tuple indicates a missing or misconfigured list of diagnostic rooms.
+        """
+        return tuple(self.diag_rooms[self.diag_offsets[illness_id]:
+                                     self.diag_offsets[illness_id + 1]])
+
+    def get_hospital_error(self, hospital_id: int) -> Optional[Exception]:
+        """Return the exception, if any, found while compiling hospital_id's entry."""
+        return self._hospital_errors.get(hospital_id)
+
+    def get_hospital_id(self, hospital_name: str) -> int:
+        """Return the hospital ID for hospital_name.
+
+        Raises:
+            KeyError: Unknown hospital name.
+        """
+        return self._hospital_ids[hospital_name]
+
+    def get_hospital_illness_ids(self, hospital_id: int) -> Tuple[int, ...]:
+        """Return the illness IDs configured for hospital_id, in hospital list order."""
+        return tuple(self.hospital_illnesses[self.hospital_offsets[hospital_id]:
+                                             self.hospital_offsets[hospital_id + 1]])
+
+    def get_illness_error(self, illness_id: int) -> Optional[Exception]:
+        """Return the exception, if any, found while compiling illness_id's entry."""
+        return self._illness_errors.get(illness_id)
+
+    def get_illness_id(self, illness_name: str) -> int:
+        """Return the illness ID for illness_name.
+
+        Raises:
+            KeyError: Unknown illness name.
+        """
+        return self._illness_ids[illness_name]
+
+    def get_illness_list_error(self, hospital_id: int) -> Optional[Exception]:
+        """Return the exception, if any, found while validating hospital_id's illness list."""
+        return self._list_errors.get(hospital_id)
+
+    def get_room_id(self, room_name: str) -> int:
+        """Return the room ID for room_name.
+
+        Raises:
+            KeyError: Unknown room name.
+        """
+        return self._room_ids[room_name]
+
+    def has_hospital(self, hospital_name: str) -> bool:
+        """Return True if hospital_name is a known hospital."""
+        return hospital_name in self._hospital_ids
+
+    def has_illness(self, illness_name: str) -> bool:
+        """Return True if illness_name is a known illness."""
+        return illness_name in self._illness_ids
+
+    def has_room(self, room_name: str) -> bool:
+        """Return True if room_name is a known room."""
+        return room_name in self._room_ids
+
+    def is_dual_purpose(self, room_id: int) -> bool:
+        """Return True if room_id is both a diagnostic and treatment room."""
+        return self.room_purpose[room_id] == PURPOSE_DIAG | PURPOSE_TREAT
+
+    def _compile_hospitals(self, hospital_dict: dict) -> None:
+        """Compile hospital illness lists into hospital_offsets and hospital_illnesses."""
+        # LOCAL VARIABLES
+        illness_list = None  # List of illnesses for one hospital
+        seen_ids = set()     # Illness IDs already added for one hospital
+
+        # COMPILE
+        for hospital_id, hospital_name in enumerate(self.hospital_names):
+            seen_ids = set()  # Reset temp variable
+            try:
+                illness_list = hospital_dict[hospital_name].illness
+            except (AttributeError, KeyError):
+                self._hospital_errors[hospital_id] = NotImplementedError(
+                    f'Malformed dictionary entry for {hospital_name}')
+                illness_list = None
+            if isinstance(illness_list, str):
+                illness_list = [illness_list]
+            elif not isinstance(illness_list, list):
+                illness_list = None
+            if illness_list:
+                for illness in illness_list:
+                    if not isinstance(illness, str):
+                        self._list_errors[hospital_id] = TypeError(
+                            f'Invalid illness data type of {type(illness)} found in '
+                            f'{hospital_name}')
+                        break
+                    if illness not in self._illness_ids:
+                        self._list_errors[hospital_id] = ValueError(
+                            f'Invalid illness "{illness}" found in {hospital_name}')
+                        break
+                    if self._illness_ids[illness] in seen_ids:
+                        self._list_errors[hospital_id] = RuntimeError(
+                            f'Duplicate entry {illness} detected in {hospital_name}')
+                        break
+                    seen_ids.add(self._illness_ids[illness])
+                    self.hospital_illnesses.append(self._illness_ids[illness])
+            elif hospital_id not in self._hospital_errors:
+                self._list_errors[hospital_id] = RuntimeError(
+                    f'No illnesses configured for {hospital_name}')
+            # A hospital with an invalid list doesn't get a partial list
+            if hospital_id in self._list_errors:
+                del self.hospital_illnesses[self.hospital_offsets[hospital_id]:]
+            self.hospital_offsets.append(len(self.hospital_illnesses))
+
+    def _compile_illnesses(self, illness_dict: dict) -> None:
+        """Compile illness details into the diag, treat, and danger factor arrays."""
+        # LOCAL VARIABLES
+        details = None  # IllnessDetails for one illness
+        diag_ids = []   # Diagnostic room IDs for one illness
+        treat_id = 0    # Treatment room ID for one illness
+        factors = []    # Difficulty, death, and decline for one illness
+
+        # COMPILE
+        for illness_id, illness_name in enumerate(self.illness_names):
+            details = illness_dict[illness_name]
+            try:
+                diag_ids = self._compile_diag(details.diagnostic)
+                treat_id = self._compile_treat(details.treatment)
+                factors = [_compile_num(details.difficulty), _compile_num(details.death),
+                           _compile_num(details.decline)]
+            except AttributeError:
+                self._illness_errors[illness_id] = NotImplementedError(
+                    f'Malformed dictionary entry for {illness_name}')
+                diag_ids, treat_id, factors = [], NO_ROOM, [math.nan] * 3
+            except (TypeError, ValueError) as err:
+                self._illness_errors[illness_id] = err
+                factors = [math.nan] * 3
+            self.diag_rooms.extend(diag_ids)
+            self.diag_offsets.append(len(self.diag_rooms))
+            self.treat_rooms.append(treat_id)
+            self.difficulty.append(factors[0])
+            self.death.append(factors[1])
+            self.decline.append(factors[2])
+
+    def _compile_diag(self, diag_rooms: list) -> list:
+        """Translate diag_rooms into room IDs, prepending the GP's Office.
+
+        Returns an empty list if diag_rooms is empty or contains anything other than known
+        diagnostic rooms.
+        """
+        # LOCAL VARIABLES
+        diag_ids = []  # Return value
+
+        # COMPILE
+        if isinstance(diag_rooms, str):
+            diag_rooms = [diag_rooms]
+        if isinstance(diag_rooms, list) and diag_rooms:
+            if TPH_NAME_ROOM_GP not in diag_rooms:
+                diag_rooms = [TPH_NAME_ROOM_GP] + diag_rooms
+            for diag_room in diag_rooms:
+                if not isinstance(diag_room, str) or diag_room not in self._room_ids \
+                        or not self.room_purpose[self._room_ids[diag_room]] & PURPOSE_DIAG:
+                    diag_ids = []
+                    break
+                diag_ids.append(self._room_ids[diag_room])
+
+        # DONE
+        return diag_ids
+
+    def _compile_rooms(self, room_dict: dict) -> None:
+        """Compile room details into room_purpose."""
+        for room_id, room_name in enumerate(self.room_names):
+            try:
+                self.room_purpose[room_id] = PURPOSE_FLAGS.get(room_dict[room_name].purpose, 0)
+            except AttributeError:
+                self.room_purpose[room_id] = 0  # Not a diag room, not a treat room
+
+    def _compile_treat(self, treat_room: str) -> int:
+        """Translate treat_room into a room ID; NO_ROOM if it is not a known treatment room."""
+        # LOCAL VARIABLES
+        treat_id = NO_ROOM  # Return value
+
+        # COMPILE
+        if isinstance(treat_room, str) and treat_room in self._room_ids \
+                and self.room_purpose[self._room_ids[treat_room]] & PURPOSE_TREAT:
+            treat_id = self._room_ids[treat_room]
+
+        # DONE
+        return treat_id
+# pylint: enable=too-many-instance-attributes
+
+
+def _compile_num(num) -> float:
+    """Validate num as a percentage and convert it to a float; NaN represents MISSING_DATA.
+
+    Raises:
+        TypeError: num is not a number.
+        ValueError: num is not a valid percentage.
+    """
+    if num == MISSING_DATA:
+        return math.nan  # Undefined data.  Let it ride.
+    if not isinstance(num, (int, float)):
+        raise TypeError(f'Value {num}, of type {type(num)}, is not a valid number type')
+    if num < 0:
+        raise ValueError(f'Value {num} is not valid as a percentage')
+    return float(num)
+
+
+# The package-wide catalog, compiled once at import
+TPH_CATALOG = TPHCatalog(TPH_ROOM_DICT, TPH_ILLNESS_DICT, TPH_HOSPITAL_DICT)
@@ -26,6 +26,7 @@ from tps.missing_data import MissingData
 HospitalDetails = namedtuple('HospitalDetails', 'illness')
 IllnessDetails = namedtuple('IllnessDetails', 'diagnostic treatment difficulty death decline')
 RoomDetails = namedtuple('RoomDetails', 'purpose')
+StaffDetails = namedtuple('StaffDetails', 'role qualification')
 
 # 2. MACROS
 # This macro indicates some game data is missing
@@ -184,6 +185,12 @@ TPH_NAME_ROOM_SU = 'Surgery'
 TPH_NAME_ROOM_WA = 'Ward'
 TPH_NAME_ROOM_XR = 'X-Ray'
 
+# STAFF ROLES
+TPH_NAME_STAFF_AS = 'Assistant'
+TPH_NAME_STAFF_DO = 'Doctor'
+TPH_NAME_STAFF_JA = 'Janitor'
+TPH_NAME_STAFF_NU = 'Nurse'
+
 
 TPH_ROOM_DICT = {
     'Cardiology': RoomDetails(purpose='Diagnostic'),
@@ -221,6 +228,35 @@ TPH_TREATMENT_LIST = [room for room, value in TPH_ROOM_DICT.items()
 
 TPH_DUAL_PURPOSE_LIST = [room for room, value in TPH_ROOM_DICT.items() if value.purpose == 'Both']
 
+# Staff each room needs while it's in use, and the qualification that lets them work it best
+TPH_ROOM_STAFF_DICT = {
+    'Cardiology': (StaffDetails(role=TPH_NAME_STAFF_DO, qualification='Cardiology'),),
+    'Chromatherapy': (StaffDetails(role=TPH_NAME_STAFF_DO, qualification='General Practice'),),
+    'Clown Clinic': (StaffDetails(role=TPH_NAME_STAFF_DO, qualification='General Practice'),),
+    TPH_NAME_ROOM_CR: (StaffDetails(role=TPH_NAME_STAFF_DO, qualification='General Practice'),),
+    'De-Lux Clinic': (StaffDetails(role=TPH_NAME_STAFF_NU, qualification='Treatment'),),
+    'DNA Lab': (StaffDetails(role=TPH_NAME_STAFF_DO, qualification='Genetics'),),
+    'Fluid Analysis': (StaffDetails(role=TPH_NAME_STAFF_DO, qualification='Diagnosis'),),
+    'Fracture Ward': (StaffDetails(role=TPH_NAME_STAFF_NU, qualification='Treatment'),),
+    'General Diagnosis': (StaffDetails(role=TPH_NAME_STAFF_DO, qualification='Diagnosis'),),
+    TPH_NAME_ROOM_GP: (StaffDetails(role=TPH_NAME_STAFF_DO, qualification='General Practice'),),
+    'Head Office': (StaffDetails(role=TPH_NAME_STAFF_DO, qualification='General Practice'),),
+    'Injection Room': (StaffDetails(role=TPH_NAME_STAFF_NU,
+                                    qualification='Injection Administration'),),
+    'M.E.G.A Scan': (StaffDetails(role=TPH_NAME_STAFF_DO, qualification='Radiology'),),
+    'Pans Lab': (StaffDetails(role=TPH_NAME_STAFF_DO, qualification='General Practice'),),
+    'Pest Control': (StaffDetails(role=TPH_NAME_STAFF_JA, qualification='Pest Control'),),
+    'Pharmacy': (StaffDetails(role=TPH_NAME_STAFF_NU, qualification='Pharmacy'),),
+    'Psychiatry': (StaffDetails(role=TPH_NAME_STAFF_DO, qualification='Psychiatry'),),
+    'Recurvery Room': (StaffDetails(role=TPH_NAME_STAFF_NU, qualification='Treatment'),),
+    'Resolution Lab': (StaffDetails(role=TPH_NAME_STAFF_DO, qualification='General Practice'),),
+    'Shock Clinic': (StaffDetails(role=TPH_NAME_STAFF_DO, qualification='General Practice'),),
+    'Surgery': (StaffDetails(role=TPH_NAME_STAFF_DO, qualification='Surgery'),
+                StaffDetails(role=TPH_NAME_STAFF_NU, qualification='Surgery')),
+    'Ward': (StaffDetails(role=TPH_NAME_STAFF_NU, qualification='Ward Management'),),
+    'X-Ray': (StaffDetails(role=TPH_NAME_STAFF_DO, qualification='Radiology'),),
+}
+
 TPH_HOSPITAL_DICT = {
     # Blighton
     # https://two-point-hospital.fandom.com/wiki/Blighton
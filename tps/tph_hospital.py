@@ -8,6 +8,8 @@ TPHHospital class validates and parses one hospital from the game Two Point Hosp
     print(f'Hospital: {site.get_name()}')     # Grockle Bay
     for illness in site.get_illness_names():
         print(f'    {illness}')
+    for hospital in get_configured_hospitals():  # Every hospital with illnesses
+        print(hospital.get_name())
 """
 
 # Standard
@@ -16,17 +18,30 @@ from typing import List
 # Third Party
 
 # Local
+from tps.tph_catalog import NO_ROOM, PURPOSE_DIAG, PURPOSE_TREAT, TPH_CATALOG
 from tps.tph_constants import TPH_HOSPITAL_DICT, TPH_HOSPITAL_LIST, TPH_ILLNESS_LIST
 from tps.tph_illness import TPHIllness
+from tps.tph_registry import FlyweightMeta
 
 
-class TPHHospital:
-    """Defines one Two Point Hospital."""
+class TPHHospital(metaclass=FlyweightMeta):
+    """Defines one Two Point Hospital.
+
+    Objects are shared: constructing a TPHHospital by name returns the instance held by
+    TPH_REGISTRY (see: tph_registry), so treat them as read-only.
+
+    Illness objects are indexed by name and by the rooms they use, so looking up one illness or
+    the illnesses that touch one room costs time proportional to the answer.
+    """
+
+    __slots__ = ('_hospital_name', '_hospital_id', '_hospital_illness_objs', '_illness_index',
+                 '_room_index')
 
     # CLASS ATTRIBUTES
     hospital_dict = TPH_HOSPITAL_DICT
     hospital_list = TPH_HOSPITAL_LIST
     illness_list = TPH_ILLNESS_LIST
+    catalog = TPH_CATALOG
 
     def __init__(self, hospital_name: str) -> None:
         """TPHHospital class ctor.
@@ -43,41 +58,58 @@ class TPHHospital:
             raise TypeError(f'Hospital name must be of type str instead of {type(hospital_name)}')
         if not hospital_name:
             raise ValueError('Hospital name can not be empty')
-        if hospital_name not in self.hospital_list:
+        if not self.catalog.has_hospital(hospital_name):
             raise ValueError('Unknown hospital name')
 
         # INSTANCE ATTRIBUTES
-        self._hospital_name = hospital_name  # Name of the hospital
-        try:
-            self._hospital_illnesses = self.hospital_dict[self._hospital_name].illness
-        except (AttributeError, KeyError):
-            raise NotImplementedError(f'Malformed dictionary entry for {self._hospital_name}')
+        self._hospital_name = hospital_name                              # Name of the hospital
+        self._hospital_id = self.catalog.get_hospital_id(hospital_name)  # Catalog hospital ID
+        if self.catalog.get_hospital_error(self._hospital_id):
+            raise self.catalog.get_hospital_error(self._hospital_id)
         self._hospital_illness_objs = None  # Defined, if asked for by caller
+        self._illness_index = None          # Illness name: TPHIllness; built with the objects
+        self._room_index = None             # Room ID: ((TPHIllness, PURPOSE_* flags), ...)
 
     def get_diag_room_list(self, sort_list: bool = True) -> List[str]:
         """Return a list of all diagnostic rooms associated with this hospital."""
-        # LOCAL VARIABLES
-        ill_obj_list = []  # List of all illness objects for this hospital
-        room_list = []     # List of all diagnostic rooms in this hospital
-
         # INPUT VALIDATION
         if not isinstance(sort_list, bool):
             raise TypeError(f'The sort_list must be of type bool instead of {type(sort_list)}')
 
+        # DONE
+        return self._translate_rooms(self.get_diag_room_ids(), sort_list=sort_list)
+
+    def get_diag_room_ids(self) -> List[int]:
+        """Return the catalog room IDs of all diagnostic rooms, in order of first appearance."""
+        # LOCAL VARIABLES
+        room_ids = {}  # Ordered set of diagnostic room IDs in this hospital
+
         # MAKE LIST
-        # Get illness objects
-        ill_obj_list = self.get_illness_objects()
-        # Build the list
-        for ill_obj in ill_obj_list:
-            for diag_room in ill_obj.get_diag():
-                if diag_room not in room_list:
-                    room_list.append(diag_room)
-        # Sort?
-        if sort_list:
-            room_list.sort()
+        for ill_obj in self.get_illness_objects():
+            for room_id in ill_obj.get_diag_ids():
+                room_ids[room_id] = None
 
         # DONE
-        return room_list
+        return list(room_ids)
+
+    def get_id(self) -> int:
+        """Return the catalog hospital ID."""
+        return self._hospital_id
+
+    def get_illness_ids(self) -> List[int]:
+        """Retrieves the catalog illness IDs found in this hospital.
+
+        Raises:
+            TypeError: A non-string illness name was found
+            ValueError: An unknown illness was found
+            RuntimeError: A duplicate illness was found or no illnesses were found
+        """
+        # INTERNAL VALIDATION
+        if self.catalog.get_illness_list_error(self._hospital_id):
+            raise self.catalog.get_illness_list_error(self._hospital_id)
+
+        # DONE
+        return list(self.catalog.get_hospital_illness_ids(self._hospital_id))
 
     def get_illness_names(self) -> List[str]:
         """Retrieves the list of illnesses found in this hospital.
@@ -87,29 +119,28 @@ class TPHHospital:
             ValueError: An unknown illness was found
             RuntimeError: A duplicate illness was found or no illnesses were found
         """
-        # LOCAL VARIABLES
-        illness_list = None  # List of illnesses
+        return [self.catalog.illness_names[illness_id] for illness_id in self.get_illness_ids()]
 
-        # INTERNAL VALIDATION
-        if isinstance(self._hospital_illnesses, list):
-            illness_list = self._hospital_illnesses
-        elif isinstance(self._hospital_illnesses, str):
-            illness_list = [self._hospital_illnesses]
-        if illness_list:
-            for illness in illness_list:
-                if not isinstance(illness, str):
-                    raise TypeError(f'Invalid illness data type of {type(illness)} found in '
-                                    f'{self._hospital_name}')
-                if illness not in self.illness_list:
-                    raise ValueError(f'Invalid illness "{illness}" found in {self._hospital_name}')
-                if illness_list.count(illness) > 1:
-                    raise RuntimeError(f'Duplicate entry {illness} detected in '
-                                       f'{self._hospital_name}')
-        else:
-            raise RuntimeError(f'No illnesses configured for {self._hospital_name}')
+    def get_illness_object(self, illness_name: str) -> TPHIllness:
+        """Retrieve the TPHIllness object named illness_name from this hospital.
+
+        Raises:
+            TypeError: illness_name is not a string.
+            ValueError: illness_name is not an illness found in this hospital.
+            NotImplementedError: Malformed/Incomplete internal data.
+        """
+        # INPUT VALIDATION
+        if not isinstance(illness_name, str):
+            raise TypeError('The illness_name argument must of type str instead of '
+                            f'{type(illness_name)}')
+        if not self._hospital_illness_objs:
+            self._build_illness_objects()
+        if illness_name not in self._illness_index:
+            raise ValueError(f'Illness "{illness_name}" could not be found in '
+                             f'{self._hospital_name}')
 
         # DONE
-        return illness_list
+        return self._illness_index[illness_name]
 
     def get_illness_objects(self) -> list:
         """Retrieves TPHIllness objects associated with this hospital.
@@ -125,70 +156,182 @@ class TPHHospital:
         if not self._hospital_illness_objs:
             self._build_illness_objects()
 
-        return self._hospital_illness_objs
+        # Shared object; hand out a copy
+        return list(self._hospital_illness_objs)
 
     def get_name(self) -> str:
         """Return the name of the hospital."""
         return self._hospital_name
 
-    def get_room_list(self, sort_list: bool = True) -> List[str]:
-        """Return a list of all rooms associated with this hospital."""
+    def get_room_ids(self) -> List[int]:
+        """Return the catalog room IDs of all rooms, diagnostic rooms first."""
         # LOCAL VARIABLES
-        room_list = []   # List of all rooms in this hospital
+        room_ids = dict.fromkeys(self.get_diag_room_ids())  # Ordered set of room IDs
+
+        # MAKE LIST
+        for room_id in self.get_treat_room_ids():
+            room_ids[room_id] = None
+
+        # DONE
+        return list(room_ids)
+
+    def get_room_illness_objects(self, room_id: int,
+                                 purpose: int = PURPOSE_DIAG | PURPOSE_TREAT) -> List[TPHIllness]:
+        """Return the illnesses that use room_id, in hospital order.
+
+        Args:
+            room_id: Catalog room ID.
+            purpose: Optional; PURPOSE_* flags (see: tph_catalog) of the roles to match.  For
+                example, PURPOSE_TREAT only returns illnesses treated in room_id.
+
+        Raises:
+            TypeError: Bad data type passed in.
+            NotImplementedError: Malformed/Incomplete internal data.
+        """
+        # INPUT VALIDATION
+        if not isinstance(room_id, int):
+            raise TypeError(f'The room_id argument must of type int instead of {type(room_id)}')
+        if not isinstance(purpose, int):
+            raise TypeError(f'The purpose argument must of type int instead of {type(purpose)}')
+        if not self._hospital_illness_objs:
+            self._build_illness_objects()
 
+        # DONE
+        return [ill_obj for ill_obj, flags in self._room_index.get(room_id, ()) if flags & purpose]
+
+    def get_room_list(self, sort_list: bool = True) -> List[str]:
+        """Return a list of all rooms associated with this hospital."""
         # INPUT VALIDATION
         if not isinstance(sort_list, bool):
             raise TypeError(f'The sort_list must be of type bool instead of {type(sort_list)}')
 
-        # GET LIST
-        # Diagnostic Rooms
-        room_list = self.get_diag_room_list(sort_list=sort_list)
-        # Treament Rooms
-        for room in self.get_treat_room_list(sort_list=sort_list):
-            if room not in room_list:
-                room_list.append(room)
-        # Sort?
-        if sort_list:
-            room_list.sort()
+        # DONE
+        return self._translate_rooms(self.get_room_ids(), sort_list=sort_list)
+
+    def get_treat_room_ids(self) -> List[int]:
+        """Return the catalog room IDs of all treatment rooms, in order of first appearance."""
+        # LOCAL VARIABLES
+        room_ids = {}  # Ordered set of treatment room IDs in this hospital
+
+        # MAKE LIST
+        for ill_obj in self.get_illness_objects():
+            if ill_obj.get_treat_id() != NO_ROOM:
+                room_ids[ill_obj.get_treat_id()] = None
 
         # DONE
-        return room_list
+        return list(room_ids)
 
     def get_treat_room_list(self, sort_list: bool = True) -> List[str]:
         """Return a list of all treatment rooms associated with this hospital."""
-        # LOCAL VARIABLES
-        ill_obj_list = []  # List of all illness objects for this hospital
-        room_list = []     # List of all treatment rooms in this hospital
-
         # INPUT VALIDATION
         if not isinstance(sort_list, bool):
             raise TypeError(f'The sort_list must be of type bool instead of {type(sort_list)}')
 
-        # MAKE LIST
-        # Get illness objects
-        ill_obj_list = self.get_illness_objects()
-        # Build the list
-        for ill_obj in ill_obj_list:
-            if ill_obj.get_treat() not in room_list:
-                room_list.append(ill_obj.get_treat())
-        # Sort?
-        if sort_list:
-            room_list.sort()
-
         # DONE
-        return room_list
+        return self._translate_rooms(self.get_treat_room_ids(), sort_list=sort_list)
 
     def _build_illness_objects(self) -> None:
-        """Builds _hospital_illness_objs list.
+        """Builds _hospital_illness_objs tuple and the illness and room indexes.
 
-        Overwrites whatever may have existed.
+        Overwrites whatever may have existed.  The indexes are assigned before the tuple, and the
+        tuple in one step, so threads sharing this object never see a partial list or an index
+        that's missing.
 
         Raises:
             TypeError: Illness name is not a string.
             ValueError: Invalid illness name.
             NotImplementedError: Malformed/Incomplete internal data.
         """
-        self._hospital_illness_objs = []  # Reset instance attribute
-        # Populate instance attribute
-        for illness in self.get_illness_names():
-            self._hospital_illness_objs.append(TPHIllness(illness))
+        # LOCAL VARIABLES
+        illness_objs = tuple(TPHIllness(self.catalog.illness_names[illness_id])
+                             for illness_id in self.get_illness_ids())  # Hospital illnesses
+        room_index = {}  # Room ID: {TPHIllness: PURPOSE_* flags}
+
+        # INDEX
+        for ill_obj in illness_objs:
+            for room_id in ill_obj.get_diag_ids():
+                room_index.setdefault(room_id, {})
+                room_index[room_id][ill_obj] = room_index[room_id].get(ill_obj, 0) | PURPOSE_DIAG
+            if ill_obj.get_treat_id() != NO_ROOM:
+                room_index.setdefault(ill_obj.get_treat_id(), {})
+                room_index[ill_obj.get_treat_id()][ill_obj] = \
+                    room_index[ill_obj.get_treat_id()].get(ill_obj, 0) | PURPOSE_TREAT
+
+        # DONE
+        self._illness_index = {ill_obj.get_name(): ill_obj for ill_obj in illness_objs}
+        self._room_index = {room_id: tuple(ill_dict.items())
+                            for room_id, ill_dict in room_index.items()}
+        self._hospital_illness_objs = illness_objs
+
+    def _translate_rooms(self, room_ids: List[int], sort_list: bool) -> List[str]:
+        """Translate room_ids into room names, sorting them by name if sort_list is True."""
+        # LOCAL VARIABLES
+        room_list = [self.catalog.room_names[room_id] for room_id in room_ids]  # Room names
+
+        # Sort?
+        if sort_list:
+            room_list.sort()
+
+        # DONE
+        return room_list
+
+
+def get_configured_hospitals(hospital_list: List[str] = None) -> List[TPHHospital]:
+    """Return the TPHHospital of every hospital in hospital_list configured with illnesses.
+
+    Every name is validated before any hospital is built.  Hospitals that are not configured
+    with illnesses are skipped.
+
+    Args:
+        hospital_list: Optional; Hospital names, as a list or tuple.  Defaults to
+            TPH_HOSPITAL_LIST.
+
+    Raises:
+        TypeError: Bad data type passed in.
+        ValueError: Unknown hospital name.
+    """
+    # LOCAL VARIABLES
+    hospitals = []   # Return value
+    hospital = None  # TPHHospital object
+
+    # INPUT VALIDATION
+    hospital_list = validate_hospital_list(hospital_list)
+
+    # LIST THEM
+    for hospital_name in hospital_list:
+        hospital = TPHHospital(hospital_name)
+        try:
+            hospital.get_illness_ids()
+        except RuntimeError:
+            continue  # Not configured with illnesses
+        hospitals.append(hospital)
+
+    # DONE
+    return hospitals
+
+
+def validate_hospital_list(hospital_list: List[str] = None) -> List[str]:
+    """Validate a list or tuple of hospital names and return it as a list.
+
+    Args:
+        hospital_list: Optional; Hospital names.  Defaults to TPH_HOSPITAL_LIST.
+
+    Raises:
+        TypeError: hospital_list is not a list or tuple, or holds a name that is not a string.
+        ValueError: Unknown hospital name.
+    """
+    # INPUT VALIDATION
+    if hospital_list is None:
+        hospital_list = TPH_HOSPITAL_LIST
+    if not isinstance(hospital_list, (list, tuple)):
+        raise TypeError('The hospital_list argument must of type list instead of '
+                        f'{type(hospital_list)}')
+    for hospital_name in hospital_list:
+        if not isinstance(hospital_name, str):
+            raise TypeError(f'Found a hospital name of type {type(hospital_name)} in the '
+                            'hospital_list')
+        if not TPH_CATALOG.has_hospital(hospital_name):
+            raise ValueError(f'Unknown hospital name: {hospital_name}')
+
+    # DONE
+    return list(hospital_list)
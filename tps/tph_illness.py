@@ -11,23 +11,34 @@ TPHIllness class validates and parses one illness from the game Two Point Hospit
 """
 
 # Standard
-from typing import Any, List
+from typing import Any, List, Tuple
+import math
 
 # Third Party
 
 # Local
+from tps.danger_strategies import evaluate_strategy, validate_strategy
+from tps.tph_catalog import NO_ROOM, TPH_CATALOG
 from tps.tph_constants import (MISSING_DATA, TPH_DIAGNOSTIC_LIST, TPH_ILLNESS_DICT,
-                               TPH_ILLNESS_LIST, TPH_NAME_ROOM_GP, TPH_TREATMENT_LIST)
+                               TPH_ILLNESS_LIST, TPH_TREATMENT_LIST)
+from tps.tph_registry import FlyweightMeta
 
 
-class TPHIllness:
-    """Defines one Two Point Hospital illness."""
+class TPHIllness(metaclass=FlyweightMeta):
+    """Defines one Two Point Hospital illness.
+
+    Objects are shared: constructing a TPHIllness by name returns the instance held by
+    TPH_REGISTRY (see: tph_registry), so treat them as read-only.
+    """
+
+    __slots__ = ('_illness_name', '_illness_id')
 
     # CLASS ATTRIBUTES
     illness_dict = TPH_ILLNESS_DICT
     illness_list = TPH_ILLNESS_LIST
     treat_room_list = TPH_TREATMENT_LIST
     diag_room_list = TPH_DIAGNOSTIC_LIST
+    catalog = TPH_CATALOG
 
     def __init__(self, illness_name: str) -> None:
         """TPHIllness class ctor.
@@ -44,25 +55,15 @@ class TPHIllness:
             raise TypeError(f'Illness name must be of type str instead of {type(illness_name)}')
         if not illness_name:
             raise ValueError('Illness name can not be empty')
-        if illness_name not in self.illness_list:
+        if not self.catalog.has_illness(illness_name):
             raise ValueError('Unknown illness name')
 
         # INSTANCE ATTRIBUTES
-        self._illness_name = illness_name  # Name of the illness
-        try:
-            # Diag rooms
-            self._illness_diag = self.illness_dict[self._illness_name].diagnostic
-            # Treatment room
-            self._illness_treat = self.illness_dict[self._illness_name].treatment
-            # Illness difficulty
-            self._illness_difficulty = self.illness_dict[self._illness_name].difficulty
-            # Chance of death
-            self._illness_death = self.illness_dict[self._illness_name].death
-            # Health loss severity
-            self._illness_decline = self.illness_dict[self._illness_name].decline
-        except (AttributeError, KeyError):
-            raise NotImplementedError(f'Malformed dictionary entry for {self._illness_name}')
-        self._validate_attributes()
+        self._illness_name = illness_name                             # Name of the illness
+        self._illness_id = self.catalog.get_illness_id(illness_name)  # Catalog illness ID
+        # Any errors compiling the catalog entry (e.g., malformed, invalid numbers) surface here
+        if self.catalog.get_illness_error(self._illness_id):
+            raise self.catalog.get_illness_error(self._illness_id)
 
     def get_aggregate_value(self, strategy: int = 2) -> Any:
         """Return the illness danger aggregate value.
@@ -71,45 +72,20 @@ class TPHIllness:
         chance of death, and health decline rate.  Any values of MISSING_DATA are calculated as 1.
 
         Args:
-            strategy: Optional; If 1, return the product of the source values.  If 2, return
-                the average of the source values.  If 3, return the average of strategy 1 and 2.
+            strategy: Optional; A registered strategy ID (see: danger_strategies module).  If 1,
+                return the product of the source values.  If 2, return the average of the source
+                values.  If 3, return the average of strategy 1 and 2.  If 4, return the largest
+                source value.  If 5, return their weighted geometric mean.
 
         Raises:
             TypeError: Bad data type
             ValueError: Invalid strategy value
         """
-        # LOCAL VARIABLES
-        # Aggregate source values
-        val_list = [self.get_difficulty_value(), self.get_death_value(), self.get_decline_value()]
-        product = 0    # Strategy 1
-        average = 0    # Strategy 2
-        aggregate = 0  # Calculated aggregate value
-
         # INPUT VALIDATION
-        if not isinstance(strategy, int):
-            raise TypeError(f'The strategy argument can not be of type {type(strategy)}')
-        if strategy not in (1, 2, 3):
-            raise ValueError(f'The strategy selection of {strategy} is invalid')
-
-        # GET IT
-        # Validate aggregate source values
-        for index, value in enumerate(val_list):
-            if value == MISSING_DATA:
-                val_list[index] = 1  # Missing data is a mathematical pass
-        # Calculate values
-        product = val_list[0] * val_list[1] * val_list[2]
-        average = (val_list[0] + val_list[1] + val_list[2]) / 3
-        if strategy == 1:
-            aggregate = product
-        elif strategy == 2:
-            aggregate = average
-        elif strategy == 3:
-            aggregate = (product + average) / 2
-        else:
-            raise NotImplementedError(f'Strategy value {strategy} passed validation?!')
+        validate_strategy(strategy)
 
         # DONE
-        return aggregate
+        return evaluate_strategy(strategy)[self._illness_id]
 
     def get_aggregate_str(self, strategy: int = 2) -> str:
         """Convert aggregate value to a percent string.
@@ -118,8 +94,7 @@ class TPHIllness:
         chance of death, and health decline rate.  Any values of MISSING_DATA are calculated as 1.
 
         Args:
-            strategy: Optional; If 1, return the product of the source values.  If 2, return
-                the average of the source values.  If 3, return the average of strategy 1 and 2.
+            strategy: Optional; A registered strategy ID. (see: get_aggregate_value())
 
         Raises:
             TypeError: Bad data type
@@ -140,7 +115,7 @@ class TPHIllness:
 
     def get_death_value(self) -> Any:
         """Return the chance of death."""
-        return self._illness_death
+        return _translate_num(self.catalog.death[self._illness_id])
 
     def get_death_str(self) -> str:
         """Convert death chance to a percent string."""
@@ -159,7 +134,7 @@ class TPHIllness:
 
     def get_decline_value(self) -> Any:
         """Return the health loss severity."""
-        return self._illness_decline
+        return _translate_num(self.catalog.decline[self._illness_id])
 
     def get_decline_str(self) -> str:
         """Convert health loss severity to a percent string."""
@@ -179,35 +154,30 @@ class TPHIllness:
     def get_diag(self) -> List[str]:
         """Retrieves the list of diagnostic rooms for the illness.
 
-        Prepends GP's Room to the list if it doesn't already exist.
+        Prepends GP's Room to the list if it doesn't already exist.  Returns None if the
+        diagnostic rooms are missing or misconfigured.
         """
         # LOCAL VARIABLES
-        illness_diag = None  # List of diagnostic rooms
-
-        # INTERNAL VALIDATION
-        if isinstance(self._illness_diag, list):
-            illness_diag = self._illness_diag
-        elif isinstance(self._illness_diag, str):
-            illness_diag = [self._illness_diag]
-        if illness_diag:
-            # Prepend GP's Room
-            if TPH_NAME_ROOM_GP not in illness_diag:
-                illness_diag = [TPH_NAME_ROOM_GP] + illness_diag
-            # Validate Contents
-            for diag_room in illness_diag:
-                if not isinstance(diag_room, str):
-                    illness_diag = None
-                    break
-                if diag_room not in self.diag_room_list:
-                    illness_diag = None
-                    break
+        illness_diag = None             # List of diagnostic rooms
+        diag_ids = self.get_diag_ids()  # Validated diagnostic room IDs
+
+        # TRANSLATE
+        if diag_ids:
+            illness_diag = [self.catalog.room_names[room_id] for room_id in diag_ids]
 
         # DONE
         return illness_diag
 
+    def get_diag_ids(self) -> Tuple[int, ...]:
+        """Retrieves the catalog room IDs of the diagnostic rooms, GP's Office first.
+
+        Returns an empty tuple if the diagnostic rooms are missing or misconfigured.
+        """
+        return self.catalog.get_diag_ids(self._illness_id)
+
     def get_difficulty_value(self) -> Any:
         """Return the difficulty."""
-        return self._illness_difficulty
+        return _translate_num(self.catalog.difficulty[self._illness_id])
 
     def get_difficulty_str(self) -> str:
         """Convert difficulty to a percent string."""
@@ -224,6 +194,10 @@ class TPHIllness:
         # DONE
         return diff_percent
 
+    def get_id(self) -> int:
+        """Return the catalog illness ID."""
+        return self._illness_id
+
     def get_name(self) -> str:
         """Return the name of the illness."""
         return self._illness_name
@@ -231,28 +205,23 @@ class TPHIllness:
     def get_treat(self) -> str:
         """Retrieves the treatment room for the illness."""
         # LOCAL VARIABLES
-        illness_treat = None  # Treatment room
+        illness_treat = None            # Treatment room
+        treat_id = self.get_treat_id()  # Validated treatment room ID
 
-        # INTERNAL VALIDATION
-        if isinstance(self._illness_treat, str) and self._illness_treat in self.treat_room_list:
-            illness_treat = self._illness_treat
+        # TRANSLATE
+        if treat_id != NO_ROOM:
+            illness_treat = self.catalog.room_names[treat_id]
 
         # DONE
         return illness_treat
 
-    def _validate_attributes(self) -> None:
-        # self._illness_diag
-        # self._illness_treat
-        _validate_num(self._illness_difficulty)
-        _validate_num(self._illness_death)
-        _validate_num(self._illness_decline)
-
-
-def _validate_num(num: Any) -> None:
-    """Validate number value as percentage."""
-    if num == MISSING_DATA:
-        pass  # Undefined data.  Let it ride.
-    elif not isinstance(num, int) and not isinstance(num, float):
-        raise TypeError(f'Value {num}, of type {type(num)}, is not a valid number type')
-    elif num < 0:
-        raise ValueError(f'Value {num} is not valid as a percentage')
+    def get_treat_id(self) -> int:
+        """Retrieves the catalog room ID of the treatment room; NO_ROOM if misconfigured."""
+        return self.catalog.treat_rooms[self._illness_id]
+
+
+def _translate_num(num: float) -> Any:
+    """Translate a catalog danger factor back into a value; NaN translates to MISSING_DATA."""
+    if math.isnan(num):
+        return MISSING_DATA
+    return num
@@ -0,0 +1,127 @@
+"""Defines the Two Point Science object registry.
+
+TPHRegistry is a bounded, thread-safe, least-recently-used cache of shared objects.  It
+invalidates itself whenever the package catalog is recompiled.  FlyweightMeta uses TPH_REGISTRY so
+constructing a TPHHospital or TPHIllness by name returns one shared instance.
+
+    Typical usage example:
+
+    from tps.tph_registry import TPH_REGISTRY
+    hospital = TPHHospital('Grockle Bay')
+    assert hospital is TPHHospital('Grockle Bay')  # Same shared object
+    print(TPH_REGISTRY.get_stats())                # Hits, misses, etc.
+    TPH_REGISTRY.invalidate()                      # Start fresh
+"""
+
+# Standard
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+import threading
+
+# Third Party
+
+# Local
+from tps.tph_catalog import TPH_CATALOG, TPHCatalog
+
+
+# MACROS
+# Default maximum number of objects held by a registry
+REGISTRY_MAX_SIZE = 512
+
+
+class TPHRegistry:
+    """Bounded, thread-safe LRU registry of shared objects keyed by any hashable value."""
+
+    def __init__(self, max_size: int = REGISTRY_MAX_SIZE,
+                 catalog: TPHCatalog = TPH_CATALOG) -> None:
+        """TPHRegistry class ctor.
+
+        Args:
+            max_size: Optional; Maximum number of objects to hold before evicting the least
+                recently used.
+            catalog: Optional; The catalog the registered objects were built from.  Any change to
+                the catalog's generation clears the registry.
+
+        Raises:
+            TypeError: Bad data type passed in.
+            ValueError: Invalid max_size.
+        """
+        # INPUT VALIDATION
+        if not isinstance(max_size, int):
+            raise TypeError(f'The max_size argument must of type int instead of {type(max_size)}')
+        if max_size < 1:
+            raise ValueError(f'The max_size value ({max_size}) must be greater than zero')
+        if not isinstance(catalog, TPHCatalog):
+            raise TypeError(f'The catalog can not be of type {type(catalog)}')
+
+        # INSTANCE ATTRIBUTES
+        self._max_size = max_size                 # Maximum number of entries
+        self._catalog = catalog                   # Catalog the entries were built from
+        self._generation = catalog.generation     # Catalog generation of the current entries
+        self._entries = OrderedDict()             # Key: Shared object, least recently used first
+        self._lock = threading.RLock()            # Factories may use the registry themselves
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Return the object registered as key, calling factory() to create it if necessary.
+
+        Exceptions raised by factory() propagate and nothing is registered.
+
+        Raises:
+            TypeError: key is not hashable.
+        """
+        with self._lock:
+            self._check_generation()
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats['hits'] = self._stats['hits'] + 1
+                return self._entries[key]
+            self._stats['misses'] = self._stats['misses'] + 1
+            entry = factory()
+            self._entries[key] = entry
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] = self._stats['evictions'] + 1
+            return entry
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return a copy of the registry statistics, including the current size."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        return stats
+
+    def invalidate(self, key: Hashable = None) -> None:
+        """Drop key from the registry.  Drops everything if key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self._stats['invalidations'] = self._stats['invalidations'] + 1
+
+    def _check_generation(self) -> None:
+        """Clear the registry if the catalog has been recompiled.  Call while holding the lock."""
+        if self._generation != self._catalog.generation:
+            self._entries.clear()
+            self._generation = self._catalog.generation
+            self._stats['invalidations'] = self._stats['invalidations'] + 1
+
+
+class FlyweightMeta(type):
+    """Metaclass which shares one instance per (class, name) through TPH_REGISTRY.
+
+    Classes using this metaclass must take a single name argument in their ctor.  Anything other
+    than a single positional string bypasses the registry so the ctor can raise its usual errors.
+    """
+
+    def __call__(cls, *args, **kwargs) -> Any:
+        """Return the shared instance of cls for the name in args, constructing it if necessary."""
+        if kwargs or len(args) != 1 or not isinstance(args[0], str):
+            return super().__call__(*args, **kwargs)
+        return TPH_REGISTRY.get((cls, args[0]),
+                                lambda: super(FlyweightMeta, cls).__call__(args[0]))
+
+
+# The package-wide registry of shared TPHHospital and TPHIllness objects
+TPH_REGISTRY = TPHRegistry()